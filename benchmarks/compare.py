@@ -0,0 +1,65 @@
+"""
+Compara dos informes de benchmarks.load_test
+
+Uso:
+    python -m benchmarks.compare antes.json despues.json --max-regression 10
+
+Sale con código 1 si algún escenario empeora su p95 más del porcentaje indicado.
+"""
+import argparse
+import json
+import sys
+
+METRICS = ("p50_ms", "p95_ms", "p99_ms", "throughput_rps")
+
+
+def _delta(before: float, after: float) -> float:
+    if before == 0:
+        return 0.0
+    return (after - before) / before * 100.0
+
+
+def compare(before: dict, after: dict, max_regression: float) -> int:
+    """
+    Imprime la diferencia por escenario y concurrencia
+
+    Returns:
+        int: Número de escenarios cuyo p95 empeoró más de max_regression %
+    """
+    regressions = 0
+    print(f"{'escenario':<40} {'c':>4} " + " ".join(f"{m:>22}" for m in METRICS))
+    for name, levels in after["results"].items():
+        for concurrency, summary in levels.items():
+            previous = before["results"].get(name, {}).get(concurrency)
+            if previous is None:
+                continue
+            cells = []
+            for metric in METRICS:
+                delta = _delta(previous[metric], summary[metric])
+                cells.append(f"{previous[metric]:>8.2f}->{summary[metric]:>8.2f} {delta:+5.1f}%")
+            print(f"{name:<40} {concurrency:>4} " + " ".join(f"{c:>22}" for c in cells))
+            if _delta(previous["p95_ms"], summary["p95_ms"]) > max_regression:
+                regressions += 1
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara dos informes de carga")
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument("--max-regression", type=float, default=10.0, help="Porcentaje máximo de empeora del p95")
+    args = parser.parse_args()
+
+    with open(args.before) as file:
+        before = json.load(file)
+    with open(args.after) as file:
+        after = json.load(file)
+
+    regressions = compare(before, after, args.max_regression)
+    if regressions:
+        print(f"{regressions} escenario(s) empeoraron más de {args.max_regression}% en p95")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Presupuesto de tiempo de importación de la API (arranque en frío)
+
+Ejecuta `python -X importtime -c "import main"` en un proceso nuevo y falla
+(código 1) si el tiempo acumulado supera el presupuesto o si se importa
+alguna dependencia pesada que debería cargarse bajo demanda.
+
+Uso:
+    python -m benchmarks.import_time --budget-ms 1500
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+# Módulos que nunca deben importarse al arrancar la API
+FORBIDDEN_MODULES = ("torch", "transformers", "pandas", "openmeteo_requests", "pyswip")
+
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure(module: str = "main") -> Tuple[int, Dict[str, int]]:
+    """
+    Importa el módulo en un intérprete limpio con -X importtime
+
+    Returns:
+        tuple: (microsegundos acumulados del módulo, {módulo: microsegundos acumulados})
+    """
+    env = dict(os.environ)
+    env.setdefault("DATABASE_URL", "sqlite://")
+    env["WARMUP_SUBSYSTEMS"] = "none"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"No se pudo importar {module}:\n{result.stderr[-2000:]}")
+
+    cumulative: Dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            cumulative[match.group(4)] = int(match.group(2))
+    return cumulative.get(module, 0), cumulative
+
+
+def check(budget_ms: float, module: str = "main") -> List[str]:
+    """
+    Devuelve la lista de incumplimientos del presupuesto (vacía si todo va bien)
+    """
+    total_us, cumulative = measure(module)
+    problems = []
+    if total_us / 1000 > budget_ms:
+        problems.append(f"import {module} tardó {total_us / 1000:.0f} ms (presupuesto {budget_ms:.0f} ms)")
+    for name in FORBIDDEN_MODULES:
+        if name in cumulative:
+            problems.append(f"{name} se importa al arrancar ({cumulative[name] / 1000:.0f} ms)")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Presupuesto de tiempo de importación")
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("IMPORT_BUDGET_MS", "1500")))
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--top", type=int, default=15, help="Mostrar los N módulos más lentos")
+    args = parser.parse_args()
+
+    total_us, cumulative = measure(args.module)
+    print(f"import {args.module}: {total_us / 1000:.1f} ms")
+    for name, micros in sorted(cumulative.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {micros / 1000:>8.1f} ms  {name}")
+
+    problems = check(args.budget_ms, args.module)
+    if problems:
+        print("\n".join(f"FALLO: {problem}" for problem in problems))
+        sys.exit(1)
+    print(f"OK: dentro del presupuesto de {args.budget_ms:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
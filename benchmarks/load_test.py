@@ -0,0 +1,206 @@
+"""
+Prueba de carga de la API, en proceso (ASGI) o por HTTP, a varios niveles de concurrencia
+
+Uso:
+    # En proceso, contra la base sembrada con benchmarks.seed
+    DATABASE_URL=sqlite:///bench.db python -m benchmarks.load_test --concurrency 1 8 32
+
+    # Por HTTP contra un servidor uvicorn ya levantado
+    python -m benchmarks.load_test --base-url http://127.0.0.1:8005 --concurrency 8 64
+
+El resultado es un JSON comparable entre ejecuciones con benchmarks.compare.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+import httpx
+
+from .stats import summarize
+
+
+@dataclass
+class Scenario:
+    """Petición a medir; build recibe el manifiesto y un Random y devuelve (path, json)"""
+    name: str
+    method: str
+    build: Callable[[dict, random.Random], tuple]
+
+
+def _greenhouse_id(manifest: dict, rng: random.Random) -> int:
+    return rng.randint(1, manifest["greenhouses"])
+
+
+def _user_id_for(greenhouse_id: int, manifest: dict) -> int:
+    return (greenhouse_id - 1) % manifest["users"] + 1
+
+
+SCENARIOS: List[Scenario] = [
+    Scenario("GET /", "GET", lambda m, r: ("/", None)),
+    Scenario(
+        "GET /greenhouses/{greenhouse_id}", "GET",
+        lambda m, r: (f"/greenhouses/{_greenhouse_id(m, r)}", None)
+    ),
+    Scenario(
+        "PATCH /greenhouses/{greenhouse_id}", "PATCH",
+        lambda m, r: (
+            lambda gid: (
+                f"/greenhouses/{gid}?user_id={_user_id_for(gid, m)}",
+                {"location": f"Parcela {r.randint(1, 97)}"}
+            )
+        )(_greenhouse_id(m, r))
+    ),
+    Scenario(
+        "POST /users/login", "POST",
+        lambda m, r: ("/users/login", {"username": f"bench_user_{r.randint(1, m['users'])}", "password": "Bench1234"})
+    ),
+]
+
+
+async def _run_level(
+        client: httpx.AsyncClient,
+        scenario: Scenario,
+        manifest: dict,
+        concurrency: int,
+        total_requests: int,
+        rng: random.Random
+) -> Dict[str, float]:
+    requests_plan = [scenario.build(manifest, rng) for _ in range(total_requests)]
+    latencies: List[float] = []
+    errors = 0
+    next_index = 0
+
+    async def worker():
+        nonlocal next_index, errors
+        while next_index < len(requests_plan):
+            path, body = requests_plan[next_index]
+            next_index += 1
+            start = time.perf_counter()
+            try:
+                response = await client.request(scenario.method, path, json=body)
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(
+        manifest: dict,
+        concurrency_levels: List[int],
+        requests_per_level: int,
+        warmup: int,
+        base_url: Optional[str] = None,
+        only: Optional[List[str]] = None,
+        random_seed: int = 7
+) -> dict:
+    """
+    Ejecuta todos los escenarios a cada nivel de concurrencia
+
+    Args:
+        manifest: Manifiesto generado por benchmarks.seed
+        concurrency_levels: Niveles de concurrencia a medir
+        requests_per_level: Peticiones por escenario y nivel
+        warmup: Peticiones de calentamiento (no medidas) por escenario
+        base_url: URL del servidor; si es None se usa la app en proceso vía ASGI
+        only: Nombres de escenario a ejecutar (por defecto todos)
+        random_seed: Semilla para que los IDs pedidos sean reproducibles
+
+    Returns:
+        dict: Informe con metadatos y resultados por escenario y concurrencia
+    """
+    if base_url:
+        client = httpx.AsyncClient(base_url=base_url, timeout=30.0)
+        mode = "http"
+    else:
+        from main import app
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=30.0)
+        mode = "in-process"
+
+    scenarios = [s for s in SCENARIOS if not only or s.name in only]
+    results: Dict[str, Dict[str, dict]] = {}
+    async with client:
+        for scenario in scenarios:
+            rng = random.Random(random_seed)
+            if warmup:
+                await _run_level(client, scenario, manifest, 1, warmup, rng)
+            results[scenario.name] = {}
+            for concurrency in concurrency_levels:
+                summary = await _run_level(client, scenario, manifest, concurrency, requests_per_level, rng)
+                results[scenario.name][str(concurrency)] = summary
+                print(
+                    f"{scenario.name:<40} c={concurrency:<4} p50={summary['p50_ms']:>8.2f}ms "
+                    f"p95={summary['p95_ms']:>8.2f}ms p99={summary['p99_ms']:>8.2f}ms "
+                    f"rps={summary['throughput_rps']:>9.1f} errors={summary['errors']}"
+                )
+
+    return {
+        "meta": {
+            "mode": mode,
+            "base_url": base_url,
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "created_at": datetime.utcnow().isoformat(),
+            "requests_per_level": requests_per_level,
+            "concurrency_levels": concurrency_levels,
+            "seed": manifest,
+        },
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga de la Greenhouse API")
+    parser.add_argument("--manifest", default="bench_seed.json", help="Manifiesto de benchmarks.seed")
+    parser.add_argument("--base-url", default=None, help="Servidor HTTP; si se omite se usa la app en proceso")
+    parser.add_argument("--database-url", default=None, help="Solo en proceso: base de datos a usar")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=500, help="Peticiones por escenario y nivel")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--scenario", action="append", help="Limitar a uno o más escenarios")
+    parser.add_argument("--output", default="bench_results.json")
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+
+    with open(args.manifest) as file:
+        manifest = json.load(file)
+    if not args.base_url:
+        os.environ.setdefault("DATABASE_URL", manifest["database_url"])
+
+    report = asyncio.run(run(
+        manifest,
+        args.concurrency,
+        args.requests,
+        args.warmup,
+        base_url=args.base_url,
+        only=args.scenario,
+    ))
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2)
+    print(f"Informe guardado en {args.output}")
+
+
+if __name__ == "__main__":
+    main()
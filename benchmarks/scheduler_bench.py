@@ -0,0 +1,122 @@
+"""
+Latencia por tick del programador de riego/clima sobre la base sembrada
+
+Por defecto el pronóstico sale de un generador sintético con la misma forma
+que HourlyForecast, para no lanzar miles de coordenadas contra Open-Meteo;
+--live-forecast usa la API real.
+
+Uso:
+    DATABASE_URL=sqlite:///bench.db python -m benchmarks.seed --scale 2.5
+    python -m benchmarks.scheduler_bench --ticks 5 --shards 4
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from datetime import datetime
+
+import numpy as np
+
+from .stats import summarize
+
+
+def _synthetic_fetch(coordinates):
+    import pandas as pd
+    from clients.weather_client import HourlyForecast
+
+    start = pd.Timestamp.now("UTC").floor("h") - pd.Timedelta(days=2)
+    dates = pd.date_range(start=start, periods=24 * 9, freq="h")
+    forecasts = []
+    for latitude, longitude in coordinates:
+        rng = np.random.default_rng(abs(hash((latitude, longitude))) % 2**32)
+        hours = len(dates)
+        forecasts.append(HourlyForecast(
+            latitude=latitude,
+            longitude=longitude,
+            elevation=10.0,
+            utc_offset=0,
+            dates=dates,
+            temperature_2m=rng.normal(28, 4, hours).astype(np.float32),
+            relative_humidity_2m=rng.uniform(40, 95, hours).astype(np.float32),
+            rain=rng.exponential(0.3, hours).astype(np.float32),
+            precipitation_probability=rng.uniform(0, 100, hours).astype(np.float32),
+            precipitation=rng.exponential(0.4, hours).astype(np.float32),
+            showers=rng.exponential(0.1, hours).astype(np.float32),
+        ))
+    return forecasts
+
+
+def run(manifest: dict, ticks: int, shards: int, batch_size: int, live_forecast: bool = False) -> dict:
+    """
+    Ejecuta varios ticks y resume su latencia total y por fase
+
+    El primer tick pide todos los pronósticos; los siguientes salen de caché.
+    Las acciones se envían a SimulatedActuatorSink y no hay enfriamiento entre
+    ticks para que cada uno haga el trabajo completo.
+
+    Returns:
+        dict: Resultados en el mismo formato que benchmarks.load_test
+    """
+    import control.scheduler as scheduler_module
+    from control.actuators import SimulatedActuatorSink
+    from control.forecasts import ForecastCache
+    from control.scheduler import ClimateScheduler
+
+    scheduler_module.ACTION_COOLDOWN = scheduler_module.timedelta(0)
+    sink = SimulatedActuatorSink()
+    forecasts = ForecastCache(fetch=None if live_forecast else _synthetic_fetch)
+    scheduler = ClimateScheduler(sink, forecasts, shards=shards, batch_size=batch_size)
+    now = datetime.fromisoformat(manifest["seeded_at"])
+
+    async def run_ticks():
+        return [await scheduler.tick(now) for _ in range(ticks)]
+
+    started = time.perf_counter()
+    results = asyncio.run(run_ticks())
+    elapsed = time.perf_counter() - started
+
+    phases = sorted({phase for result in results for phase in result.durations})
+    by_phase = {
+        phase: summarize([result.durations.get(phase, 0.0) for result in results], 0, elapsed)
+        for phase in phases
+    }
+    for result in results:
+        print(f"tick: {result.greenhouses} invernaderos, {len(result.actions)} acciones, "
+              + "  ".join(f"{phase}={seconds * 1000:.1f}ms" for phase, seconds in result.durations.items()))
+
+    return {
+        "meta": {
+            "mode": "scheduler",
+            "ticks": ticks,
+            "shards": shards,
+            "batch_size": batch_size,
+            "live_forecast": live_forecast,
+            "actions": dict(sink.counts),
+            "seed": manifest,
+        },
+        "results": {f"scheduler.{phase}": {str(shards): summary} for phase, summary in by_phase.items()},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del programador de riego/clima")
+    parser.add_argument("--manifest", default="bench_seed.json")
+    parser.add_argument("--ticks", type=int, default=5)
+    parser.add_argument("--shards", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--live-forecast", action="store_true")
+    parser.add_argument("--output", default="bench_scheduler.json")
+    args = parser.parse_args()
+
+    with open(args.manifest) as file:
+        manifest = json.load(file)
+    os.environ.setdefault("DATABASE_URL", manifest["database_url"])
+
+    report = run(manifest, args.ticks, args.shards, args.batch_size, args.live_forecast)
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""
+Siembra una base de datos local con volúmenes realistas para los benchmarks
+
+Volúmenes a escala 1.0: 2 000 invernaderos, 20 000 sensores, 20 000 plantas y
+200 millones de lecturas. Las lecturas se dividen entre --readings-factor
+(por defecto 1 000 -> 200 000 lecturas) para que la siembra quepa en un portátil.
+
+Uso:
+    DATABASE_URL=sqlite:///bench.db python -m benchmarks.seed --scale 1.0 --readings-factor 1000
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.orm import Session
+
+from models import Base, Greenhouse, Plant, PlantAnalysis, Sensor, SensorReading, User
+from services.health_summary_service import HealthSummaryService
+from services.sensor_monitor_service import SensorMonitorService
+
+GREENHOUSES_AT_SCALE_1 = 2_000
+SENSORS_PER_GREENHOUSE = 10
+PLANTS_PER_GREENHOUSE = 10
+ANALYSES_PER_PLANT = 5
+READINGS_AT_SCALE_1 = 200_000_000
+GREENHOUSES_PER_USER = 4
+BATCH_SIZE = 10_000
+
+SENSOR_TYPES = ('temperature', 'humidity', 'light', 'soil_moisture')
+# (media, desviación) aproximadas por tipo de sensor
+SENSOR_PROFILES = {
+    'temperature': (24.0, 4.0),
+    'humidity': (65.0, 12.0),
+    'light': (18_000.0, 9_000.0),
+    'soil_moisture': (35.0, 10.0),
+}
+ANALYSIS_RESULTS = ('Tomato___healthy', 'Tomato___Late_blight', 'Tomato___Early_blight', 'Pepper___healthy')
+
+
+def _insert_batches(conn, table, rows):
+    for start in range(0, len(rows), BATCH_SIZE):
+        conn.execute(insert(table), rows[start:start + BATCH_SIZE])
+
+
+def seed(database_url: str, scale: float = 1.0, readings_factor: int = 1_000, random_seed: int = 42) -> dict:
+    """
+    Crea las tablas y las llena con datos sintéticos deterministas
+
+    Args:
+        database_url: URL de SQLAlchemy (SQLite o Postgres)
+        scale: Multiplicador sobre el número de invernaderos (y por tanto sensores/plantas)
+        readings_factor: Divisor aplicado al volumen real de lecturas
+        random_seed: Semilla para que dos siembras sean idénticas
+
+    Returns:
+        dict: Manifiesto con los volúmenes y rangos de IDs sembrados
+    """
+    rng = np.random.default_rng(random_seed)
+    engine = create_engine(database_url)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+    n_greenhouses = max(1, int(GREENHOUSES_AT_SCALE_1 * scale))
+    n_users = max(1, n_greenhouses // GREENHOUSES_PER_USER)
+    n_sensors = n_greenhouses * SENSORS_PER_GREENHOUSE
+    n_plants = n_greenhouses * PLANTS_PER_GREENHOUSE
+    n_readings = max(n_sensors, int(READINGS_AT_SCALE_1 * scale / readings_factor))
+    readings_per_sensor = n_readings // n_sensors
+    now = datetime.utcnow().replace(microsecond=0)
+
+    # Invernaderos repartidos por el valle agrícola de Sinaloa (unas 50 celdas de pronóstico)
+    latitudes = rng.uniform(25.3, 26.0, n_greenhouses).round(4)
+    longitudes = rng.uniform(-109.3, -108.6, n_greenhouses).round(4)
+
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        _insert_batches(conn, User.__table__, [
+            {"id": i, "username": f"bench_user_{i}", "password": "Bench1234"}
+            for i in range(1, n_users + 1)
+        ])
+        _insert_batches(conn, Greenhouse.__table__, [
+            {
+                "id": i,
+                "name": f"Invernadero {i}",
+                "location": f"Parcela {i % 97}",
+                "latitude": float(latitudes[i - 1]),
+                "longitude": float(longitudes[i - 1]),
+                "user_id": (i - 1) % n_users + 1,
+                "created_at": now,
+            }
+            for i in range(1, n_greenhouses + 1)
+        ])
+        _insert_batches(conn, Sensor.__table__, [
+            {
+                "id": i,
+                "greenhouse_id": (i - 1) // SENSORS_PER_GREENHOUSE + 1,
+                "name": f"Sensor {i}",
+                "type": SENSOR_TYPES[(i - 1) % len(SENSOR_TYPES)],
+                "active": True,
+                "installed_at": now,
+            }
+            for i in range(1, n_sensors + 1)
+        ])
+        _insert_batches(conn, Plant.__table__, [
+            {
+                "id": i,
+                "greenhouse_id": (i - 1) // PLANTS_PER_GREENHOUSE + 1,
+                "name": f"Planta {i}",
+                "type": "tomato",
+                "created_at": now,
+            }
+            for i in range(1, n_plants + 1)
+        ])
+
+        analyses = []
+        confidences = rng.uniform(0.5, 1.0, n_plants * ANALYSES_PER_PLANT)
+        labels = rng.integers(0, len(ANALYSIS_RESULTS), n_plants * ANALYSES_PER_PLANT)
+        for index in range(n_plants * ANALYSES_PER_PLANT):
+            analyses.append({
+                "plant_id": index // ANALYSES_PER_PLANT + 1,
+                "analysis_type": "health",
+                "result": ANALYSIS_RESULTS[labels[index]],
+                "confidence": float(confidences[index]),
+                "analyzed_at": now - timedelta(days=int(index % ANALYSES_PER_PLANT)),
+            })
+        _insert_batches(conn, PlantAnalysis.__table__, analyses)
+
+        # Lecturas cada 5 minutos hacia atrás desde "ahora", sensor por sensor
+        offsets = np.arange(readings_per_sensor)[::-1] * 300
+        rows = []
+        for sensor_id in range(1, n_sensors + 1):
+            mean, std = SENSOR_PROFILES[SENSOR_TYPES[(sensor_id - 1) % len(SENSOR_TYPES)]]
+            values = rng.normal(mean, std, readings_per_sensor)
+            rows.extend(
+                {"sensor_id": sensor_id, "value": float(value), "recorded_at": now - timedelta(seconds=int(offset))}
+                for value, offset in zip(values, offsets)
+            )
+            if len(rows) >= BATCH_SIZE:
+                conn.execute(insert(SensorReading.__table__), rows)
+                rows = []
+        if rows:
+            conn.execute(insert(SensorReading.__table__), rows)
+
+    # Agregados del resumen de salud a partir de los análisis sembrados
+    with Session(engine) as db:
+        HealthSummaryService.rebuild(db)
+        # Estado de los sensores para el monitor (las lecturas sembradas no pasan por la ingesta)
+        SensorMonitorService.rebuild(db)
+
+    with engine.connect() as conn:
+        total_readings = conn.execute(select(func.count()).select_from(SensorReading.__table__)).scalar()
+
+    return {
+        "database_url": engine.url.render_as_string(hide_password=True),
+        "scale": scale,
+        "readings_factor": readings_factor,
+        "random_seed": random_seed,
+        "users": n_users,
+        "greenhouses": n_greenhouses,
+        "sensors": n_sensors,
+        "plants": n_plants,
+        "analyses": n_plants * ANALYSES_PER_PLANT,
+        "readings": total_readings,
+        "readings_per_sensor": readings_per_sensor,
+        "seeded_at": now.isoformat(),
+        "seed_seconds": round(time.perf_counter() - started, 2),
+    }
+
+
+def main():
+    import os
+
+    parser = argparse.ArgumentParser(description="Siembra datos para los benchmarks")
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL", "sqlite:///bench.db"))
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--readings-factor", type=int, default=1_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--manifest", default="bench_seed.json", help="Ruta donde guardar el manifiesto")
+    args = parser.parse_args()
+
+    manifest = seed(args.database_url, args.scale, args.readings_factor, args.seed)
+    with open(args.manifest, "w") as file:
+        json.dump(manifest, file, indent=2)
+    print(json.dumps(manifest, indent=2))
+
+
+if __name__ == "__main__":
+    main()
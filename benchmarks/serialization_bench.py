@@ -0,0 +1,164 @@
+"""
+Parte de serialización en las lecturas calientes, antes y después del camino rápido
+
+Para cada endpoint se mide por separado la consulta y la serialización de:
+    response_model  entidades del ORM validadas con el response_model (lo que
+                    hace FastAPI: validar from_attributes, volcar a JSON y json.dumps)
+    fast            consulta solo de columnas + orjson.dumps (camino actual)
+
+Uso:
+    DATABASE_URL=sqlite:///bench.db python -m benchmarks.serialization_bench --iterations 200
+"""
+import argparse
+import json
+import os
+import random
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+import orjson
+
+from .stats import summarize
+
+
+def _measure(
+        query: Callable[[], Any],
+        serialize: Callable[[Any], bytes],
+        iterations: int
+) -> Dict[str, Any]:
+    query_seconds: List[float] = []
+    serialize_seconds: List[float] = []
+    size = 0
+    for _ in range(iterations):
+        start = time.perf_counter()
+        data = query()
+        middle = time.perf_counter()
+        size = len(serialize(data))
+        query_seconds.append(middle - start)
+        serialize_seconds.append(time.perf_counter() - middle)
+
+    total = sum(query_seconds) + sum(serialize_seconds)
+    return {
+        "query": summarize(query_seconds, 0, sum(query_seconds)),
+        "serialize": summarize(serialize_seconds, 0, sum(serialize_seconds)),
+        "serialize_share": round(sum(serialize_seconds) / total, 3) if total else 0.0,
+        "bytes": size,
+    }
+
+
+def _response_model_dump(adapter) -> Callable[[Any], bytes]:
+    def dump(data: Any) -> bytes:
+        validated = adapter.validate_python(data, from_attributes=True)
+        return json.dumps(
+            adapter.dump_python(validated, mode="json"), ensure_ascii=False, separators=(",", ":")
+        ).encode()
+    return dump
+
+
+def run(manifest: dict, iterations: int, random_seed: int = 7) -> dict:
+    """
+    Compara los dos caminos en GET /greenhouses/{id}, /plants/{id}/analyses y /sensors/{id}/readings
+
+    Returns:
+        dict: Por endpoint y camino, latencias de consulta y serialización y la fracción de serialización
+    """
+    from pydantic import TypeAdapter
+
+    from database_config import SessionLocal
+    from models.plant_analysis_model import PlantAnalysis
+    from schemas.greenhouse_schema import GreenhouseDetailResponse
+    from schemas.plant_analysis_schema import PlantAnalysisResponse
+    from schemas.sensor_reading_schema import SensorReadingPoint
+    from services.greenhouse_service import GreenhouseService
+    from services.plant_service import PlantService
+    from services.reading_storage_service import ReadingStorageService
+
+    rng = random.Random(random_seed)
+    db = SessionLocal()
+
+    def fresh(func: Callable[[int], Any], count: int) -> Callable[[], Any]:
+        # Vaciar el identity map para medir ida y vuelta a la base de datos
+        def wrapper():
+            db.expunge_all()
+            return func(rng.randint(1, count))
+        return wrapper
+
+    def orm_analyses(plant_id: int):
+        return (
+            db.query(PlantAnalysis).filter(PlantAnalysis.plant_id == plant_id)
+            .order_by(PlantAnalysis.analyzed_at.desc(), PlantAnalysis.id.desc())
+            .limit(100)
+            .all()
+        )
+
+    def reading_points(sensor_id: int):
+        timestamps, values = ReadingStorageService.load_series(db, sensor_id, None, None)
+        return [
+            {"value": value, "sensor_id": sensor_id, "recorded_at": recorded_at}
+            for recorded_at, value in zip(timestamps.tolist(), values.tolist())
+        ]
+
+    scenarios: Dict[str, Dict[str, Tuple[Callable[[], Any], Callable[[Any], bytes]]]] = {
+        "GET /greenhouses/{id}": {
+            "response_model": (
+                fresh(lambda gid: GreenhouseService.get_greenhouse_complete(db, gid), manifest["greenhouses"]),
+                _response_model_dump(TypeAdapter(GreenhouseDetailResponse)),
+            ),
+            "fast": (
+                fresh(lambda gid: GreenhouseService.get_greenhouse_detail(db, gid), manifest["greenhouses"]),
+                orjson.dumps,
+            ),
+        },
+        "GET /plants/{id}/analyses": {
+            "response_model": (
+                fresh(orm_analyses, manifest["plants"]),
+                _response_model_dump(TypeAdapter(List[PlantAnalysisResponse])),
+            ),
+            "fast": (
+                fresh(lambda pid: PlantService.get_analyses(db, pid), manifest["plants"]),
+                orjson.dumps,
+            ),
+        },
+        "GET /sensors/{id}/readings": {
+            "response_model": (
+                fresh(reading_points, manifest["sensors"]),
+                _response_model_dump(TypeAdapter(List[SensorReadingPoint])),
+            ),
+            "fast": (fresh(reading_points, manifest["sensors"]), orjson.dumps),
+        },
+    }
+
+    results = {}
+    try:
+        for endpoint, paths in scenarios.items():
+            results[endpoint] = {}
+            for path, (query, serialize) in paths.items():
+                summary = _measure(query, serialize, iterations)
+                results[endpoint][path] = summary
+                print(f"{endpoint:<28} {path:<15} query p50={summary['query']['p50_ms']:>8.3f}ms "
+                      f"serialize p50={summary['serialize']['p50_ms']:>8.3f}ms "
+                      f"share={summary['serialize_share']:>6.1%} bytes={summary['bytes']}")
+    finally:
+        db.close()
+
+    return {"meta": {"mode": "serialization", "iterations": iterations, "seed": manifest}, "results": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serialización de las lecturas calientes")
+    parser.add_argument("--manifest", default="bench_seed.json")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--output", default="bench_serialization.json")
+    args = parser.parse_args()
+
+    with open(args.manifest) as file:
+        manifest = json.load(file)
+    os.environ.setdefault("DATABASE_URL", manifest["database_url"])
+
+    report = run(manifest, args.iterations)
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Micro-benchmarks de la capa de servicios, sin HTTP ni serialización
+
+Uso:
+    DATABASE_URL=sqlite:///bench.db python -m benchmarks.services_bench --iterations 500
+"""
+import argparse
+import json
+import os
+import random
+import time
+from typing import Callable, Dict
+
+from .stats import summarize
+
+
+def _measure(func: Callable[[], object], iterations: int) -> Dict[str, float]:
+    latencies = []
+    errors = 0
+    started = time.perf_counter()
+    for _ in range(iterations):
+        start = time.perf_counter()
+        try:
+            func()
+        except Exception:
+            errors += 1
+        latencies.append(time.perf_counter() - start)
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+def run(manifest: dict, iterations: int, random_seed: int = 7) -> dict:
+    """
+    Mide las operaciones de servicio más usadas por los endpoints
+
+    Returns:
+        dict: Resultados por operación en el mismo formato que benchmarks.load_test
+    """
+    from database_config import SessionLocal
+    from services.greenhouse_service import GreenhouseService
+    from services.user_service import UserService
+
+    rng = random.Random(random_seed)
+    db = SessionLocal()
+    greenhouses = manifest["greenhouses"]
+    users = manifest["users"]
+
+    def random_greenhouse():
+        return rng.randint(1, greenhouses)
+
+    def fresh(func):
+        # Vaciar el identity map para medir ida y vuelta a la base de datos
+        def wrapper():
+            db.expunge_all()
+            return func()
+        return wrapper
+
+    operations = {
+        "GreenhouseService.get_greenhouse_by_id": fresh(
+            lambda: GreenhouseService.get_greenhouse_by_id(db, random_greenhouse())
+        ),
+        "GreenhouseService.get_greenhouse_complete": fresh(
+            lambda: GreenhouseService.get_greenhouse_complete(db, random_greenhouse())
+        ),
+        "UserService.authenticate_user": fresh(
+            lambda: UserService.authenticate_user(db, f"bench_user_{rng.randint(1, users)}", "Bench1234")
+        ),
+    }
+
+    results = {}
+    try:
+        for name, func in operations.items():
+            summary = _measure(func, iterations)
+            results[name] = {"1": summary}
+            print(f"{name:<48} p50={summary['p50_ms']:>8.3f}ms p95={summary['p95_ms']:>8.3f}ms "
+                  f"ops/s={summary['throughput_rps']:>9.1f}")
+    finally:
+        db.close()
+
+    return {"meta": {"mode": "services", "iterations": iterations, "seed": manifest}, "results": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks de servicios")
+    parser.add_argument("--manifest", default="bench_seed.json")
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--output", default="bench_services.json")
+    args = parser.parse_args()
+
+    with open(args.manifest) as file:
+        manifest = json.load(file)
+    os.environ.setdefault("DATABASE_URL", manifest["database_url"])
+
+    report = run(manifest, args.iterations)
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+from typing import Dict, List
+
+import numpy as np
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> Dict[str, float]:
+    """
+    Resume las latencias (segundos) de un escenario
+
+    Returns:
+        dict: p50/p95/p99/media en milisegundos y throughput en peticiones/segundo
+    """
+    values = np.asarray(latencies, dtype=np.float64) * 1000.0
+    if values.size == 0:
+        values = np.zeros(1)
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+        "mean_ms": round(float(values.mean()), 3),
+        "max_ms": round(float(values.max()), 3),
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed > 0 else 0.0,
+    }
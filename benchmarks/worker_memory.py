@@ -0,0 +1,164 @@
+"""
+Memoria por worker e imágenes/segundo según el número de workers
+
+Para cada número de workers y cada modo (modelo por worker / modelo
+compartido) arranca serve.py, espera a que esté listo, envía imágenes a
+POST /analysis/classify y mide RSS y PSS de todo el árbol de procesos
+(PSS reparte las páginas compartidas, así que refleja el ahorro real).
+
+Solo Linux (lee /proc). Uso:
+    python -m benchmarks.worker_memory --image hoja.jpg --workers 1 2 4 8 --images 200
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+import httpx
+
+from .stats import summarize
+
+
+def _children(pid: int) -> List[int]:
+    result = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as file:
+                fields = file.read().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        if int(fields[1]) == pid:
+            result.append(int(entry))
+    return result
+
+
+def _process_tree(pid: int) -> List[int]:
+    pending, tree = [pid], []
+    while pending:
+        current = pending.pop()
+        tree.append(current)
+        pending.extend(_children(current))
+    return tree
+
+
+def _memory_kb(pid: int) -> Dict[str, int]:
+    memory = {"rss_kb": 0, "pss_kb": 0}
+    try:
+        with open(f"/proc/{pid}/status") as file:
+            for line in file:
+                if line.startswith("VmRSS:"):
+                    memory["rss_kb"] = int(line.split()[1])
+        with open(f"/proc/{pid}/smaps_rollup") as file:
+            for line in file:
+                if line.startswith("Pss:"):
+                    memory["pss_kb"] = int(line.split()[1])
+    except OSError:
+        pass
+    return memory
+
+
+async def _wait_ready(base_url: str, workers: int, timeout: float) -> None:
+    # Las peticiones se reparten entre workers: pedir varias respuestas 200 seguidas
+    deadline = time.monotonic() + timeout
+    consecutive = 0
+    async with httpx.AsyncClient(base_url=base_url, timeout=5.0) as client:
+        while consecutive < workers * 3:
+            if time.monotonic() > deadline:
+                raise RuntimeError("El servidor no estuvo listo a tiempo")
+            try:
+                response = await client.get("/health/ready")
+                consecutive = consecutive + 1 if response.status_code == 200 else 0
+            except httpx.HTTPError:
+                consecutive = 0
+            if not consecutive:
+                await asyncio.sleep(0.5)
+
+
+async def _drive(base_url: str, image: bytes, total: int, concurrency: int) -> Dict[str, float]:
+    latencies: List[float] = []
+    errors = 0
+    remaining = total
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=120.0) as client:
+        async def worker():
+            nonlocal remaining, errors
+            while remaining > 0:
+                remaining -= 1
+                start = time.perf_counter()
+                response = await client.post(
+                    "/analysis/classify", content=image, headers={"Content-Type": "image/jpeg"}
+                )
+                if response.status_code != 200:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return summarize(latencies, errors, time.perf_counter() - started)
+
+
+def run_case(workers: int, shared: bool, image: bytes, images: int, concurrency: int, port: int) -> dict:
+    command = [sys.executable, "serve.py", "--workers", str(workers), "--port", str(port)]
+    if shared:
+        command.append("--shared-model")
+    env = dict(os.environ, READINESS_REQUIRES="plant_health", WARMUP_SUBSYSTEMS="plant_health")
+    process = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        asyncio.run(_wait_ready(base_url, workers, timeout=600))
+        throughput = asyncio.run(_drive(base_url, image, images, concurrency))
+
+        memory = {pid: _memory_kb(pid) for pid in _process_tree(process.pid)}
+        total_rss = sum(m["rss_kb"] for m in memory.values())
+        total_pss = sum(m["pss_kb"] for m in memory.values())
+        return {
+            "workers": workers,
+            "mode": "shared" if shared else "per-worker",
+            "processes": len(memory),
+            "total_rss_mb": round(total_rss / 1024, 1),
+            "total_pss_mb": round(total_pss / 1024, 1),
+            "pss_per_worker_mb": round(total_pss / 1024 / workers, 1),
+            "images_per_second": throughput["throughput_rps"],
+            "latency": throughput,
+        }
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memoria por worker y throughput de inferencia")
+    parser.add_argument("--image", required=True, help="Imagen JPEG de prueba")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--images", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--port", type=int, default=8105)
+    parser.add_argument("--modes", nargs="+", choices=["per-worker", "shared"], default=["per-worker", "shared"])
+    parser.add_argument("--output", default="bench_workers.json")
+    args = parser.parse_args()
+
+    with open(args.image, "rb") as file:
+        image = file.read()
+
+    results = []
+    for workers in args.workers:
+        for mode in args.modes:
+            result = run_case(workers, mode == "shared", image, args.images, args.concurrency, args.port)
+            results.append(result)
+            print(
+                f"workers={workers:<3} modo={result['mode']:<10} PSS total={result['total_pss_mb']:>8.1f} MB "
+                f"PSS/worker={result['pss_per_worker_mb']:>7.1f} MB imgs/s={result['images_per_second']:>7.1f}"
+            )
+
+    with open(args.output, "w") as file:
+        json.dump({"results": results}, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+"""
+Servidor local de inferencia sobre un socket Unix
+
+Con `uvicorn main:app --workers N` cada worker cargaría su propia copia de
+torch y de los pesos de MobileNet. En modo compartido el modelo vive en un
+único proceso (este servidor) y los workers le envían las imágenes por un
+socket Unix; el servidor agrupa las peticiones concurrentes en lotes.
+
+Protocolo (por conexión, petición/respuesta repetibles):
+    petición:  uint32 big-endian con la longitud + bytes de la imagen (JPEG/PNG)
+    respuesta: uint32 big-endian con la longitud + JSON
+               {"predictions": [...], "model_version": "..."} o
+               {"error": "...", "invalid_image": bool}
+
+Una petición vacía (longitud 0) solo pide {"model_version": "..."}.
+
+Uso:
+    python -m clients.inference_server --socket /tmp/greenhouse-inference.sock
+"""
+import argparse
+import io
+import json
+import os
+import queue
+import socket
+import socketserver
+import struct
+import threading
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional
+
+_HEADER = struct.Struct("!I")
+MAX_IMAGE_BYTES = 20 * 1024 * 1024
+DEFAULT_SOCKET = os.getenv("INFERENCE_SOCKET_PATH", "/tmp/greenhouse-inference.sock")
+
+
+def _recv_exact(sock: socket.socket, size: int) -> Optional[bytes]:
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def _recv_message(sock: socket.socket) -> Optional[bytes]:
+    header = _recv_exact(sock, _HEADER.size)
+    if header is None:
+        return None
+    (size,) = _HEADER.unpack(header)
+    if size > MAX_IMAGE_BYTES:
+        raise ValueError(f"Mensaje demasiado grande: {size} bytes")
+    return _recv_exact(sock, size)
+
+
+def _send_message(sock: socket.socket, payload: bytes) -> None:
+    sock.sendall(_HEADER.pack(len(payload)) + payload)
+
+
+class _Batcher:
+    """Agrupa imágenes de varias conexiones en un solo lote de inferencia"""
+
+    def __init__(self, client, batch_size: int, max_wait: float):
+        self.client = client
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self._queue: "queue.Queue[tuple]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="inference-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, image) -> Future:
+        future: Future = Future()
+        self._queue.put((image, future))
+        return future
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            try:
+                while len(batch) < self.batch_size:
+                    batch.append(self._queue.get(timeout=self.max_wait))
+            except queue.Empty:
+                pass
+
+            images = [image for image, _ in batch]
+            try:
+                results = self.client.classify_batch(images, batch_size=len(images))
+            except Exception as exception:
+                for _, future in batch:
+                    future.set_exception(exception)
+                continue
+            for (_, future), predictions in zip(batch, results):
+                future.set_result(predictions)
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    def handle(self) -> None:
+        from clients.plants_health import decode_for_model
+
+        while True:
+            try:
+                data = _recv_message(self.request)
+            except (ValueError, OSError):
+                return
+            if data is None:
+                return
+            if not data:
+                _send_message(self.request, json.dumps({"model_version": self.server.model_version}).encode())
+                continue
+            try:
+                image = decode_for_model(data)
+            except OSError as exception:
+                response = {"error": str(exception), "invalid_image": True}
+            else:
+                try:
+                    response = {
+                        "predictions": self.server.batcher.submit(image).result(),
+                        "model_version": self.server.model_version,
+                    }
+                except Exception as exception:
+                    response = {"error": f"{type(exception).__name__}: {exception}"}
+            _send_message(self.request, json.dumps(response).encode())
+
+
+class InferenceServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, client, batch_size: int = 16, max_wait: float = 0.005):
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        super().__init__(socket_path, _Handler)
+        os.chmod(socket_path, 0o600)
+        # Con el modelo ya cargado: incluye el commit de los pesos
+        self.model_version = getattr(client, "model_version", None)
+        self.batcher = _Batcher(client, batch_size, max_wait)
+
+
+class RemotePlantHealthClient:
+    """
+    Cliente con la misma interfaz que PlantHealthClient que delega la
+    inferencia en el servidor local. Mantiene una conexión por hilo.
+    """
+
+    def __init__(self, socket_path: str = DEFAULT_SOCKET, timeout: float = 30.0):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._local = threading.local()
+        self._model_version: Optional[str] = None
+
+    @property
+    def is_loaded(self) -> bool:
+        return os.path.exists(self.socket_path)
+
+    @property
+    def model_version(self) -> Optional[str]:
+        """Versión del modelo del servidor (se pide una vez y se actualiza con cada respuesta)"""
+        if self._model_version is None:
+            self._model_version = self._request(b"").get("model_version")
+        return self._model_version
+
+    def load(self) -> "RemotePlantHealthClient":
+        """Comprueba que el servidor de inferencia está escuchando"""
+        self._connection()
+        return self
+
+    def _connection(self) -> socket.socket:
+        sock = getattr(self._local, "sock", None)
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+            self._local.sock = sock
+        return sock
+
+    def _reset(self) -> None:
+        sock = getattr(self._local, "sock", None)
+        if sock is not None:
+            sock.close()
+        self._local.sock = None
+
+    def _request(self, data: bytes) -> Dict[str, Any]:
+        for attempt in range(2):
+            try:
+                sock = self._connection()
+                _send_message(sock, data)
+                payload = _recv_message(sock)
+                if payload is None:
+                    raise ConnectionError("El servidor de inferencia cerró la conexión")
+                break
+            except OSError:
+                # Conexión rota (ej. servidor reiniciado): reintentar una vez
+                self._reset()
+                if attempt:
+                    raise
+        return json.loads(payload)
+
+    def classify_bytes(self, data: bytes) -> List[Dict[str, Any]]:
+        """
+        Envía la imagen codificada al servidor; el worker no decodifica nada
+
+        Raises:
+            ValueError: Si la imagen no se puede decodificar
+            RuntimeError: Si la inferencia falla en el servidor
+            ConnectionError: Si el servidor no responde
+        """
+        if not data:
+            # Una petición vacía es la consulta de model_version
+            raise ValueError("Imagen vacía")
+        response = self._request(data)
+        if response.get("model_version"):
+            # El servidor pudo reiniciarse con otro modelo
+            self._model_version = response["model_version"]
+        if response.get("invalid_image"):
+            raise ValueError(response["error"])
+        if "error" in response:
+            raise RuntimeError(response["error"])
+        return response["predictions"]
+
+    def classify(self, image: Any) -> List[Dict[str, Any]]:
+        buffer = io.BytesIO()
+        image.convert("RGB").save(buffer, format="JPEG", quality=95)
+        return self.classify_bytes(buffer.getvalue())
+
+
+def main():
+    from clients.plants_health import PlantHealthClient
+
+    parser = argparse.ArgumentParser(description="Servidor local de inferencia")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    print("Cargando modelo")
+    client = PlantHealthClient().load()
+    server = InferenceServer(args.socket, client, args.batch_size, args.max_wait_ms / 1000)
+    print(f"Servidor de inferencia escuchando en {args.socket}")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if os.path.exists(args.socket):
+            os.unlink(args.socket)
+
+
+if __name__ == "__main__":
+    main()
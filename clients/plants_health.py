@@ -1,34 +1,162 @@
-# main.py
-import os, certifi
-os.environ["REQUESTS_CA_BUNDLE"] = certifi.where()
-
-import requests
-from transformers import pipeline
-from PIL import Image
-
-# Testear conexión HTTPS con Hugging Face usando certifi
-response = requests.get("https://huggingface.co", verify=certifi.where())
-print("Status conexión HuggingFace:", response.status_code)
-
-image_url = "https://content.peat-cloud.com/w400/tomato-late-blight-tomato-1556463954.jpg"
-
-print('Cargando modelo')
-plant_classifier = pipeline(
-    task="image-classification",
-    model="linkanjarad/mobilenet_v2_1.0_224-plant-disease-identification",
-    use_fast=True
-)
-print("Modelo cargado")
-
-try:
-    image = Image.open(requests.get(image_url, stream=True).raw)
-    print("Imagen cargada")
-except Exception as exception:
-    print(f"No se pudo cargar la imagen debido a: {exception}")
-    exit()
-
-print("Realizando análisis de imagen")
-predictions = plant_classifier(image)
-
-print("Resultado de la predicción")
-print(predictions)
+import os
+from typing import Any, Dict, List, Optional
+
+from monitoring import track_external_request, track_model_inference
+
+DEFAULT_MODEL = "linkanjarad/mobilenet_v2_1.0_224-plant-disease-identification"
+# El procesador del modelo redimensiona el lado corto a 256 y recorta 224x224
+MODEL_RESIZE = 256
+
+
+def decode_for_model(data: bytes, size: int = MODEL_RESIZE) -> Any:
+    """
+    Decodifica una imagen reducida a lo que necesita el modelo
+
+    Con JPEG, draft() hace que el decodificador escale en el dominio DCT
+    (1/2, 1/4, 1/8), así que una foto de 12 MP no se decodifica entera.
+
+    Args:
+        data: Bytes de la imagen (JPEG/PNG)
+        size: Lado corto mínimo de la imagen resultante
+
+    Returns:
+        PIL.Image: Imagen RGB con el lado corto igual a size (o menor si el original lo es)
+    """
+    import io
+    from PIL import Image
+
+    image = Image.open(io.BytesIO(data))
+    image.draft("RGB", (size, size))
+    image = image.convert("RGB")
+    scale = size / min(image.size)
+    if scale < 1:
+        image = image.resize(
+            (max(size, round(image.width * scale)), max(size, round(image.height * scale))),
+            Image.BILINEAR
+        )
+    return image
+
+
+class PlantHealthClient:
+    """
+    Cliente del modelo de clasificación de enfermedades de plantas
+
+    transformers/torch se importan solo al cargar el modelo, para que importar
+    este módulo (y arrancar la API) no cueste segundos.
+    """
+
+    def __init__(self, model_name: str = DEFAULT_MODEL):
+        self.model_name = model_name
+        self._classifier = None
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._classifier is not None
+
+    @property
+    def model_version(self) -> str:
+        """Nombre del modelo y, si ya está cargado, commit de los pesos (ej. nombre@1a2b3c4)"""
+        commit = getattr(self._classifier.model.config, "_commit_hash", None) if self._classifier else None
+        return f"{self.model_name}@{commit[:7]}" if commit else self.model_name
+
+    def load(self) -> "PlantHealthClient":
+        """
+        Carga el pipeline de Hugging Face (descarga los pesos la primera vez)
+
+        Returns:
+            PlantHealthClient: El propio cliente, ya cargado
+        """
+        if self._classifier is None:
+            import certifi
+            os.environ.setdefault("REQUESTS_CA_BUNDLE", certifi.where())
+            from transformers import pipeline
+
+            self._classifier = pipeline(
+                task="image-classification",
+                model=self.model_name,
+                use_fast=True
+            )
+        return self
+
+    def classify(self, image: Any) -> List[Dict[str, Any]]:
+        """
+        Clasifica una imagen (PIL.Image o lista de imágenes)
+
+        Args:
+            image: Imagen PIL ya decodificada
+
+        Returns:
+            list: Predicciones [{"label": ..., "score": ...}] ordenadas por score
+        """
+        self.load()
+        with track_model_inference("mobilenet_v2_plant_disease"):
+            return self._classifier(image)
+
+    def classify_batch(self, images: List[Any], batch_size: int = 16) -> List[List[Dict[str, Any]]]:
+        """
+        Clasifica varias imágenes en lotes (mucho más rápido que una a una)
+
+        Args:
+            images: Imágenes PIL ya decodificadas
+            batch_size: Tamaño de lote pasado al pipeline
+
+        Returns:
+            list: Una lista de predicciones por imagen, en el mismo orden
+        """
+        self.load()
+        with track_model_inference("mobilenet_v2_plant_disease"):
+            return self._classifier(list(images), batch_size=batch_size)
+
+    def classify_bytes(self, data: bytes) -> List[Dict[str, Any]]:
+        """
+        Decodifica una imagen codificada (JPEG/PNG) y la clasifica
+
+        Args:
+            data: Bytes de la imagen
+
+        Returns:
+            list: Predicciones del modelo
+        """
+        return self.classify(decode_for_model(data))
+
+    def classify_url(self, image_url: str) -> List[Dict[str, Any]]:
+        """
+        Descarga una imagen y la clasifica
+
+        Args:
+            image_url: URL pública de la imagen
+
+        Returns:
+            list: Predicciones del modelo
+        """
+        import requests
+        from PIL import Image
+
+        with track_external_request("image-download"):
+            image = Image.open(requests.get(image_url, stream=True).raw)
+        return self.classify(image)
+
+
+if __name__ == "__main__":
+    import certifi
+    import requests
+
+    # Testear conexión HTTPS con Hugging Face usando certifi
+    response = requests.get("https://huggingface.co", verify=certifi.where())
+    print("Status conexión HuggingFace:", response.status_code)
+
+    image_url = "https://content.peat-cloud.com/w400/tomato-late-blight-tomato-1556463954.jpg"
+
+    print('Cargando modelo')
+    client = PlantHealthClient().load()
+    print("Modelo cargado")
+
+    print("Realizando análisis de imagen")
+    try:
+        predictions: Optional[List[Dict[str, Any]]] = client.classify_url(image_url)
+    except Exception as exception:
+        print(f"No se pudo cargar la imagen debido a: {exception}")
+        raise SystemExit(1)
+
+    print("Resultado de la predicción")
+    print(predictions)
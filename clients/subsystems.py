@@ -0,0 +1,109 @@
+import os
+import threading
+import time
+from typing import Callable, Dict, Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class LazySubsystem(Generic[T]):
+    """
+    Subsistema pesado (modelo de ML, cliente de clima, Prolog) que se
+    inicializa en el primer uso o en el calentamiento del lifespan
+
+    Varios hilos pueden pedirlo a la vez: solo uno lo construye y el resto espera.
+    """
+
+    def __init__(self, name: str, factory: Callable[[], T]):
+        self.name = name
+        self._factory = factory
+        self._instance: Optional[T] = None
+        self._lock = threading.Lock()
+        self.state = "idle"  # idle | loading | ready | failed
+        self.error: Optional[str] = None
+        self.load_seconds: Optional[float] = None
+
+    @property
+    def is_ready(self) -> bool:
+        return self.state == "ready"
+
+    def get(self) -> T:
+        """
+        Devuelve la instancia, construyéndola si es la primera vez
+
+        Raises:
+            Exception: La excepción original si la inicialización falla
+        """
+        if self._instance is not None:
+            return self._instance
+
+        with self._lock:
+            if self._instance is None:
+                self.state = "loading"
+                start = time.perf_counter()
+                try:
+                    self._instance = self._factory()
+                except Exception as exception:
+                    self.state = "failed"
+                    self.error = f"{type(exception).__name__}: {exception}"
+                    raise
+                self.load_seconds = round(time.perf_counter() - start, 3)
+                self.state = "ready"
+                self.error = None
+        return self._instance
+
+    def warmup(self) -> None:
+        """Carga el subsistema sin propagar errores (para tareas en segundo plano)"""
+        try:
+            self.get()
+        except Exception:
+            pass
+
+    def status(self) -> Dict[str, object]:
+        return {"state": self.state, "load_seconds": self.load_seconds, "error": self.error}
+
+
+def _build_plant_health():
+    # Con INFERENCE_SOCKET el modelo vive en el servidor de inferencia compartido
+    socket_path = os.getenv("INFERENCE_SOCKET")
+    if socket_path:
+        from clients.inference_server import RemotePlantHealthClient
+        return RemotePlantHealthClient(socket_path).load()
+
+    from clients.plants_health import PlantHealthClient
+    return PlantHealthClient().load()
+
+
+def _build_weather():
+    from clients.weather_client import WeatherClient
+    return WeatherClient().load()
+
+
+def _build_prolog():
+    from prolog.engine import PrologEngine
+    files = [path for path in os.getenv("PROLOG_KNOWLEDGE_FILES", "").split(",") if path]
+    return PrologEngine(files).load()
+
+
+plant_health = LazySubsystem("plant_health", _build_plant_health)
+weather = LazySubsystem("weather", _build_weather)
+prolog = LazySubsystem("prolog", _build_prolog)
+
+SUBSYSTEMS: Dict[str, LazySubsystem] = {
+    subsystem.name: subsystem for subsystem in (plant_health, weather, prolog)
+}
+
+
+def get_plant_health_client():
+    """Dependency de FastAPI: cliente del modelo de enfermedades"""
+    return plant_health.get()
+
+
+def get_weather_client():
+    """Dependency de FastAPI: cliente de Open-Meteo"""
+    return weather.get()
+
+
+def get_prolog_engine():
+    """Dependency de FastAPI: motor Prolog"""
+    return prolog.get()
@@ -1,60 +1,136 @@
-import openmeteo_requests
-import pandas as pd
-import certifi
-import requests
-
-# Crear cliente de Open-Meteo sin cache
-openmeteo = openmeteo_requests.Client(session=requests.Session())
-
-# Parámetros de la API
-url = "https://api.open-meteo.com/v1/forecast"
-params = {
-    "latitude": 25.793,
-    "longitude": -108.9981,
-    "hourly": [
-        "temperature_2m",
-        "relative_humidity_2m",
-        "rain",
-        "precipitation_probability",
-        "precipitation",
-        "showers"
-    ],
-}
-
-# Llamada a la API usando certificados de certifi
-responses = openmeteo.weather_api(url, params=params, verify=certifi.where())
-
-# Procesar la primera respuesta
-response = responses[0]
-
-#Info general
-latitude = response.Latitude()
-longitude = response.Longitude()
-elevation = response.Elevation()
-utc_offset = response.UtcOffsetSeconds()
-
-#Datos por hora
-hourly = response.Hourly()
-
-temperature_2m = hourly.Variables(0).ValuesAsNumpy()
-relative_humidity_2m = hourly.Variables(1).ValuesAsNumpy()
-rain = hourly.Variables(2).ValuesAsNumpy()
-precipitation_probability = hourly.Variables(3).ValuesAsNumpy()
-precipitation = hourly.Variables(4).ValuesAsNumpy()
-showers = hourly.Variables(5).ValuesAsNumpy()
-
-#Rango de fechas
-dates = pd.date_range(
-    start=pd.to_datetime(hourly.Time(), unit="s", utc=True),
-    end=pd.to_datetime(hourly.TimeEnd(), unit="s", utc=True),
-    freq=pd.Timedelta(seconds=hourly.Interval()),
-    inclusive="left"
-)
-
-
-print("Lat:", latitude)
-print("Lon:", longitude)
-print("Altura:", elevation)
-print("Primeras 5 temperaturas:", temperature_2m[:5])
-print("Primeras 5 humedades:", relative_humidity_2m[:5])
-print("Probabilidad de precipitación (primeros 5):", precipitation_probability[:5])
+from dataclasses import dataclass
+from typing import Any, List
+
+from monitoring import track_external_request
+
+FORECAST_URL = "https://api.open-meteo.com/v1/forecast"
+HOURLY_VARIABLES = [
+    "temperature_2m",
+    "relative_humidity_2m",
+    "rain",
+    "precipitation_probability",
+    "precipitation",
+    "showers"
+]
+# Coordenadas por defecto (Los Mochis, Sinaloa)
+DEFAULT_LATITUDE = 25.793
+DEFAULT_LONGITUDE = -108.9981
+
+
+@dataclass
+class HourlyForecast:
+    """Pronóstico horario de Open-Meteo como arrays de NumPy"""
+    latitude: float
+    longitude: float
+    elevation: float
+    utc_offset: int
+    dates: Any  # pandas.DatetimeIndex (UTC)
+    temperature_2m: Any
+    relative_humidity_2m: Any
+    rain: Any
+    precipitation_probability: Any
+    precipitation: Any
+    showers: Any
+
+
+class WeatherClient:
+    """
+    Cliente de Open-Meteo
+
+    openmeteo_requests y pandas se importan al crear la sesión, no al importar
+    el módulo, para no penalizar el arranque de la API.
+    """
+
+    def __init__(self):
+        self._client = None
+
+    def _get_client(self):
+        if self._client is None:
+            import openmeteo_requests
+            import requests
+
+            # Crear cliente de Open-Meteo sin cache
+            self._client = openmeteo_requests.Client(session=requests.Session())
+        return self._client
+
+    def load(self) -> "WeatherClient":
+        self._get_client()
+        return self
+
+    def get_hourly_forecasts(self, coordinates: List[tuple], past_days: int = 0) -> List[HourlyForecast]:
+        """
+        Obtiene el pronóstico horario de varias ubicaciones en una sola llamada
+
+        Args:
+            coordinates: Lista de tuplas (latitud, longitud)
+            past_days: Días anteriores a hoy que se incluyen (Open-Meteo admite hasta 92)
+
+        Returns:
+            list: Un HourlyForecast por coordenada, en el mismo orden
+        """
+        import certifi
+        import pandas as pd
+
+        params = {
+            "latitude": [lat for lat, _ in coordinates],
+            "longitude": [lon for _, lon in coordinates],
+            "hourly": HOURLY_VARIABLES,
+        }
+        if past_days:
+            params["past_days"] = past_days
+
+        # Llamada a la API usando certificados de certifi
+        with track_external_request("open-meteo"):
+            responses = self._get_client().weather_api(FORECAST_URL, params=params, verify=certifi.where())
+
+        forecasts = []
+        for response in responses:
+            hourly = response.Hourly()
+            dates = pd.date_range(
+                start=pd.to_datetime(hourly.Time(), unit="s", utc=True),
+                end=pd.to_datetime(hourly.TimeEnd(), unit="s", utc=True),
+                freq=pd.Timedelta(seconds=hourly.Interval()),
+                inclusive="left"
+            )
+            forecasts.append(HourlyForecast(
+                latitude=response.Latitude(),
+                longitude=response.Longitude(),
+                elevation=response.Elevation(),
+                utc_offset=response.UtcOffsetSeconds(),
+                dates=dates,
+                temperature_2m=hourly.Variables(0).ValuesAsNumpy(),
+                relative_humidity_2m=hourly.Variables(1).ValuesAsNumpy(),
+                rain=hourly.Variables(2).ValuesAsNumpy(),
+                precipitation_probability=hourly.Variables(3).ValuesAsNumpy(),
+                precipitation=hourly.Variables(4).ValuesAsNumpy(),
+                showers=hourly.Variables(5).ValuesAsNumpy(),
+            ))
+        return forecasts
+
+    def get_hourly_forecast(
+            self,
+            latitude: float = DEFAULT_LATITUDE,
+            longitude: float = DEFAULT_LONGITUDE
+    ) -> HourlyForecast:
+        """
+        Obtiene el pronóstico horario de una ubicación
+
+        Args:
+            latitude: Latitud
+            longitude: Longitud
+
+        Returns:
+            HourlyForecast: Pronóstico con arrays de NumPy por variable
+        """
+        return self.get_hourly_forecasts([(latitude, longitude)])[0]
+
+
+if __name__ == "__main__":
+    forecast = WeatherClient().get_hourly_forecast()
+
+    print("Lat:", forecast.latitude)
+    print("Lon:", forecast.longitude)
+    print("Altura:", forecast.elevation)
+    print("Primeras 5 temperaturas:", forecast.temperature_2m[:5])
+    print("Primeras 5 humedades:", forecast.relative_humidity_2m[:5])
+    print("Probabilidad de precipitación (primeros 5):", forecast.precipitation_probability[:5])
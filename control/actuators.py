@@ -0,0 +1,74 @@
+"""
+Destinos de las acciones del programador de riego/clima
+
+El programador solo decide; quién ejecuta (relés, MQTT, una cola) es un
+ActuatorSink. SimulatedActuatorSink guarda las acciones en memoria para
+pruebas y benchmarks.
+"""
+import logging
+import threading
+from collections import Counter, deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Deque, Dict, List
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Action:
+    """Orden para los actuadores de un invernadero"""
+    greenhouse_id: int
+    kind: str  # irrigate | ventilate
+    amount: float  # minutos de riego | % de apertura de ventanas
+    reason: str
+    issued_at: datetime
+
+
+class ActuatorSink:
+    """Interfaz: recibe las acciones de un shard (se llama desde varios hilos)"""
+
+    def send(self, actions: List[Action]) -> None:
+        raise NotImplementedError
+
+
+class SimulatedActuatorSink(ActuatorSink):
+    """Guarda las últimas acciones en memoria y cuenta las emitidas por tipo"""
+
+    def __init__(self, max_actions: int = 10_000):
+        self._actions: Deque[Action] = deque(maxlen=max_actions)
+        self._lock = threading.Lock()
+        self.counts: Dict[str, int] = Counter()
+
+    def send(self, actions: List[Action]) -> None:
+        with self._lock:
+            self._actions.extend(actions)
+            for action in actions:
+                self.counts[action.kind] += 1
+
+    @property
+    def actions(self) -> List[Action]:
+        with self._lock:
+            return list(self._actions)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._actions.clear()
+            self.counts.clear()
+
+
+class LoggingActuatorSink(ActuatorSink):
+    """Registra cada acción en el log (útil en desarrollo)"""
+
+    def send(self, actions: List[Action]) -> None:
+        for action in actions:
+            logger.info(
+                "Invernadero %s: %s %.1f (%s)",
+                action.greenhouse_id, action.kind, action.amount, action.reason
+            )
+
+
+SINKS = {
+    "simulated": SimulatedActuatorSink,
+    "log": LoggingActuatorSink,
+}
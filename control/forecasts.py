@@ -0,0 +1,190 @@
+"""
+Caché de pronósticos de Open-Meteo para el programador
+
+Los invernaderos se agrupan en celdas de FORECAST_GRID_DEGREES (la
+resolución del modelo ronda los 10 km, así que vecinos comparten pronóstico)
+y las celdas caducadas se piden en lotes de FORECAST_BATCH_SIZE coordenadas
+por llamada, con varias llamadas en paralelo. El pronóstico solo cambia cada
+hora: con miles de invernaderos casi todos los ticks salen enteros de caché.
+"""
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from clients.weather_client import DEFAULT_LATITUDE, DEFAULT_LONGITUDE
+from monitoring.metrics import SCHEDULER_ERRORS_TOTAL
+
+logger = logging.getLogger(__name__)
+
+FORECAST_TTL_SECONDS = float(os.getenv("FORECAST_TTL_SECONDS", "1800"))
+FORECAST_GRID_DEGREES = float(os.getenv("FORECAST_GRID_DEGREES", "0.1"))
+FORECAST_BATCH_SIZE = int(os.getenv("FORECAST_BATCH_SIZE", "100"))
+FORECAST_CONCURRENCY = int(os.getenv("FORECAST_CONCURRENCY", "4"))
+FORECAST_HORIZON_HOURS = int(os.getenv("FORECAST_HORIZON_HOURS", "6"))
+
+# Recibe una lista de (latitud, longitud) y devuelve un HourlyForecast por coordenada
+Fetcher = Callable[[List[Tuple[float, float]]], list]
+
+
+def fetch_open_meteo(coordinates: List[Tuple[float, float]], past_days: int = 0) -> list:
+    """Pronósticos horarios de Open-Meteo por coordenada (past_days: incluir también días pasados)"""
+    from clients.subsystems import weather
+    return weather.get().get_hourly_forecasts(coordinates, past_days=past_days)
+
+
+class _CachedForecast:
+    __slots__ = ("fetched_at", "times", "rain_probability", "rain_mm", "temperature", "humidity")
+
+    def __init__(self, forecast):
+        self.fetched_at = time.monotonic()
+        # Segundos desde epoch (UTC) de cada hora
+        self.times = np.asarray(forecast.dates.as_unit("s").asi8, dtype=np.int64)
+        self.rain_probability = np.asarray(forecast.precipitation_probability, dtype=np.float64)
+        self.rain_mm = (
+            np.asarray(forecast.rain, dtype=np.float64) + np.asarray(forecast.showers, dtype=np.float64)
+        )
+        self.temperature = np.asarray(forecast.temperature_2m, dtype=np.float64)
+        self.humidity = np.asarray(forecast.relative_humidity_2m, dtype=np.float64)
+
+    def summary(self, now_s: int, horizon_s: int) -> Tuple[float, float, float]:
+        lo, hi = np.searchsorted(self.times, [now_s - 3600, now_s + horizon_s])
+        if hi <= lo:
+            return np.nan, np.nan, np.nan
+        return (
+            # fmax.reduce ignora NaN sin avisar (nanmax avisa si todo es NaN)
+            float(np.fmax.reduce(self.rain_probability[lo:hi])),
+            float(np.nansum(self.rain_mm[lo:hi])),
+            float(np.fmax.reduce(self.temperature[lo:hi])),
+        )
+
+
+class ForecastCache:
+    """
+    Resúmenes de pronóstico por invernadero (ver control.rules)
+
+    Args:
+        fetch: Función que pide los pronósticos de un lote de coordenadas
+        ttl_seconds: Vigencia de un pronóstico en caché
+        grid_degrees: Tamaño de celda para agrupar coordenadas
+        batch_size: Coordenadas por llamada a la API
+        concurrency: Llamadas simultáneas
+        horizon_hours: Horas hacia delante que se resumen
+    """
+
+    def __init__(
+            self,
+            fetch: Optional[Fetcher] = None,
+            ttl_seconds: float = FORECAST_TTL_SECONDS,
+            grid_degrees: float = FORECAST_GRID_DEGREES,
+            batch_size: int = FORECAST_BATCH_SIZE,
+            concurrency: int = FORECAST_CONCURRENCY,
+            horizon_hours: int = FORECAST_HORIZON_HOURS
+    ):
+        self._fetch = fetch or fetch_open_meteo
+        self.ttl_seconds = ttl_seconds
+        self.grid_degrees = grid_degrees
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.horizon_hours = horizon_hours
+        self._cache: Dict[Tuple[float, float], _CachedForecast] = {}
+        self._lock = threading.Lock()
+
+    def _cells(self, coordinates: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        coordinates = np.where(np.isnan(coordinates), [DEFAULT_LATITUDE, DEFAULT_LONGITUDE], coordinates)
+        snapped = np.round(np.round(coordinates / self.grid_degrees) * self.grid_degrees, 6)
+        return np.unique(snapped, axis=0, return_inverse=True)
+
+    def _refresh(self, cells: Sequence[Tuple[float, float]]) -> None:
+        now = time.monotonic()
+        with self._lock:
+            stale = [
+                cell for cell in cells
+                if cell not in self._cache or now - self._cache[cell].fetched_at > self.ttl_seconds
+            ]
+        if not stale:
+            return
+
+        batches = [stale[i:i + self.batch_size] for i in range(0, len(stale), self.batch_size)]
+
+        def fetch_batch(batch):
+            try:
+                forecasts = self._fetch(batch)
+            except Exception:
+                # Sin pronóstico las reglas actúan solo con las lecturas; se reintenta en el próximo tick
+                SCHEDULER_ERRORS_TOTAL.inc(phase="forecast")
+                logger.exception("Error obteniendo pronósticos de %s ubicaciones", len(batch))
+                return
+            with self._lock:
+                for cell, forecast in zip(batch, forecasts):
+                    self._cache[cell] = _CachedForecast(forecast)
+
+        if len(batches) == 1:
+            fetch_batch(batches[0])
+            return
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            list(pool.map(fetch_batch, batches))
+
+    def summaries(self, coordinates: np.ndarray, now: datetime) -> np.ndarray:
+        """
+        Resume el pronóstico de cada invernadero para las próximas horas
+
+        Args:
+            coordinates: Matriz (G, 2) de latitud/longitud (NaN = coordenadas por defecto)
+            now: Momento del tick (UTC, sin zona)
+
+        Returns:
+            np.ndarray: Matriz (G, 3) de probabilidad máxima de lluvia, lluvia
+            acumulada y temperatura máxima; NaN donde no hay pronóstico
+        """
+        if len(coordinates) == 0:
+            return np.empty((0, 3))
+
+        cells, inverse = self._cells(coordinates)
+        keys = [tuple(cell) for cell in cells.tolist()]
+        self._refresh(keys)
+
+        now_s = int(np.datetime64(now, "s").astype(np.int64))
+        horizon_s = self.horizon_hours * 3600
+        per_cell = np.full((len(keys), 3), np.nan)
+        with self._lock:
+            for index, key in enumerate(keys):
+                cached = self._cache.get(key)
+                if cached is not None:
+                    per_cell[index] = cached.summary(now_s, horizon_s)
+        return per_cell[inverse.reshape(-1)]
+
+    def hourly(self, coordinates: np.ndarray, times: np.ndarray) -> np.ndarray:
+        """
+        Interpola la temperatura y la humedad exteriores en los instantes pedidos
+
+        Args:
+            coordinates: Matriz (G, 2) de latitud/longitud (NaN = coordenadas por defecto)
+            times: Instantes (n,) en segundos desde epoch (UTC)
+
+        Returns:
+            np.ndarray: Array (G, 2, n) de temperatura y humedad relativa; NaN
+            fuera del pronóstico o donde no hay pronóstico
+        """
+        times = np.asarray(times, dtype=np.float64)
+        if len(coordinates) == 0:
+            return np.empty((0, 2, len(times)))
+
+        cells, inverse = self._cells(coordinates)
+        keys = [tuple(cell) for cell in cells.tolist()]
+        self._refresh(keys)
+
+        per_cell = np.full((len(keys), 2, len(times)), np.nan)
+        with self._lock:
+            for index, key in enumerate(keys):
+                cached = self._cache.get(key)
+                if cached is None:
+                    continue
+                for row, variable in enumerate((cached.temperature, cached.humidity)):
+                    per_cell[index, row] = np.interp(times, cached.times, variable, left=np.nan, right=np.nan)
+        return per_cell[inverse.reshape(-1)]
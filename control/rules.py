@@ -0,0 +1,96 @@
+"""
+Reglas de riego y ventilación, vectorizadas sobre todos los invernaderos de un lote
+
+Entradas por invernadero (NaN si no hay dato):
+    readings  (G, 3): humedad del suelo %, temperatura °C, humedad relativa %
+    forecast  (G, 3): probabilidad máxima de lluvia %, lluvia acumulada mm y
+                      temperatura máxima °C en las próximas FORECAST_HORIZON_HOURS
+
+Un dato ausente nunca dispara una acción: las comparaciones con NaN son False.
+"""
+import os
+from typing import Tuple
+
+import numpy as np
+
+SENSOR_TYPES = ("soil_moisture", "temperature", "humidity")
+SOIL_MOISTURE, TEMPERATURE, HUMIDITY = range(3)
+RAIN_PROBABILITY, RAIN_MM, TEMPERATURE_MAX = range(3)
+
+# Riego
+SOIL_MOISTURE_MIN = float(os.getenv("CONTROL_SOIL_MOISTURE_MIN", "30"))
+SOIL_MOISTURE_TARGET = float(os.getenv("CONTROL_SOIL_MOISTURE_TARGET", "45"))
+IRRIGATION_MINUTES_PER_POINT = float(os.getenv("CONTROL_IRRIGATION_MINUTES_PER_POINT", "1.5"))
+IRRIGATION_MIN_MINUTES = 2.0
+IRRIGATION_MAX_MINUTES = float(os.getenv("CONTROL_IRRIGATION_MAX_MINUTES", "30"))
+# Se pospone el riego si se espera lluvia suficiente
+RAIN_PROBABILITY_SKIP = float(os.getenv("CONTROL_RAIN_PROBABILITY_SKIP", "60"))
+RAIN_MM_SKIP = float(os.getenv("CONTROL_RAIN_MM_SKIP", "2"))
+
+# Ventilación
+TEMPERATURE_MAX_C = float(os.getenv("CONTROL_TEMPERATURE_MAX", "30"))
+HUMIDITY_MAX = float(os.getenv("CONTROL_HUMIDITY_MAX", "85"))
+# Exceso (°C / puntos de humedad) con el que las ventanas se abren al 100 %
+VENT_TEMPERATURE_SPAN = 8.0
+VENT_HUMIDITY_SPAN = 15.0
+VENT_MIN_OPENING = 10.0
+# Con lluvia prevista no se abre más que esto
+VENT_RAIN_MAX_OPENING = float(os.getenv("CONTROL_VENT_RAIN_MAX_OPENING", "30"))
+
+
+def rain_expected(forecast: np.ndarray) -> np.ndarray:
+    """Invernaderos con lluvia probable y suficiente en el horizonte"""
+    return (
+        (forecast[:, RAIN_PROBABILITY] >= RAIN_PROBABILITY_SKIP)
+        & (forecast[:, RAIN_MM] >= RAIN_MM_SKIP)
+    )
+
+
+def irrigation_minutes(readings: np.ndarray, forecast: np.ndarray) -> np.ndarray:
+    """
+    Minutos de riego por invernadero (0 = no regar)
+
+    Proporcional al déficit hasta SOIL_MOISTURE_TARGET, solo bajo
+    SOIL_MOISTURE_MIN y si no se espera lluvia.
+    """
+    soil = readings[:, SOIL_MOISTURE]
+    dry = (soil < SOIL_MOISTURE_MIN) & ~rain_expected(forecast)
+    minutes = np.clip(
+        (SOIL_MOISTURE_TARGET - np.nan_to_num(soil, nan=SOIL_MOISTURE_TARGET)) * IRRIGATION_MINUTES_PER_POINT,
+        IRRIGATION_MIN_MINUTES,
+        IRRIGATION_MAX_MINUTES
+    )
+    return np.where(dry, minutes, 0.0)
+
+
+def vent_opening(readings: np.ndarray, forecast: np.ndarray) -> np.ndarray:
+    """
+    Apertura de ventanas en % por invernadero (0 = no ventilar)
+
+    Proporcional al mayor exceso de temperatura o humedad relativa. Si la
+    temperatura máxima prevista supera el umbral se anticipa con la apertura
+    mínima; con lluvia prevista se limita a VENT_RAIN_MAX_OPENING.
+    """
+    heat = (readings[:, TEMPERATURE] - TEMPERATURE_MAX_C) / VENT_TEMPERATURE_SPAN
+    humid = (readings[:, HUMIDITY] - HUMIDITY_MAX) / VENT_HUMIDITY_SPAN
+    # fmax ignora los NaN de un solo lado; si faltan ambos queda NaN -> 0
+    excess = np.nan_to_num(np.fmax(heat, humid), nan=0.0)
+    opening = np.clip(excess, 0.0, 1.0) * 100.0
+
+    forecast_heat = forecast[:, TEMPERATURE_MAX] > TEMPERATURE_MAX_C
+    opening = np.where((opening > 0) | forecast_heat, np.maximum(opening, VENT_MIN_OPENING), 0.0)
+    return np.where(rain_expected(forecast), np.minimum(opening, VENT_RAIN_MAX_OPENING), opening)
+
+
+def evaluate(readings: np.ndarray, forecast: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Aplica todas las reglas a un lote de invernaderos
+
+    Args:
+        readings: Matriz (G, 3) de lecturas actuales
+        forecast: Matriz (G, 3) de resumen del pronóstico
+
+    Returns:
+        tuple: (minutos de riego, % de apertura), arrays de longitud G
+    """
+    return irrigation_minutes(readings, forecast), vent_opening(readings, forecast)
@@ -0,0 +1,279 @@
+"""
+Programador de riego y ventilación
+
+En cada tick:
+    1. Carga id y coordenadas de todos los invernaderos (una consulta)
+    2. Resume el pronóstico por invernadero desde ForecastCache (llamadas por lotes)
+    3. Reparte los invernaderos en SCHEDULER_SHARDS shards que se evalúan en
+       paralelo (asyncio + hilos); cada shard lee las últimas lecturas de
+       SCHEDULER_BATCH_SIZE invernaderos por consulta, aplica control.rules
+       vectorizado y envía las acciones al ActuatorSink
+
+La latencia por fase queda en scheduler_tick_duration_seconds (ver /metrics).
+
+Uso:
+    python -m control.scheduler --once              # un tick con acciones en el log
+    python -m control.scheduler --interval 60
+"""
+import argparse
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from control import rules
+from control.actuators import SINKS, Action, ActuatorSink
+from control.forecasts import ForecastCache
+from monitoring.metrics import (
+    SCHEDULER_ACTIONS_TOTAL,
+    SCHEDULER_ERRORS_TOTAL,
+    SCHEDULER_GREENHOUSES,
+    SCHEDULER_TICK_DURATION,
+)
+
+logger = logging.getLogger(__name__)
+
+SCHEDULER_INTERVAL_SECONDS = float(os.getenv("SCHEDULER_INTERVAL_SECONDS", "60"))
+SCHEDULER_SHARDS = int(os.getenv("SCHEDULER_SHARDS", "4"))
+SCHEDULER_BATCH_SIZE = int(os.getenv("SCHEDULER_BATCH_SIZE", "500"))
+SCHEDULER_SINK = os.getenv("SCHEDULER_SINK", "log")
+# Lecturas más viejas que esto no cuentan como estado actual
+STALE_AFTER = timedelta(minutes=int(os.getenv("SCHEDULER_STALE_AFTER_MINUTES", "30")))
+# Tiempo mínimo entre dos acciones del mismo tipo en un invernadero
+ACTION_COOLDOWN = timedelta(minutes=int(os.getenv("SCHEDULER_ACTION_COOLDOWN_MINUTES", "30")))
+
+
+@dataclass
+class TickResult:
+    """Resumen de un tick del programador"""
+    greenhouses: int
+    actions: List[Action]
+    durations: Dict[str, float] = field(default_factory=dict)
+
+
+def _observe(durations: Dict[str, float], phase: str, start: float) -> None:
+    elapsed = time.perf_counter() - start
+    durations[phase] = durations.get(phase, 0.0) + elapsed
+    SCHEDULER_TICK_DURATION.observe(elapsed, phase=phase)
+
+
+class ClimateScheduler:
+    """
+    Evalúa periódicamente todos los invernaderos y emite acciones
+
+    Args:
+        sink: Destino de las acciones
+        forecasts: Caché de pronósticos (por defecto Open-Meteo)
+        session_factory: Fábrica de sesiones (por defecto database_config.SessionLocal)
+        shards: Número de shards evaluados en paralelo
+        batch_size: Invernaderos por consulta de lecturas
+    """
+
+    def __init__(
+            self,
+            sink: ActuatorSink,
+            forecasts: Optional[ForecastCache] = None,
+            session_factory: Optional[Callable] = None,
+            shards: int = SCHEDULER_SHARDS,
+            batch_size: int = SCHEDULER_BATCH_SIZE
+    ):
+        self.sink = sink
+        self.forecasts = forecasts or ForecastCache()
+        self._session_factory = session_factory
+        self.shards = max(1, shards)
+        self.batch_size = batch_size
+        # (greenhouse_id, tipo de acción) -> última emisión
+        self._last_action: Dict[Tuple[int, str], datetime] = {}
+
+    def _session(self):
+        if self._session_factory is None:
+            from database_config import SessionLocal
+            self._session_factory = SessionLocal
+        return self._session_factory()
+
+    def _load_greenhouses(self) -> Tuple[np.ndarray, np.ndarray]:
+        from sqlalchemy import select
+        from models.greenhouse_model import Greenhouse
+
+        db = self._session()
+        try:
+            rows = db.execute(
+                select(Greenhouse.id, Greenhouse.latitude, Greenhouse.longitude).order_by(Greenhouse.id)
+            ).all()
+        finally:
+            db.close()
+
+        ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+        coordinates = np.array(
+            [(row[1], row[2]) for row in rows], dtype=np.float64
+        ).reshape(len(rows), 2)
+        return ids, coordinates
+
+    def _latest_readings(self, db, greenhouse_ids: np.ndarray, now: datetime) -> np.ndarray:
+        """Matriz (G, 3) con la media de la última lectura de cada sensor por tipo"""
+        from services.sensor_service import SensorService
+
+        rows = SensorService.get_latest_values(db, greenhouse_ids.tolist(), rules.SENSOR_TYPES, now - STALE_AFTER)
+        readings = np.full((len(greenhouse_ids), len(rules.SENSOR_TYPES)), np.nan)
+        if not rows:
+            return readings
+
+        type_index = {sensor_type: index for index, sensor_type in enumerate(rules.SENSOR_TYPES)}
+        rows_gh = np.searchsorted(greenhouse_ids, np.fromiter((row[0] for row in rows), dtype=np.int64))
+        rows_type = np.fromiter((type_index[row[1]] for row in rows), dtype=np.int64)
+        values = np.fromiter((row[2] for row in rows), dtype=np.float64)
+
+        # Varios sensores del mismo tipo en un invernadero: media
+        sums = np.zeros_like(readings)
+        counts = np.zeros_like(readings)
+        np.add.at(sums, (rows_gh, rows_type), values)
+        np.add.at(counts, (rows_gh, rows_type), 1)
+        np.divide(sums, counts, out=readings, where=counts > 0)
+        return readings
+
+    def _actions_for(
+            self,
+            greenhouse_ids: np.ndarray,
+            minutes: np.ndarray,
+            opening: np.ndarray,
+            now: datetime
+    ) -> List[Action]:
+        actions = []
+        for kind, amounts, reason in (
+                ("irrigate", minutes, "humedad del suelo baja"),
+                ("ventilate", opening, "temperatura/humedad alta"),
+        ):
+            for index in np.flatnonzero(amounts > 0):
+                greenhouse_id = int(greenhouse_ids[index])
+                last = self._last_action.get((greenhouse_id, kind))
+                if last is not None and now - last < ACTION_COOLDOWN:
+                    continue
+                self._last_action[(greenhouse_id, kind)] = now
+                actions.append(Action(greenhouse_id, kind, round(float(amounts[index]), 1), reason, now))
+        return actions
+
+    def _evaluate_shard(
+            self,
+            greenhouse_ids: np.ndarray,
+            forecast: np.ndarray,
+            now: datetime
+    ) -> Tuple[List[Action], Dict[str, float]]:
+        actions: List[Action] = []
+        durations: Dict[str, float] = {}
+        db = self._session()
+        try:
+            for lo in range(0, len(greenhouse_ids), self.batch_size):
+                batch_ids = greenhouse_ids[lo:lo + self.batch_size]
+
+                start = time.perf_counter()
+                readings = self._latest_readings(db, batch_ids, now)
+                _observe(durations, "readings", start)
+
+                start = time.perf_counter()
+                minutes, opening = rules.evaluate(readings, forecast[lo:lo + self.batch_size])
+                batch_actions = self._actions_for(batch_ids, minutes, opening, now)
+                _observe(durations, "evaluate", start)
+
+                if batch_actions:
+                    start = time.perf_counter()
+                    self.sink.send(batch_actions)
+                    _observe(durations, "actuate", start)
+                actions.extend(batch_actions)
+        finally:
+            db.close()
+        return actions, durations
+
+    async def tick(self, now: Optional[datetime] = None) -> TickResult:
+        """
+        Evalúa todos los invernaderos una vez
+
+        Args:
+            now: Momento del tick (por defecto utcnow)
+
+        Returns:
+            TickResult: Invernaderos evaluados, acciones emitidas y duración por fase
+        """
+        now = now or datetime.utcnow()
+        durations: Dict[str, float] = {}
+        tick_start = time.perf_counter()
+
+        start = time.perf_counter()
+        greenhouse_ids, coordinates = await asyncio.to_thread(self._load_greenhouses)
+        _observe(durations, "greenhouses", start)
+
+        start = time.perf_counter()
+        forecast = await asyncio.to_thread(self.forecasts.summaries, coordinates, now)
+        _observe(durations, "forecast", start)
+
+        # Shards contiguos: cada uno consulta rangos de id compactos
+        shards = [
+            shard for shard in np.array_split(np.arange(len(greenhouse_ids)), self.shards) if len(shard)
+        ]
+        results = await asyncio.gather(*(
+            asyncio.to_thread(self._evaluate_shard, greenhouse_ids[shard], forecast[shard], now)
+            for shard in shards
+        ))
+        actions = [action for shard_actions, _ in results for action in shard_actions]
+        # Tiempo acumulado de todos los shards (no de pared) por fase
+        for _, shard_durations in results:
+            for phase, seconds in shard_durations.items():
+                durations[phase] = durations.get(phase, 0.0) + seconds
+
+        for action in actions:
+            SCHEDULER_ACTIONS_TOTAL.inc(action=action.kind)
+        SCHEDULER_GREENHOUSES.set(len(greenhouse_ids))
+        _observe(durations, "total", tick_start)
+        return TickResult(len(greenhouse_ids), actions, durations)
+
+    async def run(self, interval_seconds: float = SCHEDULER_INTERVAL_SECONDS) -> None:
+        """Ejecuta ticks cada interval_seconds hasta que se cancele la tarea"""
+        while True:
+            started = time.perf_counter()
+            try:
+                result = await self.tick()
+                logger.info(
+                    "Tick del programador: %s invernaderos, %s acciones en %.3f s",
+                    result.greenhouses, len(result.actions), result.durations["total"]
+                )
+            except Exception:
+                SCHEDULER_ERRORS_TOTAL.inc(phase="tick")
+                logger.exception("Error en el tick del programador")
+            await asyncio.sleep(max(0.0, interval_seconds - (time.perf_counter() - started)))
+
+
+def build_scheduler(sink: Optional[str] = None) -> ClimateScheduler:
+    """Crea el programador con la configuración de entorno"""
+    return ClimateScheduler(SINKS[sink or SCHEDULER_SINK]())
+
+
+async def scheduler_loop() -> None:
+    """Tarea del lifespan (SCHEDULER_ENABLED=true)"""
+    await build_scheduler().run()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Programador de riego y ventilación")
+    parser.add_argument("--once", action="store_true", help="Ejecuta un solo tick y termina")
+    parser.add_argument("--interval", type=float, default=SCHEDULER_INTERVAL_SECONDS)
+    parser.add_argument("--sink", choices=sorted(SINKS), default=SCHEDULER_SINK)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    scheduler = build_scheduler(args.sink)
+    if not args.once:
+        asyncio.run(scheduler.run(args.interval))
+        return
+
+    result = asyncio.run(scheduler.tick())
+    print(f"Invernaderos: {result.greenhouses}  acciones: {len(result.actions)}")
+    for phase, seconds in result.durations.items():
+        print(f"  {phase:<12} {seconds * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
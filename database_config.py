@@ -1,14 +1,52 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker
 from models import Base
+from monitoring.db_instrumentation import instrument_engine
+from monitoring import nplusone
+from storage.replicas import ReplicaSet, RoutingSession, track_writes
+from storage import change_tracking
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 DATABASE_URL = os.getenv("DATABASE_URL")
+# Réplicas de lectura separadas por comas (vacío = todo al primario, ver storage.replicas)
+DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+# echo=True registra cada sentencia y penaliza el throughput; solo para depurar
+DATABASE_ECHO = os.getenv("DATABASE_ECHO", "false").lower() in ("1", "true", "yes")
 
-engine = create_engine(DATABASE_URL, echo=True)
+
+def _enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+def _create_engine(url: str) -> Engine:
+    new_engine = create_engine(url, echo=DATABASE_ECHO)
+    instrument_engine(new_engine)
+    if new_engine.dialect.name == "sqlite":
+        # SQLite ignora las claves foráneas (y su ON DELETE CASCADE) si no se activan por conexión
+        event.listen(new_engine, "connect", _enable_sqlite_foreign_keys)
+    nplusone.install(new_engine)
+    return new_engine
+
+
+engine = _create_engine(DATABASE_URL)
+replica_set = ReplicaSet(engine, [_create_engine(url) for url in DATABASE_REPLICA_URLS])
+
+# Escrituras y lecturas que deben ver lo recién escrito
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Lecturas que toleran el retraso de replicación (GET de detalle, lecturas, analítica)
+ReadSessionLocal = sessionmaker(
+    class_=RoutingSession, autocommit=False, autoflush=False, bind=engine, replicas=replica_set
+)
+# Los commits con escrituras fijan al primario las lecturas siguientes del cliente
+track_writes(SessionLocal)
+track_writes(ReadSessionLocal)
+# change_log para GET /sync en todas las sesiones del ORM
+change_tracking.install()
 
 '''
 def create_database():
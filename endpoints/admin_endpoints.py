@@ -0,0 +1,83 @@
+import os
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import PlainTextResponse
+from monitoring.profiler import ProfilerBusy, profiler
+from monitoring.slow_requests import slow_requests
+from endpoints.dependencies import require_admin
+
+
+# Solo con X-Admin-Token. Todo es por proceso: con varios workers cada
+# respuesta indica en X-Worker-Pid de cuál viene
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+
+
+@router.post("/profile", response_class=PlainTextResponse)
+def profile_worker(
+        seconds: float = Query(10.0, gt=0, le=60, description="Duración del perfil"),
+        interval_ms: float = Query(5.0, ge=1, le=100, description="Milisegundos entre muestras"),
+        include_idle: bool = Query(False, description="Incluir hilos esperando trabajo")
+):
+    """
+    Perfilar este worker por muestreo durante unos segundos
+
+    La respuesta son pilas colapsadas ("marco;marco;marco N") para
+    flamegraph.pl, speedscope o inferno:
+
+        curl -X POST -H "X-Admin-Token: ..." ".../admin/profile?seconds=15" > perfil.txt
+        flamegraph.pl perfil.txt > perfil.svg
+
+    Args:
+        seconds: Duración del perfil (bloquea esta petición mientras dura)
+        interval_ms: Intervalo de muestreo
+        include_idle: Si es True, también los hilos ociosos
+
+    Returns:
+        PlainTextResponse: Pilas colapsadas con su número de muestras
+
+    Raises:
+        HTTPException 409: Si ya hay un perfil en curso en este worker
+    """
+    try:
+        collapsed, samples = profiler.profile(seconds, interval_ms / 1000.0, include_idle)
+    except ProfilerBusy as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc))
+
+    pid = os.getpid()
+    return PlainTextResponse(collapsed, headers={
+        "X-Worker-Pid": str(pid),
+        "X-Profile-Samples": str(samples),
+        "Content-Disposition": f'attachment; filename="profile-{pid}.collapsed"',
+    })
+
+
+@router.get("/slow-requests")
+def get_slow_requests(
+        response: Response,
+        limit: int = Query(20, ge=1, le=1000)
+):
+    """
+    Peticiones lentas recientes de este worker, las más lentas primero
+
+    Cada entrada lleva la duración total, las sentencias SQL con su duración
+    y el tiempo de inferencia y de servicios externos (ej. Open-Meteo).
+
+    Args:
+        response: Respuesta (para X-Worker-Pid)
+        limit: Número máximo de peticiones
+
+    Returns:
+        dict: worker_pid, threshold_ms y requests
+    """
+    response.headers["X-Worker-Pid"] = str(os.getpid())
+    return {
+        "worker_pid": os.getpid(),
+        "threshold_ms": round(slow_requests.threshold * 1000, 3),
+        "requests": slow_requests.snapshot(limit),
+    }
+
+
+@router.delete("/slow-requests", status_code=status.HTTP_204_NO_CONTENT)
+def clear_slow_requests():
+    """Vaciar el registro de peticiones lentas de este worker"""
+    slow_requests.clear()
@@ -0,0 +1,49 @@
+from fastapi import APIRouter, Body, HTTPException, status
+from clients.subsystems import plant_health
+
+
+router = APIRouter(prefix="/analysis", tags=["analysis"])
+
+
+@router.post("/classify")
+def classify_image(image: bytes = Body(..., media_type="image/jpeg")):
+    """
+    Clasificar una imagen de planta con el modelo de enfermedades
+
+    El cuerpo es la imagen tal cual (Content-Type image/jpeg o image/png).
+    En modo multi-worker la inferencia la hace el servidor de inferencia
+    compartido (INFERENCE_SOCKET).
+
+    Args:
+        image: Bytes de la imagen
+
+    Returns:
+        dict: Predicciones del modelo
+
+    Raises:
+        HTTPException 400: Si el cuerpo está vacío o no es una imagen válida
+        HTTPException 503: Si el modelo no está disponible
+    """
+    if not image:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No se recibió ninguna imagen"
+        )
+
+    try:
+        client = plant_health.get()
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="El modelo de análisis no está disponible"
+        )
+
+    try:
+        predictions = client.classify_bytes(image)
+    except (OSError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="La imagen no es válida"
+        )
+
+    return {"predictions": predictions}
@@ -0,0 +1,148 @@
+"""
+Compresión de respuestas (Brotli o gzip según Accept-Encoding)
+
+Solo se comprimen respuestas de un único bloque (JSONResponse, Response) a
+partir de COMPRESSION_MIN_SIZE bytes; las respuestas en streaming (ficheros)
+y los tipos ya comprimidos (imágenes, Arrow, msgpack) pasan sin tocar.
+"""
+import gzip
+import os
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - dependencia opcional
+    brotli = None
+
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+# Calidad baja: la latencia pesa más que el último porcentaje de ratio
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "4"))
+
+_SKIP_PREFIXES = ("image/", "video/", "audio/")
+_SKIP_TYPES = (
+    "application/gzip",
+    "application/zip",
+    "application/x-msgpack",
+    "application/vnd.apache.arrow.stream",
+)
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Elige la codificación a partir de la cabecera Accept-Encoding
+
+    Args:
+        accept_encoding: Valor de la cabecera (ej. "gzip, deflate, br")
+
+    Returns:
+        str: "br", "gzip" o None si el cliente no acepta ninguna
+    """
+    accepted = {}
+    for item in accept_encoding.split(","):
+        token, _, params = item.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[token] = q
+
+    wildcard = accepted.get("*", 0.0)
+    if brotli is not None and accepted.get("br", wildcard) > 0:
+        return "br"
+    if accepted.get("gzip", wildcard) > 0:
+        return "gzip"
+    return None
+
+
+def _compressible(start: Message, headers: Headers) -> bool:
+    if start["status"] < 200 or start["status"] in (204, 304):
+        return False
+    if "content-encoding" in headers:
+        return False
+    content_type = headers.get("content-type", "").split(";")[0].strip().lower()
+    return not (content_type.startswith(_SKIP_PREFIXES) or content_type in _SKIP_TYPES)
+
+
+def _compress(body: bytes, encoding: str, gzip_level: int, brotli_quality: int) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=brotli_quality)
+    return gzip.compress(body, compresslevel=gzip_level, mtime=0)
+
+
+class CompressionMiddleware:
+    """
+    Middleware ASGI que comprime con Brotli (si está instalado) o gzip
+
+    El ETag de la respuesta comprimida lleva el sufijo -br/-gzip para que
+    siga siendo fuerte por representación; endpoints.conditional lo ignora al
+    comparar If-None-Match.
+    """
+
+    def __init__(
+            self,
+            app: ASGIApp,
+            minimum_size: int = COMPRESSION_MIN_SIZE,
+            gzip_level: int = GZIP_LEVEL,
+            brotli_quality: int = BROTLI_QUALITY
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Optional[Message] = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                # Se retiene hasta ver el cuerpo: las cabeceras dependen de él
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or start_message is None:
+                await send(message)
+                return
+
+            start, start_message = start_message, None
+            headers = MutableHeaders(scope=start)
+            if message.get("more_body", False) or not _compressible(start, headers):
+                await send(start)
+                await send(message)
+                return
+
+            headers.add_vary_header("Accept-Encoding")
+            body = message.get("body", b"")
+            if len(body) < self.minimum_size:
+                await send(start)
+                await send(message)
+                return
+
+            body = _compress(body, encoding, self.gzip_level, self.brotli_quality)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(body))
+            etag = headers.get("etag")
+            if etag and etag.endswith('"'):
+                headers["ETag"] = f'{etag[:-1]}-{"br" if encoding == "br" else "gzip"}"'
+            await send(start)
+            await send({"type": "http.response.body", "body": body, "more_body": False})
+
+        await self.app(scope, receive, send_wrapper)
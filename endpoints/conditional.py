@@ -0,0 +1,90 @@
+"""
+ETags fuertes y GET condicional
+
+El ETag se calcula a partir de una "versión" barata de los datos (columnas
+version, max(updated_at), count/max(id)...) obtenida con una consulta de
+agregados, no del cuerpo serializado: si coincide con If-None-Match se
+responde 304 sin cargar ni serializar nada.
+
+La versión debe incluir todo lo que cambia la representación (parámetros de
+la consulta, media type negociado, etc.).
+"""
+import hashlib
+from typing import Any, Optional
+
+from fastapi import Request, Response, status
+
+# Sufijos que añade CompressionMiddleware al ETag de la representación comprimida
+ENCODING_SUFFIXES = ("-br", "-gzip")
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    Construye un ETag fuerte a partir de las partes que identifican la versión
+
+    Args:
+        *parts: Valores con repr estable (ids, versiones, fechas, parámetros)
+
+    Returns:
+        str: ETag entre comillas, ej. '"3f2a..."'
+    """
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+    return f'"{digest}"'
+
+
+def _strip_encoding(tag: str) -> str:
+    tag = tag.strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    for suffix in ENCODING_SUFFIXES:
+        if tag.endswith(suffix + '"'):
+            return tag[:-len(suffix) - 1] + '"'
+    return tag
+
+
+def _matching_tag(request: Request, etag: str) -> Optional[str]:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return None
+    if header.strip() == "*":
+        return etag
+    return next((tag.strip() for tag in header.split(",") if _strip_encoding(tag) == etag), None)
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    Indica si la cabecera If-None-Match de la petición incluye el ETag
+
+    Se ignoran los sufijos de codificación (-br/-gzip) para que un cliente
+    que recibió la versión comprimida también obtenga 304.
+
+    Args:
+        request: Petición
+        etag: ETag actual del recurso
+
+    Returns:
+        bool: True si el cliente ya tiene esta versión
+    """
+    return _matching_tag(request, etag) is not None
+
+
+def not_modified(request: Request, etag: str, vary: Optional[str] = None) -> Response:
+    """
+    Respuesta 304 sin cuerpo con el ETag que envió el cliente
+
+    El 304 no pasa por la compresión, así que se devuelve la etiqueta tal como
+    llegó en If-None-Match (con su sufijo -br/-gzip): la caché del cliente
+    conserva la representación que ya tiene en vez de verla como otra.
+
+    Args:
+        request: Petición (para If-None-Match)
+        etag: ETag actual del recurso, sin sufijo de codificación
+        vary: Valor de la cabecera Vary (si la representación depende de Accept)
+
+    Returns:
+        Response: 304 Not Modified
+    """
+    headers = {"ETag": _matching_tag(request, etag) or etag}
+    if vary:
+        headers["Vary"] = vary
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
@@ -0,0 +1,90 @@
+"""
+Sesiones de base de datos para los routers
+
+get_db abre una sesión en el primario (escrituras y lecturas que deben ver
+lo recién escrito); get_read_db una RoutingSession que lee de una réplica
+cuando hay alguna al día (ver storage.replicas).
+
+ReadYourWritesMiddleware devuelve la cookie WRITTEN_AT_COOKIE cuando la
+petición confirmó escrituras; mientras dure, get_read_db solo usa réplicas
+que ya tienen esa escritura, así un GET justo después de un PATCH no ve el
+estado anterior.
+
+require_admin protege los endpoints de administración con la cabecera
+X-Admin-Token (deshabilitados si ADMIN_TOKEN no está configurado).
+"""
+import os
+import secrets
+from typing import Optional
+
+from fastapi import Header, HTTPException, Request, status
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from database_config import ReadSessionLocal, SessionLocal
+from storage.replicas import READ_YOUR_WRITES_SECONDS, write_scope
+
+WRITTEN_AT_COOKIE = "db_written_at"
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+
+def get_db():
+    """Dependency para obtener la sesión de base de datos (primario)"""
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def _written_at(request: Request) -> Optional[float]:
+    value = request.cookies.get(WRITTEN_AT_COOKIE)
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def get_read_db(request: Request):
+    """Dependency para obtener una sesión de solo lectura (réplica si está al día)"""
+    db = ReadSessionLocal(written_at=_written_at(request))
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None, alias="X-Admin-Token")) -> None:
+    """Dependency para endpoints de administración"""
+    if not ADMIN_TOKEN or not x_admin_token or not secrets.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Se requiere un token de administración válido"
+        )
+
+
+class ReadYourWritesMiddleware:
+    """Marca con una cookie a los clientes cuya petición escribió en el primario"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with write_scope() as writes:
+            async def send_wrapper(message: Message) -> None:
+                if message["type"] == "http.response.start" and writes:
+                    headers = MutableHeaders(scope=message)
+                    headers.append(
+                        "Set-Cookie",
+                        f"{WRITTEN_AT_COOKIE}={max(writes):.6f}; Max-Age={READ_YOUR_WRITES_SECONDS}; "
+                        "Path=/; HttpOnly; SameSite=Lax"
+                    )
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
@@ -1,4 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Literal, Optional, Tuple, Type
+import numpy as np
+import orjson
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, ValidationError
 from sqlalchemy.orm import Session
 from schemas.greenhouse_schema import (
     GreenhouseCreate,
@@ -6,20 +12,26 @@ from schemas.greenhouse_schema import (
     GreenhouseResponse,
     GreenhouseDetailResponse
 )
-from services.greenhouse_service import GreenhouseService
-from database_config import SessionLocal
+from services.greenhouse_service import ConcurrentUpdateError, GreenhouseService
+from services.deletion_service import DeletionService
+from services.resampling_service import ResamplingService
+from services.forecast_service import FORECAST_MAX_HOURS, ForecastService
+from services.health_summary_service import HealthSummaryService
+from services.plant_service import PlantService
+from services.sensor_service import SensorService
+from schemas.common_schema import BatchItemError, BatchRequest, BatchResponse
+from schemas.plant_schema import PlantCreate, PlantResponse
+from schemas.sensor_schema import SensorCreate, SensorResponse
+from schemas.resampling_schema import ResampledReadingsResponse
+from schemas.forecast_schema import GreenhouseForecastResponse
+from schemas.health_summary_schema import HealthSummaryResponse
+from endpoints.timeseries_formats import columnar_response, negotiate_format
+from endpoints.conditional import etag_matches, make_etag, not_modified
+from endpoints.dependencies import get_db, get_read_db
 
 
 router = APIRouter(prefix="/greenhouses", tags=["greenhouses"])
 
-def get_db():
-    """Dependency para obtener la sesión de base de datos"""
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 
 @router.post("/", response_model=GreenhouseResponse, status_code=status.HTTP_201_CREATED)
 def create_greenhouse(
@@ -31,7 +43,7 @@ def create_greenhouse(
     Crear un nuevo invernadero
 
     Args:
-        greenhouse: Datos del invernadero (name y location opcional)
+        greenhouse: Datos del invernadero (name; location y coordenadas opcionales)
         user_id: ID del usuario propietario (por ahora query param, luego JWT)
         db: Sesión de base de datos
 
@@ -51,7 +63,9 @@ def create_greenhouse(
         db=db,
         name=greenhouse.name,
         user_id=user_id,
-        location=greenhouse.location
+        location=greenhouse.location,
+        latitude=greenhouse.latitude,
+        longitude=greenhouse.longitude
     )
 
     if not db_greenhouse:
@@ -64,12 +78,21 @@ def create_greenhouse(
 
 
 @router.get("/{greenhouse_id}", response_model=GreenhouseDetailResponse)
-def get_greenhouse(greenhouse_id: int, db: Session = Depends(get_db)):
+def get_greenhouse(
+        greenhouse_id: int,
+        request: Request,
+        db: Session = Depends(get_read_db)
+):
     """
     Obtener un invernadero por su ID con plantas y sensores
 
+    El ETag se calcula con las columnas version del invernadero, sus plantas
+    y sus sensores; si coincide con If-None-Match se responde 304 sin cargar
+    ni serializar las relaciones.
+
     Args:
         greenhouse_id: ID del invernadero
+        request: Petición (para If-None-Match)
         db: Sesión de base de datos
 
     Returns:
@@ -78,8 +101,22 @@ def get_greenhouse(greenhouse_id: int, db: Session = Depends(get_db)):
     Raises:
         HTTPException 404: Si el invernadero no existe
     """
-    # Obtener invernadero con relaciones
-    greenhouse = GreenhouseService.get_greenhouse_complete(db, greenhouse_id)
+    # La versión se lee antes que los datos: si cambian entre medias, el
+    # ETag queda viejo y la siguiente petición recibe la respuesta completa
+    version = GreenhouseService.get_greenhouse_version(db, greenhouse_id)
+
+    if version is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Invernadero no encontrado"
+        )
+
+    etag = make_etag("greenhouse", greenhouse_id, *version)
+    if etag_matches(request, etag):
+        return not_modified(request, etag)
+
+    # Obtener invernadero con relaciones (solo columnas, ver get_greenhouse_detail)
+    greenhouse = GreenhouseService.get_greenhouse_detail(db, greenhouse_id)
 
     if not greenhouse:
         raise HTTPException(
@@ -87,7 +124,9 @@ def get_greenhouse(greenhouse_id: int, db: Session = Depends(get_db)):
             detail="Invernadero no encontrado"
         )
 
-    return greenhouse
+    # orjson directamente: response_model queda para la documentación y no
+    # se vuelve a validar cada planta y sensor
+    return Response(content=orjson.dumps(greenhouse), media_type="application/json", headers={"ETag": etag})
 
 
 @router.patch("/{greenhouse_id}", response_model=GreenhouseResponse)
@@ -113,6 +152,7 @@ def update_greenhouse(
         HTTPException 404: Si el invernadero no existe
         HTTPException 403: Si el usuario no es el propietario
         HTTPException 400: Si no hay datos para actualizar
+        HTTPException 409: Si otra petición lo modificó a la vez
     """
     # Verificar si el invernadero existe
     existing_greenhouse = GreenhouseService.get_greenhouse_by_id(db, greenhouse_id)
@@ -139,10 +179,14 @@ def update_greenhouse(
             detail="No se proporcionaron datos para actualizar"
         )
 
-    # Actualizar invernadero
-    updated_greenhouse = GreenhouseService.update_greenhouse(
-        db, greenhouse_id, update_data
-    )
+    # Actualizar invernadero (en el primario; ReadYourWritesMiddleware fija al
+    # primario los GET siguientes de este cliente hasta que las réplicas lo tengan)
+    try:
+        updated_greenhouse = GreenhouseService.update_greenhouse(
+            db, greenhouse_id, update_data
+        )
+    except ConcurrentUpdateError as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc))
 
     if not updated_greenhouse:
         raise HTTPException(
@@ -157,6 +201,8 @@ def update_greenhouse(
 def delete_greenhouse(
         greenhouse_id: int,
         user_id: int,  # TODO: En producción esto vendrá del token JWT
+        background_tasks: BackgroundTasks,
+        background: bool = False,
         db: Session = Depends(get_db)
 ):
     """
@@ -167,10 +213,12 @@ def delete_greenhouse(
     Args:
         greenhouse_id: ID del invernadero a eliminar
         user_id: ID del usuario que hace la petición
+        background: Si es True, el borrado se hace en segundo plano por lotes
+                    (para invernaderos con años de lecturas)
         db: Sesión de base de datos
 
     Returns:
-        None (204 No Content)
+        None (204 No Content), o 202 con el trabajo si background=True
 
     Raises:
         HTTPException 404: Si el invernadero no existe
@@ -191,6 +239,15 @@ def delete_greenhouse(
             detail="No tienes permisos para eliminar este invernadero"
         )
 
+    # Borrado en segundo plano: se consulta en GET /jobs/{job_id}
+    if background:
+        job = DeletionService.create_job(db, "delete_greenhouse", greenhouse_id)
+        background_tasks.add_task(DeletionService.run_job, job.id)
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content={"job_id": job.id, "status": job.status}
+        )
+
     # Eliminar invernadero
     deleted = GreenhouseService.delete_greenhouse(db, greenhouse_id)
 
@@ -198,4 +255,336 @@ def delete_greenhouse(
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Error al eliminar el invernadero"
-        )
\ No newline at end of file
+        )
+
+
+def _ensure_owner(db: Session, greenhouse_id: int, user_id: int) -> None:
+    if not GreenhouseService.get_greenhouse_by_id(db, greenhouse_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Invernadero no encontrado"
+        )
+    if not GreenhouseService.user_owns_greenhouse(db, greenhouse_id, user_id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="No tienes permisos para modificar este invernadero"
+        )
+
+
+def _validate_batch(
+        items: List[Dict[str, Any]],
+        schema: Type[BaseModel],
+        greenhouse_id: int
+) -> Tuple[List[Dict[str, Any]], List[BatchItemError]]:
+    """
+    Valida cada elemento de un lote por separado
+
+    Returns:
+        tuple: (filas válidas en el orden de items, errores de las demás)
+    """
+    rows, errors = [], []
+    for index, item in enumerate(items):
+        if item.get("greenhouse_id", greenhouse_id) != greenhouse_id:
+            errors.append(BatchItemError(index=index, errors=[{
+                "loc": ["greenhouse_id"],
+                "msg": "No coincide con el invernadero de la ruta",
+                "type": "value_error"
+            }]))
+            continue
+        try:
+            validated = schema.model_validate({**item, "greenhouse_id": greenhouse_id})
+        except ValidationError as exc:
+            errors.append(BatchItemError(index=index, errors=[
+                {"loc": list(error["loc"]), "msg": error["msg"], "type": error["type"]}
+                for error in exc.errors()
+            ]))
+            continue
+        rows.append(validated.model_dump())
+    return rows, errors
+
+
+def _batch_status(response: Response, created: int, errors: int) -> None:
+    # 201 todo creado, 207 parcial, 422 nada válido
+    if not errors:
+        response.status_code = status.HTTP_201_CREATED
+    elif created:
+        response.status_code = status.HTTP_207_MULTI_STATUS
+    else:
+        response.status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+@router.post("/{greenhouse_id}/plants:batch", response_model=BatchResponse[PlantResponse])
+def create_plants_batch(
+        greenhouse_id: int,
+        batch: BatchRequest,
+        user_id: int,  # TODO: En producción esto vendrá del token JWT
+        response: Response,
+        db: Session = Depends(get_db)
+):
+    """
+    Registrar varias plantas de un invernadero en una sola transacción
+
+    Cada elemento se valida con PlantCreate (greenhouse_id se toma de la ruta);
+    los válidos se insertan juntos y los inválidos se devuelven en errors con
+    su posición. Responde 201 si se crearon todos, 207 si solo algunos y 422
+    si ninguno.
+
+    Args:
+        greenhouse_id: ID del invernadero
+        batch: Plantas a crear (hasta 1000)
+        user_id: ID del usuario que hace la petición
+        response: Respuesta (para el código de estado)
+        db: Sesión de base de datos
+
+    Returns:
+        BatchResponse[PlantResponse]: Plantas creadas y errores por elemento
+
+    Raises:
+        HTTPException 404: Si el invernadero no existe
+        HTTPException 403: Si el usuario no es el propietario
+        HTTPException 400: Si hay error al crear
+    """
+    _ensure_owner(db, greenhouse_id, user_id)
+    rows, errors = _validate_batch(batch.items, PlantCreate, greenhouse_id)
+
+    created = PlantService.create_plants(db, rows)
+    if created is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Error al crear las plantas"
+        )
+
+    _batch_status(response, len(created), len(errors))
+    return {"created": created, "errors": errors}
+
+
+@router.post("/{greenhouse_id}/sensors:batch", response_model=BatchResponse[SensorResponse])
+def create_sensors_batch(
+        greenhouse_id: int,
+        batch: BatchRequest,
+        user_id: int,  # TODO: En producción esto vendrá del token JWT
+        response: Response,
+        db: Session = Depends(get_db)
+):
+    """
+    Registrar varios sensores de un invernadero en una sola transacción
+
+    Igual que plants:batch, validando cada elemento con SensorCreate.
+
+    Args:
+        greenhouse_id: ID del invernadero
+        batch: Sensores a crear (hasta 1000)
+        user_id: ID del usuario que hace la petición
+        response: Respuesta (para el código de estado)
+        db: Sesión de base de datos
+
+    Returns:
+        BatchResponse[SensorResponse]: Sensores creados y errores por elemento
+
+    Raises:
+        HTTPException 404: Si el invernadero no existe
+        HTTPException 403: Si el usuario no es el propietario
+        HTTPException 400: Si hay error al crear
+    """
+    _ensure_owner(db, greenhouse_id, user_id)
+    rows, errors = _validate_batch(batch.items, SensorCreate, greenhouse_id)
+    for row in rows:
+        # active=None explícito: el valor por defecto del modelo
+        if row["active"] is None:
+            row["active"] = True
+
+    created = SensorService.create_sensors(db, rows)
+    if created is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Error al crear los sensores"
+        )
+
+    _batch_status(response, len(created), len(errors))
+    return {"created": created, "errors": errors}
+
+
+@router.get("/{greenhouse_id}/readings/resampled", response_model=ResampledReadingsResponse)
+def get_resampled_readings(
+        greenhouse_id: int,
+        request: Request,
+        start: Optional[datetime] = Query(None, description="Inicio (por defecto, hace 24 h)"),
+        end: Optional[datetime] = Query(None, description="Fin (por defecto, ahora)"),
+        step: int = Query(300, ge=10, le=86400, description="Intervalo en segundos"),
+        method: Literal['none', 'ffill', 'linear', 'median'] = 'linear',
+        window: int = Query(5, ge=1, le=101, description="Ventana de la mediana móvil"),
+        sensor_type: Optional[List[str]] = Query(None, description="Filtrar por tipo de sensor"),
+        format: Optional[str] = Query(None, description="json | columnar | msgpack | arrow (prioridad sobre Accept)"),
+        db: Session = Depends(get_read_db)
+):
+    """
+    Obtener las series regulares de todos los sensores de un invernadero
+
+    Los huecos se rellenan con el método indicado y los valores atípicos se
+    descartan y marcan en flags.
+
+    Args:
+        greenhouse_id: ID del invernadero
+        start: Inicio del rango
+        end: Fin del rango
+        step: Intervalo de la serie regular (segundos)
+        method: none | ffill | linear | median
+        window: Ventana de la mediana móvil (intervalos)
+        sensor_type: Tipos de sensor a incluir
+        format: Formato de respuesta explícito (también por cabecera Accept)
+        db: Sesión de base de datos
+
+    Returns:
+        ResampledReadingsResponse: Series en formato columnar
+
+    Raises:
+        HTTPException 404: Si el invernadero no existe
+        HTTPException 400: Si el rango no es válido o es demasiado grande
+        HTTPException 406: Si el formato pedido no está disponible
+    """
+    media_type = negotiate_format(request, format)
+
+    if not GreenhouseService.get_greenhouse_by_id(db, greenhouse_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Invernadero no encontrado"
+        )
+
+    end = end or datetime.utcnow()
+    start = start or end - timedelta(days=1)
+
+    try:
+        resampled = ResamplingService.resample_greenhouse(
+            db, greenhouse_id, start, end, step, method, window, sensor_type
+        )
+    except ValueError as exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(exception)
+        )
+
+    # Serialización directa desde NumPy (los NaN salen como null)
+    return columnar_response(
+        {
+            "greenhouse_id": greenhouse_id,
+            "start": start,
+            "end": end,
+            "step_seconds": step,
+            "method": method,
+            "sensor_ids": resampled.sensor_ids.tolist(),
+            "sensor_types": resampled.sensor_types,
+        },
+        {
+            "t": resampled.timestamps.astype(np.int64),
+            "values": resampled.values,
+            "flags": resampled.flags,
+        },
+        media_type
+    )
+
+
+@router.get("/{greenhouse_id}/forecast", response_model=GreenhouseForecastResponse)
+def get_forecast(
+        greenhouse_id: int,
+        request: Request,
+        hours: int = Query(24, ge=6, le=FORECAST_MAX_HOURS, description="Horas a pronosticar"),
+        format: Optional[str] = Query(None, description="json | columnar | msgpack | arrow (prioridad sobre Accept)"),
+        db: Session = Depends(get_db)
+):
+    """
+    Pronosticar la temperatura y la humedad interiores de las próximas horas
+
+    Un modelo ridge por sensor combina sus lecturas recientes con el
+    pronóstico exterior de Open-Meteo. Los modelos se guardan y solo se
+    actualizan con las horas nuevas, por eso la petición usa la sesión de
+    escritura.
+
+    Args:
+        greenhouse_id: ID del invernadero
+        hours: Horas a pronosticar (6..24)
+        format: Formato de respuesta explícito (también por cabecera Accept)
+        db: Sesión de base de datos
+
+    Returns:
+        GreenhouseForecastResponse: Pronóstico en formato columnar
+
+    Raises:
+        HTTPException 404: Si el invernadero no existe
+        HTTPException 406: Si el formato pedido no está disponible
+    """
+    media_type = negotiate_format(request, format)
+
+    if not GreenhouseService.get_greenhouse_by_id(db, greenhouse_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Invernadero no encontrado"
+        )
+
+    forecast = ForecastService.forecast(db, greenhouse_id, hours)
+
+    return columnar_response(
+        {
+            "greenhouse_id": greenhouse_id,
+            "origin": forecast.origin,
+            "hours": hours,
+            "sensor_ids": forecast.sensor_ids.tolist(),
+            "sensor_types": forecast.sensor_types,
+            # Un valor por sensor, como sensor_ids: no es una columna por hora
+            "samples": forecast.samples.tolist(),
+        },
+        {
+            "t": forecast.timestamps.astype(np.int64),
+            "values": forecast.values,
+            "outside_temperature": forecast.outside[0],
+            "outside_humidity": forecast.outside[1],
+        },
+        media_type
+    )
+
+
+@router.get("/{greenhouse_id}/health-summary", response_model=HealthSummaryResponse)
+def get_health_summary(
+        greenhouse_id: int,
+        request: Request,
+        response: Response,
+        days: int = Query(30, ge=1, le=366, description="Días hacia atrás, incluido hoy"),
+        analysis_type: Optional[Literal['health', 'pest']] = None,
+        db: Session = Depends(get_read_db)
+):
+    """
+    Obtener el resumen de salud de las plantas de un invernadero
+
+    Distribución de etiquetas y tendencia diaria del periodo, más las
+    etiquetas de cada planta con la fecha en que se vieron por primera vez.
+    Se lee de los agregados que se actualizan al escribir cada análisis, sin
+    recorrer plants_analysis.
+
+    Args:
+        greenhouse_id: ID del invernadero
+        request: Petición (para If-None-Match)
+        response: Respuesta (para la cabecera ETag)
+        days: Días del periodo
+        analysis_type: Filtrar por tipo de análisis
+        db: Sesión de base de datos
+
+    Returns:
+        HealthSummaryResponse: Resumen del periodo
+
+    Raises:
+        HTTPException 404: Si el invernadero no existe
+    """
+    if not GreenhouseService.get_greenhouse_by_id(db, greenhouse_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Invernadero no encontrado"
+        )
+
+    # El día forma parte del ETag: la ventana se desplaza aunque no haya análisis nuevos
+    today = datetime.utcnow().date()
+    version = HealthSummaryService.get_summary_version(db, greenhouse_id)
+    etag = make_etag("health-summary", greenhouse_id, days, analysis_type, today, *version)
+    if etag_matches(request, etag):
+        return not_modified(request, etag)
+
+    response.headers["ETag"] = etag
+    return HealthSummaryService.get_summary(db, greenhouse_id, days, analysis_type, today)
@@ -0,0 +1,57 @@
+import os
+from fastapi import APIRouter, status
+from fastapi.responses import JSONResponse
+from sqlalchemy import text
+from clients.subsystems import SUBSYSTEMS
+from database_config import engine, replica_set
+
+
+router = APIRouter(prefix="/health", tags=["health"])
+
+# Subsistemas sin los cuales el worker no debe recibir tráfico (ej. "plant_health")
+REQUIRED_SUBSYSTEMS = [name for name in os.getenv("READINESS_REQUIRES", "").split(",") if name]
+
+
+@router.get("/live")
+def liveness():
+    """
+    Liveness: el proceso responde. No toca la base de datos ni los modelos
+
+    Returns:
+        dict: Estado del proceso
+    """
+    return {"status": "alive"}
+
+
+@router.get("/ready")
+def readiness():
+    """
+    Readiness: la base de datos responde y los subsistemas requeridos están cargados
+
+    Returns:
+        JSONResponse: 200 si el worker puede recibir tráfico, 503 si no
+    """
+    checks = {}
+    ready = True
+
+    try:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+        checks["database"] = {"state": "ready"}
+    except Exception as exception:
+        checks["database"] = {"state": "failed", "error": type(exception).__name__}
+        ready = False
+
+    # Informativo: sin réplicas al día las lecturas van al primario
+    if replica_set.replicas:
+        checks["replicas"] = replica_set.status()
+
+    for name, subsystem in SUBSYSTEMS.items():
+        checks[name] = subsystem.status()
+        if name in REQUIRED_SUBSYSTEMS and not subsystem.is_ready:
+            ready = False
+
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"status": "ready" if ready else "not_ready", "checks": checks}
+    )
@@ -0,0 +1,69 @@
+import os
+import re
+from fastapi import APIRouter, HTTPException, Request, Response, status
+from fastapi.responses import FileResponse
+from storage.image_store import ORIGINAL, VARIANTS, image_store
+from endpoints.conditional import etag_matches, not_modified
+
+
+router = APIRouter(prefix="/images", tags=["images"])
+
+# El contenido de una URL nunca cambia (va por sha256): caché de un año
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Detrás de nginx: prefijo de una location "internal" que apunta a IMAGE_STORE_DIR.
+# nginx sirve el fichero con sendfile y el worker no lee ni un byte
+IMAGE_ACCEL_REDIRECT = os.getenv("IMAGE_ACCEL_REDIRECT", "")
+
+_SHA256 = re.compile(r"^[0-9a-f]{64}$")
+_MEDIA_TYPES = {"jpg": "image/jpeg", "png": "image/png", "webp": "image/webp"}
+
+
+@router.get("/{sha256}/{variant}")
+def get_image(sha256: str, variant: str, request: Request):
+    """
+    Servir una imagen del almacén (original, model o thumb)
+
+    Args:
+        sha256: Hash del contenido original
+        variant: original | model | thumb
+        request: Petición (para If-None-Match)
+
+    Returns:
+        FileResponse: El fichero, con Cache-Control immutable
+
+    Raises:
+        HTTPException 404: Si el hash o la variante no existen
+    """
+    # Validar antes de construir rutas: el hash es parte del path en disco
+    if not _SHA256.match(sha256) or (variant != ORIGINAL and variant not in VARIANTS):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Imagen no encontrada"
+        )
+
+    extensions = list(_MEDIA_TYPES) if variant == ORIGINAL else ["jpg"]
+    extension = next((ext for ext in extensions if image_store.exists(sha256, variant, ext)), None)
+    if extension is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Imagen no encontrada"
+        )
+
+    etag = f'"{sha256}-{variant}"'
+    headers = {"Cache-Control": CACHE_CONTROL, "ETag": etag}
+    if etag_matches(request, etag):
+        response = not_modified(request, etag)
+        response.headers["Cache-Control"] = CACHE_CONTROL
+        return response
+
+    if IMAGE_ACCEL_REDIRECT:
+        headers["X-Accel-Redirect"] = (
+            f"{IMAGE_ACCEL_REDIRECT.rstrip('/')}/{image_store.relative_path(sha256, variant, extension)}"
+        )
+        return Response(media_type=_MEDIA_TYPES[extension], headers=headers)
+
+    return FileResponse(
+        image_store.path(sha256, variant, extension),
+        media_type=_MEDIA_TYPES[extension],
+        headers=headers
+    )
@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+from schemas.job_schema import JobResponse
+from services.deletion_service import DeletionService
+from endpoints.dependencies import get_db
+
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+def get_job(job_id: int, db: Session = Depends(get_db)):
+    """
+    Consultar el estado de un trabajo en segundo plano
+
+    Args:
+        job_id: ID del trabajo
+        db: Sesión de base de datos
+
+    Returns:
+        JobResponse: Estado y resultado del trabajo
+
+    Raises:
+        HTTPException 404: Si el trabajo no existe
+    """
+    job = DeletionService.get_job(db, job_id)
+
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Trabajo no encontrado"
+        )
+
+    return job
@@ -0,0 +1,19 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from monitoring import registry
+
+
+router = APIRouter(tags=["monitoring"])
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def get_metrics():
+    """
+    Exponer las métricas del proceso en formato texto de Prometheus
+
+    Returns:
+        PlainTextResponse: Métricas HTTP, de base de datos, inferencia y servicios externos
+    """
+    return PlainTextResponse(registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
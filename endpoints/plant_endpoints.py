@@ -0,0 +1,177 @@
+from typing import List, Literal, Optional
+import orjson
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy.orm import Session
+from clients.subsystems import plant_health
+from models.plant_image_model import PlantImage
+from schemas.plant_analysis_schema import PlantAnalysisResponse
+from schemas.plant_image_schema import PlantImageResponse, PlantImageUploadResponse
+from services.plant_service import PlantService
+from services.plant_image_service import PlantImageService
+from storage.image_store import InvalidImageError
+from endpoints.conditional import etag_matches, make_etag, not_modified
+from endpoints.dependencies import get_db, get_read_db
+
+
+router = APIRouter(prefix="/plants", tags=["plants"])
+
+
+def _ensure_plant(db: Session, plant_id: int) -> None:
+    if not PlantService.get_plant_by_id(db, plant_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Planta no encontrada"
+        )
+
+
+def _image_response(image: PlantImage) -> dict:
+    base = f"/images/{image.sha256}"
+    return {
+        "id": image.id,
+        "plant_id": image.plant_id,
+        "sha256": image.sha256,
+        "content_type": image.content_type,
+        "width": image.width,
+        "height": image.height,
+        "size_bytes": image.size_bytes,
+        "uploaded_at": image.uploaded_at,
+        "original_url": f"{base}/original",
+        "model_url": f"{base}/model",
+        "thumbnail_url": f"{base}/thumb",
+    }
+
+
+@router.get("/{plant_id}/analyses", response_model=List[PlantAnalysisResponse])
+def get_plant_analyses(
+        plant_id: int,
+        request: Request,
+        analysis_type: Optional[Literal['health', 'pest']] = Query(None, description="Filtrar por tipo"),
+        skip: int = Query(0, ge=0),
+        limit: int = Query(100, ge=1, le=1000),
+        db: Session = Depends(get_read_db)
+):
+    """
+    Obtener los análisis de una planta (más recientes primero)
+
+    Responde 304 si If-None-Match coincide con el ETag actual, sin cargar los
+    análisis.
+
+    Args:
+        plant_id: ID de la planta
+        request: Petición (para If-None-Match)
+        analysis_type: Tipo de análisis (opcional)
+        skip: Número de análisis a saltar
+        limit: Número máximo de análisis
+        db: Sesión de base de datos
+
+    Returns:
+        List[PlantAnalysisResponse]: Análisis de la planta
+
+    Raises:
+        HTTPException 404: Si la planta no existe
+    """
+    _ensure_plant(db, plant_id)
+
+    # La versión se lee antes que los datos: si cambian entre medias, el
+    # ETag queda viejo y la siguiente petición recibe la respuesta completa
+    etag = make_etag(
+        "plant-analyses", plant_id, analysis_type, skip, limit,
+        *PlantService.get_analyses_version(db, plant_id)
+    )
+    if etag_matches(request, etag):
+        return not_modified(request, etag)
+
+    # Filas por columnas serializadas con orjson, sin validar cada análisis
+    analyses = PlantService.get_analyses(db, plant_id, analysis_type, skip, limit)
+    return Response(content=orjson.dumps(analyses), media_type="application/json", headers={"ETag": etag})
+
+
+@router.post(
+    "/{plant_id}/images",
+    response_model=PlantImageUploadResponse,
+    status_code=status.HTTP_201_CREATED
+)
+def upload_plant_image(
+        plant_id: int,
+        image: bytes = Body(..., media_type="image/jpeg"),
+        analyze: bool = Query(False, description="Clasificar la imagen con el modelo al subirla"),
+        db: Session = Depends(get_db)
+):
+    """
+    Subir una foto de una planta al almacén de imágenes
+
+    El cuerpo es la imagen tal cual (JPEG, PNG o WebP). Las variantes para el
+    modelo y la miniatura se generan aquí, una sola vez; si el mismo
+    contenido ya se había subido no se vuelve a procesar.
+
+    Args:
+        plant_id: ID de la planta
+        image: Bytes de la imagen
+        analyze: Si es True se clasifica la variante del modelo y se guarda el análisis
+        db: Sesión de base de datos
+
+    Returns:
+        PlantImageUploadResponse: Imagen registrada (y análisis si se pidió)
+
+    Raises:
+        HTTPException 404: Si la planta no existe
+        HTTPException 400: Si la imagen no es válida
+        HTTPException 503: Si se pidió análisis y el modelo no está disponible o falla
+    """
+    _ensure_plant(db, plant_id)
+
+    client = None
+    if analyze:
+        try:
+            client = plant_health.get()
+        except Exception:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="El modelo de análisis no está disponible"
+            )
+
+    try:
+        db_image, deduplicated = PlantImageService.add_image(db, plant_id, image)
+    except InvalidImageError as exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"La imagen no es válida: {exception}"
+        )
+
+    analysis = None
+    if client is not None:
+        try:
+            analysis = PlantImageService.analyze_image(db, db_image, client)
+        except (RuntimeError, ConnectionError, TimeoutError):
+            # Fallo del modelo o del servidor de inferencia, no de la imagen
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="El modelo de análisis no está disponible"
+            )
+        except (OSError, ValueError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="La imagen no se pudo analizar"
+            )
+
+    return {**_image_response(db_image), "deduplicated": deduplicated, "analysis": analysis}
+
+
+@router.get("/{plant_id}/images", response_model=List[PlantImageResponse])
+def get_plant_images(plant_id: int, db: Session = Depends(get_read_db)):
+    """
+    Obtener las imágenes de una planta con las URLs de sus variantes
+
+    Args:
+        plant_id: ID de la planta
+        db: Sesión de base de datos
+
+    Returns:
+        List[PlantImageResponse]: Imágenes de la planta
+
+    Raises:
+        HTTPException 404: Si la planta no existe
+    """
+    _ensure_plant(db, plant_id)
+
+    return [_image_response(image) for image in PlantImageService.get_images(db, plant_id)]
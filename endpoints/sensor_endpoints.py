@@ -0,0 +1,204 @@
+from datetime import datetime
+from typing import List, Optional
+import numpy as np
+import orjson
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from sqlalchemy.orm import Session
+from schemas.sensor_reading_schema import (
+    SensorReadingAggregate, SensorReadingIngest, SensorReadingIngestResponse, SensorReadingPoint
+)
+from schemas.sensor_schema import SensorStatusResponse
+from services.sensor_service import SensorService
+from services.sensor_monitor_service import SensorMonitorService
+from services.reading_storage_service import ReadingStorageService
+from services.idempotency_service import IdempotencyKeyMismatch, IdempotencyService, fingerprint
+from endpoints.dependencies import get_db, get_read_db
+from endpoints.timeseries_formats import JSON, columnar_response, negotiate_format
+from endpoints.conditional import etag_matches, make_etag, not_modified
+
+
+router = APIRouter(prefix="/sensors", tags=["sensors"])
+
+
+def _ensure_sensor(db: Session, sensor_id: int) -> None:
+    if not SensorService.get_sensor_by_id(db, sensor_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Sensor no encontrado"
+        )
+
+
+@router.get("/status", response_model=List[SensorStatusResponse])
+def get_sensor_statuses(
+        greenhouse_id: Optional[int] = Query(None, description="Limitar a un invernadero"),
+        flagged_only: bool = Query(True, description="Solo sensores stale, flatline u out_of_range"),
+        limit: int = Query(1000, ge=1, le=10000),
+        db: Session = Depends(get_read_db)
+):
+    """
+    Estado de la flota de sensores según la última pasada del monitor
+
+    El monitor (services.sensor_monitor_service) se ejecuta en segundo plano
+    cada SENSOR_MONITOR_INTERVAL_SECONDS; este endpoint solo lee su resultado.
+
+    Args:
+        greenhouse_id: ID del invernadero (opcional)
+        flagged_only: Si es True, solo los sensores con problemas
+        limit: Número máximo de sensores
+        db: Sesión de base de datos
+
+    Returns:
+        List[SensorStatusResponse]: Sensores con su estado y su última lectura
+    """
+    return SensorMonitorService.get_statuses(db, greenhouse_id, flagged_only, limit)
+
+
+INGEST_SCOPE = "POST /sensors/readings"
+
+
+@router.post("/readings", response_model=SensorReadingIngestResponse)
+def ingest_sensor_readings(
+        batch: SensorReadingIngest,
+        idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255),
+        db: Session = Depends(get_db)
+):
+    """
+    Ingesta de lecturas de varios sensores (pasarelas de campo)
+
+    Las lecturas repetidas (mismo sensor y recorded_at, en el lote o ya
+    guardadas) se descartan, así que reenviar un lote tras un corte es seguro.
+    Con la cabecera Idempotency-Key, un reintento recibe la respuesta original
+    (con Idempotent-Replayed: true) sin volver a procesar el lote.
+    """
+    request_fingerprint = None
+    if idempotency_key:
+        request_fingerprint = fingerprint(orjson.dumps(batch.model_dump(mode="json")))
+        try:
+            stored = IdempotencyService.reserve(db, INGEST_SCOPE, idempotency_key, request_fingerprint)
+        except IdempotencyKeyMismatch as exc:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc))
+        if stored is not None:
+            return Response(
+                content=stored.response_body,
+                status_code=stored.status_code,
+                media_type="application/json",
+                headers={"Idempotent-Replayed": "true"}
+            )
+
+    result = ReadingStorageService.ingest(
+        db, (reading.model_dump() for reading in batch.readings), commit=request_fingerprint is None
+    )
+    body = orjson.dumps(result)
+    if request_fingerprint is not None:
+        IdempotencyService.complete(db, INGEST_SCOPE, idempotency_key, status.HTTP_200_OK, body)
+    return Response(content=body, media_type="application/json")
+
+
+@router.get("/{sensor_id}/readings", response_model=List[SensorReadingPoint])
+def get_sensor_readings(
+        sensor_id: int,
+        request: Request,
+        start: Optional[datetime] = Query(None, description="Inicio del rango (incluido)"),
+        end: Optional[datetime] = Query(None, description="Fin del rango (excluido)"),
+        format: Optional[str] = Query(None, description="json | columnar | msgpack | arrow (prioridad sobre Accept)"),
+        db: Session = Depends(get_read_db)
+):
+    """
+    Obtener las lecturas de un sensor en un rango de fechas
+
+    Las lecturas compactadas en bloques comprimidos se descomprimen de forma
+    transparente junto con las filas sin compactar. Con Accept columnar
+    (ver endpoints.timeseries_formats) la respuesta es
+    {"sensor_id", "t_unit": "ms", "t": [epoch ms...], "v": [valores...]}.
+
+    Responde 304 si If-None-Match coincide con el ETag de la versión del
+    rango (ver ReadingStorageService.range_version), sin leer las lecturas.
+
+    Args:
+        sensor_id: ID del sensor
+        request: Petición (para Accept e If-None-Match)
+        start: Inicio del rango (opcional)
+        end: Fin del rango (opcional)
+        format: Formato de respuesta explícito
+        db: Sesión de base de datos
+
+    Returns:
+        List[SensorReadingPoint]: Lecturas ordenadas por fecha (o su forma columnar)
+
+    Raises:
+        HTTPException 404: Si el sensor no existe
+        HTTPException 406: Si el formato pedido no está disponible
+    """
+    media_type = negotiate_format(request, format)
+    _ensure_sensor(db, sensor_id)
+
+    etag = make_etag(
+        "sensor-readings", sensor_id, start, end, media_type,
+        *ReadingStorageService.range_version(db, sensor_id, start, end)
+    )
+    if etag_matches(request, etag):
+        return not_modified(request, etag, vary="Accept")
+
+    timestamps, values = ReadingStorageService.load_series(db, sensor_id, start, end)
+
+    if media_type != JSON:
+        columnar = columnar_response(
+            {"sensor_id": sensor_id, "t_unit": "ms"},
+            {"t": timestamps.astype("datetime64[ms]").astype(np.int64), "v": values},
+            media_type
+        )
+        columnar.headers["ETag"] = etag
+        return columnar
+
+    # Miles de puntos: orjson directamente en lugar de validar un SensorReadingPoint por lectura
+    return Response(
+        content=orjson.dumps([
+            {"value": value, "sensor_id": sensor_id, "recorded_at": recorded_at}
+            for recorded_at, value in zip(timestamps.tolist(), values.tolist())
+        ]),
+        media_type=JSON,
+        headers={"ETag": etag, "Vary": "Accept"}
+    )
+
+
+@router.get("/{sensor_id}/readings/aggregate", response_model=SensorReadingAggregate)
+def get_sensor_readings_aggregate(
+        sensor_id: int,
+        request: Request,
+        response: Response,
+        start: Optional[datetime] = Query(None, description="Inicio del rango (incluido)"),
+        end: Optional[datetime] = Query(None, description="Fin del rango (excluido)"),
+        db: Session = Depends(get_read_db)
+):
+    """
+    Obtener count/min/max/media de las lecturas de un sensor en un rango
+
+    Usa el mismo ETag por versión del rango que get_sensor_readings.
+
+    Args:
+        sensor_id: ID del sensor
+        request: Petición (para If-None-Match)
+        response: Respuesta (para la cabecera ETag)
+        start: Inicio del rango (opcional)
+        end: Fin del rango (opcional)
+        db: Sesión de base de datos
+
+    Returns:
+        SensorReadingAggregate: Estadísticas del rango
+
+    Raises:
+        HTTPException 404: Si el sensor no existe
+    """
+    _ensure_sensor(db, sensor_id)
+
+    etag = make_etag(
+        "sensor-aggregate", sensor_id, start, end,
+        *ReadingStorageService.range_version(db, sensor_id, start, end)
+    )
+    if etag_matches(request, etag):
+        return not_modified(request, etag)
+
+    stats = ReadingStorageService.aggregate(db, sensor_id, start, end)
+    response.headers["ETag"] = etag
+
+    return {"sensor_id": sensor_id, "start": start, "end": end, **stats}
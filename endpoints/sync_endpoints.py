@@ -0,0 +1,55 @@
+from typing import Optional
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy.orm import Session
+from schemas.sync_schema import SyncResponse
+from services.sync_service import SyncService
+from services.user_service import UserService
+from endpoints.dependencies import get_db
+
+
+router = APIRouter(prefix="/sync", tags=["sync"])
+
+
+@router.get("", response_model=SyncResponse)
+def sync(
+        user_id: int,  # TODO: En producción esto vendrá del token JWT
+        since: Optional[int] = Query(None, ge=0, description="Cursor de la sincronización anterior"),
+        limit: int = Query(1000, ge=1, le=10000, description="Máximo de cambios por respuesta"),
+        # Primario, no réplica: con retraso de réplica el cursor podría avanzar
+        # sobre cambios que la réplica aún no tiene y el cliente no los vería nunca
+        db: Session = Depends(get_db)
+):
+    """
+    Sincronización delta para la app sin conexión
+
+    Sin since devuelve todos los invernaderos, plantas, sensores, análisis
+    recientes y chats del usuario; con since, solo lo creado, modificado o
+    borrado desde ese cursor. Las entidades van en forma columnar y la
+    respuesta se comprime (Brotli/gzip) en CompressionMiddleware.
+
+    Args:
+        user_id: ID del usuario (por ahora query param, luego JWT)
+        since: Cursor devuelto por la sincronización anterior
+        limit: Máximo de entradas del registro de cambios por respuesta
+        db: Sesión de base de datos
+
+    Returns:
+        SyncResponse: Cambios y nuevo cursor (repetir mientras has_more)
+
+    Raises:
+        HTTPException 404: Si el usuario no existe
+    """
+    if not UserService.get_user_by_id(db, user_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Usuario no encontrado"
+        )
+
+    if since is None:
+        payload = SyncService.get_snapshot(db, user_id)
+    else:
+        payload = SyncService.get_changes(db, user_id, since, limit)
+
+    # orjson directamente: miles de filas sin pasar por un modelo Pydantic cada una
+    return Response(content=orjson.dumps(payload), media_type="application/json")
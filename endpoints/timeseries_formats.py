@@ -0,0 +1,152 @@
+"""
+Negociación de contenido para series temporales
+
+Formatos (cabecera Accept, o ?format= para clientes que no la controlan):
+    json      application/json                          formato por defecto de cada endpoint
+    columnar  application/vnd.greenhouse.columnar+json  {"t": [...], "v": [...]} con orjson
+    msgpack   application/x-msgpack                     arrays como bytes crudos (ver _pack_array)
+    arrow     application/vnd.apache.arrow.stream       Arrow IPC stream
+
+Los formatos columnares se serializan directamente desde arrays de NumPy,
+sin crear un objeto Pydantic por lectura. msgpack y pyarrow son opcionales:
+si no están instalados esos formatos responden 406.
+"""
+from typing import Dict, Optional
+
+import numpy as np
+import orjson
+from fastapi import HTTPException, Request, Response, status
+
+JSON = "application/json"
+COLUMNAR_JSON = "application/vnd.greenhouse.columnar+json"
+MSGPACK = "application/x-msgpack"
+ARROW = "application/vnd.apache.arrow.stream"
+
+FORMATS = {
+    "json": JSON,
+    "columnar": COLUMNAR_JSON,
+    "msgpack": MSGPACK,
+    "arrow": ARROW,
+}
+_ALIASES = {
+    "application/msgpack": MSGPACK,
+    "application/vnd.msgpack": MSGPACK,
+    "application/vnd.apache.arrow.file": ARROW,
+}
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - dependencia opcional
+    msgpack = None
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+except ImportError:  # pragma: no cover - dependencia opcional
+    pyarrow = None
+
+
+def negotiate_format(request: Request, format: Optional[str] = None) -> str:
+    """
+    Elige el media type de la respuesta
+
+    Args:
+        request: Petición (se lee la cabecera Accept)
+        format: Valor de ?format=, que tiene prioridad sobre Accept
+
+    Returns:
+        str: Uno de JSON, COLUMNAR_JSON, MSGPACK o ARROW
+
+    Raises:
+        HTTPException 406: Si el formato pedido no existe o no está instalado
+    """
+    if format:
+        media_type = FORMATS.get(format)
+        if media_type is None:
+            raise HTTPException(
+                status_code=status.HTTP_406_NOT_ACCEPTABLE,
+                detail=f"Formato no soportado: {format}"
+            )
+    else:
+        media_type = JSON
+        accepted = []
+        for part in request.headers.get("accept", "").split(","):
+            fields = part.strip().split(";")
+            quality = 1.0
+            for param in fields[1:]:
+                key, _, value = param.strip().partition("=")
+                if key == "q":
+                    try:
+                        quality = float(value)
+                    except ValueError:
+                        quality = 0.0
+            accepted.append((quality, fields[0].strip().lower()))
+        for quality, candidate in sorted(accepted, key=lambda item: -item[0]):
+            candidate = _ALIASES.get(candidate, candidate)
+            if quality > 0 and candidate in FORMATS.values():
+                media_type = candidate
+                break
+
+    if media_type == MSGPACK and msgpack is None or media_type == ARROW and pyarrow is None:
+        raise HTTPException(
+            status_code=status.HTTP_406_NOT_ACCEPTABLE,
+            detail=f"{media_type} no está disponible en este servidor"
+        )
+    return media_type
+
+
+def _pack_array(array: np.ndarray) -> dict:
+    """Array como bytes little-endian + dtype y forma (lectura directa con np.frombuffer en el cliente)"""
+    array = np.ascontiguousarray(array)
+    return {
+        "dtype": array.dtype.newbyteorder("<").str,
+        "shape": list(array.shape),
+        "data": array.astype(array.dtype.newbyteorder("<"), copy=False).tobytes(),
+    }
+
+
+def _arrow_table(meta: dict, columns: Dict[str, np.ndarray]):
+    arrays, names = [], []
+    for name, array in columns.items():
+        if array.ndim == 2:
+            # Matrices (una fila por sensor): una columna por fila, ej. values_0, values_1...
+            for row in range(array.shape[0]):
+                arrays.append(pyarrow.array(array[row]))
+                names.append(f"{name}_{row}")
+        else:
+            arrays.append(pyarrow.array(array))
+            names.append(name)
+    return pyarrow.Table.from_arrays(arrays, names=names, metadata={"meta": orjson.dumps(meta, default=str)})
+
+
+def columnar_response(meta: dict, columns: Dict[str, np.ndarray], media_type: str) -> Response:
+    """
+    Serializa columnas de NumPy en el formato negociado
+
+    Args:
+        meta: Campos escalares (sensor_id, rango, unidades...)
+        columns: Arrays de NumPy (1-D, o 2-D con una fila por sensor)
+        media_type: Resultado de negotiate_format (JSON se trata como columnar)
+
+    Returns:
+        Response: Respuesta con el cuerpo ya serializado
+    """
+    if media_type == MSGPACK:
+        body = msgpack.packb(
+            {**meta, **{name: _pack_array(array) for name, array in columns.items()}},
+            default=str
+        )
+    elif media_type == ARROW:
+        sink = pyarrow.BufferOutputStream()
+        table = _arrow_table(meta, columns)
+        with pyarrow.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        body = sink.getvalue().to_pybytes()
+    else:
+        body = orjson.dumps(
+            {**meta, **{name: np.ascontiguousarray(array) for name, array in columns.items()}},
+            option=orjson.OPT_SERIALIZE_NUMPY
+        )
+        media_type = COLUMNAR_JSON if media_type == COLUMNAR_JSON else JSON
+
+    return Response(content=body, media_type=media_type, headers={"Vary": "Accept"})
@@ -1,18 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 from schemas.user_schema import UserCreate, UserUpdate, UserLogin, UserResponse
 from services.user_service import UserService
-from database_config import SessionLocal
+from services.deletion_service import DeletionService
+from endpoints.dependencies import get_db
 
 router = APIRouter(prefix="/users", tags=["users"])
 
-def get_db():
-    """Dependency para obtener la sesión de base de datos"""
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
 
 @router.post("/", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 def create_user(user: UserCreate, db: Session = Depends(get_db)):
@@ -112,6 +107,45 @@ def update_user(
 
     return updated_user
 
+@router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_user(
+        user_id: int,
+        background_tasks: BackgroundTasks,
+        background: bool = False,
+        db: Session = Depends(get_db)
+):
+    """
+    Eliminar un usuario con sus invernaderos y chats
+
+    Args:
+        user_id: ID del usuario a eliminar
+        background: Si es True, el borrado se hace en segundo plano por lotes
+        db: Sesión de base de datos
+
+    Returns:
+        None (204 No Content), o 202 con el trabajo si background=True
+
+    Raises:
+        HTTPException 404: Si el usuario no existe
+    """
+    # Verificar si el usuario existe
+    if not UserService.get_user_by_id(db, user_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Usuario no encontrado"
+        )
+
+    # Borrado en segundo plano: se consulta en GET /jobs/{job_id}
+    if background:
+        job = DeletionService.create_job(db, "delete_user", user_id)
+        background_tasks.add_task(DeletionService.run_job, job.id)
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content={"job_id": job.id, "status": job.status}
+        )
+
+    UserService.delete_user(db, user_id)
+
 @router.post("/login")
 def authenticate_user(credentials: UserLogin, db: Session = Depends(get_db)):
     """
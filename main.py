@@ -1,29 +1,142 @@
+import asyncio
+import os
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from endpoints.user_endpoints import router as user_router
-
-app = FastAPI(
-    title="Greenhouse API",
-    description="API para gestión de invernaderos",
-    version="1.0.0"
-)
-
-# Configurar CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # En producción, especifica los dominios permitidos
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Incluir routers
-app.include_router(user_router)
-
-@app.get("/")
-def root():
-    return {
-        "message": "Greenhouse API v1.0",
-        "docs": "/docs",
-        "status": "running"
-    }
\ No newline at end of file
+from clients.subsystems import SUBSYSTEMS
+from services.reading_storage_service import STORAGE_MODE
+from monitoring import MetricsMiddleware
+from monitoring.nplusone import NPlusOneMiddleware
+# Mantenimiento de particiones/retención de sensor_readings (ver storage.partitions)
+from storage.partitions import READINGS_PARTITIONING, RETENTION_DAYS
+
+# Programador de riego/ventilación en el proceso de la API (ver control.scheduler).
+# Con varios workers conviene activarlo en uno solo o ejecutarlo aparte
+SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "false").lower() in ("1", "true", "yes")
+# Monitor de sensores caídos o defectuosos (con varios workers, cada uno hace su pasada: es idempotente)
+SENSOR_MONITOR_ENABLED = os.getenv("SENSOR_MONITOR_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# Subsistemas a calentar en segundo plano al arrancar ("none" para desactivar)
+WARMUP_SUBSYSTEMS = os.getenv("WARMUP_SUBSYSTEMS", ",".join(SUBSYSTEMS))
+
+
+def _warmup_names():
+    if WARMUP_SUBSYSTEMS.strip().lower() in ("", "none"):
+        return []
+    return [name.strip() for name in WARMUP_SUBSYSTEMS.split(",") if name.strip() in SUBSYSTEMS]
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # El calentamiento no bloquea el arranque: el worker ya acepta tráfico
+    # (liveness) y /health/ready refleja cuándo terminan de cargar los modelos
+    warmup_tasks = [
+        asyncio.create_task(asyncio.to_thread(SUBSYSTEMS[name].warmup))
+        for name in _warmup_names()
+    ]
+    app.state.warmup_tasks = warmup_tasks
+
+    background_tasks = []
+    if STORAGE_MODE == "compressed":
+        from storage.compact_readings import compaction_loop
+        background_tasks.append(asyncio.create_task(compaction_loop()))
+    if READINGS_PARTITIONING or RETENTION_DAYS:
+        from database_config import engine
+        from storage.partitions import maintenance_loop
+        background_tasks.append(asyncio.create_task(maintenance_loop(engine)))
+    if SCHEDULER_ENABLED:
+        from control.scheduler import scheduler_loop
+        background_tasks.append(asyncio.create_task(scheduler_loop()))
+    if SENSOR_MONITOR_ENABLED:
+        from services.sensor_monitor_service import monitor_loop
+        background_tasks.append(asyncio.create_task(monitor_loop()))
+    from services.idempotency_service import cleanup_loop
+    background_tasks.append(asyncio.create_task(cleanup_loop()))
+    from database_config import replica_set
+    if replica_set.replicas:
+        # Sin este latido ninguna réplica se considera al día y todo se lee del primario
+        background_tasks.append(asyncio.create_task(replica_set.monitor_loop()))
+
+    yield
+    for task in warmup_tasks + background_tasks:
+        task.cancel()
+
+
+def create_app() -> FastAPI:
+    """
+    Construye la aplicación FastAPI
+
+    Los routers solo importan módulos ligeros; torch/transformers, Open-Meteo y
+    pyswip se cargan bajo demanda desde clients.subsystems.
+
+    Returns:
+        FastAPI: Aplicación configurada
+    """
+    from endpoints.user_endpoints import router as user_router
+    from endpoints.greenhouse_endpoints import router as greenhouse_router
+    from endpoints.metrics_endpoints import router as metrics_router
+    from endpoints.health_endpoints import router as health_router
+    from endpoints.analysis_endpoints import router as analysis_router
+    from endpoints.sensor_endpoints import router as sensor_router
+    from endpoints.job_endpoints import router as job_router
+    from endpoints.plant_endpoints import router as plant_router
+    from endpoints.image_endpoints import router as image_router
+    from endpoints.sync_endpoints import router as sync_router
+    from endpoints.admin_endpoints import router as admin_router
+    from endpoints.compression import CompressionMiddleware
+    from endpoints.dependencies import ReadYourWritesMiddleware
+
+    app = FastAPI(
+        title="Greenhouse API",
+        description="API para gestión de invernaderos",
+        version="1.0.0",
+        lifespan=lifespan
+    )
+
+    # Configurar CORS
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],  # En producción, especifica los dominios permitidos
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    # Brotli/gzip para respuestas de más de COMPRESSION_MIN_SIZE bytes
+    app.add_middleware(CompressionMiddleware)
+
+    # Cookie que fija al primario las lecturas de quien acaba de escribir (ver storage.replicas)
+    app.add_middleware(ReadYourWritesMiddleware)
+
+    # Detector de consultas N+1 (solo activo con NPLUSONE_MODE=warn|raise o en tests)
+    app.add_middleware(NPlusOneMiddleware)
+
+    # Métricas de latencia, peticiones en curso y consultas SQL por petición
+    app.add_middleware(MetricsMiddleware)
+
+    # Incluir routers
+    app.include_router(user_router)
+    app.include_router(greenhouse_router)
+    app.include_router(sensor_router)
+    app.include_router(plant_router)
+    app.include_router(image_router)
+    app.include_router(sync_router)
+    app.include_router(job_router)
+    app.include_router(metrics_router)
+    app.include_router(health_router)
+    app.include_router(analysis_router)
+    app.include_router(admin_router)
+
+    @app.get("/")
+    def root():
+        return {
+            "message": "Greenhouse API v1.0",
+            "docs": "/docs",
+            "status": "running"
+        }
+
+    return app
+
+
+app = create_app()
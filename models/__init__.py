@@ -8,9 +8,19 @@ from .greenhouse_model import Greenhouse
 from .plant_model import Plant
 from .sensor_model import Sensor
 from .sensor_reading_model import SensorReading
+from .sensor_reading_chunk_model import SensorReadingChunk
 from .plant_analysis_model import PlantAnalysis
+from .plant_image_model import PlantImage
 from .chat_model import Chat
 from .message_model import Message
+from .background_job_model import BackgroundJob
+from .greenhouse_health_daily_model import GreenhouseHealthDaily
+from .plant_health_label_model import PlantHealthLabel
+from .replication_heartbeat_model import ReplicationHeartbeat
+from .change_log_model import ChangeLog
+from .idempotency_key_model import IdempotencyKey
+from .sensor_state_model import SensorState
+from .sensor_forecast_model import SensorForecastModel
 
 __all__ = [
     'Base',
@@ -19,7 +29,17 @@ __all__ = [
     'Plant',
     'Sensor',
     'SensorReading',
+    'SensorReadingChunk',
     'PlantAnalysis',
+    'PlantImage',
     'Chat',
-    'Message'
+    'Message',
+    'BackgroundJob',
+    'GreenhouseHealthDaily',
+    'PlantHealthLabel',
+    'ReplicationHeartbeat',
+    'ChangeLog',
+    'IdempotencyKey',
+    'SensorState',
+    'SensorForecastModel'
 ]
\ No newline at end of file
@@ -0,0 +1,17 @@
+from datetime import datetime
+from sqlalchemy import Column, DateTime, Integer, String, Text
+from . import Base
+
+
+class BackgroundJob(Base):
+    """Trabajo largo ejecutado fuera de la petición (ej. borrado de un invernadero con años de lecturas)"""
+    __tablename__ = 'background_jobs'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    kind = Column(String, nullable=False)  # delete_greenhouse | delete_user
+    target_id = Column(Integer)
+    status = Column(String, nullable=False, default='pending')  # pending | running | done | failed
+    result = Column(Text)  # JSON con los conteos
+    error = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    finished_at = Column(DateTime)
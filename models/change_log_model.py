@@ -0,0 +1,25 @@
+from datetime import datetime
+from sqlalchemy import Column, DateTime, Index, Integer, String
+from . import Base
+
+
+class ChangeLog(Base):
+    """
+    Registro monótono de altas, cambios y bajas para la sincronización delta
+
+    Una fila por entidad escrita (ver storage.change_tracking). El id es el
+    cursor de GET /sync; user_id es el dueño, sin clave foránea para que los
+    tombstones sobrevivan al borrado de lo que describen.
+    """
+    __tablename__ = 'change_log'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, nullable=False)
+    entity = Column(String, nullable=False)  # greenhouses | plants | sensors | analyses | chats | messages
+    entity_id = Column(Integer, nullable=False)
+    op = Column(String, nullable=False)  # upsert | delete
+    changed_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index('ix_change_log_user_cursor', 'user_id', 'id'),
+    )
@@ -8,11 +8,13 @@ class Chat(Base):
     __tablename__ = 'chats'
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
+    user_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
     name = Column(String, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relaciones
     user = relationship('User', back_populates='chats')
-    messages = relationship('Message', back_populates='chat', cascade='all, delete-orphan')
\ No newline at end of file
+    messages = relationship(
+        'Message', back_populates='chat', cascade='all, delete-orphan', passive_deletes=True
+    )
\ No newline at end of file
@@ -0,0 +1,29 @@
+from datetime import datetime
+from sqlalchemy import Column, Date, DateTime, Float, ForeignKey, Index, Integer, String
+from . import Base
+
+
+class GreenhouseHealthDaily(Base):
+    """
+    Agregado diario de análisis por invernadero y etiqueta
+
+    Se mantiene de forma incremental al escribir análisis (ver
+    HealthSummaryService.record_analyses); nunca se recalcula en lectura.
+    """
+    __tablename__ = 'greenhouse_health_daily'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    greenhouse_id = Column(Integer, ForeignKey('greenhouses.id', ondelete='CASCADE'), nullable=False)
+    day = Column(Date, nullable=False)
+    analysis_type = Column(String, nullable=False)  # health | pest
+    result = Column(String, nullable=False)
+    count = Column(Integer, nullable=False, default=0)
+    confidence_sum = Column(Float, nullable=False, default=0.0)
+    confidence_count = Column(Integer, nullable=False, default=0)  # análisis con confidence
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        Index(
+            'ix_greenhouse_health_daily_key', 'greenhouse_id', 'day', 'analysis_type', 'result', unique=True
+        ),
+    )
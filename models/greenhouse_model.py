@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer, String
 from sqlalchemy.orm import relationship
 from . import Base
 
@@ -10,10 +10,22 @@ class Greenhouse(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     name = Column(String, nullable=False)
     location = Column(String)
-    user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
+    # Coordenadas para el pronóstico de Open-Meteo (opcionales)
+    latitude = Column(Float)
+    longitude = Column(Float)
+    user_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Se incrementa en cada UPDATE del ORM; sirve para los ETags (ver endpoints.conditional)
+    version = Column(Integer, nullable=False, default=1)
+
+    __mapper_args__ = {'version_id_col': version}
 
     # Relaciones
     user = relationship('User', back_populates='greenhouses')
-    plants = relationship('Plant', back_populates='greenhouse', cascade='all, delete-orphan')
-    sensors = relationship('Sensor', back_populates='greenhouse', cascade='all, delete-orphan')
+    plants = relationship(
+        'Plant', back_populates='greenhouse', cascade='all, delete-orphan', passive_deletes=True
+    )
+    sensors = relationship(
+        'Sensor', back_populates='greenhouse', cascade='all, delete-orphan', passive_deletes=True
+    )
@@ -0,0 +1,21 @@
+from datetime import datetime
+from sqlalchemy import Column, DateTime, Integer, LargeBinary, String
+from . import Base
+
+
+class IdempotencyKey(Base):
+    """
+    Respuesta guardada de una petición con cabecera Idempotency-Key
+
+    Se inserta en la misma transacción que la escritura que protege: un
+    reintento con la misma clave recibe la respuesta original sin repetirla.
+    """
+    __tablename__ = 'idempotency_keys'
+
+    scope = Column(String, primary_key=True)  # ej. "POST /sensors/readings"
+    key = Column(String, primary_key=True)
+    fingerprint = Column(String, nullable=False)  # sha256 del cuerpo de la petición
+    status_code = Column(Integer)
+    response_body = Column(LargeBinary)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False, index=True)
@@ -8,7 +8,7 @@ class Message(Base):
     __tablename__ = 'messages'
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    chat_id = Column(Integer, ForeignKey('chats.id'), nullable=False)
+    chat_id = Column(Integer, ForeignKey('chats.id', ondelete='CASCADE'), nullable=False)
     author = Column(String, nullable=False)  # user | gemini
     message = Column(Text, nullable=False)
     sent_at = Column(DateTime, default=datetime.utcnow)
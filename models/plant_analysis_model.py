@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer, String
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import relationship
 from . import Base
 
@@ -8,11 +8,23 @@ class PlantAnalysis(Base):
     __tablename__ = 'plants_analysis'
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    plant_id = Column(Integer, ForeignKey('plants.id'), nullable=False)
+    plant_id = Column(Integer, ForeignKey('plants.id', ondelete='CASCADE'), nullable=False)
     analysis_type = Column(String, nullable=False)  # health | pest
     result = Column(String, nullable=False)
     confidence = Column(Float)  # 0-1
     analyzed_at = Column(DateTime, default=datetime.utcnow)
+    # Modelo que produjo el resultado (ej. nombre@commit); None en análisis anteriores
+    model_version = Column(String)
+    # Imagen analizada, relativa a IMAGE_STORE_DIR (permite re-analizar al cambiar de modelo)
+    image_path = Column(String)
+
+    __table_args__ = (
+        # Un resultado por imagen y versión del modelo (NULL no choca: análisis sin imagen o
+        # anteriores a model_version); también sirve al recorrido por (plant_id, image_path)
+        Index('ix_plants_analysis_plant_image', 'plant_id', 'image_path', 'model_version', unique=True),
+        # Historial de una planta por fecha (lista de análisis, re-agregados)
+        Index('ix_plants_analysis_plant_analyzed', 'plant_id', 'analyzed_at'),
+    )
 
     # Relaciones
     plant = relationship('Plant', back_populates='analyses')
\ No newline at end of file
@@ -0,0 +1,27 @@
+from datetime import datetime
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Index, Integer, String
+from . import Base
+
+
+class PlantHealthLabel(Base):
+    """
+    Resumen por planta y etiqueta: cuántas veces, primera y última detección
+
+    Mantenido de forma incremental junto con GreenhouseHealthDaily.
+    """
+    __tablename__ = 'plant_health_labels'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    plant_id = Column(Integer, ForeignKey('plants.id', ondelete='CASCADE'), nullable=False)
+    greenhouse_id = Column(Integer, ForeignKey('greenhouses.id', ondelete='CASCADE'), nullable=False, index=True)
+    analysis_type = Column(String, nullable=False)
+    result = Column(String, nullable=False)
+    count = Column(Integer, nullable=False, default=0)
+    first_seen_at = Column(DateTime, nullable=False)
+    last_seen_at = Column(DateTime, nullable=False)
+    last_confidence = Column(Float)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        Index('ix_plant_health_labels_key', 'plant_id', 'analysis_type', 'result', unique=True),
+    )
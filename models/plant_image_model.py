@@ -0,0 +1,27 @@
+from datetime import datetime
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String
+from sqlalchemy.orm import relationship
+from . import Base
+
+
+class PlantImage(Base):
+    """Imagen subida de una planta; el fichero vive en storage.image_store bajo su sha256"""
+    __tablename__ = 'plant_images'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    plant_id = Column(Integer, ForeignKey('plants.id', ondelete='CASCADE'), nullable=False)
+    sha256 = Column(String(64), nullable=False, index=True)
+    content_type = Column(String, nullable=False)
+    extension = Column(String, nullable=False)
+    width = Column(Integer, nullable=False)
+    height = Column(Integer, nullable=False)
+    size_bytes = Column(Integer, nullable=False)
+    uploaded_at = Column(DateTime, default=datetime.utcnow)
+
+    # La misma foto subida dos veces a una planta es una sola fila
+    __table_args__ = (
+        Index('ix_plant_images_plant_sha256', 'plant_id', 'sha256', unique=True),
+    )
+
+    # Relaciones
+    plant = relationship('Plant', back_populates='images')
@@ -10,9 +10,19 @@ class Plant(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     name = Column(String, nullable=False)
     type = Column(String, nullable=False)
-    greenhouse_id = Column(Integer, ForeignKey('greenhouses.id'), nullable=False)
+    greenhouse_id = Column(Integer, ForeignKey('greenhouses.id', ondelete='CASCADE'), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Se incrementa en cada UPDATE del ORM; sirve para los ETags (ver endpoints.conditional)
+    version = Column(Integer, nullable=False, default=1)
+
+    __mapper_args__ = {'version_id_col': version}
 
     # Relaciones
     greenhouse = relationship('Greenhouse', back_populates='plants')
-    analyses = relationship('PlantAnalysis', back_populates='plant', cascade='all, delete-orphan')
\ No newline at end of file
+    analyses = relationship(
+        'PlantAnalysis', back_populates='plant', cascade='all, delete-orphan', passive_deletes=True
+    )
+    images = relationship(
+        'PlantImage', back_populates='plant', cascade='all, delete-orphan', passive_deletes=True
+    )
\ No newline at end of file
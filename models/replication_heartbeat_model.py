@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Float, Integer
+from . import Base
+
+
+class ReplicationHeartbeat(Base):
+    """
+    Latido que se escribe en el primario y se lee en las réplicas
+
+    La diferencia entre el reloj y el beat_at que ve una réplica es su
+    retraso de replicación (ver storage.replicas).
+    """
+    __tablename__ = 'replication_heartbeat'
+
+    id = Column(Integer, primary_key=True)
+    beat_at = Column(Float, nullable=False)  # epoch en segundos
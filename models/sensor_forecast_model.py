@@ -0,0 +1,29 @@
+from datetime import datetime
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, LargeBinary
+from sqlalchemy.orm import relationship
+from . import Base
+
+
+class SensorForecastModel(Base):
+    """
+    Modelo de pronóstico (regresión ridge) de un sensor
+
+    Se guardan los estadísticos suficientes (X'X y X'y por horizonte) además
+    de los coeficientes: al llegar lecturas nuevas solo se suman las filas de
+    las horas nuevas y se vuelve a resolver, sin reentrenar con el histórico
+    (ver ForecastService). Los arrays son float64 en bytes (np.frombuffer).
+    """
+    __tablename__ = 'sensor_forecast_models'
+
+    sensor_id = Column(Integer, ForeignKey('sensors.id', ondelete='CASCADE'), primary_key=True)
+    # Cambia si cambian las variables del modelo: los estadísticos guardados dejan de valer
+    feature_version = Column(Integer, nullable=False)
+    # Última hora objetivo incluida en los estadísticos (inicio de la hora, UTC)
+    trained_until = Column(DateTime, nullable=False)
+    xtx = Column(LargeBinary, nullable=False)  # (H, p, p)
+    xty = Column(LargeBinary, nullable=False)  # (H, p)
+    samples = Column(LargeBinary, nullable=False)  # (H,) filas acumuladas (con olvido)
+    coefficients = Column(LargeBinary, nullable=False)  # (H, p)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    sensor = relationship('Sensor', back_populates='forecast_model')
@@ -8,12 +8,31 @@ class Sensor(Base):
     __tablename__ = 'sensors'
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    greenhouse_id = Column(Integer, ForeignKey('greenhouses.id'), nullable=False)
+    greenhouse_id = Column(Integer, ForeignKey('greenhouses.id', ondelete='CASCADE'), nullable=False)
     name = Column(String, nullable=False)  # Ej. Sensor de temperatura 1
     type = Column(String, nullable=False)  # temperature | humidity | light | soil_moisture
     active = Column(Boolean, default=True)
     installed_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Se incrementa en cada UPDATE del ORM; sirve para los ETags (ver endpoints.conditional)
+    version = Column(Integer, nullable=False, default=1)
+
+    __mapper_args__ = {'version_id_col': version}
 
     # Relaciones
     greenhouse = relationship('Greenhouse', back_populates='sensors')
-    readings = relationship('SensorReading', back_populates='sensor', cascade='all, delete-orphan')
\ No newline at end of file
+    # passive_deletes: las lecturas se borran en la base de datos (ON DELETE CASCADE),
+    # sin cargarlas en memoria
+    readings = relationship(
+        'SensorReading', back_populates='sensor', cascade='all, delete-orphan', passive_deletes=True
+    )
+    chunks = relationship(
+        'SensorReadingChunk', back_populates='sensor', cascade='all, delete-orphan', passive_deletes=True
+    )
+    state = relationship(
+        'SensorState', back_populates='sensor', uselist=False, cascade='all, delete-orphan', passive_deletes=True
+    )
+    forecast_model = relationship(
+        'SensorForecastModel', back_populates='sensor', uselist=False, cascade='all, delete-orphan',
+        passive_deletes=True
+    )
@@ -0,0 +1,29 @@
+from datetime import datetime
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Index, Integer, LargeBinary
+from sqlalchemy.orm import relationship
+from . import Base
+
+
+class SensorReadingChunk(Base):
+    """Bloque comprimido con las lecturas de un sensor en un periodo cerrado (ej. un día)"""
+    __tablename__ = 'sensor_reading_chunks'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    sensor_id = Column(Integer, ForeignKey('sensors.id', ondelete='CASCADE'), nullable=False)
+    start_at = Column(DateTime, nullable=False)  # inicio del periodo (incluido)
+    end_at = Column(DateTime, nullable=False)  # fin del periodo (excluido)
+    count = Column(Integer, nullable=False)
+    timestamps = Column(LargeBinary, nullable=False)  # delta-of-delta, ver storage.timeseries_codec
+    values = Column(LargeBinary, nullable=False)  # XOR de floats
+    # Estadísticas para agregar sin descomprimir
+    min_value = Column(Float)
+    max_value = Column(Float)
+    sum_value = Column(Float)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index('ix_sensor_reading_chunks_sensor_start', 'sensor_id', 'start_at', unique=True),
+    )
+
+    # Relaciones
+    sensor = relationship('Sensor', back_populates='chunks')
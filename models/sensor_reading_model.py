@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Index, Integer
 from sqlalchemy.orm import relationship
 from . import Base
 
@@ -8,9 +8,15 @@ class SensorReading(Base):
     __tablename__ = 'sensor_readings'
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    sensor_id = Column(Integer, ForeignKey('sensors.id'), nullable=False)
+    sensor_id = Column(Integer, ForeignKey('sensors.id', ondelete='CASCADE'), nullable=False)
     value = Column(Float, nullable=False)
     recorded_at = Column(DateTime, default=datetime.utcnow, index=True)
 
+    # En Postgres la tabla puede estar particionada por recorded_at (ver storage.partitions).
+    # Único: los reintentos de las pasarelas se descartan con ON CONFLICT DO NOTHING
+    __table_args__ = (
+        Index('ix_sensor_readings_sensor_recorded', 'sensor_id', 'recorded_at', unique=True),
+    )
+
     # Relaciones
     sensor = relationship('Sensor', back_populates='readings')
\ No newline at end of file
@@ -0,0 +1,31 @@
+from datetime import datetime
+from sqlalchemy import Boolean, Column, DateTime, Float, ForeignKey, Integer, String
+from sqlalchemy.orm import relationship
+from . import Base
+
+
+class SensorState(Base):
+    """
+    Última lectura, cadencia y estado de salud de cada sensor
+
+    Las columnas de lectura se mantienen al ingerir (ver
+    SensorMonitorService.record_readings) y las de estado las escribe el
+    monitor de la flota; así el monitor no recorre sensor_readings.
+    """
+    __tablename__ = 'sensor_states'
+
+    sensor_id = Column(Integer, ForeignKey('sensors.id', ondelete='CASCADE'), primary_key=True)
+    last_recorded_at = Column(DateTime, nullable=True)
+    last_value = Column(Float, nullable=True)
+    # Media móvil exponencial del intervalo entre lecturas
+    cadence_seconds = Column(Float, nullable=True)
+    # Primera lectura de la racha actual de valores iguales (para detectar valores congelados)
+    value_changed_at = Column(DateTime, nullable=True)
+    reading_count = Column(Integer, nullable=False, default=0)
+
+    status = Column(String(20), nullable=False, default='ok', index=True)  # ok | stale | flatline | out_of_range | inactive
+    status_since = Column(DateTime, default=datetime.utcnow)
+    # El monitor desactivó el sensor y lo reactivará cuando vuelva a reportar
+    deactivated_by_monitor = Column(Boolean, nullable=False, default=False)
+
+    sensor = relationship('Sensor', back_populates='state')
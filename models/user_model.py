@@ -12,5 +12,9 @@ class User(Base):
     password = Column(String, nullable=False)
 
     # Relaciones
-    greenhouses = relationship('Greenhouse', back_populates='user', cascade='all, delete-orphan')
-    chats = relationship('Chat', back_populates='user', cascade='all, delete-orphan')
\ No newline at end of file
+    greenhouses = relationship(
+        'Greenhouse', back_populates='user', cascade='all, delete-orphan', passive_deletes=True
+    )
+    chats = relationship(
+        'Chat', back_populates='user', cascade='all, delete-orphan', passive_deletes=True
+    )
\ No newline at end of file
@@ -0,0 +1,17 @@
+from .metrics import registry
+from .middleware import MetricsMiddleware
+from .db_instrumentation import instrument_engine
+from .nplusone import NPlusOneError, NPlusOneMiddleware, assert_no_nplusone
+from .request_context import get_request_stats, track_external_request, track_model_inference
+
+__all__ = [
+    'registry',
+    'MetricsMiddleware',
+    'instrument_engine',
+    'NPlusOneError',
+    'NPlusOneMiddleware',
+    'assert_no_nplusone',
+    'get_request_stats',
+    'track_external_request',
+    'track_model_inference',
+]
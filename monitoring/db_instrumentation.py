@@ -0,0 +1,35 @@
+import time
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .metrics import DB_QUERY_DURATION
+from .request_context import get_request_stats
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start_times = conn.info.get("query_start_time")
+    if not start_times:
+        return
+    elapsed = time.perf_counter() - start_times.pop()
+
+    DB_QUERY_DURATION.observe(elapsed)
+    stats = get_request_stats()
+    if stats is not None:
+        stats.add_query(statement, elapsed)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """
+    Registra los eventos de SQLAlchemy que cuentan y miden las sentencias SQL
+
+    Args:
+        engine: Engine a instrumentar
+    """
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
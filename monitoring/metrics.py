@@ -0,0 +1,259 @@
+import threading
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Buckets por defecto (segundos), similares a los de prometheus_client
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(label_names: Tuple[str, ...], label_values: Tuple[str, ...], extra: str = "") -> str:
+    """Formatea las etiquetas en la sintaxis de Prometheus"""
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(label_names, label_values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    metric_type = "untyped"
+
+    def __init__(self, name: str, documentation: str, label_names: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.metric_type}",
+        ]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """Contador monotónico con etiquetas"""
+    metric_type = "counter"
+
+    def __init__(self, name: str, documentation: str, label_names: Iterable[str] = ()):
+        super().__init__(name, documentation, label_names)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}"
+            for key, value in items
+        ]
+
+
+class Gauge(_Metric):
+    """Valor que puede subir y bajar (ej. peticiones en curso)"""
+    metric_type = "gauge"
+
+    def __init__(self, name: str, documentation: str, label_names: Iterable[str] = ()):
+        super().__init__(name, documentation, label_names)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        if not items and not self.label_names:
+            items = [((), 0.0)]
+        return [
+            f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}"
+            for key, value in items
+        ]
+
+
+class Histogram(_Metric):
+    """Histograma acumulativo con buckets fijos"""
+    metric_type = "histogram"
+
+    def __init__(
+            self,
+            name: str,
+            documentation: str,
+            label_names: Iterable[str] = (),
+            buckets: Iterable[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        # key -> [conteo por bucket..., suma, total]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            data = self._values.get(key)
+            if data is None:
+                data = [0.0] * (len(self.buckets) + 2)
+                self._values[key] = data
+            data[index] += 1
+            data[-2] += value
+            data[-1] += 1
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = [(key, list(data)) for key, data in self._values.items()]
+
+        lines = []
+        for key, data in items:
+            cumulative = 0.0
+            for bound, count in zip(self.buckets, data):
+                cumulative += count
+                labels = _format_labels(self.label_names, key, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{labels} {_format_value(cumulative)}")
+            labels = _format_labels(self.label_names, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(data[-2])}")
+            lines.append(f"{self.name}_count{labels} {_format_value(data[-1])}")
+        return lines
+
+
+class MetricsRegistry:
+    """Registro de métricas del proceso, exportable en formato texto de Prometheus"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, label_names: Iterable[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, label_names))
+
+    def gauge(self, name: str, documentation: str, label_names: Iterable[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, label_names))
+
+    def histogram(
+            self,
+            name: str,
+            documentation: str,
+            label_names: Iterable[str] = (),
+            buckets: Optional[Iterable[float]] = None
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, label_names, buckets or DEFAULT_BUCKETS))
+
+    def render(self) -> str:
+        """
+        Genera la exposición completa en formato texto de Prometheus (v0.0.4)
+
+        Returns:
+            str: Texto listo para servir en /metrics
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+registry = MetricsRegistry()
+
+# Métricas HTTP
+HTTP_REQUESTS_TOTAL = registry.counter(
+    "http_requests_total", "Total de peticiones HTTP", ("method", "route", "status")
+)
+HTTP_REQUEST_DURATION = registry.histogram(
+    "http_request_duration_seconds", "Latencia de peticiones HTTP por ruta", ("method", "route")
+)
+HTTP_REQUESTS_IN_FLIGHT = registry.gauge(
+    "http_requests_in_flight", "Peticiones HTTP en curso"
+)
+
+# Métricas de base de datos
+DB_QUERY_DURATION = registry.histogram(
+    "db_query_duration_seconds", "Duración de cada sentencia SQL",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+)
+DB_QUERIES_PER_REQUEST = registry.histogram(
+    "db_queries_per_request", "Sentencias SQL ejecutadas por petición", ("route",),
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 250)
+)
+DB_TIME_PER_REQUEST = registry.histogram(
+    "db_time_per_request_seconds", "Tiempo total en base de datos por petición", ("route",)
+)
+DB_REPLICA_LAG = registry.gauge(
+    "db_replica_lag_seconds", "Retraso de replicación medido con el latido (-1 si no responde)", ("replica",)
+)
+DB_READ_ROUTING_TOTAL = registry.counter(
+    "db_read_routing_total", "Sesiones de lectura por destino y motivo", ("target", "reason")
+)
+
+# Métricas de dependencias externas
+MODEL_INFERENCE_DURATION = registry.histogram(
+    "model_inference_duration_seconds", "Duración de la inferencia del modelo", ("model",)
+)
+EXTERNAL_REQUEST_DURATION = registry.histogram(
+    "external_request_duration_seconds", "Duración de llamadas a servicios externos", ("service",)
+)
+
+# Métricas del programador de riego/clima (ver control.scheduler)
+SCHEDULER_TICK_DURATION = registry.histogram(
+    "scheduler_tick_duration_seconds", "Duración de cada tick del programador por fase", ("phase",),
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+)
+SCHEDULER_GREENHOUSES = registry.gauge(
+    "scheduler_greenhouses", "Invernaderos evaluados en el último tick"
+)
+SCHEDULER_ACTIONS_TOTAL = registry.counter(
+    "scheduler_actions_total", "Acciones emitidas por el programador", ("action",)
+)
+SCHEDULER_ERRORS_TOTAL = registry.counter(
+    "scheduler_errors_total", "Errores del programador por fase", ("phase",)
+)
+
+# Métricas del monitor de la flota de sensores (ver services.sensor_monitor_service)
+SENSOR_FLEET_STATUS = registry.gauge(
+    "sensor_fleet_status", "Sensores por estado en la última pasada del monitor", ("status",)
+)
+SENSOR_MONITOR_DURATION = registry.histogram(
+    "sensor_monitor_duration_seconds", "Duración de cada pasada del monitor de sensores",
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+)
+SENSOR_ACTIVE_CHANGES_TOTAL = registry.counter(
+    "sensor_active_changes_total", "Sensores desactivados o reactivados por el monitor", ("change",)
+)
@@ -0,0 +1,61 @@
+import time
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .metrics import (
+    DB_QUERIES_PER_REQUEST,
+    DB_TIME_PER_REQUEST,
+    HTTP_REQUEST_DURATION,
+    HTTP_REQUESTS_IN_FLIGHT,
+    HTTP_REQUESTS_TOTAL,
+)
+from .request_context import request_scope
+from .slow_requests import slow_requests
+
+
+def _route_template(scope: Scope) -> str:
+    """Usa la plantilla de la ruta (ej. /greenhouses/{greenhouse_id}) para no disparar la cardinalidad"""
+    route = scope.get("route")
+    if route is not None and getattr(route, "path", None):
+        return route.path
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI que registra latencia por ruta, peticiones en curso y
+    número/tiempo de consultas SQL por petición; las peticiones lentas se
+    guardan con su desglose en slow_requests
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        with request_scope() as stats:
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                elapsed = time.perf_counter() - start
+                HTTP_REQUESTS_IN_FLIGHT.dec()
+
+                route = _route_template(scope)
+                method = scope["method"]
+                HTTP_REQUESTS_TOTAL.inc(method=method, route=route, status=str(status_code))
+                HTTP_REQUEST_DURATION.observe(elapsed, method=method, route=route)
+                DB_QUERIES_PER_REQUEST.observe(stats.query_count, route=route)
+                DB_TIME_PER_REQUEST.observe(stats.query_time, route=route)
+                slow_requests.record(method, scope["path"], route, status_code, elapsed, stats)
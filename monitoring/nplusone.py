@@ -0,0 +1,202 @@
+import logging
+import os
+import re
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, Optional, Set
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import RelationshipProperty, Session
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+# off | warn | raise  (NPLUSONE_MODE en el entorno; los tests lo activan con el fixture)
+_mode = os.getenv("NPLUSONE_MODE", "off").lower()
+# Número de veces que una sentencia/relación puede repetirse antes de considerarse N+1
+DEFAULT_THRESHOLD = int(os.getenv("NPLUSONE_THRESHOLD", "2"))
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+class NPlusOneError(AssertionError):
+    """Se lanzó una consulta N+1 dentro de un ámbito vigilado"""
+
+
+@dataclass
+class Violation:
+    """Sentencia repetida con parámetros distintos dentro de una misma petición"""
+    statement: str
+    count: int
+    relationship: Optional[str] = None
+
+    def describe(self) -> str:
+        if self.relationship:
+            return (
+                f"Relación {self.relationship} cargada de forma perezosa {self.count} veces "
+                f"(usa selectinload/joinedload). SQL: {self.statement}"
+            )
+        return f"Sentencia repetida {self.count} veces con distintos parámetros. SQL: {self.statement}"
+
+
+@dataclass
+class QueryLog:
+    """Sentencias emitidas dentro de un ámbito (normalmente una petición)"""
+    statement_count: int = 0
+    # sentencia normalizada -> conjuntos de parámetros distintos
+    parameters: Dict[str, Set[str]] = field(default_factory=lambda: defaultdict(set))
+    # sentencia normalizada -> relación que la originó (carga perezosa)
+    relationships: Dict[str, str] = field(default_factory=dict)
+    # relación pendiente de asociar a la siguiente sentencia SQL
+    pending_relationship: Optional[str] = None
+
+    def violations(self, threshold: int = DEFAULT_THRESHOLD) -> List[Violation]:
+        found = []
+        for statement, params in self.parameters.items():
+            if len(params) >= threshold:
+                found.append(Violation(statement, len(params), self.relationships.get(statement)))
+        # Las cargas perezosas primero: son las que indican la relación culpable
+        found.sort(key=lambda v: (v.relationship is None, -v.count))
+        return found
+
+
+_current_log: ContextVar[Optional[QueryLog]] = ContextVar("nplusone_log", default=None)
+
+
+def _normalize(statement: str) -> str:
+    return _WHITESPACE.sub(" ", statement).strip()
+
+
+def _on_orm_execute(orm_execute_state) -> None:
+    log = _current_log.get()
+    if log is None or not orm_execute_state.is_relationship_load:
+        return
+    if orm_execute_state.lazy_loaded_from is None:
+        return  # selectinload/subqueryload: una sola sentencia para todos los padres
+
+    path = orm_execute_state.loader_strategy_path
+    prop = path.path[-1] if path is not None and path.path else None
+    if isinstance(prop, RelationshipProperty):
+        log.pending_relationship = str(prop)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    log = _current_log.get()
+    if log is None or executemany:
+        return
+    normalized = _normalize(statement)
+    log.statement_count += 1
+    log.parameters[normalized].add(repr(parameters))
+    if log.pending_relationship is not None:
+        log.relationships.setdefault(normalized, log.pending_relationship)
+        log.pending_relationship = None
+
+
+def install(engine: Engine) -> None:
+    """
+    Registra los eventos del detector en el engine y en todas las sesiones
+
+    Args:
+        engine: Engine cuyas sentencias se van a contar
+    """
+    if not event.contains(Session, "do_orm_execute", _on_orm_execute):
+        event.listen(Session, "do_orm_execute", _on_orm_execute)
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+
+
+def get_mode() -> str:
+    return _mode
+
+
+def set_mode(mode: str) -> str:
+    """
+    Cambia el modo del detector (off | warn | raise)
+
+    Returns:
+        str: Modo anterior, para poder restaurarlo
+    """
+    global _mode
+    if mode not in ("off", "warn", "raise"):
+        raise ValueError(f"Modo de detección N+1 inválido: {mode}")
+    previous, _mode = _mode, mode
+    return previous
+
+
+@contextmanager
+def query_log() -> Iterator[QueryLog]:
+    """Cuenta las sentencias emitidas dentro del bloque"""
+    log = QueryLog()
+    token = _current_log.set(log)
+    try:
+        yield log
+    finally:
+        _current_log.reset(token)
+
+
+@contextmanager
+def assert_no_nplusone(threshold: int = DEFAULT_THRESHOLD, label: str = "") -> Iterator[QueryLog]:
+    """
+    Falla con NPlusOneError si dentro del bloque se repite una sentencia N+1
+
+    Args:
+        threshold: Repeticiones con parámetros distintos a partir de las cuales se falla
+        label: Texto para identificar el ámbito en el mensaje (ej. "GET /greenhouses/{greenhouse_id}")
+    """
+    with query_log() as log:
+        yield log
+    violations = log.violations(threshold)
+    if violations:
+        header = f"N+1 detectado en {label}" if label else "N+1 detectado"
+        raise NPlusOneError(header + ":\n" + "\n".join(f"  - {v.describe()}" for v in violations))
+
+
+# Receptores de violaciones (los usa el fixture de pytest para fallar el test)
+_reporters: List[Callable[[str, List[Violation]], None]] = []
+
+
+def add_reporter(reporter: Callable[[str, List[Violation]], None]) -> None:
+    _reporters.append(reporter)
+
+
+def remove_reporter(reporter: Callable[[str, List[Violation]], None]) -> None:
+    if reporter in _reporters:
+        _reporters.remove(reporter)
+
+
+class NPlusOneMiddleware:
+    """
+    Middleware de depuración: cuenta las sentencias SQL de cada petición y
+    avisa (o falla) cuando detecta consultas N+1
+
+    Con NPLUSONE_MODE=off no añade coste más allá de una comparación.
+    """
+
+    def __init__(self, app: ASGIApp, threshold: int = DEFAULT_THRESHOLD):
+        self.app = app
+        self.threshold = threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or _mode == "off":
+            await self.app(scope, receive, send)
+            return
+
+        with query_log() as log:
+            await self.app(scope, receive, send)
+
+        violations = log.violations(self.threshold)
+        if not violations:
+            return
+
+        route = scope.get("route")
+        label = f"{scope['method']} {getattr(route, 'path', scope['path'])}"
+        for reporter in list(_reporters):
+            reporter(label, violations)
+
+        message = f"N+1 detectado en {label}:\n" + "\n".join(f"  - {v.describe()}" for v in violations)
+        if _mode == "raise" and not _reporters:
+            raise NPlusOneError(message)
+        logger.warning(message)
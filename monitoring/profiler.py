@@ -0,0 +1,102 @@
+"""
+Profiler por muestreo para procesos en producción
+
+Cada interval segundos se capturan las pilas de todos los hilos del proceso
+(sys._current_frames) y se cuentan; el resultado está en formato de pilas
+colapsadas ("marco;marco;marco N"), que leen flamegraph.pl, speedscope o
+inferno. A diferencia de cProfile, ve los hilos del threadpool donde corren
+los endpoints síncronos y no añade coste a las llamadas de función: solo
+cuesta mientras está activo.
+
+Las corrutinas suspendidas no aparecen (no están en ninguna pila); el hilo
+del bucle de eventos sí, mientras ejecuta código.
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Iterable, Tuple
+
+# Pilas cuyo marco superior está en estos módulos son hilos esperando trabajo
+_IDLE_FILES = ("threading.py", "selectors.py", "queue.py")
+MAX_STACK_DEPTH = 128
+
+
+class ProfilerBusy(RuntimeError):
+    """Ya hay un perfil en curso en este proceso"""
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _collapse(frame, thread_name: str) -> Tuple[str, bool]:
+    """Pila de un hilo como 'hilo;raíz;...;hoja' y si el hilo está ocioso"""
+    idle = os.path.basename(frame.f_code.co_filename) in _IDLE_FILES
+    labels = []
+    while frame is not None and len(labels) < MAX_STACK_DEPTH:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.append(thread_name)
+    return ";".join(reversed(labels)).replace("\n", " "), idle
+
+
+class SamplingProfiler:
+    """Un perfil a la vez por proceso"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    def profile(
+            self,
+            seconds: float,
+            interval: float = 0.005,
+            include_idle: bool = False,
+            exclude_threads: Iterable[int] = ()
+    ) -> Tuple[str, int]:
+        """
+        Muestrea las pilas del proceso durante seconds (bloquea el hilo que llama)
+
+        Args:
+            seconds: Duración del perfil
+            interval: Segundos entre muestras
+            include_idle: Incluir hilos esperando en colas, locks o select()
+            exclude_threads: Idents de hilos a ignorar (además del que muestrea)
+
+        Returns:
+            tuple: (pilas colapsadas, número de muestras)
+
+        Raises:
+            ProfilerBusy: Si ya hay un perfil en curso
+        """
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusy("Ya hay un perfil en curso en este proceso")
+        try:
+            skip = {threading.get_ident(), *exclude_threads}
+            stacks: Counter = Counter()
+            samples = 0
+            deadline = time.perf_counter() + seconds
+            while time.perf_counter() < deadline:
+                names = {thread.ident: thread.name for thread in threading.enumerate()}
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id in skip:
+                        continue
+                    stack, idle = _collapse(frame, names.get(thread_id, f"thread-{thread_id}"))
+                    if include_idle or not idle:
+                        stacks[stack] += 1
+                samples += 1
+                time.sleep(interval)
+        finally:
+            self._lock.release()
+
+        collapsed = "\n".join(f"{stack} {count}" for stack, count in stacks.most_common())
+        return collapsed + ("\n" if collapsed else ""), samples
+
+
+profiler = SamplingProfiler()
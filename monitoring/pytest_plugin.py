@@ -0,0 +1,34 @@
+"""
+Plugin de pytest que hace fallar cualquier test que provoque consultas N+1
+
+Uso (en el conftest.py de los tests):
+
+    pytest_plugins = ["monitoring.pytest_plugin"]
+
+Todas las peticiones hechas con TestClient durante el test pasan por
+NPlusOneMiddleware; si alguna repite una carga perezosa, el test falla con
+el nombre de la relación culpable (ej. Greenhouse.plants).
+"""
+import pytest
+
+from . import nplusone
+
+
+@pytest.fixture(autouse=True)
+def nplusone_guard():
+    """Activa el detector N+1 durante el test y falla al terminar si hubo violaciones"""
+    found = []
+
+    def reporter(label, violations):
+        found.extend(f"{label}: {v.describe()}" for v in violations)
+
+    previous = nplusone.set_mode("raise")
+    nplusone.add_reporter(reporter)
+    try:
+        yield found
+    finally:
+        nplusone.remove_reporter(reporter)
+        nplusone.set_mode(previous)
+
+    if found:
+        pytest.fail("Consultas N+1 detectadas:\n" + "\n".join(f"  - {item}" for item in found))
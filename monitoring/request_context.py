@@ -0,0 +1,83 @@
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .metrics import EXTERNAL_REQUEST_DURATION, MODEL_INFERENCE_DURATION
+
+# Sentencias SQL que se guardan por petición para el registro de peticiones lentas
+MAX_STATEMENTS_PER_REQUEST = int(os.getenv("SLOW_REQUEST_MAX_STATEMENTS", "50"))
+
+
+@dataclass
+class RequestStats:
+    """Estadísticas acumuladas durante una petición HTTP"""
+    query_count: int = 0
+    query_time: float = 0.0
+    # Tiempo acumulado por dependencia externa (ej. "model:mobilenet", "weather:open-meteo")
+    external_time: Dict[str, float] = field(default_factory=dict)
+    # (sentencia, segundos) de las primeras MAX_STATEMENTS_PER_REQUEST sentencias
+    statements: List[Tuple[str, float]] = field(default_factory=list)
+
+    def add_query(self, statement: str, elapsed: float) -> None:
+        self.query_count += 1
+        self.query_time += elapsed
+        if len(self.statements) < MAX_STATEMENTS_PER_REQUEST:
+            self.statements.append((statement, elapsed))
+
+    def add_external(self, name: str, elapsed: float) -> None:
+        self.external_time[name] = self.external_time.get(name, 0.0) + elapsed
+
+
+_current_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def get_request_stats() -> Optional[RequestStats]:
+    """Devuelve las estadísticas de la petición actual, o None fuera de una petición"""
+    return _current_stats.get()
+
+
+@contextmanager
+def request_scope() -> Iterator[RequestStats]:
+    """
+    Abre un ámbito de estadísticas para una petición
+
+    El objeto es mutable, así que los hilos del threadpool de FastAPI (que copian
+    el contexto) acumulan sobre la misma instancia.
+    """
+    stats = RequestStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+@contextmanager
+def track_model_inference(model: str) -> Iterator[None]:
+    """Mide el tiempo de inferencia de un modelo de ML"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        MODEL_INFERENCE_DURATION.observe(elapsed, model=model)
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.add_external(f"model:{model}", elapsed)
+
+
+@contextmanager
+def track_external_request(service: str) -> Iterator[None]:
+    """Mide el tiempo de una llamada a un servicio externo (ej. Open-Meteo)"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        EXTERNAL_REQUEST_DURATION.observe(elapsed, service=service)
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.add_external(f"service:{service}", elapsed)
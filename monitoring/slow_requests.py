@@ -0,0 +1,70 @@
+"""
+Registro en memoria de las peticiones lentas recientes del proceso
+
+Cada petición que supera SLOW_REQUEST_THRESHOLD_SECONDS entra en un buffer
+circular de SLOW_REQUEST_BUFFER_SIZE entradas con su desglose: sentencias
+SQL con su duración, y tiempo de inferencia y de servicios externos
+(ver request_context). No se guardan parámetros ni cuerpos.
+"""
+import os
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List
+
+from .request_context import RequestStats
+
+SLOW_REQUEST_THRESHOLD_SECONDS = float(os.getenv("SLOW_REQUEST_THRESHOLD_SECONDS", "0.5"))
+SLOW_REQUEST_BUFFER_SIZE = int(os.getenv("SLOW_REQUEST_BUFFER_SIZE", "100"))
+# Longitud máxima de cada sentencia guardada
+MAX_STATEMENT_LENGTH = 2_000
+
+
+class SlowRequestLog:
+    """Buffer circular de peticiones lentas (las más antiguas se descartan)"""
+
+    def __init__(self, threshold: float = SLOW_REQUEST_THRESHOLD_SECONDS, size: int = SLOW_REQUEST_BUFFER_SIZE):
+        self.threshold = threshold
+        self._entries: Deque[Dict[str, Any]] = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def record(self, method: str, path: str, route: str, status: int, elapsed: float, stats: RequestStats) -> bool:
+        """
+        Guarda la petición si superó el umbral
+
+        Returns:
+            bool: True si se guardó
+        """
+        if elapsed < self.threshold:
+            return False
+        entry = {
+            "at": datetime.utcnow().isoformat(),
+            "method": method,
+            "path": path,
+            "route": route,
+            "status": status,
+            "duration_ms": round(elapsed * 1000, 3),
+            "db_queries": stats.query_count,
+            "db_time_ms": round(stats.query_time * 1000, 3),
+            "external_ms": {name: round(seconds * 1000, 3) for name, seconds in stats.external_time.items()},
+            "statements": [
+                {"sql": statement[:MAX_STATEMENT_LENGTH], "duration_ms": round(seconds * 1000, 3)}
+                for statement, seconds in stats.statements
+            ],
+        }
+        with self._lock:
+            self._entries.append(entry)
+        return True
+
+    def snapshot(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Las peticiones guardadas más lentas primero"""
+        with self._lock:
+            entries = list(self._entries)
+        return sorted(entries, key=lambda entry: entry["duration_ms"], reverse=True)[:limit]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+slow_requests = SlowRequestLog()
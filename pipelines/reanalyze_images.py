@@ -0,0 +1,377 @@
+"""
+Re-análisis por lotes de las imágenes históricas de plantas
+
+Al cambiar el modelo de enfermedades se clasifican con él las imágenes
+subidas y se insertan nuevos PlantAnalysis con su model_version. Etapas
+solapadas:
+
+    lectura + decodificación + reducción   Pool de procesos (decode_for_model)
+    inferencia por lotes                   proceso principal, un solo modelo cargado
+    inserción masiva + checkpoint          hilo escritor
+
+La fuente es cada fila de plant_images que aún no tiene un análisis de su
+variante "model" con la nueva versión del modelo, recorridas en orden por
+keyset (plant_id, sha256). El checkpoint (JSON) guarda la última clave
+confirmada; al reanudar se continúa desde ahí, y el filtro por versión evita
+duplicados si el proceso murió entre la inserción y el guardado del
+checkpoint.
+
+Uso:
+    python -m pipelines.reanalyze_images --workers 4 --batch-size 32
+    python -m pipelines.reanalyze_images --restart        # ignora el checkpoint
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from storage.image_store import IMAGE_STORE_DIR
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_PATH = "reanalysis_checkpoint.json"
+PAGE_SIZE = 1_000
+PROGRESS_EVERY = 10  # lotes
+
+Key = Tuple[int, str]
+
+_image_root: Optional[str] = None
+
+
+def iter_pending_images(
+        session_factory: Callable,
+        model_version: str,
+        after: Optional[Key] = None,
+        page_size: int = PAGE_SIZE
+) -> Iterator[Key]:
+    """
+    Recorre las imágenes que aún no tienen análisis con model_version
+
+    Args:
+        session_factory: Fábrica de sesiones
+        model_version: Versión del modelo nuevo
+        after: Última clave (plant_id, image_path) ya procesada
+        page_size: Filas por consulta
+
+    Yields:
+        tuple: (plant_id, image_path) en orden
+    """
+    from sqlalchemy import and_, exists, func, or_, select
+    from models.plant_analysis_model import PlantAnalysis
+    from models.plant_image_model import PlantImage
+    from storage.image_store import image_store
+
+    # image_store.relative_path(sha256, "model") en SQL, para comparar con PlantAnalysis.image_path
+    sha256 = PlantImage.sha256
+    model_path = (
+        func.substr(sha256, 1, 2) + "/" + func.substr(sha256, 3, 2) + "/" + sha256 + "/model.jpg"
+    )
+    already_done = exists().where(
+        PlantAnalysis.plant_id == PlantImage.plant_id,
+        PlantAnalysis.image_path == model_path,
+        PlantAnalysis.model_version == model_version
+    )
+
+    db = session_factory()
+    try:
+        while True:
+            # La ruta deriva del hash: ordenar por sha256 es ordenar por image_path
+            query = (
+                select(PlantImage.plant_id, sha256)
+                .where(~already_done)
+                .distinct()
+                .order_by(PlantImage.plant_id, sha256)
+                .limit(page_size)
+            )
+            if after is not None:
+                query = query.where(or_(
+                    PlantImage.plant_id > after[0],
+                    and_(PlantImage.plant_id == after[0], sha256 > _sha256_of(after[1]))
+                ))
+            page = [(plant_id, image_store.relative_path(digest, "model")) for plant_id, digest in db.execute(query)]
+            if not page:
+                return
+            yield from page
+            after = page[-1]
+    finally:
+        db.close()
+
+
+def _sha256_of(image_path: str) -> str:
+    """sha256 de una ruta del almacén (ab/cd/<sha256>/model.jpg); "" si no lo es"""
+    parts = image_path.replace(os.sep, "/").split("/")
+    return parts[2] if len(parts) == 4 else ""
+
+
+def _init_worker(image_root: str) -> None:
+    global _image_root
+    _image_root = image_root
+
+
+def _load_image(key: Key) -> Tuple[Key, Any, Optional[str]]:
+    """Etapa de los procesos: leer, decodificar y reducir a tamaño de modelo"""
+    import numpy as np
+    from clients.plants_health import decode_for_model
+
+    try:
+        with open(os.path.join(_image_root, key[1]), "rb") as file:
+            image = decode_for_model(file.read())
+    except OSError as exception:
+        return key, None, f"{type(exception).__name__}: {exception}"
+    # Un array viaja entre procesos mucho más barato que un PIL.Image
+    return key, np.asarray(image), None
+
+
+def _prefetch(pool, keys: Iterator[Key], max_in_flight: int) -> Iterator[Tuple[Key, Any, Optional[str]]]:
+    """Como pool.imap, pero con un máximo de imágenes decodificadas en vuelo"""
+    pending = deque()
+    for key in keys:
+        pending.append(pool.apply_async(_load_image, (key,)))
+        if len(pending) >= max_in_flight:
+            yield pending.popleft().get()
+    while pending:
+        yield pending.popleft().get()
+
+
+def load_checkpoint(path: str, model_version: str) -> Optional[Dict[str, Any]]:
+    """Lee el checkpoint si existe y corresponde a la misma versión del modelo"""
+    if not os.path.exists(path):
+        return None
+    with open(path) as file:
+        checkpoint = json.load(file)
+    if checkpoint.get("model_version") != model_version:
+        return None
+    return checkpoint
+
+
+def _save_checkpoint(path: str, checkpoint: Dict[str, Any]) -> None:
+    # Escritura atómica: un corte a mitad no deja un JSON truncado
+    temporary = f"{path}.tmp"
+    with open(temporary, "w") as file:
+        json.dump(checkpoint, file, indent=2)
+    os.replace(temporary, path)
+
+
+class _Writer(threading.Thread):
+    """Inserta los resultados por lotes y avanza el checkpoint tras cada commit"""
+
+    def __init__(self, session_factory: Callable, checkpoint_path: str, checkpoint: Dict[str, Any]):
+        super().__init__(name="reanalysis-writer", daemon=True)
+        self._session_factory = session_factory
+        self._checkpoint_path = checkpoint_path
+        self.checkpoint = checkpoint
+        # Acotada: si la base de datos va lenta, la inferencia espera
+        self.queue: "queue.Queue" = queue.Queue(maxsize=4)
+        self.error: Optional[BaseException] = None
+
+    def run(self) -> None:
+        from models.plant_analysis_model import PlantAnalysis
+        from services.health_summary_service import HealthSummaryService
+        from storage.change_tracking import log_changes
+        from storage.sql import dialect_insert
+
+        db = self._session_factory()
+        try:
+            while True:
+                item = self.queue.get()
+                if item is None:
+                    return
+                rows, last_key, failed = item
+                if rows:
+                    table = PlantAnalysis.__table__
+                    # Una imagen ya analizada con esta versión (otra ejecución
+                    # concurrente o un análisis en línea) no se duplica
+                    inserted = db.execute(
+                        dialect_insert(db, table)
+                        .on_conflict_do_nothing(index_elements=["plant_id", "image_path", "model_version"])
+                        .returning(table.c.id, table.c.plant_id, table.c.image_path),
+                        rows
+                    ).all()
+                    new_keys = {(plant_id, image_path) for _, plant_id, image_path in inserted}
+                    HealthSummaryService.record_analyses(
+                        db, [row for row in rows if (row["plant_id"], row["image_path"]) in new_keys]
+                    )
+                    log_changes(db, "analyses", [(id_, plant_id) for id_, plant_id, _ in inserted])
+                    db.commit()
+                self.checkpoint["processed"] += len(rows)
+                self.checkpoint["failed"] += failed
+                self.checkpoint["last_key"] = list(last_key)
+                self.checkpoint["updated_at"] = datetime.utcnow().isoformat()
+                _save_checkpoint(self._checkpoint_path, self.checkpoint)
+        except BaseException as exception:
+            self.error = exception
+        finally:
+            db.close()
+
+    def _put(self, item: Any) -> None:
+        # Con timeout: si el escritor murió, el productor no se queda bloqueado con la cola llena
+        while True:
+            if self.error is not None:
+                raise RuntimeError("El escritor falló") from self.error
+            try:
+                self.queue.put(item, timeout=1.0)
+                return
+            except queue.Full:
+                continue
+
+    def put(self, rows: List[Dict[str, Any]], last_key: Key, failed: int) -> None:
+        self._put((rows, last_key, failed))
+
+    def close(self) -> None:
+        """Espera a que se escriba todo lo encolado"""
+        self._put(None)
+        self.join()
+        if self.error is not None:
+            raise RuntimeError("El escritor falló") from self.error
+
+
+def run(
+        workers: int = max(1, (os.cpu_count() or 2) - 1),
+        batch_size: int = 32,
+        checkpoint_path: str = CHECKPOINT_PATH,
+        image_root: str = IMAGE_STORE_DIR,
+        model_version: Optional[str] = None,
+        restart: bool = False,
+        limit: Optional[int] = None,
+        session_factory: Optional[Callable] = None,
+        client: Any = None
+) -> Dict[str, Any]:
+    """
+    Re-analiza todas las imágenes pendientes
+
+    Args:
+        workers: Procesos de decodificación
+        batch_size: Imágenes por lote de inferencia e inserción
+        checkpoint_path: Fichero de checkpoint
+        image_root: Directorio base de image_path
+        model_version: Versión a registrar (por defecto la del cliente cargado)
+        restart: Ignorar el checkpoint existente
+        limit: Máximo de imágenes en esta ejecución (para pruebas)
+        session_factory: Fábrica de sesiones (por defecto SessionLocal)
+        client: Cliente con classify_batch() (por defecto PlantHealthClient)
+
+    Returns:
+        dict: Procesadas, fallidas, segundos e imágenes por segundo de esta ejecución
+    """
+    if session_factory is None:
+        from database_config import SessionLocal
+        session_factory = SessionLocal
+
+    # El pool se crea antes de cargar torch: los procesos hijos no heredan el modelo
+    pool = multiprocessing.Pool(workers, initializer=_init_worker, initargs=(image_root,))
+    try:
+        if client is None:
+            from clients.plants_health import PlantHealthClient
+            client = PlantHealthClient().load()
+        model_version = model_version or client.model_version
+
+        checkpoint = None if restart else load_checkpoint(checkpoint_path, model_version)
+        resumed_from = tuple(checkpoint["last_key"]) if checkpoint and checkpoint.get("last_key") else None
+        checkpoint = checkpoint or {"model_version": model_version, "processed": 0, "failed": 0, "last_key": None}
+        if resumed_from:
+            logger.info("Reanudando desde %s", resumed_from)
+
+        keys = iter_pending_images(session_factory, model_version, resumed_from)
+        if limit is not None:
+            keys = (key for _, key in zip(range(limit), keys))
+
+        writer = _Writer(session_factory, checkpoint_path, checkpoint)
+        writer.start()
+
+        from PIL import Image
+
+        processed = failed = batches = 0
+        batch: List[Tuple[Key, Any]] = []
+        pending_failed = 0
+        last_key: Optional[Key] = None
+        started = time.perf_counter()
+
+        def flush() -> None:
+            nonlocal processed, batches, pending_failed
+            rows = []
+            if batch:
+                predictions = client.classify_batch([Image.fromarray(array) for _, array in batch], batch_size)
+                analyzed_at = datetime.utcnow()
+                for (plant_id, image_path), prediction in zip((key for key, _ in batch), predictions):
+                    top = prediction[0]
+                    rows.append({
+                        "plant_id": plant_id,
+                        "analysis_type": "health",
+                        "result": top["label"][:100],
+                        "confidence": float(top["score"]),
+                        "analyzed_at": analyzed_at,
+                        "model_version": model_version,
+                        "image_path": image_path,
+                    })
+            writer.put(rows, last_key, pending_failed)
+            processed += len(rows)
+            batches += 1
+            pending_failed = 0
+            batch.clear()
+            if batches % PROGRESS_EVERY == 0:
+                elapsed = time.perf_counter() - started
+                logger.info("%s imágenes (%.1f img/s), %s fallidas", processed, processed / elapsed, failed)
+
+        for key, array, error in _prefetch(pool, keys, max_in_flight=batch_size * max(2, workers)):
+            last_key = key
+            if error is not None:
+                failed += 1
+                pending_failed += 1
+                logger.warning("Imagen %s de la planta %s omitida: %s", key[1], key[0], error)
+            else:
+                batch.append((key, array))
+            if len(batch) >= batch_size:
+                flush()
+        if batch or pending_failed:
+            flush()
+
+        writer.close()
+        elapsed = time.perf_counter() - started
+    finally:
+        pool.close()
+        pool.join()
+
+    return {
+        "model_version": model_version,
+        "resumed_from": list(resumed_from) if resumed_from else None,
+        "processed": processed,
+        "failed": failed,
+        "seconds": round(elapsed, 3),
+        "images_per_second": round(processed / elapsed, 2) if elapsed > 0 else 0.0,
+        "total_processed": checkpoint["processed"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-analiza las imágenes históricas con el modelo actual")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) - 1))
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--checkpoint", default=CHECKPOINT_PATH)
+    parser.add_argument("--image-root", default=IMAGE_STORE_DIR)
+    parser.add_argument("--model-version", default=None, help="Por defecto nombre@commit del modelo")
+    parser.add_argument("--restart", action="store_true", help="Ignora el checkpoint existente")
+    parser.add_argument("--limit", type=int, default=None)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    stats = run(
+        workers=args.workers,
+        batch_size=args.batch_size,
+        checkpoint_path=args.checkpoint,
+        image_root=args.image_root,
+        model_version=args.model_version,
+        restart=args.restart,
+        limit=args.limit
+    )
+    print(json.dumps(stats, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+import threading
+from typing import Any, Dict, List, Optional
+
+
+class PrologEngine:
+    """
+    Envoltorio de pyswip (SWI-Prolog)
+
+    pyswip carga la librería nativa de SWI-Prolog al importarse, así que el
+    import se hace al crear el motor y no al importar el módulo. SWI-Prolog no
+    es reentrante entre hilos, por eso las consultas se serializan con un lock.
+    """
+
+    def __init__(self, knowledge_files: Optional[List[str]] = None):
+        self.knowledge_files = knowledge_files or []
+        self._prolog = None
+        self._lock = threading.Lock()
+
+    def load(self) -> "PrologEngine":
+        """
+        Inicializa SWI-Prolog y consulta las bases de conocimiento
+
+        Returns:
+            PrologEngine: El propio motor, ya inicializado
+        """
+        with self._lock:
+            if self._prolog is None:
+                from pyswip import Prolog
+
+                prolog = Prolog()
+                for path in self.knowledge_files:
+                    prolog.consult(path)
+                self._prolog = prolog
+        return self
+
+    def query(self, goal: str, max_solutions: int = -1) -> List[Dict[str, Any]]:
+        """
+        Ejecuta una consulta y devuelve todas sus soluciones
+
+        Args:
+            goal: Objetivo Prolog, ej. "riego_necesario(X)"
+            max_solutions: Límite de soluciones (-1 = todas)
+
+        Returns:
+            list: Una lista de diccionarios variable -> valor
+        """
+        self.load()
+        with self._lock:
+            return list(self._prolog.query(goal, maxresult=max_solutions))
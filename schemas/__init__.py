@@ -4,8 +4,12 @@ from .plant_schema import PlantCreate, PlantResponse, PlantUpdate
 from .sensor_schema import SensorCreate, SensorResponse, SensorUpdate
 from .sensor_reading_schema import SensorReadingCreate, SensorReadingResponse
 from .plant_analysis_schema import PlantAnalysisCreate, PlantAnalysisResponse
+from .plant_image_schema import PlantImageResponse, PlantImageUploadResponse
+from .health_summary_schema import HealthSummaryResponse
+from .sync_schema import SyncResponse
 from .chat_schema import ChatCreate, ChatResponse, ChatUpdate
 from .message_schema import MessageCreate, MessageResponse
+from .job_schema import JobResponse
 
 __all__ = [
     # User
@@ -20,8 +24,16 @@ __all__ = [
     'SensorReadingCreate', 'SensorReadingResponse',
     # PlantAnalysis
     'PlantAnalysisCreate', 'PlantAnalysisResponse',
+    # PlantImage
+    'PlantImageResponse', 'PlantImageUploadResponse',
+    # HealthSummary
+    'HealthSummaryResponse',
+    # Sync
+    'SyncResponse',
     # Chat
     'ChatCreate', 'ChatResponse', 'ChatUpdate',
     # Message
     'MessageCreate', 'MessageResponse',
+    # BackgroundJob
+    'JobResponse',
 ]
\ No newline at end of file
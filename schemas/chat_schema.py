@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field
 from typing import Optional, List
 from datetime import datetime
+from .message_schema import MessageResponse
 
 
 class ChatBase(BaseModel):
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Generic, TypeVar, List, Optional
+from pydantic import BaseModel, Field
+from typing import Any, Dict, Generic, TypeVar, List, Optional
 
 T = TypeVar('T')
 
@@ -22,4 +22,21 @@ class ErrorResponse(BaseModel):
 class SuccessResponse(BaseModel):
     """Schema para respuestas exitosas"""
     message: str
-    data: Optional[dict] = None
\ No newline at end of file
+    data: Optional[dict] = None
+
+
+class BatchRequest(BaseModel):
+    """Schema para altas por lotes (cada elemento se valida por separado)"""
+    items: List[Dict[str, Any]] = Field(..., min_length=1, max_length=1000)
+
+
+class BatchItemError(BaseModel):
+    """Errores de un elemento de un lote"""
+    index: int = Field(..., description="Posición del elemento en items")
+    errors: List[Dict[str, Any]]
+
+
+class BatchResponse(BaseModel, Generic[T]):
+    """Schema genérico de respuesta de un alta por lotes"""
+    created: List[T] = Field(..., description="Elementos creados, en el orden de items")
+    errors: List[BatchItemError] = Field(..., description="Elementos rechazados (no se crearon)")
@@ -0,0 +1,21 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from datetime import datetime
+
+
+class GreenhouseForecastResponse(BaseModel):
+    """
+    Schema columnar del pronóstico de los sensores de un invernadero
+
+    values es una matriz (una fila por sensor, una columna por hora de t).
+    """
+    greenhouse_id: int
+    origin: datetime = Field(..., description="Última hora completa medida (inicio, UTC)")
+    hours: int
+    t: List[int] = Field(..., description="Inicio de cada hora pronosticada (epoch en segundos)")
+    sensor_ids: List[int]
+    sensor_types: List[str]
+    values: List[List[Optional[float]]] = Field(..., description="null donde faltan datos para pronosticar")
+    samples: List[float] = Field(..., description="Filas (ponderadas por antigüedad) del modelo de cada sensor")
+    outside_temperature: List[Optional[float]]
+    outside_humidity: List[Optional[float]]
@@ -1,11 +1,15 @@
 from pydantic import BaseModel, Field
 from typing import Optional, List
 from datetime import datetime
+from .plant_schema import PlantResponse
+from .sensor_schema import SensorResponse
 
 
 class GreenhouseBase(BaseModel):
     name: str = Field(..., min_length=1, max_length=100, description="Nombre del invernadero")
     location: Optional[str] = Field(None, max_length=200, description="Ubicación física")
+    latitude: Optional[float] = Field(None, ge=-90, le=90, description="Latitud (para el pronóstico)")
+    longitude: Optional[float] = Field(None, ge=-180, le=180, description="Longitud (para el pronóstico)")
 
 
 class GreenhouseCreate(GreenhouseBase):
@@ -17,6 +21,8 @@ class GreenhouseUpdate(BaseModel):
     """Schema para actualizar invernadero"""
     name: Optional[str] = Field(None, min_length=1, max_length=100)
     location: Optional[str] = Field(None, max_length=200)
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
 
 
 class GreenhouseResponse(GreenhouseBase):
@@ -0,0 +1,44 @@
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
+from datetime import date, datetime
+
+
+class HealthLabelShare(BaseModel):
+    """Frecuencia de una etiqueta en el periodo"""
+    analysis_type: str
+    result: str
+    count: int
+    share: float = Field(..., description="Fracción sobre el total de análisis del periodo")
+    mean_confidence: Optional[float] = None
+
+
+class HealthTrendPoint(BaseModel):
+    """Análisis de un día"""
+    day: date
+    count: int
+    healthy_ratio: float = Field(..., description="Fracción de resultados 'healthy'")
+    mean_confidence: Optional[float] = None
+    labels: Dict[str, int] = Field(..., description="Análisis por etiqueta")
+
+
+class PlantHealthLabelResponse(BaseModel):
+    """Etiqueta detectada en una planta (histórico completo)"""
+    plant_id: int
+    plant_name: str
+    analysis_type: str
+    result: str
+    count: int
+    first_seen_at: datetime
+    last_seen_at: datetime
+    last_confidence: Optional[float] = None
+
+
+class HealthSummaryResponse(BaseModel):
+    """Schema de respuesta del resumen de salud de un invernadero"""
+    greenhouse_id: int
+    start: date
+    end: date
+    total_analyses: int
+    distribution: List[HealthLabelShare]
+    trend: List[HealthTrendPoint]
+    plants: List[PlantHealthLabelResponse]
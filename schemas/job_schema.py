@@ -0,0 +1,18 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+
+
+class JobResponse(BaseModel):
+    """Schema para respuesta de un trabajo en segundo plano"""
+    id: int
+    kind: str
+    target_id: Optional[int] = None
+    status: str
+    result: Optional[str] = None
+    error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
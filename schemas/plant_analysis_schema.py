@@ -19,6 +19,7 @@ class PlantAnalysisResponse(PlantAnalysisBase):
     id: int
     plant_id: int
     analyzed_at: datetime
+    model_version: Optional[str] = None
 
     class Config:
         from_attributes = True
\ No newline at end of file
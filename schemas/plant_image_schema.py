@@ -0,0 +1,28 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+from datetime import datetime
+from .plant_analysis_schema import PlantAnalysisResponse
+
+
+class PlantImageResponse(BaseModel):
+    """Schema para respuesta de imagen de planta"""
+    id: int
+    plant_id: int
+    sha256: str
+    content_type: str
+    width: int
+    height: int
+    size_bytes: int
+    uploaded_at: datetime
+    original_url: str = Field(..., description="URL del original")
+    model_url: str = Field(..., description="URL de la variante de entrada del modelo (lado corto 256 px)")
+    thumbnail_url: str = Field(..., description="URL de la miniatura (lado largo 320 px)")
+
+    class Config:
+        from_attributes = True
+
+
+class PlantImageUploadResponse(PlantImageResponse):
+    """Schema de respuesta al subir una imagen"""
+    deduplicated: bool = Field(..., description="True si el contenido ya estaba en el almacén")
+    analysis: Optional[PlantAnalysisResponse] = None
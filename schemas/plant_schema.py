@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field
 from typing import Optional, List
 from datetime import datetime
+from .plant_analysis_schema import PlantAnalysisResponse
 
 
 class PlantBase(BaseModel):
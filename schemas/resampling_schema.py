@@ -0,0 +1,22 @@
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
+from datetime import datetime
+
+
+class ResampledReadingsResponse(BaseModel):
+    """
+    Schema columnar de series regulares de un invernadero
+
+    values y flags son matrices (una fila por sensor, una columna por
+    instante de t). Bits de flags: 1 = hueco, 2 = atípico, 4 = rellenado.
+    """
+    greenhouse_id: int
+    start: datetime
+    end: datetime
+    step_seconds: int
+    method: Literal['none', 'ffill', 'linear', 'median']
+    t: List[int] = Field(..., description="Inicio de cada intervalo (epoch en segundos)")
+    sensor_ids: List[int]
+    sensor_types: List[str]
+    values: List[List[Optional[float]]]
+    flags: List[List[int]]
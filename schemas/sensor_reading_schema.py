@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 
 from pydantic import BaseModel, Field
 from datetime import datetime
@@ -11,6 +11,9 @@ class SensorReadingBase(BaseModel):
 class SensorReadingCreate(SensorReadingBase):
     """Schema para crear una lectura de sensor"""
     sensor_id: int = Field(..., gt=0, description="ID del sensor")
+    recorded_at: Optional[datetime] = Field(
+        None, description="Momento de la medida (UTC); si falta, el de recepción y no se deduplica"
+    )
 
 
 class SensorReadingResponse(SensorReadingBase):
@@ -27,3 +30,33 @@ class SensorReadingBulkCreate(BaseModel):
     """Schema para crear múltiples lecturas a la vez"""
     sensor_id: int = Field(..., gt=0)
     readings: List[float] = Field(..., min_length=1, max_length=1000)
+
+
+class SensorReadingIngest(BaseModel):
+    """Schema para la ingesta de lecturas de una pasarela"""
+    readings: List[SensorReadingCreate] = Field(..., min_length=1, max_length=10000)
+
+
+class SensorReadingIngestResponse(BaseModel):
+    """Schema de respuesta de la ingesta"""
+    received: int
+    inserted: int
+    duplicates: int = Field(..., description="Repetidas en el lote o ya registradas")
+    unknown_sensors: List[int] = Field(..., description="Sensores inexistentes (sus lecturas se descartan)")
+
+
+class SensorReadingPoint(SensorReadingBase):
+    """Lectura de una serie (puede venir de un bloque comprimido, sin id propio)"""
+    sensor_id: int
+    recorded_at: datetime
+
+
+class SensorReadingAggregate(BaseModel):
+    """Schema con estadísticas de un sensor en un rango"""
+    sensor_id: int
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
+    count: int
+    min: Optional[float] = None
+    max: Optional[float] = None
+    mean: Optional[float] = None
@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field
 from typing import Optional, List, Literal
 from datetime import datetime
+from .sensor_reading_schema import SensorReadingResponse
 
 
 class SensorBase(BaseModel):
@@ -36,4 +37,18 @@ class SensorResponse(SensorBase):
 
 class SensorDetailResponse(SensorResponse):
     """Schema con lecturas del sensor"""
-    readings: List['SensorReadingResponse'] = []
\ No newline at end of file
+    readings: List['SensorReadingResponse'] = []
+
+
+class SensorStatusResponse(BaseModel):
+    """Schema con el estado de un sensor según el monitor de la flota"""
+    sensor_id: int
+    greenhouse_id: int
+    name: str
+    type: str
+    active: Optional[bool] = None
+    status: Literal['ok', 'stale', 'flatline', 'out_of_range', 'inactive']
+    status_since: Optional[datetime] = None
+    last_recorded_at: Optional[datetime] = None
+    last_value: Optional[float] = None
+    cadence_seconds: Optional[float] = Field(None, description="Intervalo medio entre lecturas")
@@ -0,0 +1,19 @@
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List
+
+
+class EntityChanges(BaseModel):
+    """Cambios de una entidad en forma columnar"""
+    columns: List[str]
+    rows: List[List[Any]] = Field(..., description="Filas creadas o modificadas, en el orden de columns")
+    deleted: List[int] = Field(..., description="IDs borrados (un padre borrado implica sus hijos)")
+
+
+class SyncResponse(BaseModel):
+    """Schema de respuesta de la sincronización delta"""
+    cursor: int = Field(..., description="Valor de since para la siguiente sincronización")
+    has_more: bool = Field(..., description="Quedan cambios: repetir con el nuevo cursor")
+    snapshot: bool = Field(..., description="True si es una foto completa (sin since)")
+    changes: Dict[str, EntityChanges] = Field(
+        ..., description="greenhouses, plants, sensors, analyses, chats y messages (solo las que cambiaron)"
+    )
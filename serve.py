@@ -0,0 +1,67 @@
+"""
+Arranque de producción con varios workers
+
+Modo por defecto: cada worker de uvicorn carga su propio modelo.
+Modo --shared-model: se levanta un único servidor de inferencia (un solo
+proceso con torch y los pesos de MobileNet) y los workers le envían las
+imágenes por un socket Unix, así la memoria del modelo no se multiplica por N.
+
+Uso:
+    python serve.py --workers 4 --port 8005 --shared-model
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+import uvicorn
+
+
+def start_inference_server(socket_path: str, timeout: float = 300.0) -> subprocess.Popen:
+    """
+    Lanza el servidor de inferencia y espera a que el socket exista
+
+    Raises:
+        RuntimeError: Si el servidor termina o no arranca a tiempo
+    """
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    process = subprocess.Popen([sys.executable, "-m", "clients.inference_server", "--socket", socket_path])
+
+    deadline = time.monotonic() + timeout
+    while not os.path.exists(socket_path):
+        if process.poll() is not None:
+            raise RuntimeError("El servidor de inferencia terminó durante el arranque")
+        if time.monotonic() > deadline:
+            process.terminate()
+            raise RuntimeError("El servidor de inferencia no arrancó a tiempo")
+        time.sleep(0.2)
+    return process
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor de la Greenhouse API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8005)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--shared-model", action="store_true", help="Un solo proceso de inferencia para todos los workers")
+    parser.add_argument("--inference-socket", default="/tmp/greenhouse-inference.sock")
+    args = parser.parse_args()
+
+    inference_process = None
+    if args.shared_model:
+        inference_process = start_inference_server(args.inference_socket)
+        # Los workers heredan el entorno: clients.subsystems usará el cliente remoto
+        os.environ["INFERENCE_SOCKET"] = args.inference_socket
+
+    try:
+        uvicorn.run("main:app", host=args.host, port=args.port, workers=args.workers)
+    finally:
+        if inference_process is not None:
+            inference_process.terminate()
+            inference_process.wait(timeout=10)
+
+
+if __name__ == "__main__":
+    main()
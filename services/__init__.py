@@ -1,3 +1,13 @@
 from .user_service import UserService
+from .greenhouse_service import GreenhouseService
+from .sensor_service import SensorService
+from .plant_service import PlantService
+from .plant_image_service import PlantImageService
+from .reading_storage_service import ReadingStorageService
+from .health_summary_service import HealthSummaryService
+from .sync_service import SyncService
+from .idempotency_service import IdempotencyService
+from .sensor_monitor_service import SensorMonitorService
+from .forecast_service import ForecastService
 
-__all__ = ['UserService']
\ No newline at end of file
+__all__ = ['UserService', 'GreenhouseService', 'SensorService', 'PlantService', 'PlantImageService', 'ReadingStorageService', 'HealthSummaryService', 'SyncService', 'IdempotencyService', 'SensorMonitorService', 'ForecastService']
\ No newline at end of file
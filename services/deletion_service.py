@@ -0,0 +1,195 @@
+import json
+from datetime import datetime
+from typing import Dict, Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from models.background_job_model import BackgroundJob
+from models.chat_model import Chat
+from models.greenhouse_health_daily_model import GreenhouseHealthDaily
+from models.greenhouse_model import Greenhouse
+from models.message_model import Message
+from models.plant_analysis_model import PlantAnalysis
+from models.plant_health_label_model import PlantHealthLabel
+from models.plant_image_model import PlantImage
+from models.plant_model import Plant
+from models.sensor_forecast_model import SensorForecastModel
+from models.sensor_model import Sensor
+from models.sensor_reading_chunk_model import SensorReadingChunk
+from models.sensor_reading_model import SensorReading
+from models.sensor_state_model import SensorState
+from models.user_model import User
+from storage.change_tracking import DELETE, log_changes
+
+# Filas de lecturas por transacción en los borrados en segundo plano
+BATCH_SIZE = 10_000
+
+
+def _delete(db: Session, model, *criteria) -> int:
+    # synchronize_session=False: no traer a memoria los IDs de las filas borradas
+    result = db.execute(
+        delete(model).where(*criteria).execution_options(synchronize_session=False)
+    )
+    return result.rowcount or 0
+
+
+def _delete_in_batches(db: Session, model, batch_size: int, *criteria) -> int:
+    total = 0
+    while True:
+        batch = select(model.id).where(*criteria).limit(batch_size)
+        deleted = _delete(db, model, model.id.in_(batch))
+        db.commit()
+        total += deleted
+        if deleted < batch_size:
+            return total
+
+
+class DeletionService:
+    """
+    Borrados en cascada con DELETEs por conjuntos, de hojas a raíz
+
+    No depende del ON DELETE CASCADE de la base (que también está declarado)
+    ni de la cascada del ORM, que cargaría cada lectura, análisis y mensaje
+    en memoria antes de borrarlos uno a uno.
+    """
+
+    @staticmethod
+    def delete_greenhouse(db: Session, greenhouse_id: int, batch_size: Optional[int] = None) -> Dict[str, int]:
+        """
+        Elimina un invernadero con sus sensores, lecturas, plantas y análisis
+
+        Args:
+            db: Sesión de base de datos
+            greenhouse_id: ID del invernadero
+            batch_size: Si se indica, las lecturas se borran en lotes de este
+                        tamaño, con un commit por lote
+
+        Returns:
+            dict: Filas eliminadas por tabla
+        """
+        sensor_ids = select(Sensor.id).where(Sensor.greenhouse_id == greenhouse_id)
+        plant_ids = select(Plant.id).where(Plant.greenhouse_id == greenhouse_id)
+
+        counts = {}
+        if batch_size:
+            counts["sensor_readings"] = _delete_in_batches(
+                db, SensorReading, batch_size, SensorReading.sensor_id.in_(sensor_ids)
+            )
+        else:
+            counts["sensor_readings"] = _delete(db, SensorReading, SensorReading.sensor_id.in_(sensor_ids))
+        counts["sensor_reading_chunks"] = _delete(
+            db, SensorReadingChunk, SensorReadingChunk.sensor_id.in_(sensor_ids)
+        )
+        counts["sensor_states"] = _delete(db, SensorState, SensorState.sensor_id.in_(sensor_ids))
+        counts["sensor_forecast_models"] = _delete(
+            db, SensorForecastModel, SensorForecastModel.sensor_id.in_(sensor_ids)
+        )
+        counts["plants_analysis"] = _delete(db, PlantAnalysis, PlantAnalysis.plant_id.in_(plant_ids))
+        # Los ficheros del almacén de imágenes se comparten por sha256 y no se borran aquí
+        counts["plant_images"] = _delete(db, PlantImage, PlantImage.plant_id.in_(plant_ids))
+        counts["plant_health_labels"] = _delete(db, PlantHealthLabel, PlantHealthLabel.greenhouse_id == greenhouse_id)
+        counts["greenhouse_health_daily"] = _delete(
+            db, GreenhouseHealthDaily, GreenhouseHealthDaily.greenhouse_id == greenhouse_id
+        )
+        counts["sensors"] = _delete(db, Sensor, Sensor.greenhouse_id == greenhouse_id)
+        counts["plants"] = _delete(db, Plant, Plant.greenhouse_id == greenhouse_id)
+        # Tombstone para GET /sync: el cliente borra con el invernadero todo lo que cuelga de él
+        log_changes(db, "greenhouses", db.execute(
+            select(Greenhouse.id, Greenhouse.user_id).where(Greenhouse.id == greenhouse_id)
+        ).all(), DELETE)
+        counts["greenhouses"] = _delete(db, Greenhouse, Greenhouse.id == greenhouse_id)
+        db.commit()
+        # Los objetos de la sesión que apuntaban a filas borradas quedan obsoletos
+        db.expire_all()
+        return counts
+
+    @staticmethod
+    def delete_user(db: Session, user_id: int, batch_size: Optional[int] = None) -> Dict[str, int]:
+        """
+        Elimina un usuario con sus invernaderos (y todo su contenido) y sus chats
+
+        Args:
+            db: Sesión de base de datos
+            user_id: ID del usuario
+            batch_size: Tamaño de lote para las lecturas (ver delete_greenhouse)
+
+        Returns:
+            dict: Filas eliminadas por tabla
+        """
+        counts: Dict[str, int] = {}
+        greenhouse_ids = db.execute(select(Greenhouse.id).where(Greenhouse.user_id == user_id)).scalars().all()
+        for greenhouse_id in greenhouse_ids:
+            for table, deleted in DeletionService.delete_greenhouse(db, greenhouse_id, batch_size).items():
+                counts[table] = counts.get(table, 0) + deleted
+
+        chat_ids = select(Chat.id).where(Chat.user_id == user_id)
+        counts["messages"] = _delete(db, Message, Message.chat_id.in_(chat_ids))
+        counts["chats"] = _delete(db, Chat, Chat.user_id == user_id)
+        counts["users"] = _delete(db, User, User.id == user_id)
+        db.commit()
+        db.expire_all()
+        return counts
+
+    @staticmethod
+    def create_job(db: Session, kind: str, target_id: int) -> BackgroundJob:
+        """
+        Registra un trabajo de borrado pendiente
+
+        Args:
+            db: Sesión de base de datos
+            kind: delete_greenhouse | delete_user
+            target_id: ID del objeto a borrar
+
+        Returns:
+            BackgroundJob: Trabajo creado
+        """
+        job = BackgroundJob(kind=kind, target_id=target_id, status='pending')
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        return job
+
+    @staticmethod
+    def get_job(db: Session, job_id: int) -> Optional[BackgroundJob]:
+        return db.query(BackgroundJob).filter(BackgroundJob.id == job_id).first()
+
+    @staticmethod
+    def run_job(job_id: int) -> None:
+        """
+        Ejecuta un trabajo de borrado con su propia sesión (para BackgroundTasks)
+
+        Args:
+            job_id: ID del BackgroundJob
+        """
+        from database_config import SessionLocal
+
+        db = SessionLocal()
+        try:
+            job = DeletionService.get_job(db, job_id)
+            if job is None or job.status != 'pending':
+                return
+            job.status = 'running'
+            db.commit()
+
+            try:
+                if job.kind == 'delete_greenhouse':
+                    counts = DeletionService.delete_greenhouse(db, job.target_id, BATCH_SIZE)
+                elif job.kind == 'delete_user':
+                    counts = DeletionService.delete_user(db, job.target_id, BATCH_SIZE)
+                else:
+                    raise ValueError(f"Tipo de trabajo desconocido: {job.kind}")
+            except Exception as exception:
+                db.rollback()
+                job = DeletionService.get_job(db, job_id)
+                job.status = 'failed'
+                job.error = f"{type(exception).__name__}: {exception}"
+            else:
+                job = DeletionService.get_job(db, job_id)
+                job.status = 'done'
+                job.result = json.dumps(counts)
+
+            job.finished_at = datetime.utcnow()
+            db.commit()
+        finally:
+            db.close()
@@ -0,0 +1,340 @@
+"""
+Pronóstico a corto plazo de temperatura y humedad interiores por sensor
+
+Un modelo de regresión ridge por sensor y horizonte (1..FORECAST_MAX_HOURS
+horas, pronóstico directo: un vector de coeficientes por horizonte) sobre
+series horarias. Variables de la hora objetivo τ = t + h, vista desde la
+última hora completa t:
+
+    1, y(t), y(t) - y(t-1), y(τ-24),
+    T_ext(τ), HR_ext(τ), T_ext(τ) - T_ext(t), HR_ext(τ) - HR_ext(t),
+    sen y cos de la hora del día de τ
+
+El exterior sale del pronóstico horario de Open-Meteo (con past_days para
+tener también las horas ya pasadas con las que se entrena).
+
+Por sensor se guardan X'X y X'y de cada horizonte (sensor_forecast_models)
+con olvido exponencial: al llegar horas nuevas solo se suman sus filas y se
+resuelven los sistemas de todos los sensores de una vez con
+np.linalg.solve. Si los modelos están al día, un pronóstico es un remuestreo
+de las últimas 25 horas y un producto matricial.
+"""
+import functools
+import logging
+import os
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from control.forecasts import ForecastCache, fetch_open_meteo
+from models.greenhouse_model import Greenhouse
+from models.sensor_forecast_model import SensorForecastModel
+from models.sensor_model import Sensor
+from services.resampling_service import ResamplingService
+from storage.sql import dialect_insert
+
+logger = logging.getLogger(__name__)
+
+FORECAST_MAX_HOURS = 24
+# Historia con la que se entrena un modelo nuevo
+FORECAST_TRAINING_DAYS = int(os.getenv("FORECAST_TRAINING_DAYS", "14"))
+# Peso que conserva una fila por cada hora que pasa (0.995 -> vida media de ~6 días)
+FORECAST_FORGETTING = float(os.getenv("FORECAST_FORGETTING", "0.995"))
+FORECAST_RIDGE_ALPHA = float(os.getenv("FORECAST_RIDGE_ALPHA", "1.0"))
+# Por debajo de estas filas (ponderadas) el horizonte usa persistencia: y(τ) = y(t)
+FORECAST_MIN_SAMPLES = float(os.getenv("FORECAST_MIN_SAMPLES", "48"))
+
+FORECAST_SENSOR_TYPES = ['temperature', 'humidity']
+FEATURE_VERSION = 1
+N_FEATURES = 10
+HOUR = timedelta(hours=1)
+# Coeficientes de y(τ) = y(t), para sensores sin modelo o con pocas filas
+PERSISTENCE = np.zeros(N_FEATURES)
+PERSISTENCE[1] = 1.0
+
+# Pronóstico exterior con las horas pasadas de la ventana de entrenamiento (un día más de margen)
+_outside = ForecastCache(fetch=functools.partial(fetch_open_meteo, past_days=FORECAST_TRAINING_DAYS + 1))
+
+
+@dataclass
+class SensorForecast:
+    """Pronóstico de todos los sensores de un invernadero, en columnas"""
+    origin: datetime  # última hora completa (inicio, UTC)
+    timestamps: np.ndarray  # (H,) datetime64[s], inicio de cada hora pronosticada
+    sensor_ids: np.ndarray  # (S,) int64
+    sensor_types: List[str]  # (S,)
+    values: np.ndarray  # (S, H) float64, NaN donde no se puede pronosticar
+    samples: np.ndarray  # (S,) filas (ponderadas) del modelo a 1 hora
+    outside: np.ndarray  # (2, H) temperatura y humedad exteriores pronosticadas
+
+
+def _design(series: np.ndarray, outside: np.ndarray, angle: np.ndarray, origins: np.ndarray, h: int) -> np.ndarray:
+    """
+    Variables de las filas con origen en origins y horizonte h
+
+    Args:
+        series: Matriz (S, N) de valores horarios
+        outside: Matriz (2, N) de temperatura y humedad exteriores
+        angle: Hora del día (N,) en radianes
+        origins: Índices t de origen (t >= 1 y t + h >= 24)
+        h: Horizonte en horas
+
+    Returns:
+        np.ndarray: Tensor (S, len(origins), N_FEATURES), con NaN donde falta un dato
+    """
+    targets = origins + h
+    features = np.empty((series.shape[0], len(origins), N_FEATURES))
+    features[..., 0] = 1.0
+    features[..., 1] = series[:, origins]
+    features[..., 2] = series[:, origins] - series[:, origins - 1]
+    features[..., 3] = series[:, targets - 24]
+    features[..., 4] = outside[0, targets]
+    features[..., 5] = outside[1, targets]
+    features[..., 6] = outside[0, targets] - outside[0, origins]
+    features[..., 7] = outside[1, targets] - outside[1, origins]
+    features[..., 8] = np.sin(angle[targets])
+    features[..., 9] = np.cos(angle[targets])
+    return features
+
+
+def _solve(xtx: np.ndarray, xty: np.ndarray, samples: np.ndarray) -> np.ndarray:
+    """
+    Coeficientes ridge de todos los sensores y horizontes en una llamada
+
+    Args:
+        xtx: (S, H, p, p)
+        xty: (S, H, p)
+        samples: (S, H)
+
+    Returns:
+        np.ndarray: (S, H, p); persistencia donde no hay filas suficientes
+    """
+    # La constante no se penaliza (solo un mínimo para que el sistema sea invertible)
+    penalty = np.full(N_FEATURES, FORECAST_RIDGE_ALPHA)
+    penalty[0] = 1e-9
+    coefficients = np.linalg.solve(xtx + np.diag(penalty), xty[..., None])[..., 0]
+
+    coefficients[samples < FORECAST_MIN_SAMPLES] = PERSISTENCE
+    return coefficients
+
+
+def _accumulate(
+        series: np.ndarray,
+        outside: np.ndarray,
+        angle: np.ndarray,
+        measured: int,
+        trained_index: np.ndarray,
+        xtx: np.ndarray,
+        xty: np.ndarray,
+        samples: np.ndarray
+) -> None:
+    """
+    Suma a los estadísticos (en el sitio) las filas cuya hora objetivo es nueva
+
+    Los estadísticos previos se multiplican por el olvido de las horas
+    transcurridas y cada fila nueva entra con el peso de su antigüedad, así
+    que el resultado es el mismo que entrenar de cero con olvido exponencial.
+
+    Args:
+        series: Matriz (S, N) de valores horarios (NaN en las horas futuras)
+        outside: Matriz (2, N) del exterior
+        angle: Hora del día (N,) en radianes
+        measured: Horas medidas de la rejilla (la última es la hora de origen)
+        trained_index: Última hora objetivo ya incluida de cada sensor (índice en la rejilla)
+        xtx: (S, H, p, p)
+        xty: (S, H, p)
+        samples: (S, H)
+    """
+    last = measured - 1
+    decay = FORECAST_FORGETTING ** (last - trained_index)
+    xtx *= decay[:, None, None, None]
+    xty *= decay[:, None, None]
+    samples *= decay[:, None]
+
+    for h in range(1, xtx.shape[1] + 1):
+        origins = np.arange(max(1, 24 - h), measured - h)
+        if len(origins) == 0:
+            continue
+        targets = origins + h
+        features = _design(series, outside, angle, origins, h)
+        target = series[:, targets]
+        weights = (
+            np.isfinite(features).all(axis=-1) & np.isfinite(target)
+            & (targets[None, :] > trained_index[:, None])
+        ) * FORECAST_FORGETTING ** (last - targets)[None, :]
+        # Las filas incompletas tienen peso 0; sin NaN para que no contaminen las sumas
+        features = np.nan_to_num(features)
+        target = np.nan_to_num(target)
+        xtx[:, h - 1] += np.einsum("sk,skp,skq->spq", weights, features, features)
+        xty[:, h - 1] += np.einsum("sk,skp,sk->sp", weights, features, target)
+        samples[:, h - 1] += weights.sum(axis=1)
+
+
+def _blob(array: np.ndarray) -> bytes:
+    return np.ascontiguousarray(array, dtype=np.float64).tobytes()
+
+
+def _array(blob: bytes, shape: tuple) -> np.ndarray:
+    return np.frombuffer(blob, dtype=np.float64).reshape(shape).copy()
+
+
+class ForecastService:
+    @staticmethod
+    def forecast(
+            db: Session,
+            greenhouse_id: int,
+            hours: int = FORECAST_MAX_HOURS,
+            now: Optional[datetime] = None
+    ) -> SensorForecast:
+        """
+        Pronostica las próximas horas de los sensores de temperatura y humedad
+
+        Antes de predecir se incorporan a los modelos las horas completas que
+        aún no tenían (y se entrenan los de sensores nuevos con los últimos
+        FORECAST_TRAINING_DAYS días); los modelos actualizados se guardan.
+
+        Args:
+            db: Sesión de base de datos
+            greenhouse_id: ID del invernadero
+            hours: Horas a pronosticar (1..FORECAST_MAX_HOURS)
+            now: Momento actual (UTC, sin zona)
+
+        Returns:
+            SensorForecast: Pronóstico en columnas
+
+        Raises:
+            ValueError: Si hours está fuera de rango
+        """
+        if not 1 <= hours <= FORECAST_MAX_HOURS:
+            raise ValueError(f"Las horas deben estar entre 1 y {FORECAST_MAX_HOURS}")
+
+        H = FORECAST_MAX_HOURS
+        now = now or datetime.utcnow()
+        origin = now.replace(minute=0, second=0, microsecond=0) - HOUR
+        untrained = origin - timedelta(days=FORECAST_TRAINING_DAYS)
+
+        rows = db.execute(
+            select(Sensor.id, SensorForecastModel)
+            .outerjoin(SensorForecastModel, SensorForecastModel.sensor_id == Sensor.id)
+            .where(Sensor.greenhouse_id == greenhouse_id, Sensor.type.in_(FORECAST_SENSOR_TYPES))
+        ).all()
+        models = {
+            sensor_id: model for sensor_id, model in rows
+            if model is not None and model.feature_version == FEATURE_VERSION
+        }
+        # Solo se carga la historia que falta: 14 días para un modelo nuevo, unas horas si no
+        # Lo anterior a la ventana de entrenamiento ya casi no pesa: no se recarga
+        oldest = min(
+            (max(models[sensor_id].trained_until, untrained) if sensor_id in models else untrained
+             for sensor_id, _ in rows),
+            default=origin
+        )
+        start = min(oldest - H * HOUR, origin - 24 * HOUR)
+
+        resampled = ResamplingService.resample_greenhouse(
+            db, greenhouse_id, start, origin + HOUR, 3600, 'none', sensor_types=FORECAST_SENSOR_TYPES
+        )
+        sensor_ids = resampled.sensor_ids
+        measured = resampled.values.shape[1]
+        S = len(sensor_ids)
+
+        # Rejilla horaria: las horas medidas (la última es el origen) más H futuras
+        grid = resampled.timestamps[0] + np.arange(measured + H) * np.timedelta64(1, "h")
+        grid_s = grid.astype(np.int64)
+        angle = 2 * np.pi * ((grid_s // 3600) % 24) / 24
+        location = db.execute(
+            select(Greenhouse.latitude, Greenhouse.longitude).where(Greenhouse.id == greenhouse_id)
+        ).one()
+        coordinates = np.array([[np.nan if value is None else value for value in location]], dtype=np.float64)
+        # Valor instantáneo a mitad de cada hora (las series son medias horarias)
+        outside = _outside.hourly(coordinates, grid_s + 1800)[0]
+
+        series = np.concatenate([resampled.values, np.full((S, H), np.nan)], axis=1)
+
+        xtx = np.zeros((S, H, N_FEATURES, N_FEATURES))
+        xty = np.zeros((S, H, N_FEATURES))
+        samples = np.zeros((S, H))
+        coefficients = np.tile(PERSISTENCE, (S, H, 1))
+        trained_until = np.full(S, np.datetime64(untrained, "s"))
+        for row, sensor_id in enumerate(sensor_ids.tolist()):
+            model = models.get(sensor_id)
+            if model is None:
+                continue
+            xtx[row] = _array(model.xtx, (H, N_FEATURES, N_FEATURES))
+            xty[row] = _array(model.xty, (H, N_FEATURES))
+            samples[row] = _array(model.samples, (H,))
+            coefficients[row] = _array(model.coefficients, (H, N_FEATURES))
+            trained_until[row] = np.datetime64(max(model.trained_until, untrained), "s")
+
+        trained_index = ((trained_until - grid[0]) // np.timedelta64(1, "h")).astype(np.int64)
+        stale = np.flatnonzero(trained_index < measured - 1)
+        if len(stale) and np.isnan(outside[:, :measured]).all():
+            # Sin exterior no hay filas completas: las horas se incorporan cuando vuelva
+            logger.warning("Sin pronóstico exterior para el invernadero %s; modelos sin actualizar", greenhouse_id)
+        elif len(stale):
+            stale_xtx, stale_xty, stale_samples = xtx[stale], xty[stale], samples[stale]
+            _accumulate(
+                series[stale], outside, angle, measured, trained_index[stale],
+                stale_xtx, stale_xty, stale_samples
+            )
+            xtx[stale], xty[stale], samples[stale] = stale_xtx, stale_xty, stale_samples
+            coefficients[stale] = _solve(stale_xtx, stale_xty, stale_samples)
+            ForecastService._save(db, sensor_ids[stale], origin, xtx[stale], xty[stale], samples[stale],
+                                  coefficients[stale])
+
+        # Una fila por horizonte con origen en la última hora completa -> (S, H, p) x (S, H, p)
+        features = np.concatenate(
+            [_design(series, outside, angle, np.array([measured - 1]), h) for h in range(1, H + 1)], axis=1
+        )
+        values = np.einsum("shp,shp->sh", np.nan_to_num(features), coefficients)
+        # Sin predicción si falta una variable que el modelo usa (la persistencia solo necesita y(t))
+        values[(np.isnan(features) & (coefficients != 0)).any(axis=-1)] = np.nan
+
+        return SensorForecast(
+            origin=origin,
+            timestamps=grid[measured:measured + hours],
+            sensor_ids=sensor_ids,
+            sensor_types=resampled.sensor_types,
+            values=values[:, :hours],
+            samples=samples[:, 0],
+            outside=outside[:, measured:measured + hours],
+        )
+
+    @staticmethod
+    def _save(
+            db: Session,
+            sensor_ids: np.ndarray,
+            trained_until: datetime,
+            xtx: np.ndarray,
+            xty: np.ndarray,
+            samples: np.ndarray,
+            coefficients: np.ndarray
+    ) -> None:
+        """Guarda (upsert) los modelos actualizados y confirma"""
+        now = datetime.utcnow()
+        rows = [
+            {
+                "sensor_id": sensor_id,
+                "feature_version": FEATURE_VERSION,
+                "trained_until": trained_until,
+                "xtx": _blob(xtx[row]),
+                "xty": _blob(xty[row]),
+                "samples": _blob(samples[row]),
+                "coefficients": _blob(coefficients[row]),
+                "updated_at": now,
+            }
+            for row, sensor_id in enumerate(sensor_ids.tolist())
+        ]
+        statement = dialect_insert(db, SensorForecastModel.__table__)
+        db.execute(
+            statement.on_conflict_do_update(
+                index_elements=["sensor_id"],
+                set_={column: statement.excluded[column] for column in rows[0] if column != "sensor_id"}
+            ),
+            rows
+        )
+        db.commit()
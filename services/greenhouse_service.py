@@ -1,7 +1,27 @@
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import func, select, true
+from sqlalchemy.orm import Session, selectinload
 from sqlalchemy.exc import IntegrityError
-from typing import Optional, List, Dict, Any
+from sqlalchemy.orm.exc import StaleDataError
+from typing import Optional, List, Dict, Any, Tuple
 from models.greenhouse_model import Greenhouse
+from models.plant_model import Plant
+from models.sensor_model import Sensor
+from services.deletion_service import DeletionService
+from storage.sql import rows_as_dicts
+
+# Columnas de GreenhouseResponse, PlantResponse y SensorResponse, en su orden
+GREENHOUSE_COLUMNS = (
+    Greenhouse.name, Greenhouse.location, Greenhouse.latitude, Greenhouse.longitude,
+    Greenhouse.id, Greenhouse.user_id, Greenhouse.created_at,
+)
+PLANT_COLUMNS = (Plant.name, Plant.type, Plant.id, Plant.greenhouse_id, Plant.created_at)
+SENSOR_COLUMNS = (
+    Sensor.name, Sensor.type, Sensor.id, Sensor.greenhouse_id, Sensor.active, Sensor.installed_at,
+)
+
+
+class ConcurrentUpdateError(RuntimeError):
+    """Otra petición modificó la fila entre la lectura y el commit (version_id_col)"""
 
 
 class GreenhouseService:
@@ -10,7 +30,9 @@ class GreenhouseService:
             db: Session,
             name: str,
             user_id: int,
-            location: Optional[str] = None
+            location: Optional[str] = None,
+            latitude: Optional[float] = None,
+            longitude: Optional[float] = None
     ) -> Optional[Greenhouse]:
         """
         Crea un nuevo invernadero en la base de datos
@@ -20,6 +42,8 @@ class GreenhouseService:
             name: Nombre del invernadero
             user_id: ID del usuario propietario
             location: Ubicación física (opcional)
+            latitude: Latitud (opcional)
+            longitude: Longitud (opcional)
 
         Returns:
             Greenhouse: Invernadero creado o None si hay error
@@ -28,7 +52,9 @@ class GreenhouseService:
             db_greenhouse = Greenhouse(
                 name=name,
                 user_id=user_id,
-                location=location
+                location=location,
+                latitude=latitude,
+                longitude=longitude
             )
 
             db.add(db_greenhouse)
@@ -41,6 +67,7 @@ class GreenhouseService:
             db.rollback()
             return None
 
+    @staticmethod
     def get_greenhouse_by_id(db: Session, greenhouse_id: int) -> Optional[Greenhouse]:
         """
         Obtiene un invernadero por su ID
@@ -54,6 +81,119 @@ class GreenhouseService:
         """
         return db.query(Greenhouse).filter(Greenhouse.id == greenhouse_id).first()
 
+    @staticmethod
+    def get_greenhouse_complete(db: Session, greenhouse_id: int) -> Optional[Greenhouse]:
+        """
+        Obtiene un invernadero con sus plantas y sensores ya cargados
+
+        Las relaciones se cargan con selectinload (una consulta por relación)
+        para que serializar GreenhouseDetailResponse no dispare cargas perezosas.
+
+        Args:
+            db: Sesión de base de datos
+            greenhouse_id: ID del invernadero
+
+        Returns:
+            Greenhouse: Invernadero con plants y sensors o None
+        """
+        return (
+            db.query(Greenhouse)
+            .options(selectinload(Greenhouse.plants), selectinload(Greenhouse.sensors))
+            .filter(Greenhouse.id == greenhouse_id)
+            .first()
+        )
+
+    @staticmethod
+    def get_greenhouse_detail(db: Session, greenhouse_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Obtiene un invernadero con sus plantas y sensores como dicts
+
+        Variante de get_greenhouse_complete para GET /greenhouses/{id}: las
+        mismas tres consultas, pero solo con las columnas de la respuesta y
+        sin construir entidades del ORM, para serializar con orjson sin
+        validar cada planta y sensor con Pydantic.
+
+        Args:
+            db: Sesión de base de datos
+            greenhouse_id: ID del invernadero
+
+        Returns:
+            dict: Invernadero con las listas plants y sensors, o None
+        """
+        greenhouse = rows_as_dicts(db.execute(
+            select(*GREENHOUSE_COLUMNS).where(Greenhouse.id == greenhouse_id)
+        ))
+        if not greenhouse:
+            return None
+
+        detail = greenhouse[0]
+        detail["plants"] = rows_as_dicts(db.execute(
+            select(*PLANT_COLUMNS).where(Plant.greenhouse_id == greenhouse_id).order_by(Plant.id)
+        ))
+        detail["sensors"] = rows_as_dicts(db.execute(
+            select(*SENSOR_COLUMNS).where(Sensor.greenhouse_id == greenhouse_id).order_by(Sensor.id)
+        ))
+        return detail
+
+    @staticmethod
+    def get_greenhouse_version(db: Session, greenhouse_id: int) -> Optional[Tuple[int, ...]]:
+        """
+        Obtiene la versión de un invernadero y de sus plantas y sensores
+
+        Una sola consulta de agregados (sin cargar filas) para calcular el ETag
+        de GreenhouseDetailResponse: version del invernadero y count,
+        sum(version) y sum(id) de plantas y sensores, que cambian con cualquier
+        alta, baja o modificación hecha por el ORM.
+
+        Args:
+            db: Sesión de base de datos
+            greenhouse_id: ID del invernadero
+
+        Returns:
+            tuple: Versión compuesta o None si el invernadero no existe
+        """
+        plants = select(
+            func.count(Plant.id).label("count"),
+            func.coalesce(func.sum(Plant.version), 0).label("versions"),
+            func.coalesce(func.sum(Plant.id), 0).label("ids")
+        ).where(Plant.greenhouse_id == greenhouse_id).subquery()
+        sensors = select(
+            func.count(Sensor.id).label("count"),
+            func.coalesce(func.sum(Sensor.version), 0).label("versions"),
+            func.coalesce(func.sum(Sensor.id), 0).label("ids")
+        ).where(Sensor.greenhouse_id == greenhouse_id).subquery()
+
+        row = db.execute(
+            select(
+                Greenhouse.version,
+                plants.c.count, plants.c.versions, plants.c.ids,
+                sensors.c.count, sensors.c.versions, sensors.c.ids
+            )
+            .select_from(Greenhouse)
+            .join(plants, true())
+            .join(sensors, true())
+            .where(Greenhouse.id == greenhouse_id)
+        ).first()
+        return tuple(row) if row else None
+
+    @staticmethod
+    def user_owns_greenhouse(db: Session, greenhouse_id: int, user_id: int) -> bool:
+        """
+        Verifica si un invernadero pertenece a un usuario
+
+        Args:
+            db: Sesión de base de datos
+            greenhouse_id: ID del invernadero
+            user_id: ID del usuario
+
+        Returns:
+            bool: True si el usuario es el propietario
+        """
+        return db.query(Greenhouse.id).filter(
+            Greenhouse.id == greenhouse_id,
+            Greenhouse.user_id == user_id
+        ).first() is not None
+
     @staticmethod
     def update_greenhouse(
             db: Session,
@@ -71,6 +211,9 @@ class GreenhouseService:
 
         Returns:
             Greenhouse: Invernadero actualizado o None si no existe
+
+        Raises:
+            ConcurrentUpdateError: Si otra petición lo modificó a la vez
         """
         db_greenhouse = GreenhouseService.get_greenhouse_by_id(db, greenhouse_id)
 
@@ -89,12 +232,19 @@ class GreenhouseService:
         except IntegrityError:
             db.rollback()
             return None
+        except StaleDataError as exception:
+            # El UPDATE ... WHERE version = :leída no encontró la fila
+            db.rollback()
+            raise ConcurrentUpdateError("El invernadero se modificó en otra petición") from exception
 
     @staticmethod
     def delete_greenhouse(db: Session, greenhouse_id: int) -> bool:
         """
         Elimina un invernadero de la base de datos
 
+        Sensores, lecturas, plantas y análisis se borran con DELETEs por
+        conjuntos (ver DeletionService), sin cargarlos en memoria.
+
         Args:
             db: Sesión de base de datos
             greenhouse_id: ID del invernadero a eliminar
@@ -107,6 +257,5 @@ class GreenhouseService:
         if not db_greenhouse:
             return False
 
-        db.delete(db_greenhouse)
-        db.commit()
+        DeletionService.delete_greenhouse(db, greenhouse_id)
         return True
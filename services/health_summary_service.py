@@ -0,0 +1,304 @@
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import case, delete, func, select
+from sqlalchemy.orm import Session
+
+from models.greenhouse_health_daily_model import GreenhouseHealthDaily
+from models.plant_analysis_model import PlantAnalysis
+from models.plant_health_label_model import PlantHealthLabel
+from models.plant_model import Plant
+from storage.sql import dialect_insert
+
+# Filas de plants_analysis por lote al reconstruir los agregados
+REBUILD_BATCH_SIZE = 10_000
+_ANALYSIS_FIELDS = ("plant_id", "analysis_type", "result", "confidence", "analyzed_at")
+
+
+def _as_dict(analysis: Any) -> Dict[str, Any]:
+    if isinstance(analysis, dict):
+        return analysis
+    return {field: getattr(analysis, field) for field in _ANALYSIS_FIELDS}
+
+
+def _is_healthy(result: str) -> bool:
+    return "healthy" in result.lower()
+
+
+class HealthSummaryService:
+    """
+    Agregados de salud de plantas mantenidos de forma incremental
+
+    Quien escribe análisis llama a record_analyses en la misma transacción,
+    con un UPSERT por tabla y lote. El dashboard lee solo los agregados
+    (decenas de filas por invernadero y día) en lugar de agrupar plants_analysis.
+    """
+
+    @staticmethod
+    def record_analyses(db: Session, analyses: Iterable[Any]) -> int:
+        """
+        Suma un lote de análisis nuevos a los agregados (sin commit)
+
+        Args:
+            db: Sesión de base de datos (la misma que inserta los análisis)
+            analyses: PlantAnalysis o dicts con plant_id, analysis_type,
+                      result, confidence y analyzed_at
+
+        Returns:
+            int: Análisis agregados
+        """
+        rows = [_as_dict(analysis) for analysis in analyses]
+        if not rows:
+            return 0
+
+        plant_ids = {row["plant_id"] for row in rows}
+        greenhouse_of = dict(db.execute(
+            select(Plant.id, Plant.greenhouse_id).where(Plant.id.in_(plant_ids))
+        ).all())
+
+        # Pre-agregar en memoria: una fila de UPSERT por clave, no por análisis
+        daily: Dict[Tuple, List] = defaultdict(lambda: [0, 0.0, 0])
+        labels: Dict[Tuple, Dict[str, Any]] = {}
+        now = datetime.utcnow()
+        for row in rows:
+            greenhouse_id = greenhouse_of.get(row["plant_id"])
+            if greenhouse_id is None:
+                continue
+            analyzed_at = row.get("analyzed_at") or now
+            confidence = row.get("confidence")
+
+            totals = daily[(greenhouse_id, analyzed_at.date(), row["analysis_type"], row["result"])]
+            totals[0] += 1
+            if confidence is not None:
+                totals[1] += confidence
+                totals[2] += 1
+
+            key = (row["plant_id"], row["analysis_type"], row["result"])
+            label = labels.get(key)
+            if label is None:
+                labels[key] = {
+                    "greenhouse_id": greenhouse_id, "count": 1, "first_seen_at": analyzed_at,
+                    "last_seen_at": analyzed_at, "last_confidence": confidence,
+                }
+                continue
+            label["count"] += 1
+            label["first_seen_at"] = min(label["first_seen_at"], analyzed_at)
+            if analyzed_at >= label["last_seen_at"]:
+                label["last_seen_at"] = analyzed_at
+                label["last_confidence"] = confidence
+
+        if not daily:
+            return 0
+
+        table = GreenhouseHealthDaily.__table__
+        insert_daily = dialect_insert(db, table)
+        excluded = insert_daily.excluded
+        db.execute(
+            insert_daily.on_conflict_do_update(
+                index_elements=["greenhouse_id", "day", "analysis_type", "result"],
+                set_={
+                    "count": table.c.count + excluded.count,
+                    "confidence_sum": table.c.confidence_sum + excluded.confidence_sum,
+                    "confidence_count": table.c.confidence_count + excluded.confidence_count,
+                    "updated_at": excluded.updated_at,
+                }
+            ),
+            [
+                {
+                    "greenhouse_id": greenhouse_id, "day": day, "analysis_type": analysis_type,
+                    "result": result, "count": count, "confidence_sum": confidence_sum,
+                    "confidence_count": confidence_count, "updated_at": now,
+                }
+                for (greenhouse_id, day, analysis_type, result), (count, confidence_sum, confidence_count)
+                in daily.items()
+            ]
+        )
+
+        table = PlantHealthLabel.__table__
+        insert_labels = dialect_insert(db, table)
+        excluded = insert_labels.excluded
+        newer = excluded.last_seen_at >= table.c.last_seen_at
+        db.execute(
+            insert_labels.on_conflict_do_update(
+                index_elements=["plant_id", "analysis_type", "result"],
+                set_={
+                    "count": table.c.count + excluded.count,
+                    "first_seen_at": case(
+                        (excluded.first_seen_at < table.c.first_seen_at, excluded.first_seen_at),
+                        else_=table.c.first_seen_at
+                    ),
+                    "last_seen_at": case((newer, excluded.last_seen_at), else_=table.c.last_seen_at),
+                    "last_confidence": case((newer, excluded.last_confidence), else_=table.c.last_confidence),
+                    "updated_at": excluded.updated_at,
+                }
+            ),
+            [
+                {"plant_id": plant_id, "analysis_type": analysis_type, "result": result, "updated_at": now, **label}
+                for (plant_id, analysis_type, result), label in labels.items()
+            ]
+        )
+        return len(rows)
+
+    @staticmethod
+    def rebuild(db: Session, greenhouse_id: Optional[int] = None, batch_size: int = REBUILD_BATCH_SIZE) -> int:
+        """
+        Recalcula los agregados desde plants_analysis (carga inicial o reparación)
+
+        Recorre los análisis por lotes de id y reutiliza record_analyses, con
+        un commit por lote.
+
+        Args:
+            db: Sesión de base de datos
+            greenhouse_id: Limitar a un invernadero (por defecto todos)
+            batch_size: Análisis por lote
+
+        Returns:
+            int: Análisis agregados
+        """
+        daily_filter, labels_filter = [], []
+        analyses = select(*(getattr(PlantAnalysis, field) for field in _ANALYSIS_FIELDS), PlantAnalysis.id)
+        if greenhouse_id is not None:
+            daily_filter.append(GreenhouseHealthDaily.greenhouse_id == greenhouse_id)
+            labels_filter.append(PlantHealthLabel.greenhouse_id == greenhouse_id)
+            analyses = analyses.where(
+                PlantAnalysis.plant_id.in_(select(Plant.id).where(Plant.greenhouse_id == greenhouse_id))
+            )
+        db.execute(delete(GreenhouseHealthDaily).where(*daily_filter).execution_options(synchronize_session=False))
+        db.execute(delete(PlantHealthLabel).where(*labels_filter).execution_options(synchronize_session=False))
+
+        total, last_id = 0, 0
+        while True:
+            batch = db.execute(
+                analyses.where(PlantAnalysis.id > last_id).order_by(PlantAnalysis.id).limit(batch_size)
+            ).all()
+            if not batch:
+                break
+            total += HealthSummaryService.record_analyses(
+                db, [dict(zip(_ANALYSIS_FIELDS, row[:-1])) for row in batch]
+            )
+            last_id = batch[-1][-1]
+            db.commit()
+        db.commit()
+        return total
+
+    @staticmethod
+    def get_summary_version(db: Session, greenhouse_id: int) -> Tuple[int, Optional[datetime]]:
+        """
+        Versión barata de los agregados de un invernadero para ETags
+
+        Cada análisis nuevo actualiza al menos una fila diaria (y su updated_at).
+
+        Returns:
+            tuple: (filas diarias, max(updated_at))
+        """
+        count, updated_at = db.execute(
+            select(func.count(GreenhouseHealthDaily.id), func.max(GreenhouseHealthDaily.updated_at))
+            .where(GreenhouseHealthDaily.greenhouse_id == greenhouse_id)
+        ).one()
+        return count, updated_at
+
+    @staticmethod
+    def get_summary(
+            db: Session,
+            greenhouse_id: int,
+            days: int = 30,
+            analysis_type: Optional[str] = None,
+            today: Optional[date] = None
+    ) -> Dict[str, Any]:
+        """
+        Resumen de salud de un invernadero en los últimos días
+
+        Args:
+            db: Sesión de base de datos
+            greenhouse_id: ID del invernadero
+            days: Días hacia atrás (incluido hoy)
+            analysis_type: Filtrar por tipo (health | pest)
+            today: Día de referencia (por defecto hoy en UTC)
+
+        Returns:
+            dict: Distribución de etiquetas, tendencia diaria y etiquetas por planta
+        """
+        end = today or datetime.utcnow().date()
+        start = end - timedelta(days=days - 1)
+
+        daily_query = select(
+            GreenhouseHealthDaily.day, GreenhouseHealthDaily.analysis_type, GreenhouseHealthDaily.result,
+            GreenhouseHealthDaily.count, GreenhouseHealthDaily.confidence_sum, GreenhouseHealthDaily.confidence_count
+        ).where(
+            GreenhouseHealthDaily.greenhouse_id == greenhouse_id,
+            GreenhouseHealthDaily.day >= start,
+            GreenhouseHealthDaily.day <= end
+        )
+        labels_query = (
+            select(
+                PlantHealthLabel.plant_id, Plant.name, PlantHealthLabel.analysis_type, PlantHealthLabel.result,
+                PlantHealthLabel.count, PlantHealthLabel.first_seen_at, PlantHealthLabel.last_seen_at,
+                PlantHealthLabel.last_confidence
+            )
+            .join(Plant, Plant.id == PlantHealthLabel.plant_id)
+            .where(PlantHealthLabel.greenhouse_id == greenhouse_id)
+            .order_by(PlantHealthLabel.plant_id, PlantHealthLabel.first_seen_at)
+        )
+        if analysis_type:
+            daily_query = daily_query.where(GreenhouseHealthDaily.analysis_type == analysis_type)
+            labels_query = labels_query.where(PlantHealthLabel.analysis_type == analysis_type)
+
+        distribution: Dict[Tuple[str, str], List] = defaultdict(lambda: [0, 0.0, 0])
+        trend: Dict[date, Dict[str, Any]] = {}
+        total = 0
+        for day, row_type, result, count, confidence_sum, confidence_count in db.execute(daily_query):
+            total += count
+            label = distribution[(row_type, result)]
+            label[0] += count
+            label[1] += confidence_sum
+            label[2] += confidence_count
+
+            point = trend.setdefault(day, {"count": 0, "healthy": 0, "confidence_sum": 0.0,
+                                           "confidence_count": 0, "labels": {}})
+            point["count"] += count
+            point["healthy"] += count if _is_healthy(result) else 0
+            point["confidence_sum"] += confidence_sum
+            point["confidence_count"] += confidence_count
+            point["labels"][result] = point["labels"].get(result, 0) + count
+
+        return {
+            "greenhouse_id": greenhouse_id,
+            "start": start,
+            "end": end,
+            "total_analyses": total,
+            "distribution": sorted(
+                (
+                    {
+                        "analysis_type": row_type,
+                        "result": result,
+                        "count": count,
+                        "share": count / total if total else 0.0,
+                        "mean_confidence": confidence_sum / confidence_count if confidence_count else None,
+                    }
+                    for (row_type, result), (count, confidence_sum, confidence_count) in distribution.items()
+                ),
+                key=lambda item: -item["count"]
+            ),
+            "trend": [
+                {
+                    "day": day,
+                    "count": point["count"],
+                    "healthy_ratio": point["healthy"] / point["count"],
+                    "mean_confidence": (
+                        point["confidence_sum"] / point["confidence_count"] if point["confidence_count"] else None
+                    ),
+                    "labels": point["labels"],
+                }
+                for day, point in sorted(trend.items())
+            ],
+            "plants": [
+                {
+                    "plant_id": plant_id, "plant_name": plant_name, "analysis_type": row_type,
+                    "result": result, "count": count, "first_seen_at": first_seen_at,
+                    "last_seen_at": last_seen_at, "last_confidence": last_confidence,
+                }
+                for plant_id, plant_name, row_type, result, count, first_seen_at, last_seen_at, last_confidence
+                in db.execute(labels_query)
+            ],
+        }
@@ -0,0 +1,138 @@
+import asyncio
+import hashlib
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import delete
+from sqlalchemy.orm import Session
+
+from models.idempotency_key_model import IdempotencyKey
+from storage.sql import dialect_insert
+
+logger = logging.getLogger(__name__)
+
+# Tiempo durante el que un reintento con la misma clave recibe la respuesta original
+IDEMPOTENCY_TTL = timedelta(hours=int(os.getenv("IDEMPOTENCY_TTL_HOURS", "24")))
+
+
+class IdempotencyKeyMismatch(ValueError):
+    """La clave ya se usó con un cuerpo de petición distinto"""
+
+
+def fingerprint(body: bytes) -> str:
+    return hashlib.sha256(body).hexdigest()
+
+
+class IdempotencyService:
+    """
+    Claves de idempotencia de las escrituras (cabecera Idempotency-Key)
+
+    Uso en un endpoint, todo en la misma transacción:
+
+        stored = IdempotencyService.reserve(db, scope, key, fingerprint(body))
+        if stored: devolver stored.status_code / stored.response_body
+        ... escritura sin commit ...
+        IdempotencyService.complete(db, scope, key, 200, body)   # commit
+
+    Si dos reintentos llegan a la vez, el INSERT del segundo espera al commit
+    del primero (índice único) y encuentra su respuesta.
+    """
+
+    @staticmethod
+    def reserve(db: Session, scope: str, key: str, request_fingerprint: str) -> Optional[IdempotencyKey]:
+        """
+        Reserva la clave o devuelve la respuesta ya guardada
+
+        Args:
+            db: Sesión de base de datos
+            scope: Endpoint (ej. "POST /sensors/readings")
+            key: Valor de Idempotency-Key
+            request_fingerprint: Huella del cuerpo (ver fingerprint)
+
+        Returns:
+            IdempotencyKey: Respuesta guardada, o None si la petición debe ejecutarse
+
+        Raises:
+            IdempotencyKeyMismatch: Si la clave se usó con otro cuerpo
+        """
+        now = datetime.utcnow()
+        stored = db.get(IdempotencyKey, (scope, key))
+        if stored is not None and stored.expires_at <= now:
+            # Caducada: la clave vuelve a estar libre
+            db.delete(stored)
+            db.flush()
+            stored = None
+
+        if stored is None:
+            table = IdempotencyKey.__table__
+            reserved = db.execute(
+                dialect_insert(db, table)
+                .values(scope=scope, key=key, fingerprint=request_fingerprint,
+                        created_at=now, expires_at=now + IDEMPOTENCY_TTL)
+                .on_conflict_do_nothing(index_elements=["scope", "key"])
+                .returning(table.c.key)
+            ).first()
+            if reserved is not None:
+                return None
+            # Otra petición con la misma clave confirmó entre medias
+            stored = db.get(IdempotencyKey, (scope, key), populate_existing=True)
+
+        if stored.fingerprint != request_fingerprint:
+            raise IdempotencyKeyMismatch("La clave de idempotencia ya se usó con otra petición")
+        return stored
+
+    @staticmethod
+    def complete(db: Session, scope: str, key: str, status_code: int, response_body: bytes) -> None:
+        """
+        Guarda la respuesta y confirma la transacción (junto con la escritura que protege)
+
+        Args:
+            db: Sesión de base de datos
+            scope: Endpoint
+            key: Valor de Idempotency-Key
+            status_code: Código HTTP de la respuesta
+            response_body: Cuerpo de la respuesta
+        """
+        stored = db.get(IdempotencyKey, (scope, key))
+        stored.status_code = status_code
+        stored.response_body = response_body
+        db.commit()
+
+    @staticmethod
+    def purge_expired(db: Session) -> int:
+        """
+        Borra las claves caducadas
+
+        Returns:
+            int: Claves borradas
+        """
+        result = db.execute(
+            delete(IdempotencyKey)
+            .where(IdempotencyKey.expires_at <= datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        return result.rowcount
+
+
+async def cleanup_loop(interval_seconds: float = 3600.0) -> None:
+    """Tarea del lifespan: borra periódicamente las claves caducadas"""
+    from database_config import SessionLocal
+
+    def purge() -> int:
+        db = SessionLocal()
+        try:
+            return IdempotencyService.purge_expired(db)
+        finally:
+            db.close()
+
+    while True:
+        try:
+            purged = await asyncio.to_thread(purge)
+            if purged:
+                logger.info("Claves de idempotencia caducadas borradas: %s", purged)
+        except Exception:
+            logger.exception("Error borrando claves de idempotencia caducadas")
+        await asyncio.sleep(interval_seconds)
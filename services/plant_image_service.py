@@ -0,0 +1,146 @@
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from typing import Any, List, Optional, Tuple
+from models.plant_analysis_model import PlantAnalysis
+from models.plant_image_model import PlantImage
+from storage.image_store import ImageStore, image_store
+from services.health_summary_service import HealthSummaryService
+
+
+class PlantImageService:
+    @staticmethod
+    def add_image(
+            db: Session,
+            plant_id: int,
+            data: bytes,
+            store: ImageStore = image_store
+    ) -> Tuple[PlantImage, bool]:
+        """
+        Guarda una imagen de una planta en el almacén y la registra
+
+        Si el contenido ya existe en el almacén no se vuelve a escribir ni a
+        redimensionar; si además ya estaba asociado a la planta se devuelve la
+        fila existente.
+
+        Args:
+            db: Sesión de base de datos
+            plant_id: ID de la planta
+            data: Bytes de la imagen
+            store: Almacén de imágenes
+
+        Returns:
+            tuple: (PlantImage, True si el contenido ya estaba en el almacén)
+
+        Raises:
+            InvalidImageError: Si los bytes no son una imagen válida
+        """
+        stored = store.put(data)
+
+        existing = PlantImageService.get_plant_image(db, plant_id, stored.sha256)
+        if existing:
+            return existing, True
+
+        db_image = PlantImage(
+            plant_id=plant_id,
+            sha256=stored.sha256,
+            content_type=stored.content_type,
+            extension=stored.extension,
+            width=stored.width,
+            height=stored.height,
+            size_bytes=stored.size_bytes
+        )
+        try:
+            db.add(db_image)
+            db.commit()
+            db.refresh(db_image)
+        except IntegrityError:
+            # Subida simultánea de la misma imagen
+            db.rollback()
+            return PlantImageService.get_plant_image(db, plant_id, stored.sha256), True
+        return db_image, not stored.created
+
+    @staticmethod
+    def get_plant_image(db: Session, plant_id: int, sha256: str) -> Optional[PlantImage]:
+        return db.query(PlantImage).filter(
+            PlantImage.plant_id == plant_id,
+            PlantImage.sha256 == sha256
+        ).first()
+
+    @staticmethod
+    def get_images(db: Session, plant_id: int) -> List[PlantImage]:
+        """
+        Obtiene las imágenes de una planta, de la más reciente a la más antigua
+
+        Args:
+            db: Sesión de base de datos
+            plant_id: ID de la planta
+
+        Returns:
+            List[PlantImage]: Imágenes de la planta
+        """
+        return (
+            db.query(PlantImage)
+            .filter(PlantImage.plant_id == plant_id)
+            .order_by(PlantImage.uploaded_at.desc(), PlantImage.id.desc())
+            .all()
+        )
+
+    @staticmethod
+    def analyze_image(
+            db: Session,
+            image: PlantImage,
+            client: Any,
+            store: ImageStore = image_store
+    ) -> PlantAnalysis:
+        """
+        Clasifica la variante "model" de una imagen y guarda el análisis
+
+        La variante ya tiene el tamaño de entrada del modelo: no se decodifica
+        el original.
+
+        Args:
+            db: Sesión de base de datos
+            image: Imagen registrada
+            client: Cliente del modelo (PlantHealthClient o remoto)
+            store: Almacén de imágenes
+
+        Returns:
+            PlantAnalysis: Análisis creado, o el existente si esta imagen ya se
+            analizó con la misma versión del modelo
+
+        Raises:
+            OSError/ValueError: Si la imagen no se puede leer o clasificar
+            RuntimeError/ConnectionError: Si falla el modelo o el servidor de inferencia
+        """
+        model_version = getattr(client, "model_version", None)
+        image_path = store.relative_path(image.sha256, "model")
+        existing = db.execute(
+            select(PlantAnalysis).where(
+                PlantAnalysis.plant_id == image.plant_id,
+                PlantAnalysis.image_path == image_path,
+                PlantAnalysis.model_version == model_version,
+            )
+        ).scalars().first()
+        if existing is not None:
+            return existing
+
+        with open(store.path(image.sha256, "model"), "rb") as file:
+            predictions = client.classify_bytes(file.read())
+        top = predictions[0]
+
+        analysis = PlantAnalysis(
+            plant_id=image.plant_id,
+            analysis_type="health",
+            result=top["label"][:100],
+            confidence=float(top["score"]),
+            model_version=model_version,
+            image_path=image_path
+        )
+        db.add(analysis)
+        db.flush()
+        # Agregados del resumen de salud en la misma transacción que el análisis
+        HealthSummaryService.record_analyses(db, [analysis])
+        db.commit()
+        db.refresh(analysis)
+        return analysis
@@ -0,0 +1,118 @@
+from sqlalchemy import func, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from typing import Any, Dict, List, Optional, Tuple
+from models.plant_model import Plant
+from models.plant_analysis_model import PlantAnalysis
+from storage.change_tracking import log_changes
+from storage.sql import rows_as_dicts
+
+# Columnas de PlantAnalysisResponse, en su orden
+ANALYSIS_COLUMNS = (
+    PlantAnalysis.analysis_type, PlantAnalysis.result, PlantAnalysis.confidence,
+    PlantAnalysis.id, PlantAnalysis.plant_id, PlantAnalysis.analyzed_at, PlantAnalysis.model_version,
+)
+
+
+class PlantService:
+    @staticmethod
+    def get_plant_by_id(db: Session, plant_id: int) -> Optional[Plant]:
+        """
+        Obtiene una planta por su ID
+
+        Args:
+            db: Sesión de base de datos
+            plant_id: ID de la planta
+
+        Returns:
+            Plant: Planta encontrada o None
+        """
+        return db.query(Plant).filter(Plant.id == plant_id).first()
+
+    @staticmethod
+    def create_plants(db: Session, plants: List[Dict[str, Any]]) -> Optional[List[Plant]]:
+        """
+        Crea varias plantas en una sola sentencia y una sola transacción
+
+        INSERT ... RETURNING con todas las filas: un viaje a la base de datos
+        en lugar de un add/commit/refresh por planta. Al no pasar por el flush
+        del ORM, los cambios se anotan a mano para la sincronización.
+
+        Args:
+            db: Sesión de base de datos
+            plants: Dicts con name, type y greenhouse_id (ya validados)
+
+        Returns:
+            List[Plant]: Plantas creadas, en el mismo orden, o None si hay error
+        """
+        if not plants:
+            return []
+        try:
+            created = db.scalars(
+                insert(Plant).returning(Plant, sort_by_parameter_order=True), plants
+            ).all()
+            log_changes(db, "plants", [(plant.id, plant.greenhouse_id) for plant in created])
+            # RETURNING ya trajo todas las columnas: fuera de la sesión el commit no las
+            # expira y serializar la respuesta no lanza un SELECT por fila
+            for plant in created:
+                db.expunge(plant)
+            db.commit()
+            return created
+
+        except IntegrityError:
+            db.rollback()
+            return None
+
+    @staticmethod
+    def get_analyses(
+            db: Session,
+            plant_id: int,
+            analysis_type: Optional[str] = None,
+            skip: int = 0,
+            limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        """
+        Obtiene los análisis de una planta, del más reciente al más antiguo
+
+        Solo se leen las columnas de PlantAnalysisResponse, como dicts que el
+        endpoint serializa directamente.
+
+        Args:
+            db: Sesión de base de datos
+            plant_id: ID de la planta
+            analysis_type: Filtrar por tipo (health | pest, opcional)
+            skip: Número de análisis a saltar
+            limit: Número máximo de análisis
+
+        Returns:
+            list: Análisis de la planta (dicts con ANALYSIS_COLUMNS)
+        """
+        query = select(*ANALYSIS_COLUMNS).where(PlantAnalysis.plant_id == plant_id)
+        if analysis_type:
+            query = query.where(PlantAnalysis.analysis_type == analysis_type)
+        return rows_as_dicts(db.execute(
+            query.order_by(PlantAnalysis.analyzed_at.desc(), PlantAnalysis.id.desc())
+            .offset(skip)
+            .limit(limit)
+        ))
+
+    @staticmethod
+    def get_analyses_version(db: Session, plant_id: int) -> Tuple[int, int, int]:
+        """
+        Versión barata de los análisis de una planta para ETags
+
+        Los análisis solo se insertan o se borran: count, max(id) y sum(id)
+        cambian en ambos casos.
+
+        Args:
+            db: Sesión de base de datos
+            plant_id: ID de la planta
+
+        Returns:
+            tuple: (count, max(id), sum(id))
+        """
+        count, max_id, sum_id = db.execute(
+            select(func.count(PlantAnalysis.id), func.max(PlantAnalysis.id), func.sum(PlantAnalysis.id))
+            .where(PlantAnalysis.plant_id == plant_id)
+        ).one()
+        return count, max_id or 0, sum_id or 0
@@ -0,0 +1,431 @@
+import os
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+
+from models.sensor_model import Sensor
+from models.sensor_reading_chunk_model import SensorReadingChunk
+from models.sensor_reading_model import SensorReading
+from services.sensor_monitor_service import SensorMonitorService
+from storage.partitions import READINGS_PARTITIONING, ensure_partitions_for
+from storage.sql import dialect_insert
+from storage.timeseries_codec import decode_chunk, decode_timestamps, encode_chunk
+
+# rows: cada lectura es una fila | compressed: los periodos cerrados se compactan en bloques
+STORAGE_MODE = os.getenv("READINGS_STORAGE_MODE", "rows").lower()
+CHUNK_PERIOD = timedelta(hours=int(os.getenv("READINGS_CHUNK_HOURS", "24")))
+
+_EPOCH = datetime(1970, 1, 1)
+# Filas por sentencia INSERT en la ingesta
+INGEST_BATCH_SIZE = 1_000
+
+# (timestamps datetime64[us], valores float64)
+Series = Tuple[np.ndarray, np.ndarray]
+
+
+def _empty_series() -> Series:
+    return np.empty(0, dtype="datetime64[us]"), np.empty(0, dtype=np.float64)
+
+
+def _to_micros(moments: Iterable[datetime]) -> np.ndarray:
+    return np.array(list(moments), dtype="datetime64[us]").astype(np.int64)
+
+
+def _period_start(moment: datetime, period: timedelta = CHUNK_PERIOD) -> datetime:
+    elapsed = (moment - _EPOCH) // period
+    return _EPOCH + elapsed * period
+
+
+def _slice(timestamps_us: np.ndarray, values: np.ndarray, start: Optional[datetime], end: Optional[datetime]):
+    lo = np.searchsorted(timestamps_us, _to_micros([start])[0]) if start else 0
+    hi = np.searchsorted(timestamps_us, _to_micros([end])[0]) if end else len(timestamps_us)
+    return timestamps_us[lo:hi], values[lo:hi]
+
+
+def _drop_compacted(db: Session, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Quita las lecturas que ya están en un bloque comprimido
+
+    Una sola consulta acotada al rango de fechas del lote; en la ingesta
+    normal (lecturas recientes, periodo aún abierto) no devuelve bloques y
+    no se descomprime nada.
+
+    Args:
+        db: Sesión de base de datos
+        rows: Filas a insertar (sensor_id, value, recorded_at)
+
+    Returns:
+        list: Las filas cuyo (sensor_id, recorded_at) no está en ningún bloque
+    """
+    if not rows:
+        return rows
+    moments = [row["recorded_at"] for row in rows]
+    chunks = db.execute(
+        select(SensorReadingChunk.sensor_id, SensorReadingChunk.timestamps).where(
+            SensorReadingChunk.sensor_id.in_({row["sensor_id"] for row in rows}),
+            SensorReadingChunk.start_at <= max(moments),
+            SensorReadingChunk.end_at > min(moments)
+        )
+    ).all()
+    if not chunks:
+        return rows
+
+    # Solo hacen falta las marcas de tiempo, no los valores
+    compacted = set()
+    for sensor_id, timestamps_blob in chunks:
+        compacted.update((sensor_id, micros) for micros in decode_timestamps(timestamps_blob).tolist())
+
+    micros = _to_micros(moments).tolist()
+    return [row for row, moment in zip(rows, micros) if (row["sensor_id"], moment) not in compacted]
+
+
+class ReadingStorageService:
+    @staticmethod
+    def ingest(db: Session, readings: Iterable[Dict[str, Any]], commit: bool = True) -> Dict[str, Any]:
+        """
+        Inserta lecturas descartando duplicados
+
+        Los duplicados dentro del lote se quitan en memoria, los que ya están
+        compactados en un bloque se descartan frente a sus marcas de tiempo y
+        los que están en la tabla los descarta INSERT ... ON CONFLICT DO
+        NOTHING sobre el índice único (sensor_id, recorded_at): ni errores de
+        integridad ni rollbacks fila a fila.
+
+        Args:
+            db: Sesión de base de datos
+            readings: Dicts con sensor_id, value y recorded_at (None = ahora)
+            commit: False para confirmar junto con otras escrituras (ej. la clave de idempotencia)
+
+        Returns:
+            dict: received, inserted, duplicates y unknown_sensors
+        """
+        now = datetime.utcnow()
+        unique: Dict[Tuple[int, datetime], Dict[str, Any]] = {}
+        received = 0
+        for reading in readings:
+            received += 1
+            recorded_at = reading.get("recorded_at") or now
+            # Con zona horaria se normaliza a UTC sin zona, como el resto de la tabla
+            if recorded_at.tzinfo is not None:
+                recorded_at = (recorded_at - recorded_at.utcoffset()).replace(tzinfo=None)
+            # Dentro del lote gana la primera copia, igual que frente a la tabla
+            unique.setdefault(
+                (reading["sensor_id"], recorded_at),
+                {"sensor_id": reading["sensor_id"], "value": reading["value"], "recorded_at": recorded_at}
+            )
+
+        sensor_ids = {sensor_id for sensor_id, _ in unique}
+        known = set(db.execute(select(Sensor.id).where(Sensor.id.in_(sensor_ids))).scalars()) if sensor_ids else set()
+        rows: List[Dict[str, Any]] = [row for key, row in unique.items() if key[0] in known]
+        candidates = len(rows)
+        # El índice único solo cubre las filas: un reintento de una lectura ya compactada se insertaría otra vez
+        rows = _drop_compacted(db, rows)
+
+        if READINGS_PARTITIONING and rows:
+            # Una lectura sin partición haría fallar el lote entero
+            ensure_partitions_for(db.get_bind(), (row["recorded_at"] for row in rows))
+
+        table = SensorReading.__table__
+        statement = dialect_insert(db, table).on_conflict_do_nothing(
+            index_elements=["sensor_id", "recorded_at"]
+        ).returning(table.c.sensor_id, table.c.recorded_at, table.c.value)
+        inserted_rows = []
+        for lo in range(0, len(rows), INGEST_BATCH_SIZE):
+            inserted_rows.extend(db.execute(statement, rows[lo:lo + INGEST_BATCH_SIZE]).all())
+        inserted = len(inserted_rows)
+        # Última lectura y cadencia para el monitor de la flota, en la misma transacción
+        SensorMonitorService.record_readings(db, inserted_rows)
+        if commit:
+            db.commit()
+
+        return {
+            "received": received,
+            "inserted": inserted,
+            # Repetidas dentro del lote + ya compactadas + ya presentes en la tabla
+            "duplicates": (received - len(unique)) + (candidates - inserted),
+            "unknown_sensors": sorted(sensor_ids - known),
+        }
+
+    @staticmethod
+    def compact_chunk(
+            db: Session,
+            sensor_id: int,
+            start_at: datetime,
+            end_at: datetime
+    ) -> Optional[SensorReadingChunk]:
+        """
+        Mueve las lecturas de un sensor en [start_at, end_at) a un bloque comprimido
+
+        Si ya existe un bloque para ese periodo (lecturas que llegaron tarde),
+        se fusiona con las nuevas filas.
+
+        Args:
+            db: Sesión de base de datos
+            sensor_id: ID del sensor
+            start_at: Inicio del periodo (incluido)
+            end_at: Fin del periodo (excluido)
+
+        Returns:
+            SensorReadingChunk: Bloque creado/actualizado o None si no había lecturas
+        """
+        rows = db.execute(
+            select(SensorReading.recorded_at, SensorReading.value)
+            .where(
+                SensorReading.sensor_id == sensor_id,
+                SensorReading.recorded_at >= start_at,
+                SensorReading.recorded_at < end_at
+            )
+            .order_by(SensorReading.recorded_at)
+        ).all()
+        if not rows:
+            return None
+
+        timestamps = _to_micros(row[0] for row in rows)
+        values = np.fromiter((row[1] for row in rows), dtype=np.float64, count=len(rows))
+
+        chunk = db.query(SensorReadingChunk).filter(
+            SensorReadingChunk.sensor_id == sensor_id,
+            SensorReadingChunk.start_at == start_at
+        ).first()
+        if chunk is not None:
+            old_timestamps, old_values = decode_chunk(chunk.timestamps, chunk.values)
+            timestamps = np.concatenate((old_timestamps, timestamps))
+            values = np.concatenate((old_values, values))
+            order = np.argsort(timestamps, kind="stable")
+            timestamps, values = timestamps[order], values[order]
+            # Reintento tardío de una lectura ya compactada: se queda la del bloque
+            keep = np.r_[True, np.diff(timestamps) != 0]
+            timestamps, values = timestamps[keep], values[keep]
+        else:
+            chunk = SensorReadingChunk(sensor_id=sensor_id, start_at=start_at, end_at=end_at)
+            db.add(chunk)
+
+        chunk.timestamps, chunk.values = encode_chunk(timestamps, values)
+        chunk.count = int(values.size)
+        chunk.min_value = float(values.min())
+        chunk.max_value = float(values.max())
+        chunk.sum_value = float(values.sum())
+
+        db.execute(
+            delete(SensorReading).where(
+                SensorReading.sensor_id == sensor_id,
+                SensorReading.recorded_at >= start_at,
+                SensorReading.recorded_at < end_at
+            )
+        )
+        db.commit()
+        return chunk
+
+    @staticmethod
+    def compact_closed_chunks(
+            db: Session,
+            closed_before: Optional[datetime] = None,
+            period: timedelta = CHUNK_PERIOD
+    ) -> int:
+        """
+        Compacta todos los periodos cerrados (anteriores a closed_before)
+
+        Args:
+            db: Sesión de base de datos
+            closed_before: Solo se compactan periodos que terminan antes de este
+                          instante (por defecto, el inicio del periodo actual)
+            period: Duración de cada bloque
+
+        Returns:
+            int: Número de bloques escritos
+        """
+        cutoff = _period_start(closed_before or datetime.utcnow(), period)
+        pending = db.execute(
+            select(SensorReading.sensor_id, func.min(SensorReading.recorded_at))
+            .where(SensorReading.recorded_at < cutoff)
+            .group_by(SensorReading.sensor_id)
+        ).all()
+
+        written = 0
+        for sensor_id, oldest in pending:
+            start_at = _period_start(oldest, period)
+            while start_at < cutoff:
+                if ReadingStorageService.compact_chunk(db, sensor_id, start_at, start_at + period):
+                    written += 1
+                start_at += period
+        return written
+
+    @staticmethod
+    def load_many(
+            db: Session,
+            sensor_ids: Iterable[int],
+            start: Optional[datetime] = None,
+            end: Optional[datetime] = None
+    ) -> Dict[int, Series]:
+        """
+        Carga las series de varios sensores en [start, end) con dos consultas
+        (bloques comprimidos + filas sin compactar), sin importar el modo
+
+        Args:
+            db: Sesión de base de datos
+            sensor_ids: IDs de los sensores
+            start: Inicio del rango (incluido, opcional)
+            end: Fin del rango (excluido, opcional)
+
+        Returns:
+            dict: sensor_id -> (timestamps datetime64[us], valores float64) ordenados
+        """
+        sensor_ids = list(sensor_ids)
+        parts: Dict[int, list] = {sensor_id: [] for sensor_id in sensor_ids}
+        if not sensor_ids:
+            return {}
+
+        chunk_query = select(
+            SensorReadingChunk.sensor_id, SensorReadingChunk.timestamps, SensorReadingChunk.values
+        ).where(SensorReadingChunk.sensor_id.in_(sensor_ids))
+        if start:
+            chunk_query = chunk_query.where(SensorReadingChunk.end_at > start)
+        if end:
+            chunk_query = chunk_query.where(SensorReadingChunk.start_at < end)
+        for sensor_id, timestamps_blob, values_blob in db.execute(chunk_query.order_by(SensorReadingChunk.start_at)):
+            timestamps, values = decode_chunk(timestamps_blob, values_blob)
+            parts[sensor_id].append(_slice(timestamps, values, start, end))
+
+        row_query = select(
+            SensorReading.sensor_id, SensorReading.recorded_at, SensorReading.value
+        ).where(SensorReading.sensor_id.in_(sensor_ids))
+        if start:
+            row_query = row_query.where(SensorReading.recorded_at >= start)
+        if end:
+            row_query = row_query.where(SensorReading.recorded_at < end)
+        rows = db.execute(row_query.order_by(SensorReading.sensor_id, SensorReading.recorded_at)).all()
+
+        if rows:
+            ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+            timestamps = _to_micros(row[1] for row in rows)
+            values = np.fromiter((row[2] for row in rows), dtype=np.float64, count=len(rows))
+            # Filas ordenadas por sensor: cortar en los cambios de sensor_id
+            boundaries = np.flatnonzero(np.diff(ids)) + 1
+            for lo, hi in zip(np.r_[0, boundaries], np.r_[boundaries, len(ids)]):
+                parts[int(ids[lo])].append((timestamps[lo:hi], values[lo:hi]))
+
+        series: Dict[int, Series] = {}
+        for sensor_id, pieces in parts.items():
+            if not pieces:
+                series[sensor_id] = _empty_series()
+                continue
+            timestamps = np.concatenate([piece[0] for piece in pieces])
+            values = np.concatenate([piece[1] for piece in pieces])
+            if len(pieces) > 1:
+                order = np.argsort(timestamps, kind="stable")
+                timestamps, values = timestamps[order], values[order]
+            series[sensor_id] = (timestamps.astype("datetime64[us]"), values)
+        return series
+
+    @staticmethod
+    def load_series(
+            db: Session,
+            sensor_id: int,
+            start: Optional[datetime] = None,
+            end: Optional[datetime] = None
+    ) -> Series:
+        """
+        Carga la serie de un sensor en [start, end) como arrays de NumPy
+
+        Returns:
+            tuple: (timestamps datetime64[us], valores float64)
+        """
+        return ReadingStorageService.load_many(db, [sensor_id], start, end)[sensor_id]
+
+    @staticmethod
+    def aggregate(
+            db: Session,
+            sensor_id: int,
+            start: Optional[datetime] = None,
+            end: Optional[datetime] = None
+    ) -> Dict[str, Optional[float]]:
+        """
+        Calcula count/min/max/mean de un sensor en [start, end)
+
+        Los bloques que caen enteros dentro del rango se agregan con sus
+        estadísticas guardadas, sin descomprimir.
+
+        Returns:
+            dict: count, min, max y mean (None si no hay lecturas)
+        """
+        count, total = 0, 0.0
+        minimum, maximum = np.inf, -np.inf
+
+        chunk_query = db.query(SensorReadingChunk).filter(SensorReadingChunk.sensor_id == sensor_id)
+        if start:
+            chunk_query = chunk_query.filter(SensorReadingChunk.end_at > start)
+        if end:
+            chunk_query = chunk_query.filter(SensorReadingChunk.start_at < end)
+        for chunk in chunk_query:
+            if (not start or chunk.start_at >= start) and (not end or chunk.end_at <= end):
+                count += chunk.count
+                total += chunk.sum_value
+                minimum = min(minimum, chunk.min_value)
+                maximum = max(maximum, chunk.max_value)
+                continue
+            timestamps, values = decode_chunk(chunk.timestamps, chunk.values)
+            _, values = _slice(timestamps, values, start, end)
+            if values.size:
+                count += int(values.size)
+                total += float(values.sum())
+                minimum = min(minimum, float(values.min()))
+                maximum = max(maximum, float(values.max()))
+
+        row_query = select(
+            func.count(SensorReading.id), func.sum(SensorReading.value),
+            func.min(SensorReading.value), func.max(SensorReading.value)
+        ).where(SensorReading.sensor_id == sensor_id)
+        if start:
+            row_query = row_query.where(SensorReading.recorded_at >= start)
+        if end:
+            row_query = row_query.where(SensorReading.recorded_at < end)
+        row_count, row_sum, row_min, row_max = db.execute(row_query).one()
+        if row_count:
+            count += row_count
+            total += row_sum
+            minimum = min(minimum, row_min)
+            maximum = max(maximum, row_max)
+
+        if not count:
+            return {"count": 0, "min": None, "max": None, "mean": None}
+        return {"count": count, "min": float(minimum), "max": float(maximum), "mean": total / count}
+
+    @staticmethod
+    def range_version(
+            db: Session,
+            sensor_id: int,
+            start: Optional[datetime] = None,
+            end: Optional[datetime] = None
+    ) -> Tuple[int, ...]:
+        """
+        Versión barata de las lecturas de un sensor en [start, end) para ETags
+
+        Las lecturas solo se insertan, se compactan o se borran por retención:
+        count/max(id) de las filas y count/sum(count)/max(id) de los bloques
+        cambian en cualquiera de esos casos, sin leer ni descomprimir valores.
+
+        Returns:
+            tuple: Enteros que cambian cuando cambian las lecturas del rango
+        """
+        row_query = select(
+            func.count(SensorReading.id), func.max(SensorReading.id)
+        ).where(SensorReading.sensor_id == sensor_id)
+        if start:
+            row_query = row_query.where(SensorReading.recorded_at >= start)
+        if end:
+            row_query = row_query.where(SensorReading.recorded_at < end)
+
+        chunk_query = select(
+            func.count(SensorReadingChunk.id), func.sum(SensorReadingChunk.count), func.max(SensorReadingChunk.id)
+        ).where(SensorReadingChunk.sensor_id == sensor_id)
+        if start:
+            chunk_query = chunk_query.where(SensorReadingChunk.end_at > start)
+        if end:
+            chunk_query = chunk_query.where(SensorReadingChunk.start_at < end)
+
+        row_count, row_max_id = db.execute(row_query).one()
+        chunk_count, chunk_readings, chunk_max_id = db.execute(chunk_query).one()
+        return row_count, row_max_id or 0, chunk_count, chunk_readings or 0, chunk_max_id or 0
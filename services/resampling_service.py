@@ -0,0 +1,218 @@
+import warnings
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from models.sensor_model import Sensor
+from services.reading_storage_service import ReadingStorageService
+
+METHODS = ('none', 'ffill', 'linear', 'median')
+
+# Bits de la matriz de flags
+FLAG_GAP = 1  # el intervalo no tenía lecturas
+FLAG_OUTLIER = 2  # la media del intervalo se descartó por atípica
+FLAG_FILLED = 4  # el valor es interpolado/rellenado, no medido
+
+# Umbral del z-score robusto (mediana/MAD) a partir del cual un valor es atípico
+OUTLIER_Z = 3.5
+MAX_CELLS = 5_000_000
+
+
+@dataclass
+class ResampledSeries:
+    """Series regulares de todos los sensores de un invernadero, en columnas"""
+    timestamps: np.ndarray  # (n,) datetime64[s], inicio de cada intervalo
+    sensor_ids: np.ndarray  # (S,) int64
+    sensor_types: List[str]  # (S,)
+    values: np.ndarray  # (S, n) float64, NaN donde no hay dato
+    flags: np.ndarray  # (S, n) uint8, combinación de FLAG_*
+    counts: np.ndarray  # (S, n) int32, lecturas crudas por intervalo
+
+
+def _naive_utc(moment: datetime) -> datetime:
+    """Con zona horaria se pasa a UTC sin zona, como las lecturas guardadas (ver ingest)"""
+    if moment.tzinfo is not None:
+        return (moment - moment.utcoffset()).replace(tzinfo=None)
+    return moment
+
+
+def _forward_fill_index(valid: np.ndarray) -> np.ndarray:
+    """Para cada celda, índice de la última celda válida a su izquierda (-1 si no hay)"""
+    n = valid.shape[1]
+    index = np.where(valid, np.arange(n), -1)
+    return np.maximum.accumulate(index, axis=1)
+
+
+def _backward_fill_index(valid: np.ndarray) -> np.ndarray:
+    """Para cada celda, índice de la siguiente celda válida a su derecha (n si no hay)"""
+    n = valid.shape[1]
+    index = np.where(valid, np.arange(n), n)
+    return np.minimum.accumulate(index[:, ::-1], axis=1)[:, ::-1]
+
+
+def _robust_outliers(values: np.ndarray) -> np.ndarray:
+    """Marca valores con |z| robusto > OUTLIER_Z, calculado por sensor (fila)"""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        median = np.nanmedian(values, axis=1, keepdims=True)
+        mad = np.nanmedian(np.abs(values - median), axis=1, keepdims=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = 0.6745 * (values - median) / mad
+    return np.abs(np.nan_to_num(z, nan=0.0, posinf=0.0, neginf=0.0)) > OUTLIER_Z
+
+
+def fill(values: np.ndarray, method: str, window: int = 5) -> np.ndarray:
+    """
+    Rellena los NaN de una matriz (S, n) fila a fila, sin bucles por celda
+
+    Args:
+        values: Matriz con NaN en los huecos
+        method: none | ffill | linear | median
+        window: Ventana (en intervalos) de la mediana móvil
+
+    Returns:
+        np.ndarray: Nueva matriz rellenada (los huecos sin vecinos quedan en NaN)
+    """
+    if method == 'none' or values.size == 0:
+        return values.copy()
+
+    valid = ~np.isnan(values)
+    rows = np.arange(values.shape[0])[:, None]
+
+    if method == 'ffill':
+        previous = _forward_fill_index(valid)
+        filled = values[rows, np.clip(previous, 0, None)]
+        return np.where(previous >= 0, filled, np.nan)
+
+    if method == 'linear':
+        n = values.shape[1]
+        previous = _forward_fill_index(valid)
+        following = _backward_fill_index(valid)
+        has_both = (previous >= 0) & (following < n)
+        left = values[rows, np.clip(previous, 0, None)]
+        right = values[rows, np.clip(following, None, n - 1)]
+        # En las celdas válidas previous == following (span 0), pero esas conservan su valor
+        span = np.where(has_both & ~valid, following - previous, 1)
+        weight = (np.arange(n) - previous) / span
+        interpolated = left + (right - left) * weight
+        return np.where(valid, values, np.where(has_both, interpolated, np.nan))
+
+    if method == 'median':
+        window = max(1, window | 1)  # ventana impar, centrada
+        pad = window // 2
+        padded = np.pad(values, ((0, 0), (pad, pad)), constant_values=np.nan)
+        windows = np.lib.stride_tricks.sliding_window_view(padded, window, axis=1)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            return np.nanmedian(windows, axis=-1)
+
+    raise ValueError(f"Método de relleno desconocido: {method}")
+
+
+class ResamplingService:
+    @staticmethod
+    def resample_greenhouse(
+            db: Session,
+            greenhouse_id: int,
+            start: datetime,
+            end: datetime,
+            step_seconds: int = 300,
+            method: str = 'linear',
+            window: int = 5,
+            sensor_types: Optional[List[str]] = None
+    ) -> ResampledSeries:
+        """
+        Convierte las lecturas crudas de todos los sensores de un invernadero en
+        series regulares, con huecos rellenados y valores atípicos marcados
+
+        Las lecturas se cargan con una consulta (más una de bloques comprimidos)
+        y todo el cálculo es vectorizado sobre matrices (sensores x intervalos).
+
+        Args:
+            db: Sesión de base de datos
+            greenhouse_id: ID del invernadero
+            start: Inicio del rango (incluido)
+            end: Fin del rango (excluido)
+            step_seconds: Tamaño del intervalo de la serie regular
+            method: none | ffill | linear | median
+            window: Ventana de la mediana móvil (en intervalos)
+            sensor_types: Limitar a estos tipos de sensor (opcional)
+
+        Returns:
+            ResampledSeries: Series en columnas
+
+        Raises:
+            ValueError: Si el método o el rango no son válidos
+        """
+        if method not in METHODS:
+            raise ValueError(f"Método de relleno desconocido: {method}")
+        # NumPy no admite datetime64 con zona horaria
+        start, end = _naive_utc(start), _naive_utc(end)
+        if step_seconds <= 0 or end <= start:
+            raise ValueError("El rango o el intervalo no son válidos")
+
+        sensor_query = select(Sensor.id, Sensor.type).where(Sensor.greenhouse_id == greenhouse_id)
+        if sensor_types:
+            sensor_query = sensor_query.where(Sensor.type.in_(sensor_types))
+        sensors = db.execute(sensor_query.order_by(Sensor.id)).all()
+
+        # Los intervalos empiezan en el segundo entero de start; n se calcula con el
+        # end completo para que una lectura en [trunc(end), end) tenga intervalo
+        start_s = np.datetime64(start, "s")
+        step_us = step_seconds * 1_000_000
+        start_us = start_s.astype("datetime64[us]").astype(np.int64)
+        end_us = np.datetime64(end, "us").astype(np.int64)
+        n = int(-(-(end_us - start_us) // step_us))
+        if len(sensors) * n > MAX_CELLS:
+            raise ValueError("El rango pedido es demasiado grande para el intervalo indicado")
+
+        timestamps = start_s + np.arange(n) * np.timedelta64(step_seconds, "s")
+        sensor_ids = np.array([row[0] for row in sensors], dtype=np.int64)
+        series: Dict[int, tuple] = ReadingStorageService.load_many(db, sensor_ids.tolist(), start, end)
+
+        # Índice plano (sensor, intervalo) de cada lectura -> sumas y conteos con bincount
+        flat_index, flat_values = [], []
+        for row, sensor_id in enumerate(sensor_ids.tolist()):
+            reading_times, reading_values = series[sensor_id]
+            bins = (reading_times.astype(np.int64) - start_us) // step_us
+            # Nunca escribir en la fila de otro sensor
+            inside = (bins >= 0) & (bins < n)
+            flat_index.append(row * n + bins[inside])
+            flat_values.append(reading_values[inside])
+
+        cells = len(sensor_ids) * n
+        if flat_index:
+            index = np.concatenate(flat_index)
+            readings = np.concatenate(flat_values)
+            counts = np.bincount(index, minlength=cells)
+            sums = np.bincount(index, weights=readings, minlength=cells)
+        else:
+            counts = np.zeros(cells, dtype=np.int64)
+            sums = np.zeros(cells)
+
+        counts = counts.reshape(len(sensor_ids), n).astype(np.int32)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            means = np.where(counts > 0, sums.reshape(counts.shape) / counts, np.nan)
+
+        flags = np.zeros(counts.shape, dtype=np.uint8)
+        flags[counts == 0] |= FLAG_GAP
+
+        outliers = _robust_outliers(means)
+        flags[outliers] |= FLAG_OUTLIER
+        means[outliers] = np.nan
+
+        values = fill(means, method, window)
+        flags[np.isnan(means) & ~np.isnan(values)] |= FLAG_FILLED
+
+        return ResampledSeries(
+            timestamps=timestamps,
+            sensor_ids=sensor_ids,
+            sensor_types=[row[1] for row in sensors],
+            values=values,
+            flags=flags,
+            counts=counts,
+        )
@@ -0,0 +1,403 @@
+"""
+Monitor de la flota de sensores
+
+Marca los sensores que dejaron de reportar (stale), cuyo valor lleva
+demasiado tiempo congelado (flatline) o cuya última lectura está fuera del
+rango físico de su tipo (out_of_range), y desactiva los que llevan
+SENSOR_QUIET_SECONDS callados (se reactivan solos cuando vuelven a reportar).
+
+La pasada no toca sensor_readings: la ingesta mantiene en sensor_states la
+última lectura, la cadencia y el inicio de la racha de valores iguales
+(record_readings), y run() evalúa todos los sensores de una vez con NumPy
+sobre una sola consulta de sensors + sensor_states.
+"""
+import asyncio
+import logging
+import os
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import and_, case, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from models.sensor_model import Sensor
+from models.sensor_reading_model import SensorReading
+from models.sensor_state_model import SensorState
+from monitoring.metrics import SENSOR_ACTIVE_CHANGES_TOTAL, SENSOR_FLEET_STATUS, SENSOR_MONITOR_DURATION
+from storage.change_tracking import log_changes
+from storage.sql import dialect_insert, rows_as_dicts
+
+logger = logging.getLogger(__name__)
+
+SENSOR_MONITOR_INTERVAL_SECONDS = float(os.getenv("SENSOR_MONITOR_INTERVAL_SECONDS", "60"))
+# Stale: sin lecturas durante más de SENSOR_STALE_FACTOR veces su cadencia (y al menos SENSOR_STALE_MIN_SECONDS)
+SENSOR_STALE_FACTOR = float(os.getenv("SENSOR_STALE_FACTOR", "3"))
+SENSOR_STALE_MIN_SECONDS = float(os.getenv("SENSOR_STALE_MIN_SECONDS", "300"))
+# Cadencia supuesta mientras un sensor no tiene dos lecturas
+SENSOR_DEFAULT_CADENCE_SECONDS = float(os.getenv("SENSOR_DEFAULT_CADENCE_SECONDS", "60"))
+# Callado durante más de esto: se desactiva (Sensor.active = False)
+SENSOR_QUIET_SECONDS = float(os.getenv("SENSOR_QUIET_SECONDS", str(6 * 3600)))
+
+# Peso de cada intervalo nuevo en la media móvil de la cadencia
+CADENCE_ALPHA = 0.2
+# Diferencia por debajo de la cual dos lecturas se consideran el mismo valor
+FLATLINE_TOLERANCE = 1e-9
+# Lecturas que usa rebuild() para reconstruir el estado
+REBUILD_WINDOW = timedelta(days=1)
+# IDs por sentencia en los UPDATE ... WHERE id IN (...)
+UPDATE_BATCH_SIZE = 1_000
+
+# tipo -> (mínimo físico, máximo físico, segundos con el mismo valor para considerarlo congelado)
+SENSOR_RULES: Dict[str, Tuple[float, float, float]] = {
+    "temperature": (-40.0, 85.0, 2 * 3600),
+    "humidity": (0.0, 100.0, 4 * 3600),
+    # De noche la luz se queda en 0 lux muchas horas
+    "light": (0.0, 200_000.0, 18 * 3600),
+    "soil_moisture": (0.0, 100.0, 24 * 3600),
+}
+_NO_RULE = (-np.inf, np.inf, np.inf)
+
+OK = "ok"
+STALE = "stale"
+FLATLINE = "flatline"
+OUT_OF_RANGE = "out_of_range"
+INACTIVE = "inactive"
+STATUSES = (OK, STALE, FLATLINE, OUT_OF_RANGE, INACTIVE)
+
+_READING_COLUMNS = ("last_recorded_at", "last_value", "cadence_seconds", "value_changed_at", "reading_count")
+
+
+def _seconds(delta: np.ndarray) -> np.ndarray:
+    """timedelta64 -> segundos en float (NaT -> NaN)"""
+    return delta / np.timedelta64(1, "s")
+
+
+def _set_active(db: Session, sensor_ids: List[int], active: bool, now: datetime) -> List[Tuple[int, int]]:
+    """
+    Cambia Sensor.active con UPDATE masivo
+
+    Fuera del ORM no se aplica version_id_col: version se incrementa aquí
+    para que los ETags cambien, y el cambio se anota para la sincronización.
+
+    Returns:
+        list: (id, greenhouse_id) de los sensores que cambiaron
+    """
+    changed: List[Tuple[int, int]] = []
+    for lo in range(0, len(sensor_ids), UPDATE_BATCH_SIZE):
+        changed.extend(db.execute(
+            update(Sensor)
+            .where(
+                Sensor.id.in_(sensor_ids[lo:lo + UPDATE_BATCH_SIZE]),
+                # Otra pasada concurrente (otro worker) pudo hacerlo ya
+                Sensor.active.is_(False) if active else Sensor.active.isnot(False)
+            )
+            .values(active=active, version=Sensor.version + 1, updated_at=now)
+            .returning(Sensor.id, Sensor.greenhouse_id)
+            .execution_options(synchronize_session=False)
+        ).all())
+    log_changes(db, "sensors", changed)
+    return changed
+
+
+class SensorMonitorService:
+    @staticmethod
+    def record_readings(db: Session, readings: Iterable[Tuple[int, datetime, float]]) -> int:
+        """
+        Actualiza el estado de los sensores con lecturas recién insertadas (sin commit)
+
+        Las lecturas que llegan tarde (anteriores a la última conocida) solo
+        cuentan en reading_count. El UPSERT no retrocede last_recorded_at si
+        otra ingesta concurrente ya escribió una lectura posterior.
+
+        Args:
+            db: Sesión de base de datos (la misma que inserta las lecturas)
+            readings: Tuplas (sensor_id, recorded_at, value) insertadas
+
+        Returns:
+            int: Sensores actualizados
+        """
+        by_sensor: Dict[int, List[Tuple[datetime, float]]] = defaultdict(list)
+        for sensor_id, recorded_at, value in readings:
+            by_sensor[sensor_id].append((recorded_at, value))
+        if not by_sensor:
+            return 0
+
+        states = {
+            row[0]: tuple(row[1:])
+            for row in db.execute(
+                select(SensorState.sensor_id, *(getattr(SensorState, column) for column in _READING_COLUMNS))
+                .where(SensorState.sensor_id.in_(list(by_sensor)))
+            )
+        }
+
+        rows = []
+        for sensor_id, points in by_sensor.items():
+            last_at, last_value, cadence, changed_at, count = states.get(sensor_id, (None, None, None, None, 0))
+            for recorded_at, value in sorted(points):
+                if last_at is not None and recorded_at <= last_at:
+                    continue
+                if last_at is not None:
+                    interval = (recorded_at - last_at).total_seconds()
+                    cadence = interval if cadence is None else cadence + CADENCE_ALPHA * (interval - cadence)
+                if last_value is None or abs(value - last_value) > FLATLINE_TOLERANCE:
+                    changed_at = recorded_at
+                last_at, last_value = recorded_at, value
+            rows.append({
+                "sensor_id": sensor_id,
+                "last_recorded_at": last_at,
+                "last_value": last_value,
+                "cadence_seconds": cadence,
+                "value_changed_at": changed_at,
+                "reading_count": (count or 0) + len(points),
+            })
+
+        table = SensorState.__table__
+        statement = dialect_insert(db, table)
+        statement = statement.on_conflict_do_update(
+            index_elements=["sensor_id"],
+            set_={column: statement.excluded[column] for column in _READING_COLUMNS},
+            where=or_(
+                table.c.last_recorded_at.is_(None),
+                statement.excluded.last_recorded_at >= table.c.last_recorded_at
+            )
+        )
+        db.execute(statement, rows)
+        return len(rows)
+
+    @staticmethod
+    def rebuild(db: Session, now: Optional[datetime] = None) -> int:
+        """
+        Reconstruye el estado de lectura desde sensor_readings (REBUILD_WINDOW)
+
+        Para bases de datos anteriores al monitor o tras una carga masiva que
+        no pasó por la ingesta; la pasada periódica no lo necesita. El inicio
+        de la racha de valores iguales se aproxima con la última lectura
+        distinta (una lectura de margen).
+
+        Args:
+            db: Sesión de base de datos
+            now: Momento de referencia (por defecto ahora, UTC)
+
+        Returns:
+            int: Sensores con estado
+        """
+        since = (now or datetime.utcnow()) - REBUILD_WINDOW
+        window = (
+            select(
+                SensorReading.sensor_id,
+                func.min(SensorReading.recorded_at).label("first_at"),
+                func.max(SensorReading.recorded_at).label("last_at"),
+                func.count().label("count"),
+            )
+            .where(SensorReading.recorded_at >= since)
+            .group_by(SensorReading.sensor_id)
+            .subquery()
+        )
+        latest = (
+            select(window, SensorReading.value)
+            .join(SensorReading, and_(
+                SensorReading.sensor_id == window.c.sensor_id,
+                SensorReading.recorded_at == window.c.last_at
+            ))
+            .subquery()
+        )
+        changed = dict(db.execute(
+            select(SensorReading.sensor_id, func.max(SensorReading.recorded_at))
+            .join(latest, latest.c.sensor_id == SensorReading.sensor_id)
+            .where(
+                SensorReading.recorded_at >= since,
+                func.abs(SensorReading.value - latest.c.value) > FLATLINE_TOLERANCE
+            )
+            .group_by(SensorReading.sensor_id)
+        ).all())
+
+        rows = []
+        for sensor_id, first_at, last_at, count, value in db.execute(select(latest)).all():
+            rows.append({
+                "sensor_id": sensor_id,
+                "last_recorded_at": last_at,
+                "last_value": value,
+                "cadence_seconds": (last_at - first_at).total_seconds() / (count - 1) if count > 1 else None,
+                "value_changed_at": changed.get(sensor_id, first_at),
+                "reading_count": count,
+            })
+        if rows:
+            statement = dialect_insert(db, SensorState.__table__)
+            db.execute(
+                statement.on_conflict_do_update(
+                    index_elements=["sensor_id"],
+                    set_={column: statement.excluded[column] for column in _READING_COLUMNS}
+                ),
+                rows
+            )
+        db.commit()
+        return len(rows)
+
+    @staticmethod
+    def run(db: Session, now: Optional[datetime] = None) -> Dict[str, int]:
+        """
+        Una pasada del monitor sobre todos los sensores
+
+        Solo se escriben los estados que cambian y los sensores que se
+        desactivan o reactivan. Los sensores desactivados a mano quedan como
+        inactive y el monitor no los toca.
+
+        Args:
+            db: Sesión de base de datos
+            now: Momento de referencia (por defecto ahora, UTC)
+
+        Returns:
+            dict: Sensores por estado, más deactivated y reactivated
+        """
+        started = time.perf_counter()
+        now = now or datetime.utcnow()
+        rows = db.execute(
+            select(
+                Sensor.id, Sensor.type, Sensor.active, Sensor.installed_at,
+                SensorState.last_recorded_at, SensorState.last_value, SensorState.cadence_seconds,
+                SensorState.value_changed_at, SensorState.status, SensorState.deactivated_by_monitor,
+            )
+            .outerjoin(SensorState, SensorState.sensor_id == Sensor.id)
+        ).all()
+        counts = {status: 0 for status in STATUSES}
+        counts.update(deactivated=0, reactivated=0)
+        if not rows:
+            return counts
+
+        (ids, types, active, installed_at, last_at, last_value, cadence,
+         changed_at, stored_status, by_monitor) = zip(*rows)
+        ids = np.array(ids, dtype=np.int64)
+        active = np.array([flag is not False for flag in active])
+        by_monitor = np.array([bool(flag) for flag in by_monitor])
+        installed_at = np.array(installed_at, dtype="datetime64[us]")
+        last_at = np.array(last_at, dtype="datetime64[us]")
+        changed_at = np.array(changed_at, dtype="datetime64[us]")
+        last_value = np.array(last_value, dtype=np.float64)
+        cadence = np.array(cadence, dtype=np.float64)
+
+        kinds, kind_index = np.unique(np.array(types, dtype=str), return_inverse=True)
+        rules = np.array([SENSOR_RULES.get(kind, _NO_RULE) for kind in kinds], dtype=np.float64)[kind_index]
+
+        # Un sensor que nunca reportó cuenta desde su instalación
+        now64 = np.datetime64(now, "us")
+        last_seen = np.where(np.isnat(last_at), installed_at, last_at)
+        age = _seconds(now64 - np.where(np.isnat(last_seen), now64, last_seen))
+        stale_after = np.maximum(
+            SENSOR_STALE_FACTOR * np.where(np.isnan(cadence), SENSOR_DEFAULT_CADENCE_SECONDS, cadence),
+            SENSOR_STALE_MIN_SECONDS
+        )
+        stale = age > stale_after
+        quiet = age > np.maximum(stale_after, SENSOR_QUIET_SECONDS)
+        # Comparaciones con NaN (sin lecturas) son False
+        out_of_range = (last_value < rules[:, 0]) | (last_value > rules[:, 1])
+        flatline = _seconds(last_at - changed_at) >= rules[:, 2]
+
+        monitored = active | by_monitor
+        status = np.select(
+            [~monitored, stale, out_of_range, flatline],
+            [INACTIVE, STALE, OUT_OF_RANGE, FLATLINE],
+            OK
+        ).astype(object)
+        deactivate = active & quiet
+        reactivate = ~active & by_monitor & ~stale
+        new_by_monitor = (by_monitor & ~reactivate) | deactivate
+
+        dirty = (status != np.array(stored_status, dtype=object)) | (new_by_monitor != by_monitor)
+        if dirty.any():
+            table = SensorState.__table__
+            statement = dialect_insert(db, table)
+            db.execute(
+                statement.on_conflict_do_update(
+                    index_elements=["sensor_id"],
+                    set_={
+                        "status": statement.excluded.status,
+                        "deactivated_by_monitor": statement.excluded.deactivated_by_monitor,
+                        "status_since": case(
+                            (table.c.status == statement.excluded.status, table.c.status_since),
+                            else_=statement.excluded.status_since
+                        ),
+                    }
+                ),
+                [
+                    {"sensor_id": sensor_id, "status": state, "deactivated_by_monitor": flag, "status_since": now}
+                    for sensor_id, state, flag in zip(
+                        ids[dirty].tolist(), status[dirty].tolist(), new_by_monitor[dirty].tolist()
+                    )
+                ]
+            )
+
+        deactivated = _set_active(db, ids[deactivate].tolist(), False, now) if deactivate.any() else []
+        reactivated = _set_active(db, ids[reactivate].tolist(), True, now) if reactivate.any() else []
+        db.commit()
+
+        labels, totals = np.unique(status.astype(str), return_counts=True)
+        counts.update(zip(labels.tolist(), totals.tolist()))
+        counts.update(deactivated=len(deactivated), reactivated=len(reactivated))
+        for state in STATUSES:
+            SENSOR_FLEET_STATUS.set(counts[state], status=state)
+        SENSOR_ACTIVE_CHANGES_TOTAL.inc(len(deactivated), change="deactivated")
+        SENSOR_ACTIVE_CHANGES_TOTAL.inc(len(reactivated), change="reactivated")
+        SENSOR_MONITOR_DURATION.observe(time.perf_counter() - started)
+        return counts
+
+    @staticmethod
+    def get_statuses(
+            db: Session,
+            greenhouse_id: Optional[int] = None,
+            flagged_only: bool = True,
+            limit: int = 1000
+    ) -> List[Dict[str, Any]]:
+        """
+        Estado de los sensores según la última pasada del monitor
+
+        Args:
+            db: Sesión de base de datos
+            greenhouse_id: Limitar a un invernadero (opcional)
+            flagged_only: Solo los que no están ok
+            limit: Máximo de sensores
+
+        Returns:
+            list: Dicts con el sensor, su estado y su última lectura
+        """
+        query = (
+            select(
+                Sensor.id.label("sensor_id"), Sensor.greenhouse_id, Sensor.name, Sensor.type, Sensor.active,
+                SensorState.status, SensorState.status_since, SensorState.last_recorded_at,
+                SensorState.last_value, SensorState.cadence_seconds,
+            )
+            .join(SensorState, SensorState.sensor_id == Sensor.id)
+            .order_by(Sensor.id)
+            .limit(limit)
+        )
+        if greenhouse_id is not None:
+            query = query.where(Sensor.greenhouse_id == greenhouse_id)
+        if flagged_only:
+            query = query.where(SensorState.status.notin_((OK, INACTIVE)))
+        return rows_as_dicts(db.execute(query))
+
+
+async def monitor_loop(interval_seconds: float = SENSOR_MONITOR_INTERVAL_SECONDS) -> None:
+    """Tarea del lifespan: una pasada del monitor cada interval_seconds"""
+    from database_config import SessionLocal
+
+    def run_once() -> Dict[str, int]:
+        db = SessionLocal()
+        try:
+            return SensorMonitorService.run(db)
+        finally:
+            db.close()
+
+    while True:
+        try:
+            counts = await asyncio.to_thread(run_once)
+            if counts["deactivated"] or counts["reactivated"]:
+                logger.info(
+                    "Monitor de sensores: %s desactivados, %s reactivados",
+                    counts["deactivated"], counts["reactivated"]
+                )
+        except Exception:
+            logger.exception("Error en la pasada del monitor de sensores")
+        await asyncio.sleep(interval_seconds)
@@ -0,0 +1,104 @@
+from datetime import datetime
+from sqlalchemy import and_, func, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from models.sensor_model import Sensor
+from models.sensor_reading_model import SensorReading
+from storage.change_tracking import log_changes
+
+
+class SensorService:
+    @staticmethod
+    def get_sensor_by_id(db: Session, sensor_id: int) -> Optional[Sensor]:
+        """
+        Obtiene un sensor por su ID
+
+        Args:
+            db: Sesión de base de datos
+            sensor_id: ID del sensor
+
+        Returns:
+            Sensor: Sensor encontrado o None
+        """
+        return db.query(Sensor).filter(Sensor.id == sensor_id).first()
+
+    @staticmethod
+    def create_sensors(db: Session, sensors: List[Dict[str, Any]]) -> Optional[List[Sensor]]:
+        """
+        Crea varios sensores en una sola sentencia y una sola transacción
+
+        Args:
+            db: Sesión de base de datos
+            sensors: Dicts con name, type, greenhouse_id y active (ya validados)
+
+        Returns:
+            List[Sensor]: Sensores creados, en el mismo orden, o None si hay error
+        """
+        if not sensors:
+            return []
+        try:
+            created = db.scalars(
+                insert(Sensor).returning(Sensor, sort_by_parameter_order=True), sensors
+            ).all()
+            # Fuera del flush del ORM: se anota a mano para la sincronización
+            log_changes(db, "sensors", [(sensor.id, sensor.greenhouse_id) for sensor in created])
+            # RETURNING ya trajo todas las columnas: fuera de la sesión el commit no las
+            # expira y serializar la respuesta no lanza un SELECT por fila
+            for sensor in created:
+                db.expunge(sensor)
+            db.commit()
+            return created
+
+        except IntegrityError:
+            db.rollback()
+            return None
+
+    @staticmethod
+    def get_latest_values(
+            db: Session,
+            greenhouse_ids: Iterable[int],
+            sensor_types: Iterable[str],
+            since: datetime
+    ) -> List[Tuple[int, str, float]]:
+        """
+        Obtiene la última lectura de cada sensor activo de varios invernaderos
+
+        Una sola consulta (max(recorded_at) por sensor y join de vuelta) que
+        usa el índice (sensor_id, recorded_at); el límite since acota el
+        recorrido y descarta sensores que llevan tiempo sin reportar. Las
+        lecturas recientes nunca están compactadas, así que basta con las filas.
+
+        Args:
+            db: Sesión de base de datos
+            greenhouse_ids: IDs de los invernaderos
+            sensor_types: Tipos de sensor a incluir (ej. temperature)
+            since: Ignorar lecturas anteriores a esta fecha
+
+        Returns:
+            list: Tuplas (greenhouse_id, tipo de sensor, valor)
+        """
+        sensors = select(Sensor.id, Sensor.greenhouse_id, Sensor.type).where(
+            Sensor.greenhouse_id.in_(list(greenhouse_ids)),
+            Sensor.type.in_(list(sensor_types)),
+            Sensor.active.is_(True)
+        ).subquery()
+
+        latest = (
+            select(SensorReading.sensor_id, func.max(SensorReading.recorded_at).label("recorded_at"))
+            .join(sensors, sensors.c.id == SensorReading.sensor_id)
+            .where(SensorReading.recorded_at >= since)
+            .group_by(SensorReading.sensor_id)
+            .subquery()
+        )
+
+        rows = db.execute(
+            select(sensors.c.greenhouse_id, sensors.c.type, SensorReading.value)
+            .select_from(latest)
+            .join(sensors, sensors.c.id == latest.c.sensor_id)
+            .join(SensorReading, and_(
+                SensorReading.sensor_id == latest.c.sensor_id,
+                SensorReading.recorded_at == latest.c.recorded_at
+            ))
+        ).all()
+        return [tuple(row) for row in rows]
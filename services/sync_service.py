@@ -0,0 +1,145 @@
+import os
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from models.change_log_model import ChangeLog
+from models.chat_model import Chat
+from models.greenhouse_model import Greenhouse
+from models.message_model import Message
+from models.plant_analysis_model import PlantAnalysis
+from models.plant_model import Plant
+from models.sensor_model import Sensor
+from storage.change_tracking import DELETE
+
+# Entradas del change_log más recientes que esto aún no se sirven: un commit
+# lento puede confirmar un id menor que otro ya visible y el cursor lo saltaría
+SYNC_SETTLE_SECONDS = float(os.getenv("SYNC_SETTLE_SECONDS", "2"))
+# La primera sincronización solo incluye los análisis de los últimos días
+SYNC_SNAPSHOT_ANALYSIS_DAYS = int(os.getenv("SYNC_SNAPSHOT_ANALYSIS_DAYS", "90"))
+
+# entidad -> (modelo, columnas enviadas al cliente, en orden)
+SYNC_COLUMNS: Dict[str, Tuple[Any, Tuple[str, ...]]] = {
+    "greenhouses": (Greenhouse, ("id", "name", "location", "latitude", "longitude", "updated_at", "version")),
+    "plants": (Plant, ("id", "greenhouse_id", "name", "type", "updated_at", "version")),
+    "sensors": (Sensor, ("id", "greenhouse_id", "name", "type", "active", "updated_at", "version")),
+    "analyses": (
+        PlantAnalysis,
+        ("id", "plant_id", "analysis_type", "result", "confidence", "analyzed_at", "model_version")
+    ),
+    "chats": (Chat, ("id", "name", "updated_at")),
+    "messages": (Message, ("id", "chat_id", "author", "message", "sent_at")),
+}
+
+
+def _user_scope(entity: str, user_id: int, now: datetime) -> list:
+    """Condiciones que limitan una entidad a lo que pertenece al usuario"""
+    greenhouse_ids = select(Greenhouse.id).where(Greenhouse.user_id == user_id)
+    if entity == "greenhouses":
+        return [Greenhouse.user_id == user_id]
+    if entity in ("plants", "sensors"):
+        return [SYNC_COLUMNS[entity][0].greenhouse_id.in_(greenhouse_ids)]
+    if entity == "analyses":
+        return [
+            PlantAnalysis.plant_id.in_(select(Plant.id).where(Plant.greenhouse_id.in_(greenhouse_ids))),
+            PlantAnalysis.analyzed_at >= now - timedelta(days=SYNC_SNAPSHOT_ANALYSIS_DAYS),
+        ]
+    if entity == "chats":
+        return [Chat.user_id == user_id]
+    return [Message.chat_id.in_(select(Chat.id).where(Chat.user_id == user_id))]
+
+
+def _rows(db: Session, entity: str, *criteria) -> List[list]:
+    model, columns = SYNC_COLUMNS[entity]
+    query = select(*(getattr(model, column) for column in columns)).where(*criteria).order_by(model.id)
+    return [list(row) for row in db.execute(query)]
+
+
+class SyncService:
+    """
+    Sincronización delta para clientes sin conexión permanente
+
+    Sin cursor se envía una foto completa de lo que pertenece al usuario; con
+    cursor, solo lo que cambió desde entonces según change_log (ver
+    storage.change_tracking). Cada entidad va en forma columnar:
+    {"columns": [...], "rows": [[...], ...], "deleted": [ids]}.
+    """
+
+    @staticmethod
+    def _settled_cursor(db: Session, user_id: int, settled: datetime) -> int:
+        return db.execute(
+            select(func.max(ChangeLog.id)).where(ChangeLog.user_id == user_id, ChangeLog.changed_at <= settled)
+        ).scalar() or 0
+
+    @staticmethod
+    def get_snapshot(db: Session, user_id: int) -> Dict[str, Any]:
+        """
+        Foto completa de los datos del usuario y el cursor para continuar
+
+        El cursor se lee antes que los datos: lo que cambie entre medias se
+        vuelve a enviar en la siguiente sincronización (los upserts son idempotentes).
+
+        Args:
+            db: Sesión de base de datos
+            user_id: ID del usuario
+
+        Returns:
+            dict: cursor, has_more, snapshot y changes por entidad
+        """
+        now = datetime.utcnow()
+        cursor = SyncService._settled_cursor(db, user_id, now - timedelta(seconds=SYNC_SETTLE_SECONDS))
+        changes = {}
+        for entity, (_, columns) in SYNC_COLUMNS.items():
+            rows = _rows(db, entity, *_user_scope(entity, user_id, now))
+            if rows:
+                changes[entity] = {"columns": list(columns), "rows": rows, "deleted": []}
+        return {"cursor": cursor, "has_more": False, "snapshot": True, "changes": changes}
+
+    @staticmethod
+    def get_changes(db: Session, user_id: int, since: int, limit: int = 1000) -> Dict[str, Any]:
+        """
+        Cambios del usuario posteriores a un cursor
+
+        Args:
+            db: Sesión de base de datos
+            user_id: ID del usuario
+            since: Cursor devuelto por la sincronización anterior
+            limit: Máximo de entradas del change_log por respuesta
+
+        Returns:
+            dict: cursor, has_more, snapshot y changes por entidad (solo las que cambiaron)
+        """
+        settled = datetime.utcnow() - timedelta(seconds=SYNC_SETTLE_SECONDS)
+        log = db.execute(
+            select(ChangeLog.id, ChangeLog.entity, ChangeLog.entity_id, ChangeLog.op)
+            .where(ChangeLog.user_id == user_id, ChangeLog.id > since, ChangeLog.changed_at <= settled)
+            .order_by(ChangeLog.id)
+            .limit(limit + 1)
+        ).all()
+        has_more = len(log) > limit
+        log = log[:limit]
+
+        # Varias escrituras de la misma fila: cuenta la última
+        latest: Dict[str, Dict[int, str]] = {}
+        for _, entity, entity_id, op in log:
+            if entity in SYNC_COLUMNS:
+                latest.setdefault(entity, {})[entity_id] = op
+
+        changes = {}
+        for entity, ops in latest.items():
+            model, columns = SYNC_COLUMNS[entity]
+            deleted = {entity_id for entity_id, op in ops.items() if op == DELETE}
+            upserted = [entity_id for entity_id, op in ops.items() if op != DELETE]
+            rows = _rows(db, entity, model.id.in_(upserted)) if upserted else []
+            # Filas anotadas como cambiadas que ya no existen (borrado masivo sin tombstone propio)
+            deleted.update(set(upserted) - {row[0] for row in rows})
+            changes[entity] = {"columns": list(columns), "rows": rows, "deleted": sorted(deleted)}
+
+        return {
+            "cursor": log[-1][0] if log else since,
+            "has_more": has_more,
+            "snapshot": False,
+            "changes": changes,
+        }
@@ -2,6 +2,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from typing import Optional, Dict, Any
 from models.user_model import User
+from services.deletion_service import DeletionService
 
 
 class UserService:
@@ -85,6 +86,24 @@ class UserService:
             db.rollback()
             return None
 
+    @staticmethod
+    def delete_user(db: Session, user_id: int) -> bool:
+        """
+        Elimina un usuario con sus invernaderos y chats
+
+        Args:
+            db: Sesión de base de datos
+            user_id: ID del usuario a eliminar
+
+        Returns:
+            bool: True si se eliminó, False si no existe
+        """
+        if not UserService.get_user_by_id(db, user_id):
+            return False
+
+        DeletionService.delete_user(db, user_id)
+        return True
+
     def authenticate_user(
             db: Session,
             username: str,
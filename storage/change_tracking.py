@@ -0,0 +1,143 @@
+"""
+Seguimiento de cambios para la sincronización delta (GET /sync)
+
+Tras cada flush del ORM se anota en change_log, en la misma transacción, una
+fila por entidad sincronizable creada, modificada o borrada. Las escrituras
+que no pasan por la unidad de trabajo del ORM (insert()/delete() masivos)
+llaman a log_changes explícitamente.
+
+Un tombstone de un padre (invernadero, planta, chat) implica el borrado de
+sus hijos en el cliente: los borrados en cascada de la base de datos no
+generan tombstones propios.
+"""
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event, insert, inspect, select
+from sqlalchemy.orm import Session
+
+from models.change_log_model import ChangeLog
+from models.chat_model import Chat
+from models.greenhouse_model import Greenhouse
+from models.message_model import Message
+from models.plant_analysis_model import PlantAnalysis
+from models.plant_model import Plant
+from models.sensor_model import Sensor
+
+UPSERT = "upsert"
+DELETE = "delete"
+
+ENTITIES: Dict[type, str] = {
+    Greenhouse: "greenhouses",
+    Plant: "plants",
+    Sensor: "sensors",
+    PlantAnalysis: "analyses",
+    Chat: "chats",
+    Message: "messages",
+}
+
+# Columna de cada entidad que lleva hasta el usuario dueño
+OWNER_KEYS = {
+    "greenhouses": "user_id",
+    "chats": "user_id",
+    "plants": "greenhouse_id",
+    "sensors": "greenhouse_id",
+    "analyses": "plant_id",
+    "messages": "chat_id",
+}
+_OWNER_QUERIES = {
+    "greenhouse_id": lambda ids: select(Greenhouse.id, Greenhouse.user_id).where(Greenhouse.id.in_(ids)),
+    "plant_id": lambda ids: (
+        select(Plant.id, Greenhouse.user_id)
+        .join(Greenhouse, Greenhouse.id == Plant.greenhouse_id)
+        .where(Plant.id.in_(ids))
+    ),
+    "chat_id": lambda ids: select(Chat.id, Chat.user_id).where(Chat.id.in_(ids)),
+}
+
+# (entidad, id, valor de OWNER_KEYS, op)
+Change = Tuple[str, int, Optional[int], str]
+
+
+def _write(connection, changes: List[Change]) -> int:
+    keys: Dict[str, set] = defaultdict(set)
+    for entity, _, key_value, _ in changes:
+        key = OWNER_KEYS[entity]
+        if key != "user_id" and key_value is not None:
+            keys[key].add(key_value)
+    owners = {
+        key: dict(connection.execute(_OWNER_QUERIES[key](list(values))).all())
+        for key, values in keys.items()
+    }
+
+    now = datetime.utcnow()
+    rows = []
+    for entity, entity_id, key_value, op in changes:
+        key = OWNER_KEYS[entity]
+        user_id = key_value if key == "user_id" else owners[key].get(key_value)
+        # Sin dueño (el padre se borró en la misma transacción): lo cubre el tombstone del padre
+        if user_id is not None:
+            rows.append({"user_id": user_id, "entity": entity, "entity_id": entity_id, "op": op, "changed_at": now})
+    if rows:
+        connection.execute(insert(ChangeLog.__table__), rows)
+    return len(rows)
+
+
+def log_changes(db: Session, entity: str, rows: Iterable[Tuple[int, Optional[int]]], op: str = UPSERT) -> int:
+    """
+    Anota cambios hechos fuera del ORM (en la transacción de la sesión)
+
+    Args:
+        db: Sesión de base de datos
+        entity: Nombre de la entidad (valores de ENTITIES)
+        rows: Pares (id, valor de la columna OWNER_KEYS[entity])
+        op: UPSERT o DELETE
+
+    Returns:
+        int: Filas anotadas
+    """
+    changes = [(entity, entity_id, key_value, op) for entity_id, key_value in rows]
+    if not changes:
+        return 0
+    return _write(db.connection(), changes)
+
+
+def _before_flush(session, flush_context, instances) -> None:
+    # La clave del dueño de lo que se va a borrar se lee ahora, mientras la fila existe
+    tombstones = []
+    for instance in session.deleted:
+        entity = ENTITIES.get(type(instance))
+        if entity is not None:
+            tombstones.append(
+                (entity, inspect(instance).identity[0], getattr(instance, OWNER_KEYS[entity]), DELETE)
+            )
+    if tombstones:
+        session.info.setdefault("sync_tombstones", []).extend(tombstones)
+
+
+def _after_flush(session, flush_context) -> None:
+    changes = session.info.pop("sync_tombstones", [])
+    for instance in session.new:
+        entity = ENTITIES.get(type(instance))
+        if entity is not None:
+            changes.append((entity, instance.id, getattr(instance, OWNER_KEYS[entity]), UPSERT))
+    for instance in session.dirty:
+        entity = ENTITIES.get(type(instance))
+        if entity is not None and session.is_modified(instance, include_collections=False):
+            changes.append((entity, instance.id, getattr(instance, OWNER_KEYS[entity]), UPSERT))
+    if changes:
+        _write(session.connection(), changes)
+
+
+def _after_rollback(session) -> None:
+    session.info.pop("sync_tombstones", None)
+
+
+def install() -> None:
+    """Registra el seguimiento de cambios en todas las sesiones"""
+    if event.contains(Session, "after_flush", _after_flush):
+        return
+    event.listen(Session, "before_flush", _before_flush)
+    event.listen(Session, "after_flush", _after_flush)
+    event.listen(Session, "after_rollback", _after_rollback)
@@ -0,0 +1,48 @@
+"""
+Compactación de lecturas en bloques comprimidos (READINGS_STORAGE_MODE=compressed)
+
+Uso:
+    python -m storage.compact_readings              # periodos cerrados hasta hoy
+    python -m storage.compact_readings --before 2025-01-01
+"""
+import argparse
+import asyncio
+import logging
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+
+def compact_once(closed_before: datetime = None) -> int:
+    """Compacta los periodos cerrados con una sesión propia"""
+    from database_config import SessionLocal
+    from services.reading_storage_service import ReadingStorageService
+
+    db = SessionLocal()
+    try:
+        return ReadingStorageService.compact_closed_chunks(db, closed_before)
+    finally:
+        db.close()
+
+
+async def compaction_loop(interval_seconds: float = 3600.0) -> None:
+    """Tarea del lifespan: compacta periódicamente en un hilo aparte"""
+    while True:
+        try:
+            written = await asyncio.to_thread(compact_once)
+            if written:
+                logger.info("Compactados %s bloques de lecturas", written)
+        except Exception:
+            logger.exception("Error compactando lecturas")
+        await asyncio.sleep(interval_seconds)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compacta lecturas en bloques comprimidos")
+    parser.add_argument("--before", type=datetime.fromisoformat, default=None)
+    args = parser.parse_args()
+    print(f"Bloques escritos: {compact_once(args.before)}")
+
+
+if __name__ == "__main__":
+    main()
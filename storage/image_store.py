@@ -0,0 +1,156 @@
+"""
+Almacén local de imágenes direccionado por contenido
+
+Cada imagen se guarda una sola vez bajo el sha256 de sus bytes, en
+directorios repartidos por los primeros caracteres del hash para no acumular
+millones de ficheros en uno:
+
+    <IMAGE_STORE_DIR>/ab/cd/abcd…ef/original.jpg
+                                    model.jpg     lado corto 256 px (entrada del modelo)
+                                    thumb.jpg     lado largo 320 px (UI)
+
+Las variantes se generan al subir la imagen, a partir de una única
+decodificación reducida (draft de JPEG); ni la inferencia ni la UI vuelven a
+tocar el original. Al ser inmutables se sirven con caché de un año.
+"""
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass
+from typing import Dict, Tuple
+
+IMAGE_STORE_DIR = os.getenv("IMAGE_STORE_DIR", "data/images")
+IMAGE_MAX_BYTES = int(os.getenv("IMAGE_MAX_BYTES", str(20 * 1024 * 1024)))
+
+ORIGINAL = "original"
+# variante -> (modo de redimensionado, tamaño en px, calidad JPEG)
+VARIANTS: Dict[str, Tuple[str, int, int]] = {
+    "model": ("short_side", 256, 90),
+    "thumb": ("long_side", 320, 80),
+}
+_FORMATS = {"JPEG": ("jpg", "image/jpeg"), "PNG": ("png", "image/png"), "WEBP": ("webp", "image/webp")}
+
+
+class InvalidImageError(ValueError):
+    """Los bytes recibidos no son una imagen JPEG/PNG/WebP válida o son demasiado grandes"""
+
+
+@dataclass
+class StoredImage:
+    """Metadatos de una imagen del almacén"""
+    sha256: str
+    content_type: str
+    extension: str
+    width: int
+    height: int
+    size_bytes: int
+    created: bool  # False si ya existía (deduplicada)
+
+
+class ImageStore:
+    """
+    Almacén de blobs de imagen en disco
+
+    Args:
+        root: Directorio base
+    """
+
+    def __init__(self, root: str = IMAGE_STORE_DIR):
+        self.root = root
+
+    def directory(self, sha256: str) -> str:
+        return os.path.join(self.root, sha256[:2], sha256[2:4], sha256)
+
+    def relative_path(self, sha256: str, variant: str, extension: str = "jpg") -> str:
+        """Ruta relativa a root (la que se guarda en PlantAnalysis.image_path)"""
+        return os.path.join(sha256[:2], sha256[2:4], sha256, f"{variant}.{extension}")
+
+    def path(self, sha256: str, variant: str, extension: str = "jpg") -> str:
+        return os.path.join(self.root, self.relative_path(sha256, variant, extension))
+
+    @staticmethod
+    def _write(path: str, data: bytes) -> None:
+        # Escritura atómica: un lector nunca ve un fichero a medias. El temporal es
+        # único por llamada: los endpoints síncronos corren en un threadpool y dos
+        # subidas simultáneas del mismo contenido escriben la misma ruta
+        descriptor, temporary = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "wb") as file:
+                file.write(data)
+            os.chmod(temporary, 0o644)  # mkstemp crea con 0600
+            os.replace(temporary, path)
+        except BaseException:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            raise
+
+    def put(self, data: bytes) -> StoredImage:
+        """
+        Guarda una imagen y sus variantes si no existía ya
+
+        Args:
+            data: Bytes de la imagen (JPEG, PNG o WebP)
+
+        Returns:
+            StoredImage: Metadatos; created=False si el contenido ya estaba
+
+        Raises:
+            InvalidImageError: Si no es una imagen válida o supera IMAGE_MAX_BYTES
+        """
+        import io
+        from PIL import Image, ImageOps, UnidentifiedImageError
+
+        if not data:
+            raise InvalidImageError("Imagen vacía")
+        if len(data) > IMAGE_MAX_BYTES:
+            raise InvalidImageError(f"La imagen supera {IMAGE_MAX_BYTES} bytes")
+
+        try:
+            image = Image.open(io.BytesIO(data))
+            image_format = image.format
+            width, height = image.size
+        except (UnidentifiedImageError, OSError) as exception:
+            raise InvalidImageError("No es una imagen JPEG, PNG o WebP") from exception
+        if image_format not in _FORMATS:
+            raise InvalidImageError(f"Formato no soportado: {image_format}")
+
+        extension, content_type = _FORMATS[image_format]
+        sha256 = hashlib.sha256(data).hexdigest()
+        stored = StoredImage(sha256, content_type, extension, width, height, len(data), created=False)
+
+        directory = self.directory(sha256)
+        if os.path.exists(os.path.join(directory, f"{ORIGINAL}.{extension}")):
+            return stored
+
+        # Una sola decodificación, ya reducida a lo que necesita la variante más grande
+        largest = max(size for _, size, _ in VARIANTS.values())
+        try:
+            image.draft("RGB", (largest, largest))
+            decoded = ImageOps.exif_transpose(image.convert("RGB"))
+        except OSError as exception:
+            raise InvalidImageError(str(exception)) from exception
+
+        os.makedirs(directory, exist_ok=True)
+        for variant, (mode, size, quality) in VARIANTS.items():
+            reference = min(decoded.size) if mode == "short_side" else max(decoded.size)
+            resized = decoded
+            if reference > size:
+                scale = size / reference
+                resized = decoded.resize(
+                    (max(1, round(decoded.width * scale)), max(1, round(decoded.height * scale))),
+                    Image.BILINEAR if variant == "model" else Image.LANCZOS
+                )
+            buffer = io.BytesIO()
+            resized.save(buffer, format="JPEG", quality=quality, optimize=True)
+            self._write(self.path(sha256, variant), buffer.getvalue())
+
+        # El original se escribe al final: su presencia marca la imagen como completa
+        self._write(os.path.join(directory, f"{ORIGINAL}.{extension}"), data)
+        stored.created = True
+        return stored
+
+    def exists(self, sha256: str, variant: str, extension: str = "jpg") -> bool:
+        return os.path.exists(self.path(sha256, variant, extension))
+
+
+image_store = ImageStore()
@@ -0,0 +1,309 @@
+"""
+Particionado por tiempo de sensor_readings y retención por partición
+
+En Postgres la tabla se crea con particionado nativo (PARTITION BY RANGE
+(recorded_at)) y una partición por mes o por semana; las consultas acotadas
+por recorded_at solo tocan las particiones del rango (partition pruning) y la
+retención es un DROP TABLE por partición en lugar de un DELETE masivo.
+
+En SQLite no hay particionado nativo, y en Postgres la tabla puede no estar
+particionada (READINGS_PARTITIONING desactivado): en ambos casos la retención
+cae a DELETEs por lotes sobre el índice de recorded_at para no bloquear la
+base con una sola transacción enorme.
+
+Uso:
+    python -m storage.partitions create            # tabla particionada + particiones próximas
+    python -m storage.partitions retention --keep-days 365
+"""
+import argparse
+import asyncio
+import logging
+import os
+import threading
+from datetime import date, datetime, timedelta
+from typing import Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+TABLE = "sensor_readings"
+# Tabla particionada (Postgres): la ingesta crea las particiones que falten y el lifespan las mantiene
+READINGS_PARTITIONING = os.getenv("READINGS_PARTITIONING", "false").lower() in ("1", "true", "yes")
+# month | week
+PARTITION_INTERVAL = os.getenv("READINGS_PARTITION_INTERVAL", "month").lower()
+PARTITIONS_AHEAD = int(os.getenv("READINGS_PARTITIONS_AHEAD", "2"))
+RETENTION_DAYS = int(os.getenv("READINGS_RETENTION_DAYS", "0"))  # 0 = sin retención
+DELETE_BATCH_SIZE = 10_000
+
+# Inicio de los periodos con partición conocida en este proceso (ver ensure_partitions_for)
+_known_periods: Set[date] = set()
+_known_lock = threading.Lock()
+
+
+def is_postgres(engine: Engine) -> bool:
+    return engine.dialect.name == "postgresql"
+
+
+def period_bounds(moment: date, interval: str = PARTITION_INTERVAL) -> Tuple[date, date]:
+    """
+    Devuelve el periodo [inicio, fin) que contiene la fecha
+
+    Args:
+        moment: Fecha dentro del periodo
+        interval: "month" o "week" (semanas ISO, empiezan en lunes)
+    """
+    if isinstance(moment, datetime):
+        moment = moment.date()
+    if interval == "week":
+        start = moment - timedelta(days=moment.weekday())
+        return start, start + timedelta(days=7)
+    start = moment.replace(day=1)
+    end = (start.replace(year=start.year + 1, month=1) if start.month == 12
+           else start.replace(month=start.month + 1))
+    return start, end
+
+
+def partition_name(start: date, interval: str = PARTITION_INTERVAL) -> str:
+    if interval == "week":
+        year, week, _ = start.isocalendar()
+        return f"{TABLE}_{year}w{week:02d}"
+    return f"{TABLE}_{start.year}m{start.month:02d}"
+
+
+def create_partitioned_table(engine: Engine) -> bool:
+    """
+    Crea sensor_readings como tabla particionada (solo Postgres)
+
+    Hay que llamarlo antes de Base.metadata.create_all, que después
+    respetará la tabla existente. La clave primaria incluye recorded_at
+    porque Postgres lo exige en tablas particionadas; el id sigue siendo único
+    por su secuencia, así que el modelo SensorReading no cambia.
+
+    Returns:
+        bool: True si se creó, False si no es Postgres o ya existía
+    """
+    if not is_postgres(engine):
+        return False
+
+    with engine.begin() as connection:
+        exists = connection.execute(text("SELECT to_regclass(:name)"), {"name": TABLE}).scalar()
+        if exists:
+            return False
+        connection.execute(text(f"""
+            CREATE TABLE {TABLE} (
+                id SERIAL,
+                sensor_id INTEGER NOT NULL REFERENCES sensors(id) ON DELETE CASCADE,
+                value DOUBLE PRECISION NOT NULL,
+                recorded_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT (now() AT TIME ZONE 'utc'),
+                PRIMARY KEY (id, recorded_at)
+            ) PARTITION BY RANGE (recorded_at)
+        """))
+        connection.execute(text(f"CREATE INDEX ix_{TABLE}_recorded_at ON {TABLE} (recorded_at)"))
+        connection.execute(text(
+            f"CREATE UNIQUE INDEX ix_{TABLE}_sensor_recorded ON {TABLE} (sensor_id, recorded_at)"
+        ))
+    ensure_partitions(engine)
+    return True
+
+
+def ensure_partitions(engine: Engine, start: Optional[date] = None, ahead: int = PARTITIONS_AHEAD) -> List[str]:
+    """
+    Crea las particiones desde start hasta `ahead` periodos en el futuro
+
+    Args:
+        engine: Engine de Postgres
+        start: Primer periodo a cubrir (por defecto el actual)
+        ahead: Periodos futuros a crear por adelantado
+
+    Returns:
+        list: Nombres de las particiones creadas
+    """
+    if not is_postgres(engine):
+        return []
+
+    today = datetime.utcnow().date()
+    period_start, _ = period_bounds(start or today)
+    _, last_end = period_bounds(today)
+    for _ in range(ahead):
+        _, last_end = period_bounds(last_end)
+
+    existing = set(name for name, _, _ in list_partitions(engine))
+    created = []
+    with engine.begin() as connection:
+        while period_start < last_end:
+            _, period_end = period_bounds(period_start)
+            name = partition_name(period_start)
+            if name not in existing:
+                connection.execute(text(
+                    f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {TABLE} "
+                    f"FOR VALUES FROM ('{period_start.isoformat()}') TO ('{period_end.isoformat()}')"
+                ))
+                created.append(name)
+            period_start = period_end
+    return created
+
+
+def ensure_partitions_for(engine: Engine, moments: Iterable[datetime]) -> List[str]:
+    """
+    Crea las particiones de los periodos de moments que todavía no existen
+
+    Postgres rechaza una fila sin partición y con ella todo el INSERT del
+    lote: la ingesta lo llama antes de insertar lecturas atrasadas (backfill
+    de una pasarela, lecturas retenidas al cambiar de mes). Solo se crean los
+    periodos pedidos, no los intermedios. Los periodos ya vistos se recuerdan
+    en el proceso, así que en el caso normal no hay ninguna consulta.
+
+    Args:
+        engine: Engine de Postgres (las particiones se crean en su propia transacción)
+        moments: Valores de recorded_at del lote
+
+    Returns:
+        list: Nombres de las particiones creadas
+    """
+    if not is_postgres(engine):
+        return []
+
+    periods = {period_bounds(moment)[0] for moment in moments}
+    with _known_lock:
+        missing = periods - _known_periods
+    if not missing:
+        return []
+
+    existing = set(name for name, _, _ in list_partitions(engine))
+    created = []
+    with engine.begin() as connection:
+        for period_start in sorted(missing):
+            name = partition_name(period_start)
+            if name in existing:
+                continue
+            _, period_end = period_bounds(period_start)
+            connection.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {TABLE} "
+                f"FOR VALUES FROM ('{period_start.isoformat()}') TO ('{period_end.isoformat()}')"
+            ))
+            created.append(name)
+    with _known_lock:
+        _known_periods.update(missing)
+    if created:
+        logger.info("Particiones creadas para lecturas fuera de rango: %s", created)
+    return created
+
+
+def list_partitions(engine: Engine) -> List[Tuple[str, Optional[datetime], Optional[datetime]]]:
+    """
+    Lista las particiones con sus límites
+
+    Returns:
+        list: Tuplas (nombre, desde, hasta) ordenadas por fecha
+    """
+    if not is_postgres(engine):
+        return []
+
+    with engine.connect() as connection:
+        rows = connection.execute(text("""
+            SELECT child.relname, pg_get_expr(child.relpartbound, child.oid)
+            FROM pg_inherits
+            JOIN pg_class parent ON pg_inherits.inhparent = parent.oid
+            JOIN pg_class child ON pg_inherits.inhrelid = child.oid
+            WHERE parent.relname = :table
+        """), {"table": TABLE}).all()
+
+    partitions = []
+    for name, bound in rows:
+        # FOR VALUES FROM ('2025-01-01 00:00:00') TO ('2025-02-01 00:00:00')
+        parts = bound.split("'")
+        if len(parts) >= 4:
+            partitions.append((name, datetime.fromisoformat(parts[1]), datetime.fromisoformat(parts[3])))
+        else:
+            partitions.append((name, None, None))
+    partitions.sort(key=lambda item: item[1] or datetime.min)
+    return partitions
+
+
+def apply_retention(engine: Engine, keep_days: int) -> dict:
+    """
+    Elimina las lecturas con más de keep_days días
+
+    Con la tabla particionada se eliminan particiones completas (DROP TABLE,
+    instantáneo); la partición que contiene el límite se conserva entera. Sin
+    particiones (SQLite o tabla normal en Postgres) se borra por lotes. Los
+    bloques comprimidos cerrados también se eliminan.
+
+    Returns:
+        dict: Particiones eliminadas o filas borradas
+    """
+    cutoff = datetime.utcnow() - timedelta(days=keep_days)
+    result = {"cutoff": cutoff.isoformat(), "dropped_partitions": [], "deleted_rows": 0}
+
+    # Vacía fuera de Postgres o si sensor_readings no está particionada
+    existing = list_partitions(engine)
+    if existing:
+        for name, _, upper in existing:
+            if upper is not None and upper <= cutoff:
+                with engine.begin() as connection:
+                    connection.execute(text(f"ALTER TABLE {TABLE} DETACH PARTITION {name}"))
+                    connection.execute(text(f"DROP TABLE {name}"))
+                result["dropped_partitions"].append(name)
+        if result["dropped_partitions"]:
+            # Una lectura de un periodo eliminado debe volver a crear su partición
+            with _known_lock:
+                _known_periods.clear()
+    else:
+        while True:
+            with engine.begin() as connection:
+                deleted = connection.execute(text(f"""
+                    DELETE FROM {TABLE} WHERE id IN (
+                        SELECT id FROM {TABLE} WHERE recorded_at < :cutoff LIMIT :limit
+                    )
+                """), {"cutoff": cutoff, "limit": DELETE_BATCH_SIZE}).rowcount
+            result["deleted_rows"] += deleted
+            if deleted < DELETE_BATCH_SIZE:
+                break
+
+    with engine.begin() as connection:
+        result["deleted_chunks"] = connection.execute(
+            text("DELETE FROM sensor_reading_chunks WHERE end_at <= :cutoff"), {"cutoff": cutoff}
+        ).rowcount
+    return result
+
+
+async def maintenance_loop(engine: Engine, interval_seconds: float = 6 * 3600.0) -> None:
+    """Tarea del lifespan: crea particiones futuras (tabla particionada) y aplica la retención"""
+    while True:
+        try:
+            if READINGS_PARTITIONING:
+                await asyncio.to_thread(ensure_partitions, engine)
+            if RETENTION_DAYS:
+                result = await asyncio.to_thread(apply_retention, engine, RETENTION_DAYS)
+                logger.info("Retención de lecturas aplicada: %s", result)
+        except Exception:
+            logger.exception("Error en el mantenimiento de particiones")
+        await asyncio.sleep(interval_seconds)
+
+
+def main():
+    from database_config import engine
+
+    parser = argparse.ArgumentParser(description="Particiones y retención de sensor_readings")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("create", help="Crear la tabla particionada y las particiones próximas")
+    subparsers.add_parser("list", help="Listar particiones")
+    retention = subparsers.add_parser("retention", help="Eliminar lecturas antiguas")
+    retention.add_argument("--keep-days", type=int, required=True)
+    args = parser.parse_args()
+
+    if args.command == "create":
+        created = create_partitioned_table(engine)
+        print("Tabla particionada creada" if created else "Tabla existente o base no Postgres")
+        print(f"Particiones nuevas: {ensure_partitions(engine)}")
+    elif args.command == "list":
+        for name, lower, upper in list_partitions(engine):
+            print(f"{name}: {lower} -> {upper}")
+    else:
+        print(apply_retention(engine, args.keep_days))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+"""
+Réplicas de lectura: retraso de replicación y enrutado de sesiones
+
+El monitor escribe cada REPLICA_HEARTBEAT_SECONDS un latido (epoch) en
+replication_heartbeat del primario y lo lee en cada réplica:
+
+    retraso = ahora - beat_at visto en la réplica
+
+Una réplica recibe lecturas solo si respondió en la última comprobación y su
+retraso, calculado al elegir con el último latido visto, no supera
+REPLICA_MAX_LAG_SECONDS. Sin réplicas sanas (o sin monitor
+en marcha) todo va al primario.
+
+Leer lo propio escrito: quien acaba de escribir en el instante t solo puede
+leer de réplicas cuyo latido replicado sea >= t. Como la réplica aplica los
+commits en orden, ese latido implica que ya tiene la escritura.
+
+RoutingSession manda los SELECT a la réplica elegida (una por sesión, para
+que todas las lecturas de una petición vean el mismo estado) y cualquier
+escritura al primario; tras la primera escritura la sesión sigue en el
+primario.
+"""
+import asyncio
+import itertools
+import logging
+import math
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+from sqlalchemy import Select, event, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from models.replication_heartbeat_model import ReplicationHeartbeat
+from monitoring.metrics import DB_READ_ROUTING_TOTAL, DB_REPLICA_LAG
+from storage.sql import dialect_insert
+
+logger = logging.getLogger(__name__)
+
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "5"))
+REPLICA_HEARTBEAT_SECONDS = float(os.getenv("REPLICA_HEARTBEAT_SECONDS", "1"))
+
+_HEARTBEAT_ID = 1
+
+# Pasado este tiempo desde una escritura, cualquier réplica enrutable ya la tiene
+READ_YOUR_WRITES_SECONDS = math.ceil(REPLICA_MAX_LAG_SECONDS + REPLICA_HEARTBEAT_SECONDS) + 1
+
+# Instantes de los commits con escrituras de la petición actual (ver write_scope)
+_request_writes: ContextVar[Optional[List[float]]] = ContextVar("request_writes", default=None)
+
+
+@contextmanager
+def write_scope() -> Iterator[List[float]]:
+    """
+    Abre un ámbito donde se anotan los commits con escrituras
+
+    La lista es mutable, así que los hilos del threadpool de FastAPI (que
+    copian el contexto) anotan sobre la misma instancia.
+    """
+    writes: List[float] = []
+    token = _request_writes.set(writes)
+    try:
+        yield writes
+    finally:
+        _request_writes.reset(token)
+
+
+def _on_flush(session, flush_context) -> None:
+    session.info["wrote"] = True
+
+
+def _on_orm_execute(orm_execute_state) -> None:
+    # insert()/update()/delete() ejecutados directamente no pasan por el flush
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["wrote"] = True
+
+
+def _on_commit(session) -> None:
+    if session.info.pop("wrote", False):
+        writes = _request_writes.get()
+        if writes is not None:
+            writes.append(time.time())
+
+
+def _on_rollback(session) -> None:
+    session.info.pop("wrote", None)
+
+
+def track_writes(session_factory) -> None:
+    """
+    Anota en el write_scope actual los commits con escrituras de las sesiones
+
+    Args:
+        session_factory: sessionmaker cuyas sesiones se siguen
+    """
+    if event.contains(session_factory, "after_commit", _on_commit):
+        return
+    event.listen(session_factory, "after_flush", _on_flush)
+    event.listen(session_factory, "do_orm_execute", _on_orm_execute)
+    event.listen(session_factory, "after_commit", _on_commit)
+    event.listen(session_factory, "after_rollback", _on_rollback)
+
+
+class Replica:
+    """Estado de una réplica según la última comprobación"""
+    __slots__ = ("name", "engine", "beat_at", "lag", "error")
+
+    def __init__(self, name: str, engine: Engine):
+        self.name = name
+        self.engine = engine
+        self.beat_at: Optional[float] = None
+        self.lag: Optional[float] = None
+        self.error: Optional[str] = None
+
+
+class ReplicaSet:
+    """
+    Primario y réplicas de lectura
+
+    Args:
+        primary: Engine del primario
+        replicas: Engines de las réplicas
+        max_lag_seconds: Retraso a partir del cual una réplica deja de recibir lecturas
+    """
+
+    def __init__(self, primary: Engine, replicas: List[Engine], max_lag_seconds: float = REPLICA_MAX_LAG_SECONDS):
+        self.primary = primary
+        self.replicas = [Replica(f"replica{index}", engine) for index, engine in enumerate(replicas)]
+        self.max_lag_seconds = max_lag_seconds
+        self._round_robin = itertools.count()
+
+    def heartbeat(self) -> float:
+        """Escribe el latido en el primario y devuelve su valor"""
+        now = time.time()
+        with Session(self.primary) as db:
+            statement = dialect_insert(db, ReplicationHeartbeat.__table__).values(id=_HEARTBEAT_ID, beat_at=now)
+            db.execute(statement.on_conflict_do_update(index_elements=["id"], set_={"beat_at": now}))
+            db.commit()
+        return now
+
+    def check(self) -> Dict[str, Optional[float]]:
+        """
+        Escribe un latido y mide el retraso de cada réplica
+
+        Returns:
+            dict: Retraso en segundos por réplica (None si no responde o no tiene latido)
+        """
+        if not self.replicas:
+            return {}
+        self.heartbeat()
+
+        lags = {}
+        for replica in self.replicas:
+            try:
+                with replica.engine.connect() as connection:
+                    beat_at = connection.execute(
+                        select(ReplicationHeartbeat.beat_at).where(ReplicationHeartbeat.id == _HEARTBEAT_ID)
+                    ).scalar()
+            except Exception as exception:
+                replica.lag, replica.error = None, type(exception).__name__
+                logger.warning("Réplica %s no disponible: %s", replica.name, exception)
+            else:
+                replica.beat_at = beat_at
+                if beat_at is None:
+                    # El primer latido aún no ha llegado a la réplica
+                    replica.lag, replica.error = None, "no_heartbeat"
+                else:
+                    replica.lag, replica.error = max(0.0, time.time() - beat_at), None
+            lags[replica.name] = replica.lag
+            DB_REPLICA_LAG.set(-1 if replica.lag is None else replica.lag, replica=replica.name)
+        return lags
+
+    def _routable(self, replica: Replica, now: float) -> bool:
+        # El retraso se calcula ahora, no en la última comprobación: si el latido
+        # deja de escribirse beat_at no avanza y la réplica sale sola del enrutado
+        if replica.error is not None or replica.beat_at is None:
+            return False
+        return now - replica.beat_at <= self.max_lag_seconds
+
+    def choose(self, written_at: Optional[float] = None) -> Optional[Replica]:
+        """
+        Elige una réplica para una sesión de lectura
+
+        Args:
+            written_at: Epoch de la última escritura del cliente (leer lo propio escrito)
+
+        Returns:
+            Replica: Réplica elegida, o None si la sesión debe ir al primario
+        """
+        if not self.replicas:
+            return None
+        now = time.time()
+        healthy = [replica for replica in self.replicas if self._routable(replica, now)]
+        if not healthy:
+            DB_READ_ROUTING_TOTAL.inc(target="primary", reason="lag")
+            return None
+        if written_at is not None:
+            healthy = [replica for replica in healthy if replica.beat_at is not None and replica.beat_at >= written_at]
+            if not healthy:
+                DB_READ_ROUTING_TOTAL.inc(target="primary", reason="read_your_writes")
+                return None
+        DB_READ_ROUTING_TOTAL.inc(target="replica", reason="healthy")
+        return healthy[next(self._round_robin) % len(healthy)]
+
+    def status(self) -> List[Dict[str, Any]]:
+        """Estado de cada réplica (para /health/ready)"""
+        now = time.time()
+        return [
+            {
+                "name": replica.name,
+                "lag_seconds": replica.lag,
+                "routable": self._routable(replica, now),
+                "error": replica.error,
+            }
+            for replica in self.replicas
+        ]
+
+    async def monitor_loop(self, interval_seconds: float = REPLICA_HEARTBEAT_SECONDS) -> None:
+        """Tarea del lifespan: latido y medición de retraso periódicos"""
+        while True:
+            try:
+                await asyncio.to_thread(self.check)
+            except Exception:
+                # Sin latido nuevo las réplicas se atrasan y las lecturas vuelven al primario
+                logger.exception("Error escribiendo el latido de replicación")
+            await asyncio.sleep(interval_seconds)
+
+
+class RoutingSession(Session):
+    """
+    Sesión que lee de una réplica y escribe en el primario
+
+    Args:
+        replicas: Conjunto de réplicas (None = siempre primario)
+        written_at: Epoch de la última escritura del cliente, si la hubo
+    """
+
+    def __init__(self, *args, replicas: Optional[ReplicaSet] = None, written_at: Optional[float] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._replicas = replicas
+        self._written_at = written_at
+        self._read_bind: Optional[Engine] = None
+        self._pinned = replicas is None or not replicas.replicas
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        primary = super().get_bind(mapper, clause=clause, **kwargs)
+        if self._pinned:
+            return primary
+        # Escrituras, SELECT ... FOR UPDATE y SQL textual: primario desde aquí en adelante
+        if self._flushing or not isinstance(clause, Select) or clause._for_update_arg is not None:
+            self._pinned = True
+            return primary
+        if self._read_bind is None:
+            replica = self._replicas.choose(self._written_at)
+            self._read_bind = replica.engine if replica is not None else primary
+        return self._read_bind
+
+    @property
+    def read_engine(self) -> Optional[Engine]:
+        """Engine de las lecturas de esta sesión (None hasta la primera lectura enrutada)"""
+        return self._read_bind
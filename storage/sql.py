@@ -0,0 +1,48 @@
+"""
+Utilidades SQL compartidas por los servicios (SQLite y Postgres)
+"""
+from typing import Any, Dict, List
+
+from sqlalchemy.engine import Result
+from sqlalchemy.orm import Session
+
+
+def dialect_insert(db: Session, table):
+    """
+    insert() del dialecto de la sesión, con on_conflict_do_update/do_nothing
+
+    Args:
+        db: Sesión (se usa el dialecto de su conexión)
+        table: Tabla o modelo
+
+    Returns:
+        Insert: Sentencia INSERT con soporte de ON CONFLICT
+
+    Raises:
+        NotImplementedError: Si el dialecto no es SQLite ni Postgres
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"ON CONFLICT no soportado para el dialecto {dialect}")
+    return insert(table)
+
+
+def rows_as_dicts(result: Result) -> List[Dict[str, Any]]:
+    """
+    Filas de una consulta por columnas como dicts listos para orjson
+
+    Para lecturas calientes: sin entidades del ORM (identity map, estado) ni
+    validación Pydantic por objeto.
+
+    Args:
+        result: Resultado de select(columnas...)
+
+    Returns:
+        list: Un dict por fila con las claves de las columnas seleccionadas
+    """
+    keys = list(result.keys())
+    return [dict(zip(keys, row)) for row in result]
@@ -0,0 +1,88 @@
+"""
+Fixtures comunes de los tests
+
+Cada sesión de pytest usa un SQLite temporal (DATABASE_URL se fija antes de
+importar database_config) y cada test parte de las tablas vacías. El plugin
+monitoring.pytest_plugin hace fallar cualquier test cuyas peticiones
+provoquen consultas N+1.
+"""
+import os
+import tempfile
+
+_DATA_DIR = tempfile.mkdtemp(prefix="greenhouse-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_DATA_DIR}/test.db"
+os.environ["IMAGE_STORE_DIR"] = os.path.join(_DATA_DIR, "images")
+os.environ["WARMUP_SUBSYSTEMS"] = "none"
+os.environ["SENSOR_MONITOR_ENABLED"] = "false"
+
+import pytest
+from fastapi.testclient import TestClient
+
+pytest_plugins = ["monitoring.pytest_plugin"]
+
+
+@pytest.fixture(autouse=True)
+def _tables():
+    """Crea las tablas antes de cada test y las borra al terminar"""
+    from database_config import engine
+    from models import Base
+
+    Base.metadata.create_all(engine)
+    yield
+    Base.metadata.drop_all(engine)
+
+
+@pytest.fixture
+def db():
+    from database_config import SessionLocal
+
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def client():
+    """Cliente de la API sin lifespan (no arranca los bucles en segundo plano)"""
+    from main import app
+
+    return TestClient(app)
+
+
+@pytest.fixture
+def user_id(client):
+    response = client.post("/users/", json={"username": "grower", "password": "Secret123"})
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+@pytest.fixture
+def greenhouse_id(client, user_id):
+    response = client.post(
+        f"/greenhouses/?user_id={user_id}",
+        json={"name": "Invernadero 1", "latitude": 25.8, "longitude": -108.9}
+    )
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+def create_sensors(client, user_id: int, greenhouse_id: int, types) -> list:
+    """Crea un sensor por tipo y devuelve sus IDs"""
+    response = client.post(
+        f"/greenhouses/{greenhouse_id}/sensors:batch?user_id={user_id}",
+        json={"items": [{"name": f"{kind}-{index}", "type": kind} for index, kind in enumerate(types)]}
+    )
+    assert response.status_code == 201, response.text
+    return [sensor["id"] for sensor in response.json()["created"]]
+
+
+def create_plants(client, user_id: int, greenhouse_id: int, count: int) -> list:
+    """Crea count plantas y devuelve sus IDs"""
+    response = client.post(
+        f"/greenhouses/{greenhouse_id}/plants:batch?user_id={user_id}",
+        json={"items": [{"name": f"planta-{index}", "type": "tomate"} for index in range(count)]}
+    )
+    assert response.status_code == 201, response.text
+    return [plant["id"] for plant in response.json()["created"]]
@@ -0,0 +1,88 @@
+"""ETags, GET condicional, compresión y conflictos de versión"""
+import pytest
+
+from database_config import SessionLocal
+from models import Greenhouse
+from services.greenhouse_service import ConcurrentUpdateError, GreenhouseService
+
+from .conftest import create_plants
+
+
+@pytest.fixture
+def detail_url(client, user_id, greenhouse_id):
+    # Suficientes plantas para pasar de COMPRESSION_MIN_SIZE
+    create_plants(client, user_id, greenhouse_id, 30)
+    return f"/greenhouses/{greenhouse_id}"
+
+
+def test_unchanged_greenhouse_returns_304(client, detail_url):
+    first = client.get(detail_url, headers={"Accept-Encoding": "identity"})
+    etag = first.headers["ETag"]
+
+    response = client.get(detail_url, headers={"Accept-Encoding": "identity", "If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+
+
+def test_compressed_response_has_suffixed_etag(client, detail_url):
+    plain = client.get(detail_url, headers={"Accept-Encoding": "identity"})
+    compressed = client.get(detail_url, headers={"Accept-Encoding": "gzip"})
+
+    assert compressed.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in compressed.headers["Vary"]
+    assert compressed.headers["ETag"] == plain.headers["ETag"][:-1] + '-gzip"'
+    # httpx ya lo descomprime: mismo cuerpo que sin compresión
+    assert compressed.json() == plain.json()
+
+
+def test_304_echoes_the_suffixed_etag(client, detail_url):
+    """El 304 devuelve la etiqueta de la representación que tiene el cliente, con su sufijo"""
+    etag = client.get(detail_url, headers={"Accept-Encoding": "gzip"}).headers["ETag"]
+    assert etag.endswith('-gzip"')
+
+    response = client.get(detail_url, headers={"Accept-Encoding": "gzip", "If-None-Match": f'"otro", {etag}'})
+
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+
+
+def test_update_changes_etag(client, user_id, greenhouse_id, detail_url):
+    etag = client.get(detail_url).headers["ETag"]
+    response = client.patch(f"{detail_url}?user_id={user_id}", json={"name": "Invernadero norte"})
+    assert response.status_code == 200, response.text
+
+    response = client.get(detail_url, headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert response.json()["name"] == "Invernadero norte"
+
+
+def test_concurrent_update_is_a_conflict(db, greenhouse_id):
+    """Si otra sesión confirmó antes, el UPDATE con la versión leída no encuentra la fila"""
+    stale = db.get(Greenhouse, greenhouse_id)
+    other = SessionLocal()
+    try:
+        other.get(Greenhouse, greenhouse_id).name = "Cambio de otra petición"
+        other.commit()
+    finally:
+        other.close()
+
+    with pytest.raises(ConcurrentUpdateError):
+        GreenhouseService.update_greenhouse(db, greenhouse_id, {"name": "Cambio perdido"})
+
+    db.expire_all()
+    assert stale.name == "Cambio de otra petición"
+
+
+def test_concurrent_update_returns_409(client, user_id, greenhouse_id, monkeypatch):
+    def conflict(db, greenhouse_id, update_data):
+        raise ConcurrentUpdateError("El invernadero se modificó en otra petición")
+
+    monkeypatch.setattr(GreenhouseService, "update_greenhouse", staticmethod(conflict))
+
+    response = client.patch(f"/greenhouses/{greenhouse_id}?user_id={user_id}", json={"name": "Otro"})
+
+    assert response.status_code == 409
@@ -0,0 +1,115 @@
+"""Pronóstico por sensor de un invernadero (ForecastService y GET /greenhouses/{id}/forecast)"""
+from datetime import datetime, timedelta
+
+import msgpack
+import numpy as np
+import pandas as pd
+import pyarrow
+import pytest
+
+import services.forecast_service as forecast_service
+from clients.weather_client import HourlyForecast
+from control.forecasts import ForecastCache
+from models import SensorForecastModel
+from services.forecast_service import ForecastService
+
+from .conftest import create_sensors
+
+NOW = datetime.utcnow().replace(minute=20, second=0, microsecond=0)
+DAYS = 4
+
+
+def _outside_temperature(hours: np.ndarray) -> np.ndarray:
+    # hours: horas desde epoch
+    return 20 + 8 * np.sin(2 * np.pi * (hours % 24 - 9) / 24)
+
+
+def _fetch(coordinates):
+    dates = pd.date_range(pd.Timestamp(NOW - timedelta(days=30)).floor("h").tz_localize("UTC"), periods=40 * 24, freq="h")
+    hours = dates.as_unit("s").asi8 / 3600
+    temperature = _outside_temperature(hours)
+    humidity = 60 - 2 * (temperature - 20)
+    zeros = np.zeros(len(dates))
+    return [
+        HourlyForecast(latitude, longitude, 0, 0, dates, temperature, humidity, zeros, zeros, zeros, zeros)
+        for latitude, longitude in coordinates
+    ]
+
+
+@pytest.fixture(autouse=True)
+def _outside(monkeypatch):
+    monkeypatch.setattr(forecast_service, "_outside", ForecastCache(fetch=_fetch))
+
+
+@pytest.fixture
+def sensors(client, user_id, greenhouse_id):
+    """Sensores de temperatura y humedad con DAYS días de lecturas cada 10 minutos, más uno de luz"""
+    temperature_id, humidity_id, light_id = create_sensors(
+        client, user_id, greenhouse_id, ["temperature", "humidity", "light"]
+    )
+    moments = [NOW - timedelta(minutes=10 * step) for step in range(DAYS * 144)]
+    readings = []
+    for moment in moments:
+        outside = float(_outside_temperature(np.array([moment.timestamp() / 3600 - 1.5]))[0])
+        readings += [
+            {"sensor_id": temperature_id, "value": 0.6 * outside + 10, "recorded_at": moment.isoformat()},
+            {"sensor_id": humidity_id, "value": 70 - 1.5 * (outside - 20), "recorded_at": moment.isoformat()},
+            {"sensor_id": light_id, "value": 1000.0, "recorded_at": moment.isoformat()},
+        ]
+    for offset in range(0, len(readings), 10_000):
+        response = client.post("/sensors/readings", json={"readings": readings[offset:offset + 10_000]})
+        assert response.status_code == 200, response.text
+    return [temperature_id, humidity_id]
+
+
+def test_forecast_columns(db, greenhouse_id, sensors):
+    forecast = ForecastService.forecast(db, greenhouse_id, 12, now=NOW)
+
+    assert forecast.sensor_ids.tolist() == sensors
+    assert forecast.sensor_types == ["temperature", "humidity"]
+    assert forecast.values.shape == (2, 12)
+    assert forecast.timestamps.shape == (12,)
+    assert forecast.samples.shape == (2,)
+    assert forecast.outside.shape == (2, 12)
+    assert np.isfinite(forecast.values).all()
+    assert db.query(SensorForecastModel).count() == 2
+
+
+def test_incremental_update_matches_full_fit(db, greenhouse_id, sensors):
+    ForecastService.forecast(db, greenhouse_id, 24, now=NOW - timedelta(hours=6))
+    incremental = ForecastService.forecast(db, greenhouse_id, 24, now=NOW)
+
+    db.query(SensorForecastModel).delete()
+    db.commit()
+    full = ForecastService.forecast(db, greenhouse_id, 24, now=NOW)
+
+    np.testing.assert_allclose(incremental.values, full.values, rtol=1e-6)
+
+
+@pytest.mark.parametrize("format", ["json", "columnar", "msgpack", "arrow"])
+def test_forecast_endpoint_formats(client, greenhouse_id, sensors, format):
+    response = client.get(f"/greenhouses/{greenhouse_id}/forecast", params={"hours": 6, "format": format})
+
+    assert response.status_code == 200, response.text
+    if format in ("json", "columnar"):
+        body = response.json()
+        assert body["sensor_ids"] == sensors
+        assert len(body["samples"]) == len(sensors)
+        assert len(body["t"]) == 6
+        assert len(body["outside_temperature"]) == 6
+        assert [len(row) for row in body["values"]] == [6, 6]
+    elif format == "msgpack":
+        body = msgpack.unpackb(response.content)
+        assert body["sensor_ids"] == sensors
+        assert len(body["samples"]) == len(sensors)
+        assert body["t"]["shape"] == [6]
+        assert body["values"]["shape"] == [2, 6]
+    else:
+        table = pyarrow.ipc.open_stream(response.content).read_all()
+        assert table.num_rows == 6
+        assert set(table.column_names) == {"t", "values_0", "values_1", "outside_temperature", "outside_humidity"}
+
+
+def test_forecast_hours_out_of_range(client, greenhouse_id):
+    assert client.get(f"/greenhouses/{greenhouse_id}/forecast", params={"hours": 3}).status_code == 422
+    assert client.get("/greenhouses/999/forecast").status_code == 404
@@ -0,0 +1,98 @@
+"""Agregados incrementales de salud de plantas (HealthSummaryService)"""
+from datetime import date, datetime
+
+from models import PlantAnalysis
+from services.health_summary_service import HealthSummaryService
+
+from .conftest import create_plants
+
+TODAY = date(2026, 3, 2)
+
+
+def _record(db, plant_id, *analyses):
+    """Inserta análisis (result, confidence, analyzed_at) y los suma a los agregados en la misma transacción"""
+    rows = [
+        PlantAnalysis(plant_id=plant_id, analysis_type="health", result=result,
+                      confidence=confidence, analyzed_at=analyzed_at)
+        for result, confidence, analyzed_at in analyses
+    ]
+    db.add_all(rows)
+    db.flush()
+    HealthSummaryService.record_analyses(db, rows)
+    db.commit()
+
+
+def _label(summary, plant_id, result):
+    return next(row for row in summary["plants"] if row["plant_id"] == plant_id and row["result"] == result)
+
+
+def _distribution(summary):
+    return sorted(summary.pop("distribution"), key=lambda row: row["result"])
+
+
+def test_upsert_adds_counts_and_confidences(client, db, user_id, greenhouse_id):
+    plant_id, other_id = create_plants(client, user_id, greenhouse_id, 2)
+    _record(db, plant_id,
+            ("healthy", 0.5, datetime(2026, 3, 1, 9)),
+            ("rust", 0.75, datetime(2026, 3, 1, 10)),
+            ("rust", None, datetime(2026, 3, 2, 8)))
+    _record(db, other_id,
+            ("rust", 0.25, datetime(2026, 3, 1, 11)))
+
+    summary = HealthSummaryService.get_summary(db, greenhouse_id, days=7, today=TODAY)
+
+    assert summary["total_analyses"] == 4
+    distribution = {row["result"]: row for row in summary["distribution"]}
+    assert distribution["rust"]["count"] == 3
+    assert distribution["rust"]["share"] == 0.75
+    # Los análisis sin confianza cuentan pero no entran en la media
+    assert distribution["rust"]["mean_confidence"] == 0.5
+    assert distribution["healthy"]["mean_confidence"] == 0.5
+
+    first_day, second_day = summary["trend"]
+    assert first_day["day"] == date(2026, 3, 1)
+    assert first_day["count"] == 3
+    assert first_day["healthy_ratio"] == 1 / 3
+    assert first_day["labels"] == {"healthy": 1, "rust": 2}
+    assert second_day["mean_confidence"] is None
+
+    rust = _label(summary, plant_id, "rust")
+    assert rust["count"] == 2
+    assert rust["first_seen_at"] == datetime(2026, 3, 1, 10)
+    assert rust["last_seen_at"] == datetime(2026, 3, 2, 8)
+    assert rust["last_confidence"] is None
+
+
+def test_out_of_order_batch_keeps_latest_confidence(client, db, user_id, greenhouse_id):
+    """Un lote atrasado amplía first_seen_at pero no pisa la última confianza"""
+    plant_id, = create_plants(client, user_id, greenhouse_id, 1)
+    _record(db, plant_id, ("rust", 0.75, datetime(2026, 3, 2, 12)))
+    _record(db, plant_id, ("rust", 0.25, datetime(2026, 3, 1, 12)), ("rust", 0.5, datetime(2026, 3, 1, 18)))
+
+    rust = _label(HealthSummaryService.get_summary(db, greenhouse_id, days=7, today=TODAY), plant_id, "rust")
+
+    assert rust["count"] == 3
+    assert rust["first_seen_at"] == datetime(2026, 3, 1, 12)
+    assert rust["last_seen_at"] == datetime(2026, 3, 2, 12)
+    assert rust["last_confidence"] == 0.75
+
+    # Y uno más reciente sí la reemplaza
+    _record(db, plant_id, ("rust", 0.5, datetime(2026, 3, 2, 13)))
+    rust = _label(HealthSummaryService.get_summary(db, greenhouse_id, days=7, today=TODAY), plant_id, "rust")
+    assert rust["last_confidence"] == 0.5
+
+
+def test_rebuild_matches_incremental_updates(client, db, user_id, greenhouse_id):
+    plant_id, other_id = create_plants(client, user_id, greenhouse_id, 2)
+    _record(db, plant_id, ("rust", 0.75, datetime(2026, 3, 2, 12)), ("healthy", 0.5, datetime(2026, 3, 1, 7)))
+    _record(db, plant_id, ("rust", 0.25, datetime(2026, 3, 1, 12)))
+    _record(db, other_id, ("mildew", None, datetime(2026, 2, 28, 23)), ("healthy", 1.0, datetime(2026, 3, 2, 1)))
+    incremental = HealthSummaryService.get_summary(db, greenhouse_id, days=7, today=TODAY)
+
+    # Lotes de 2 para que rebuild pase varias veces por record_analyses
+    assert HealthSummaryService.rebuild(db, batch_size=2) == 5
+    rebuilt = HealthSummaryService.get_summary(db, greenhouse_id, days=7, today=TODAY)
+
+    # distribution solo se ordena por count: los empates pueden salir en otro orden
+    assert _distribution(rebuilt) == _distribution(incremental)
+    assert rebuilt == incremental
@@ -0,0 +1,108 @@
+"""Ingesta de lecturas con Idempotency-Key (IdempotencyService)"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from models import SensorReading
+from models.idempotency_key_model import IdempotencyKey
+from services.idempotency_service import IdempotencyService
+from services.reading_storage_service import ReadingStorageService
+
+from .conftest import create_sensors
+
+MOMENT = datetime(2026, 3, 1, 12, 0)
+
+
+def _batch(sensor_id, *values):
+    return {"readings": [
+        {"sensor_id": sensor_id, "value": value, "recorded_at": (MOMENT + timedelta(minutes=step)).isoformat()}
+        for step, value in enumerate(values)
+    ]}
+
+
+def _post(client, batch, key):
+    return client.post("/sensors/readings", json=batch, headers={"Idempotency-Key": key})
+
+
+@pytest.fixture
+def sensor_id(client, user_id, greenhouse_id):
+    sensor_id, = create_sensors(client, user_id, greenhouse_id, ["temperature"])
+    return sensor_id
+
+
+def test_retry_replays_original_response(client, db, sensor_id):
+    """Un reintento con la misma clave recibe la respuesta original sin volver a ingerir"""
+    first = _post(client, _batch(sensor_id, 20.0, 21.0), "gateway-1")
+    assert first.status_code == 200, first.text
+    assert "Idempotent-Replayed" not in first.headers
+
+    # Entre medias alguien borra las lecturas: el reintento no las vuelve a insertar
+    db.query(SensorReading).delete()
+    db.commit()
+    retry = _post(client, _batch(sensor_id, 20.0, 21.0), "gateway-1")
+
+    assert retry.status_code == 200
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.content == first.content
+    assert db.query(SensorReading).count() == 0
+
+
+def test_same_key_with_other_body_is_rejected(client, sensor_id):
+    """La misma clave con otro cuerpo es un error del cliente (422), no un reintento"""
+    assert _post(client, _batch(sensor_id, 20.0), "gateway-1").status_code == 200
+
+    response = _post(client, _batch(sensor_id, 25.0), "gateway-1")
+
+    assert response.status_code == 422
+    assert "Idempotent-Replayed" not in response.headers
+
+
+def test_expired_key_is_reclaimed(client, db, sensor_id):
+    """Pasado IDEMPOTENCY_TTL la clave vuelve a estar libre, aunque el cuerpo sea otro"""
+    assert _post(client, _batch(sensor_id, 20.0), "gateway-1").status_code == 200
+    stored = db.get(IdempotencyKey, ("POST /sensors/readings", "gateway-1"))
+    stored.expires_at = datetime.utcnow() - timedelta(seconds=1)
+    db.commit()
+
+    response = _post(client, _batch(sensor_id, 20.0, 22.0), "gateway-1")
+
+    assert response.status_code == 200, response.text
+    assert "Idempotent-Replayed" not in response.headers
+    assert response.json()["inserted"] == 1
+    db.expire_all()
+    assert db.get(IdempotencyKey, ("POST /sensors/readings", "gateway-1")).expires_at > datetime.utcnow()
+    assert IdempotencyService.purge_expired(db) == 0
+
+
+def test_failed_ingest_releases_the_key(client, db, sensor_id, monkeypatch):
+    """Si la ingesta falla la reserva se deshace con ella y el reintento se procesa"""
+    original = ReadingStorageService.ingest
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("base de datos caída")
+
+    monkeypatch.setattr(ReadingStorageService, "ingest", staticmethod(fail))
+    with pytest.raises(RuntimeError):
+        _post(client, _batch(sensor_id, 20.0), "gateway-1")
+    assert db.query(IdempotencyKey).count() == 0
+
+    monkeypatch.setattr(ReadingStorageService, "ingest", staticmethod(original))
+    response = _post(client, _batch(sensor_id, 20.0), "gateway-1")
+
+    assert response.status_code == 200, response.text
+    assert "Idempotent-Replayed" not in response.headers
+    assert response.json()["inserted"] == 1
+
+
+def test_duplicates_within_batch_are_dropped(client, db, sensor_id):
+    """Dentro de un lote gana la primera copia de cada (sensor, recorded_at)"""
+    batch = _batch(sensor_id, 20.0, 21.0)
+    batch["readings"].append(dict(batch["readings"][0], value=99.0))
+
+    result = _post(client, batch, "gateway-1").json()
+
+    assert result["received"] == 3
+    assert result["inserted"] == 2
+    assert result["duplicates"] == 1
+    values = db.query(SensorReading.value).order_by(SensorReading.recorded_at).all()
+    assert [value for value, in values] == [20.0, 21.0]
@@ -0,0 +1,46 @@
+"""Almacén de imágenes direccionado por contenido (storage.image_store)"""
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+from storage.image_store import ImageStore
+
+from .conftest import create_plants
+
+
+def _jpeg(color) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (640, 480), color).save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+def test_concurrent_puts_of_same_image(tmp_path):
+    """Varios hilos guardando los mismos bytes no chocan en el fichero temporal"""
+    for trial, color in enumerate(("red", "green", "blue", "white")):
+        store = ImageStore(str(tmp_path / str(trial)))
+        data = _jpeg(color)
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            stored = list(pool.map(lambda _: store.put(data), range(16)))
+
+        assert len({image.sha256 for image in stored}) == 1
+        directory = store.directory(stored[0].sha256)
+        assert sorted(os.listdir(directory)) == ["model.jpg", "original.jpg", "thumb.jpg"]
+
+
+def test_concurrent_uploads_of_same_image(client, user_id, greenhouse_id):
+    """Subidas simultáneas de la misma imagen a una planta devuelven todas la misma fila"""
+    plant_id, = create_plants(client, user_id, greenhouse_id, 1)
+    data = _jpeg("yellow")
+
+    def upload(_):
+        return client.post(
+            f"/plants/{plant_id}/images", content=data, headers={"Content-Type": "image/jpeg"}
+        )
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        responses = list(pool.map(upload, range(8)))
+
+    assert all(response.status_code in (200, 201) for response in responses), [r.text for r in responses]
+    assert len({response.json()["id"] for response in responses}) == 1
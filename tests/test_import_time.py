@@ -0,0 +1,12 @@
+"""Presupuesto de arranque en frío de la API (benchmarks.import_time)"""
+import os
+
+from benchmarks.import_time import check
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_import_main_within_budget(monkeypatch):
+    """import main cabe en 1500 ms y no arrastra torch, transformers, pandas, Open-Meteo ni pyswip"""
+    monkeypatch.chdir(ROOT)
+    assert check(budget_ms=1500) == []
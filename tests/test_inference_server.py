@@ -0,0 +1,81 @@
+"""Servidor de inferencia compartido y análisis de imágenes con el cliente remoto"""
+import io
+import os
+import shutil
+import tempfile
+import threading
+
+import pytest
+from PIL import Image
+
+import endpoints.plant_endpoints as plant_endpoints
+from clients.inference_server import InferenceServer, RemotePlantHealthClient
+
+from .conftest import create_plants
+
+
+class _FakeModel:
+    model_version = "fake-model@1a2b3c4"
+
+    def classify_batch(self, images, batch_size):
+        return [[{"label": "healthy", "score": 0.9}] for _ in images]
+
+
+def _jpeg(color="green") -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (64, 48), color).save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def remote_client():
+    # Ruta corta: los sockets Unix no admiten más de ~100 caracteres
+    directory = tempfile.mkdtemp(prefix="inference-")
+    socket_path = os.path.join(directory, "server.sock")
+    server = InferenceServer(socket_path, _FakeModel(), batch_size=4, max_wait=0.001)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield RemotePlantHealthClient(socket_path, timeout=5.0).load()
+    server.shutdown()
+    server.server_close()
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+def test_remote_client_reports_model_version(remote_client):
+    assert remote_client.model_version == _FakeModel.model_version
+    assert remote_client.classify_bytes(_jpeg()) == [{"label": "healthy", "score": 0.9}]
+    with pytest.raises(ValueError):
+        remote_client.classify_bytes(b"no es una imagen")
+
+
+def test_remote_analyses_are_deduplicated(client, user_id, greenhouse_id, remote_client, monkeypatch):
+    """Con la versión del servidor, volver a subir la misma imagen reutiliza el análisis"""
+    plant_id, = create_plants(client, user_id, greenhouse_id, 1)
+    monkeypatch.setattr(plant_endpoints.plant_health, "get", lambda: remote_client)
+
+    analyses = []
+    for _ in range(2):
+        response = client.post(
+            f"/plants/{plant_id}/images?analyze=true", content=_jpeg(), headers={"Content-Type": "image/jpeg"}
+        )
+        assert response.status_code == 201, response.text
+        analyses.append(response.json()["analysis"])
+
+    assert analyses[0]["id"] == analyses[1]["id"]
+    assert analyses[0]["model_version"] == _FakeModel.model_version
+
+
+def test_model_failure_is_503(client, user_id, greenhouse_id, monkeypatch):
+    plant_id, = create_plants(client, user_id, greenhouse_id, 1)
+
+    class _BrokenModel(_FakeModel):
+        def classify_bytes(self, data):
+            raise RuntimeError("CUDA out of memory")
+
+    monkeypatch.setattr(plant_endpoints.plant_health, "get", lambda: _BrokenModel())
+
+    response = client.post(
+        f"/plants/{plant_id}/images?analyze=true", content=_jpeg(), headers={"Content-Type": "image/jpeg"}
+    )
+
+    assert response.status_code == 503
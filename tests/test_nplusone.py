@@ -0,0 +1,95 @@
+"""
+Detector de consultas N+1 (monitoring.nplusone) sobre los endpoints
+
+Las peticiones de estos tests pasan por NPlusOneMiddleware con el fixture
+nplusone_guard activo: una carga perezosa repetida hace fallar el test.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from endpoints.dependencies import get_db
+from models import Plant, PlantAnalysis
+from monitoring.nplusone import NPlusOneError, NPlusOneMiddleware, assert_no_nplusone
+
+from .conftest import create_plants, create_sensors
+
+
+@pytest.fixture
+def populated(client, db, user_id, greenhouse_id):
+    """Invernadero con varias plantas (con análisis), sensores y lecturas"""
+    plant_ids = create_plants(client, user_id, greenhouse_id, 5)
+    sensor_ids = create_sensors(client, user_id, greenhouse_id, ["temperature", "humidity", "light"])
+    for plant_id in plant_ids:
+        db.add_all([
+            PlantAnalysis(plant_id=plant_id, analysis_type="health", result=label, confidence=0.9)
+            for label in ("healthy", "rust")
+        ])
+    db.commit()
+
+    start = datetime.utcnow() - timedelta(hours=1)
+    response = client.post("/sensors/readings", json={"readings": [
+        {"sensor_id": sensor_id, "value": 20.0 + minute, "recorded_at": (start + timedelta(minutes=minute)).isoformat()}
+        for sensor_id in sensor_ids for minute in range(30)
+    ]})
+    assert response.status_code == 200, response.text
+    return {"user_id": user_id, "greenhouse_id": greenhouse_id, "plant_ids": plant_ids, "sensor_ids": sensor_ids}
+
+
+@pytest.mark.parametrize("path", [
+    "/greenhouses/{greenhouse_id}",
+    "/greenhouses/{greenhouse_id}/readings/resampled",
+    "/greenhouses/{greenhouse_id}/health-summary",
+    "/plants/{plant_id}/analyses",
+    "/plants/{plant_id}/images",
+    "/sensors/{sensor_id}/readings",
+    "/sensors/{sensor_id}/readings/aggregate",
+    "/sensors/status?flagged_only=false",
+    "/sync?user_id={user_id}&since=0",
+])
+def test_read_endpoints_have_no_nplusone(client, populated, path):
+    url = path.format(
+        greenhouse_id=populated["greenhouse_id"],
+        plant_id=populated["plant_ids"][0],
+        sensor_id=populated["sensor_ids"][0],
+        user_id=populated["user_id"],
+    )
+    response = client.get(url)
+    assert response.status_code == 200, response.text
+
+
+def test_greenhouse_delete_has_no_nplusone(client, populated):
+    response = client.delete(f"/greenhouses/{populated['greenhouse_id']}?user_id={populated['user_id']}")
+    assert response.status_code == 204, response.text
+
+
+def _lazy_app() -> FastAPI:
+    """Aplicación con un endpoint que recorre Plant.analyses de forma perezosa"""
+    app = FastAPI()
+    app.add_middleware(NPlusOneMiddleware)
+
+    @app.get("/plants")
+    def list_plants(db=Depends(get_db)):
+        return [len(plant.analyses) for plant in db.query(Plant).all()]
+
+    return app
+
+
+def test_guard_reports_lazy_relationship(populated, nplusone_guard):
+    response = TestClient(_lazy_app()).get("/plants")
+    assert response.status_code == 200
+
+    assert nplusone_guard, "El detector no registró la carga perezosa"
+    assert "GET /plants" in nplusone_guard[0]
+    assert "Plant.analyses" in nplusone_guard[0]
+    # Violación esperada: no debe hacer fallar este test
+    nplusone_guard.clear()
+
+
+def test_assert_no_nplusone_names_relationship(populated, db):
+    with pytest.raises(NPlusOneError, match=r"Plant\.analyses"):
+        with assert_no_nplusone(label="listado de plantas"):
+            for plant in db.query(Plant).all():
+                len(plant.analyses)
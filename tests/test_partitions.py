@@ -0,0 +1,144 @@
+"""Particiones de sensor_readings (storage.partitions)"""
+import asyncio
+import os
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, text
+
+import services.reading_storage_service as reading_storage_service
+from storage import partitions
+
+from .conftest import create_sensors
+
+
+class _RecordingEngine:
+    """Engine de Postgres que solo anota las sentencias ejecutadas"""
+
+    class dialect:
+        name = "postgresql"
+
+    def __init__(self):
+        self.statements = []
+
+    @contextmanager
+    def begin(self):
+        engine = self
+
+        class Connection:
+            def execute(self, statement, parameters=None):
+                engine.statements.append(str(statement))
+
+        yield Connection()
+
+
+@pytest.fixture
+def known_periods(monkeypatch):
+    periods = set()
+    monkeypatch.setattr(partitions, "_known_periods", periods)
+    return periods
+
+
+def test_backfill_creates_only_missing_periods(monkeypatch, known_periods):
+    monkeypatch.setattr(partitions, "PARTITION_INTERVAL", "month")
+    monkeypatch.setattr(partitions, "list_partitions", lambda engine: [
+        ("sensor_readings_2026m03", datetime(2026, 3, 1), datetime(2026, 4, 1)),
+    ])
+    engine = _RecordingEngine()
+
+    created = partitions.ensure_partitions_for(engine, [
+        datetime(2026, 1, 31, 23, 59), datetime(2026, 3, 2), datetime(2025, 11, 5), datetime(2026, 1, 1),
+    ])
+
+    assert created == ["sensor_readings_2025m11", "sensor_readings_2026m01"]
+    assert "FOR VALUES FROM ('2026-01-01') TO ('2026-02-01')" in engine.statements[1]
+    assert known_periods == {date(2025, 11, 1), date(2026, 1, 1), date(2026, 3, 1)}
+
+    # Periodos ya conocidos: ni consulta ni DDL
+    monkeypatch.setattr(partitions, "list_partitions", lambda engine: pytest.fail("consulta innecesaria"))
+    assert partitions.ensure_partitions_for(engine, [datetime(2026, 1, 15)]) == []
+    assert len(engine.statements) == 2
+
+
+def test_ingest_prepares_partitions_for_old_readings(client, user_id, greenhouse_id, monkeypatch):
+    sensor_id, = create_sensors(client, user_id, greenhouse_id, ["temperature"])
+    calls = []
+    monkeypatch.setattr(reading_storage_service, "READINGS_PARTITIONING", True)
+    monkeypatch.setattr(
+        reading_storage_service, "ensure_partitions_for", lambda engine, moments: calls.append(list(moments))
+    )
+    old = datetime.utcnow() - timedelta(days=95)
+
+    response = client.post("/sensors/readings", json={"readings": [
+        {"sensor_id": sensor_id, "value": 20.0, "recorded_at": old.isoformat()},
+    ]})
+
+    assert response.status_code == 200, response.text
+    assert response.json()["inserted"] == 1
+    assert calls == [[old]]
+
+
+def test_retention_deletes_in_batches_without_partitions(client, db, user_id, greenhouse_id, monkeypatch):
+    """Postgres con sensor_readings sin particionar: la retención borra por lotes"""
+    sensor_id, = create_sensors(client, user_id, greenhouse_id, ["temperature"])
+    now = datetime.utcnow()
+    response = client.post("/sensors/readings", json={"readings": [
+        {"sensor_id": sensor_id, "value": float(days), "recorded_at": (now - timedelta(days=days)).isoformat()}
+        for days in (1, 2, 40, 41, 42, 43, 44)
+    ]})
+    assert response.status_code == 200, response.text
+
+    monkeypatch.setattr(partitions, "is_postgres", lambda engine: True)
+    monkeypatch.setattr(partitions, "list_partitions", lambda engine: [])
+    monkeypatch.setattr(partitions, "DELETE_BATCH_SIZE", 2)
+
+    result = partitions.apply_retention(db.get_bind(), keep_days=30)
+
+    assert result["deleted_rows"] == 5
+    assert result["dropped_partitions"] == []
+    remaining = db.execute(text("SELECT value FROM sensor_readings ORDER BY value")).scalars().all()
+    assert remaining == [1.0, 2.0]
+
+
+def test_maintenance_applies_retention_without_partitioning(monkeypatch):
+    """Con retención configurada y sin particionado solo se aplica la retención"""
+    calls = []
+    monkeypatch.setattr(partitions, "READINGS_PARTITIONING", False)
+    monkeypatch.setattr(partitions, "RETENTION_DAYS", 30)
+    monkeypatch.setattr(partitions, "ensure_partitions", lambda engine: pytest.fail("tabla sin particionar"))
+    monkeypatch.setattr(partitions, "apply_retention", lambda engine, keep_days: calls.append(keep_days) or {})
+
+    async def one_iteration():
+        task = asyncio.create_task(partitions.maintenance_loop(object(), interval_seconds=60))
+        await asyncio.sleep(0.1)
+        task.cancel()
+
+    asyncio.run(one_iteration())
+    assert calls == [30]
+
+
+@pytest.mark.skipif(not os.getenv("TEST_POSTGRES_URL"), reason="TEST_POSTGRES_URL no configurada")
+def test_postgres_accepts_readings_before_current_period(known_periods):
+    engine = create_engine(os.environ["TEST_POSTGRES_URL"])
+    with engine.begin() as connection:
+        connection.execute(text("DROP TABLE IF EXISTS sensor_readings CASCADE"))
+        connection.execute(text("DROP TABLE IF EXISTS sensors CASCADE"))
+        connection.execute(text("CREATE TABLE sensors (id SERIAL PRIMARY KEY)"))
+        connection.execute(text("INSERT INTO sensors DEFAULT VALUES"))
+    try:
+        assert partitions.create_partitioned_table(engine)
+        old = datetime.utcnow() - timedelta(days=120)
+
+        expected = partitions.partition_name(partitions.period_bounds(old)[0])
+        assert partitions.ensure_partitions_for(engine, [old]) == [expected]
+        with engine.begin() as connection:
+            connection.execute(
+                text("INSERT INTO sensor_readings (sensor_id, value, recorded_at) VALUES (1, 20.0, :at)"),
+                {"at": old}
+            )
+    finally:
+        with engine.begin() as connection:
+            connection.execute(text("DROP TABLE IF EXISTS sensor_readings CASCADE"))
+            connection.execute(text("DROP TABLE IF EXISTS sensors CASCADE"))
+        engine.dispose()
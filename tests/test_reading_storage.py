@@ -0,0 +1,45 @@
+"""Ingesta y almacenamiento de lecturas (ReadingStorageService)"""
+from datetime import datetime, timedelta
+
+from models import SensorReading
+from services.reading_storage_service import ReadingStorageService
+
+from .conftest import create_sensors
+
+DAY = datetime(2026, 1, 1)
+
+
+def _post(client, readings):
+    response = client.post("/sensors/readings", json={"readings": [
+        {"sensor_id": sensor_id, "value": value, "recorded_at": moment.isoformat()}
+        for sensor_id, moment, value in readings
+    ]})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_retry_of_compacted_reading_is_a_duplicate(client, db, user_id, greenhouse_id):
+    sensor_id, = create_sensors(client, user_id, greenhouse_id, ["temperature"])
+    readings = [(sensor_id, DAY + timedelta(minutes=10 * step), 20.0 + step) for step in range(6)]
+    _post(client, readings)
+    assert ReadingStorageService.compact_closed_chunks(db, closed_before=DAY + timedelta(days=2)) == 1
+    assert db.query(SensorReading).count() == 0
+
+    # Reintento de la pasarela: una lectura ya compactada y otra nueva del mismo día
+    late = (sensor_id, DAY + timedelta(hours=5), 30.0)
+    result = _post(client, [readings[2], late])
+
+    assert result["inserted"] == 1
+    assert result["duplicates"] == 1
+    timestamps, _ = ReadingStorageService.load_series(db, sensor_id)
+    assert len(timestamps) == 7
+    assert ReadingStorageService.aggregate(db, sensor_id)["count"] == 7
+
+
+def test_ingest_without_chunks_inserts_everything(client, db, user_id, greenhouse_id):
+    sensor_id, = create_sensors(client, user_id, greenhouse_id, ["humidity"])
+    readings = [(sensor_id, DAY + timedelta(minutes=step), 50.0) for step in range(3)]
+
+    assert _post(client, readings + readings[:1]) == {
+        "received": 4, "inserted": 3, "duplicates": 1, "unknown_sensors": []
+    }
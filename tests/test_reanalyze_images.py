@@ -0,0 +1,79 @@
+"""Re-análisis por lotes de las imágenes guardadas (pipelines.reanalyze_images)"""
+import io
+
+import pytest
+from PIL import Image
+
+from models import PlantAnalysis
+from pipelines.reanalyze_images import iter_pending_images, run
+from storage.image_store import image_store
+
+from .conftest import create_plants
+
+
+class _FakeClient:
+    model_version = "model@v2"
+
+    def classify_batch(self, images, batch_size):
+        return [[{"label": "healthy", "score": 0.9}] for _ in images]
+
+
+def _jpeg(color) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (64, 48), color).save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def images(client, db, user_id, greenhouse_id):
+    """Tres imágenes subidas sin ?analyze; una ya tiene análisis con la versión anterior y otra con la nueva"""
+    plant_id, other_plant_id = create_plants(client, user_id, greenhouse_id, 2)
+    uploaded = []
+    for target, color in ((plant_id, "red"), (plant_id, "green"), (other_plant_id, "blue")):
+        response = client.post(
+            f"/plants/{target}/images", content=_jpeg(color), headers={"Content-Type": "image/jpeg"}
+        )
+        assert response.status_code == 201, response.text
+        uploaded.append((target, image_store.relative_path(response.json()["sha256"], "model")))
+
+    db.add_all([
+        PlantAnalysis(plant_id=uploaded[0][0], analysis_type="health", result="rust",
+                      model_version="model@v1", image_path=uploaded[0][1]),
+        PlantAnalysis(plant_id=uploaded[2][0], analysis_type="health", result="healthy",
+                      model_version=_FakeClient.model_version, image_path=uploaded[2][1]),
+    ])
+    db.commit()
+    return uploaded
+
+
+def test_pending_images_come_from_plant_images(images):
+    from database_config import SessionLocal
+
+    pending = list(iter_pending_images(SessionLocal, _FakeClient.model_version, page_size=1))
+
+    # Incluye la imagen sin ningún análisis; excluye la ya analizada con la versión nueva
+    assert pending == sorted(images[:2])
+    # Reanudar tras la primera clave continúa por la segunda
+    assert list(iter_pending_images(SessionLocal, _FakeClient.model_version, after=pending[0])) == pending[1:]
+
+
+def test_run_reanalyzes_images_without_previous_analysis(images, db, tmp_path):
+    from database_config import SessionLocal
+
+    stats = run(
+        workers=1,
+        batch_size=8,
+        checkpoint_path=str(tmp_path / "checkpoint.json"),
+        image_root=image_store.root,
+        session_factory=SessionLocal,
+        client=_FakeClient(),
+    )
+
+    assert stats["processed"] == 2
+    assert stats["failed"] == 0
+    analyzed = {
+        (row.plant_id, row.image_path)
+        for row in db.query(PlantAnalysis).filter(PlantAnalysis.model_version == _FakeClient.model_version)
+    }
+    assert analyzed == set(images)
+    assert list(iter_pending_images(SessionLocal, _FakeClient.model_version)) == []
@@ -0,0 +1,72 @@
+"""Enrutado de lecturas a réplicas según su retraso (storage.replicas)"""
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine, delete, insert, select
+
+from models.replication_heartbeat_model import ReplicationHeartbeat
+from storage.replicas import ReplicaSet
+
+
+@pytest.fixture
+def replica_set(tmp_path):
+    primary = create_engine(f"sqlite:///{tmp_path / 'primary.db'}")
+    replica = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    for engine in (primary, replica):
+        ReplicationHeartbeat.__table__.create(engine)
+    replicas = ReplicaSet(primary, [replica], max_lag_seconds=0.2)
+    yield replicas
+    primary.dispose()
+    replica.dispose()
+
+
+def _replicate(replicas: ReplicaSet) -> None:
+    """Copia el latido del primario a la réplica (lo que haría la replicación)"""
+    with replicas.primary.connect() as connection:
+        beat_at = connection.execute(select(ReplicationHeartbeat.beat_at)).scalar()
+    with replicas.replicas[0].engine.begin() as connection:
+        connection.execute(delete(ReplicationHeartbeat))
+        connection.execute(insert(ReplicationHeartbeat).values(id=1, beat_at=beat_at))
+
+
+def test_replica_without_heartbeat_is_not_routable(replica_set):
+    """Hasta que el primer latido llega a la réplica las lecturas van al primario"""
+    replica_set.check()
+    assert replica_set.choose() is None
+
+    _replicate(replica_set)
+    replica_set.check()
+    assert replica_set.choose() is replica_set.replicas[0]
+
+
+def test_failed_heartbeat_stops_routing_to_replica(replica_set, monkeypatch):
+    """Si el latido deja de escribirse la réplica sale del enrutado al superar el retraso máximo"""
+    replica_set.heartbeat()
+    _replicate(replica_set)
+    replica_set.check()
+    assert replica_set.choose() is replica_set.replicas[0]
+
+    def fail():
+        raise ConnectionError("primario caído")
+
+    monkeypatch.setattr(replica_set, "heartbeat", fail)
+
+    async def one_iteration():
+        task = asyncio.create_task(replica_set.monitor_loop(interval_seconds=0.05))
+        await asyncio.sleep(0.3)
+        task.cancel()
+
+    asyncio.run(one_iteration())
+    assert replica_set.choose() is None
+    assert replica_set.status()[0]["routable"] is False
+
+
+def test_read_your_writes_skips_replica_behind_the_write(replica_set):
+    """Un cliente que escribió después del último latido replicado lee del primario"""
+    replica_set.heartbeat()
+    _replicate(replica_set)
+    replica_set.check()
+    beat_at = replica_set.replicas[0].beat_at
+
+    assert replica_set.choose(written_at=beat_at) is replica_set.replicas[0]
+    assert replica_set.choose(written_at=beat_at + 1) is None
@@ -0,0 +1,86 @@
+"""Remuestreo de las series de un invernadero (ResamplingService)"""
+import warnings
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from services.resampling_service import ResamplingService
+
+from .conftest import create_sensors
+
+START = datetime(2026, 1, 1, 0, 0, 0)
+
+
+def _ingest(client, readings):
+    response = client.post("/sensors/readings", json={"readings": [
+        {"sensor_id": sensor_id, "value": value, "recorded_at": moment.isoformat()}
+        for sensor_id, moment, value in readings
+    ]})
+    assert response.status_code == 200, response.text
+
+
+def test_subsecond_end_keeps_readings_in_their_sensor(client, db, user_id, greenhouse_id):
+    first, second = create_sensors(client, user_id, greenhouse_id, ["temperature", "temperature"])
+    end = START + timedelta(hours=1, microseconds=500_000)
+    _ingest(client, [
+        (first, START + timedelta(minutes=10), 10.0),
+        # Dentro de [trunc(end), end): antes caía en el primer intervalo del sensor siguiente
+        (first, START + timedelta(hours=1, microseconds=200_000), 99.0),
+        (second, START + timedelta(minutes=10), 20.0),
+    ])
+
+    resampled = ResamplingService.resample_greenhouse(db, greenhouse_id, START, end, 300, 'none')
+
+    assert resampled.values.shape == (2, 13)
+    assert resampled.values[0, -1] == 99.0
+    assert resampled.counts[1].sum() == 1
+    assert resampled.values[1, 2] == 20.0
+    assert np.isnan(resampled.values[1, 0])
+
+
+def test_subsecond_end_on_last_sensor(client, db, user_id, greenhouse_id):
+    first, second = create_sensors(client, user_id, greenhouse_id, ["temperature", "humidity"])
+    end = START + timedelta(hours=1, microseconds=500_000)
+    _ingest(client, [
+        (first, START, 10.0),
+        (second, START + timedelta(hours=1, microseconds=200_000), 55.0),
+    ])
+
+    response = client.get(
+        f"/greenhouses/{greenhouse_id}/readings/resampled",
+        params={"start": START.isoformat(), "end": end.isoformat(), "step": 300, "method": "none"}
+    )
+
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert len(body["t"]) == 13
+    assert body["values"][1][-1] == 55.0
+    assert body["values"][0][0] == 10.0
+
+
+def test_default_range_uses_current_time(client, user_id, greenhouse_id):
+    sensor_id, = create_sensors(client, user_id, greenhouse_id, ["temperature"])
+    _ingest(client, [(sensor_id, datetime.utcnow() - timedelta(minutes=5), 21.5)])
+
+    response = client.get(f"/greenhouses/{greenhouse_id}/readings/resampled")
+
+    assert response.status_code == 200, response.text
+    assert 21.5 in response.json()["values"][0]
+
+
+def test_timezone_aware_range_is_utc(client, db, user_id, greenhouse_id):
+    """Un rango con zona horaria equivale al mismo instante en UTC, sin avisos de NumPy"""
+    sensor_id, = create_sensors(client, user_id, greenhouse_id, ["temperature"])
+    _ingest(client, [(sensor_id, START + timedelta(minutes=10), 10.0)])
+    plus_two = timezone(timedelta(hours=2))
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        resampled = ResamplingService.resample_greenhouse(
+            db, greenhouse_id, (START + timedelta(hours=2)).replace(tzinfo=plus_two),
+            START + timedelta(hours=1), 300, 'none'
+        )
+
+    assert resampled.timestamps[0] == np.datetime64(START, "s")
+    assert resampled.values.shape == (1, 12)
+    assert resampled.values[0, 2] == 10.0
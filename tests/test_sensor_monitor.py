@@ -0,0 +1,104 @@
+"""Monitor de la flota de sensores (SensorMonitorService)"""
+from datetime import datetime, timedelta
+
+from models import Sensor
+from models.change_log_model import ChangeLog
+from services.sensor_monitor_service import SENSOR_QUIET_SECONDS, SensorMonitorService
+
+from .conftest import create_sensors
+
+NOW = datetime(2026, 3, 1, 12, 0)
+
+
+def _post(client, sensor_id, end, count, value, step=60):
+    """count lecturas cada step segundos que terminan en end; value(i) da el valor"""
+    response = client.post("/sensors/readings", json={"readings": [
+        {"sensor_id": sensor_id, "value": value(index),
+         "recorded_at": (end - timedelta(seconds=step * (count - 1 - index))).isoformat()}
+        for index in range(count)
+    ]})
+    assert response.status_code == 200, response.text
+
+
+def _sensor_changes(db, sensor_id):
+    return db.query(ChangeLog).filter_by(entity="sensors", entity_id=sensor_id).count()
+
+
+def test_detects_stale_flatline_and_out_of_range(client, db, user_id, greenhouse_id):
+    ok, stale, flat, out = create_sensors(
+        client, user_id, greenhouse_id, ["temperature", "temperature", "humidity", "temperature"]
+    )
+    _post(client, ok, NOW - timedelta(minutes=1), 30, lambda i: 20.0 + i % 3)
+    # Cadencia de 60 s: stale pasados max(3 * 60 s, 300 s) sin lecturas
+    _post(client, stale, NOW - timedelta(minutes=6), 30, lambda i: 20.0 + i % 3)
+    # Humedad congelada más de 4 h
+    _post(client, flat, NOW, 300, lambda i: 55.0)
+    _post(client, out, NOW, 5, lambda i: 150.0)
+
+    counts = SensorMonitorService.run(db, now=NOW)
+
+    assert counts["ok"] == 1
+    assert counts["stale"] == 1
+    assert counts["flatline"] == 1
+    assert counts["out_of_range"] == 1
+    assert counts["deactivated"] == 0
+    statuses = {row["sensor_id"]: row["status"] for row in SensorMonitorService.get_statuses(db)}
+    assert statuses == {stale: "stale", flat: "flatline", out: "out_of_range"}
+
+
+def test_quiet_sensor_is_deactivated_and_reactivated(client, db, user_id, greenhouse_id):
+    sensor_id, = create_sensors(client, user_id, greenhouse_id, ["humidity"])
+    _post(client, sensor_id, NOW - timedelta(seconds=SENSOR_QUIET_SECONDS + 60), 5, lambda i: 50.0 + i)
+    version = db.get(Sensor, sensor_id).version
+    changes = _sensor_changes(db, sensor_id)
+
+    counts = SensorMonitorService.run(db, now=NOW)
+
+    assert counts["deactivated"] == 1
+    db.expire_all()
+    sensor = db.get(Sensor, sensor_id)
+    assert sensor.active is False
+    # UPDATE fuera del ORM: la versión y el change_log se escriben a mano
+    assert sensor.version == version + 1
+    assert _sensor_changes(db, sensor_id) == changes + 1
+    # Una segunda pasada no vuelve a escribir nada
+    assert SensorMonitorService.run(db, now=NOW)["deactivated"] == 0
+    assert _sensor_changes(db, sensor_id) == changes + 1
+
+    # Vuelve a reportar: se reactiva solo
+    later = NOW + timedelta(minutes=10)
+    _post(client, sensor_id, later, 2, lambda i: 60.0 + i)
+    counts = SensorMonitorService.run(db, now=later)
+
+    assert counts["reactivated"] == 1
+    assert counts["ok"] == 1
+    db.expire_all()
+    sensor = db.get(Sensor, sensor_id)
+    assert sensor.active is True
+    assert sensor.version == version + 2
+    assert _sensor_changes(db, sensor_id) == changes + 2
+
+
+def test_hand_disabled_sensor_is_left_alone(client, db, user_id, greenhouse_id):
+    sensor_id, = create_sensors(client, user_id, greenhouse_id, ["light"])
+    _post(client, sensor_id, NOW - timedelta(seconds=SENSOR_QUIET_SECONDS + 60), 5, lambda i: 100.0)
+    sensor = db.get(Sensor, sensor_id)
+    sensor.active = False
+    db.commit()
+    version = sensor.version
+
+    counts = SensorMonitorService.run(db, now=NOW)
+    assert counts["inactive"] == 1
+    assert counts["deactivated"] == 0
+
+    # Aunque vuelva a reportar, solo quien lo desactivó puede reactivarlo
+    _post(client, sensor_id, NOW, 2, lambda i: 200.0 + i)
+    counts = SensorMonitorService.run(db, now=NOW)
+
+    assert counts["inactive"] == 1
+    assert counts["reactivated"] == 0
+    db.expire_all()
+    sensor = db.get(Sensor, sensor_id)
+    assert sensor.active is False
+    assert sensor.version == version
+    assert SensorMonitorService.get_statuses(db) == []